@@ -0,0 +1,5 @@
+"""
+Dvent performance benchmarks
+
+Run with `python -m benchmarks --help`
+"""
@@ -0,0 +1,86 @@
+"""
+Command line interface for running and comparing benchmarks
+"""
+import argparse
+import sys
+
+from benchmarks.runner import (
+    compare_results, load_results, run_benchmarks, save_results
+)
+
+
+def _report(result):
+    per_item = result['best_per_item']
+    print('{:<48} {:>9} {:>12.6f}s {:>12}'.format(
+        result['benchmark'],
+        result['size'],
+        result['best'],
+        '{:.3f}us/item'.format(per_item * 1e6) if per_item else '',
+    ), flush=True)
+
+
+def run(args):
+    results = run_benchmarks(
+        names=args.filter,
+        max_size=args.max_size,
+        sizes=args.size,
+        repeat=args.repeat,
+        report=_report,
+    )
+    if args.output:
+        save_results(results, args.output)
+
+
+def compare(args):
+    comparisons = compare_results(
+        load_results(args.base), load_results(args.head)
+    )
+    for name, size, base_best, head_best, ratio in comparisons:
+        print('{:<48} {:>9} {:>12.6f}s {:>12.6f}s {:>8.2f}x'.format(
+            name, size, base_best, head_best, ratio or 0
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description='Dvent benchmarks'
+    )
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='Run benchmarks')
+    run_parser.add_argument(
+        '-o', '--output', help='Save results as JSON to this path'
+    )
+    run_parser.add_argument(
+        '-k', '--filter', action='append',
+        help='Only run benchmarks whose name contains this (repeatable)'
+    )
+    run_parser.add_argument(
+        '--max-size', type=int, help='Skip sizes larger than this'
+    )
+    run_parser.add_argument(
+        '--size', type=int, action='append',
+        help='Only run this size (repeatable)'
+    )
+    run_parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='Measurements per benchmark and size (default 3)'
+    )
+    run_parser.set_defaults(fn=run)
+
+    compare_parser = commands.add_parser(
+        'compare', help='Compare two saved results; ratio < 1 is faster'
+    )
+    compare_parser.add_argument('base', help='Baseline results JSON')
+    compare_parser.add_argument('head', help='Results JSON to compare')
+    compare_parser.set_defaults(fn=compare)
+
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 1
+    return args.fn(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Aggregate benchmarks
+"""
+from uuid import uuid4
+
+from pyrsistent import pvector
+
+from dvent.event import set_trusted_replay
+
+from benchmarks.fixtures import (
+    CountingAggregate, get_aggregate, get_events, generate_events
+)
+from benchmarks.runner import benchmark
+
+
+@benchmark('aggregate.apply_event', items=lambda size: 1)
+def bench_apply_event(size):
+    """
+    Apply a single event to an aggregate which already has `size` events
+    """
+    aggregate = get_aggregate(size)
+    event = generate_events(1, versioned=False)[0]
+
+    def fn():
+        aggregate.apply_event(event)
+    return fn
+
+
+@benchmark('aggregate.apply_events')
+def bench_apply_events(size):
+    """
+    Apply `size` new events to an empty aggregate as uncommitted
+    """
+    aggregate = CountingAggregate.generate()
+    events = get_events(size)
+
+    def fn():
+        aggregate.apply_events(events)
+    return fn
+
+
+@benchmark('aggregate.generate_from_events')
+def bench_generate_from_events(size):
+    """
+    Rebuild an aggregate from `size` committed events
+    """
+    id_ = str(uuid4())
+    events = pvector(get_events(size))
+
+    def fn():
+        CountingAggregate.generate_from_events(id_, events)
+    return fn
+
+
+@benchmark('aggregate.generate_from_events_validated')
+def bench_generate_from_events_validated(size):
+    """
+    Rebuild an aggregate from `size` committed events with trusted replay
+    disabled so every event is re-validated
+    """
+    id_ = str(uuid4())
+    events = pvector(get_events(size))
+
+    def fn():
+        previous = set_trusted_replay(False)
+        try:
+            CountingAggregate.generate_from_events(id_, events)
+        finally:
+            set_trusted_replay(previous)
+    return fn
+
+
+# Aggregates per set/dict in the hashing benchmarks
+HASHED_AGGREGATES = 100
+
+
+def _get_hashed_aggregates(size):
+    """
+    Return `HASHED_AGGREGATES` aggregates of `size` events each, sharing
+    their events, and an equal but distinct copy of each
+    """
+    events = pvector(get_events(size))
+    aggregates = [
+        CountingAggregate.generate_from_events(str(uuid4()), events)
+        for _ in range(HASHED_AGGREGATES)
+    ]
+    copies = [
+        CountingAggregate.generate_from_events(aggregate.id, events)
+        for aggregate in aggregates
+    ]
+    return aggregates, copies
+
+
+@benchmark('aggregate.hash', items=lambda size: 1)
+def bench_hash(size):
+    """
+    Hash an aggregate which has `size` events
+    """
+    aggregate = get_aggregate(size)
+
+    def fn():
+        hash(aggregate)
+    return fn
+
+
+@benchmark('aggregate.set_membership', items=lambda size: HASHED_AGGREGATES)
+def bench_set_membership(size):
+    """
+    Look up an equal copy of each of a set's aggregates of `size` events
+    """
+    aggregates, copies = _get_hashed_aggregates(size)
+    aggregates = set(aggregates)
+
+    def fn():
+        for copy in copies:
+            copy in aggregates
+    return fn
+
+
+@benchmark('aggregate.dict_keys', items=lambda size: HASHED_AGGREGATES)
+def bench_dict_keys(size):
+    """
+    Key a new dict by aggregates of `size` events
+    """
+    aggregates, _ = _get_hashed_aggregates(size)
+
+    def fn():
+        dict.fromkeys(aggregates)
+    return fn
@@ -0,0 +1,54 @@
+"""
+Cold stream archival benchmarks
+"""
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+from dvent.archive import ArchivingEventStore
+
+from benchmarks.fixtures import copy_db, generate_store, get_stream_db
+from benchmarks.runner import benchmark
+
+
+def _generate_archived_store(size):
+    db, stream_id = get_stream_db(size)
+    path = os.path.join(tempfile.gettempdir(), 'dvent-bench-archive')
+    shutil.rmtree(path, ignore_errors=True)
+    store = ArchivingEventStore.generate(
+        generate_store(copy_db(db)), path, idle_period=timedelta(0),
+        clock=lambda: datetime.utcnow() + timedelta(days=1)
+    )
+    store.archive_idle_streams()
+    return store, stream_id
+
+
+@benchmark('archive.archive_idle_streams')
+def bench_archive_idle_streams(size):
+    """
+    Archive a stream with `size` events
+    """
+    db, _ = get_stream_db(size)
+    path = os.path.join(tempfile.gettempdir(), 'dvent-bench-archive')
+
+    def fn():
+        shutil.rmtree(path, ignore_errors=True)
+        ArchivingEventStore.generate(
+            generate_store(copy_db(db)), path, idle_period=timedelta(0),
+            clock=lambda: datetime.utcnow() + timedelta(days=1)
+        ).archive_idle_streams()
+    return fn
+
+
+@benchmark('archive.get_events')
+def bench_get_events(size):
+    """
+    Read every event of an archived stream with `size` events
+    """
+    store, stream_id = _generate_archived_store(size)
+
+    def fn():
+        for _ in store.get_events(stream_id):
+            pass
+    return fn
@@ -0,0 +1,62 @@
+"""
+Bulk export & import benchmarks
+"""
+import os
+import tempfile
+
+from dvent.bulk import (
+    export_columnar, export_jsonl, import_events, read_columnar, read_jsonl
+)
+
+from benchmarks.fixtures import generate_store, get_streams_db
+from benchmarks.runner import benchmark
+
+# Events per stream in the exported store
+EVENTS_PER_STREAM = 10
+
+FORMATS = (
+    ('jsonl', export_jsonl, read_jsonl),
+    ('columnar', export_columnar, read_columnar),
+)
+
+
+def _get_export_path(format_):
+    return os.path.join(
+        tempfile.gettempdir(), 'dvent-bench.{}'.format(format_)
+    )
+
+
+def _get_store(size):
+    return generate_store(get_streams_db(
+        max(size // EVENTS_PER_STREAM, 1), events_per_stream=EVENTS_PER_STREAM
+    ))
+
+
+def _register(format_, export_fn, read_fn):
+    @benchmark('bulk.export_{}'.format(format_))
+    def bench_export(size):
+        """
+        Export a store holding `size` events
+        """
+        store = _get_store(size)
+
+        def fn():
+            export_fn(store, _get_export_path(format_))
+        return fn
+
+    @benchmark('bulk.import_{}'.format(format_))
+    def bench_import(size):
+        """
+        Import `size` exported events into a new store
+        """
+        export_fn(_get_store(size), _get_export_path(format_))
+
+        def fn():
+            import_events(
+                generate_store(), read_fn(_get_export_path(format_))
+            )
+        return fn
+
+
+for _format in FORMATS:
+    _register(*_format)
@@ -0,0 +1,59 @@
+"""
+Event bus benchmarks
+"""
+from dvent.bus import EventBus
+
+from benchmarks.fixtures import generate_events
+from benchmarks.runner import benchmark
+
+# Subscriptions registered on the benchmarked bus, each to its own type
+SUBSCRIBERS = 100
+
+
+def _get_bus():
+    bus = EventBus()
+    for index in range(SUBSCRIBERS):
+        bus.subscribe(
+            lambda event: None, types=('Type{}'.format(index),),
+            name='subscriber{}'.format(index)
+        )
+    bus.subscribe(
+        lambda event: None, types=('ThingCounted',), name='counter'
+    )
+    return bus
+
+
+@benchmark('bus.publish')
+def bench_publish(size):
+    """
+    Publish `size` events through a bus of 101 type subscriptions, each event
+    routed to one of them
+    """
+    bus = _get_bus()
+    events = generate_events(size)
+
+    def fn():
+        for event in events:
+            bus.publish(event)
+    return fn
+
+
+@benchmark('bus.publish_filtered')
+def bench_publish_filtered(size):
+    """
+    Publish `size` events to the same 101 handlers each filtering every event
+    by type itself, for comparison with `bus.publish`
+    """
+    types = ['Type{}'.format(index) for index in range(SUBSCRIBERS)]
+    types.append('ThingCounted')
+    handlers = [
+        (lambda type_: lambda event: event.type == type_ and None)(type_)
+        for type_ in types
+    ]
+    events = generate_events(size)
+
+    def fn():
+        for event in events:
+            for handler in handlers:
+                handler(event)
+    return fn
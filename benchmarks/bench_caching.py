@@ -0,0 +1,40 @@
+"""
+Caching event store benchmarks
+"""
+from dvent.caching import CachingEventStore
+
+from benchmarks.fixtures import generate_store, get_stream_db
+from benchmarks.runner import benchmark
+
+
+def _generate_warm_store(size):
+    db, stream_id = get_stream_db(size)
+    store = CachingEventStore.generate(generate_store(db), max_events=size)
+    for _ in store.get_events(stream_id):
+        pass
+    return store, stream_id
+
+
+@benchmark('caching.get_events')
+def bench_get_events(size):
+    """
+    Read every event of a cached stream with `size` events
+    """
+    store, stream_id = _generate_warm_store(size)
+
+    def fn():
+        for _ in store.get_events(stream_id):
+            pass
+    return fn
+
+
+@benchmark('caching.get_last_event', items=lambda size: 1)
+def bench_get_last_event(size):
+    """
+    Get the last event of a cached stream with `size` events
+    """
+    store, stream_id = _generate_warm_store(size)
+
+    def fn():
+        store.get_last_event(stream_id)
+    return fn
@@ -0,0 +1,70 @@
+"""
+Columnar event log view benchmarks
+"""
+from dvent.columnar import EventLogView
+
+from benchmarks.fixtures import generate_store, get_streams_db
+from benchmarks.runner import benchmark
+
+# Events per stream in the viewed store
+EVENTS_PER_STREAM = 10
+
+
+def _get_store(size):
+    return generate_store(get_streams_db(
+        max(size // EVENTS_PER_STREAM, 1), events_per_stream=EVENTS_PER_STREAM
+    ))
+
+
+def _get_view(size):
+    view = EventLogView(_get_store(size))
+    view.refresh()
+    return view
+
+
+@benchmark('columnar.refresh')
+def bench_refresh(size):
+    """
+    Materialize a view of a store holding `size` events
+    """
+    store = _get_store(size)
+
+    def fn():
+        EventLogView(store).refresh()
+    return fn
+
+
+@benchmark('columnar.count_by_type_per_interval')
+def bench_count_by_type_per_interval(size):
+    """
+    Count events per type per hour over a view of `size` events
+    """
+    view = _get_view(size)
+
+    def fn():
+        view.count_by_type_per_interval()
+    return fn
+
+
+@benchmark('columnar.stream_lengths')
+def bench_stream_lengths(size):
+    """
+    Count events per stream over a view of `size` events
+    """
+    view = _get_view(size)
+
+    def fn():
+        view.stream_lengths()
+    return fn
+
+
+@benchmark('columnar.version_gaps')
+def bench_version_gaps(size):
+    """
+    Find version gaps over a view of `size` events
+    """
+    view = _get_view(size)
+
+    def fn():
+        view.version_gaps()
+    return fn
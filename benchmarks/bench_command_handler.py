@@ -0,0 +1,113 @@
+"""
+Command handler benchmarks
+"""
+from functools import lru_cache as memoize
+from itertools import cycle
+from uuid import uuid4
+
+from pyrsistent import pmap
+
+from dvent.command import Command
+from dvent.command_handler import CommandHandler
+from dvent.event import Event
+from dvent.event_store import InMemoryEventDB
+from dvent.repository import Repository
+
+from benchmarks.fixtures import (
+    CountingAggregate, copy_db, generate_events, generate_store
+)
+from benchmarks.runner import benchmark
+
+# Commands per aggregate, and events per aggregate before handling them
+AGGREGATE_COMMANDS = 10
+AGGREGATE_EVENTS = 10
+
+
+def _count_thing(aggregate):
+    return aggregate.apply_event(Event.generate(
+        'ThingCounted', data={'amount': 1},
+        version=aggregate.uncommitted_version + 1
+    ))
+
+
+class CountingCommandHandler(CommandHandler):
+    """
+    Handler counting things on a `CountingAggregate` per command
+    """
+
+    @classmethod
+    @memoize(maxsize=1)
+    def get_handle_map(cls):
+        return pmap({'CountThing': cls.handle_count_thing})
+
+    @classmethod
+    @memoize(maxsize=1)
+    def get_aggregate_handle_map(cls):
+        return pmap({
+            'CountThing': (CountingAggregate, cls.handle_aggregate_count_thing)
+        })
+
+    @staticmethod
+    def handle_count_thing(context, command):
+        repository = context['repository']
+        aggregate = repository.get_aggregate(
+            CountingAggregate, command.data['id']
+        )
+        return repository.save_aggregate(_count_thing(aggregate))
+
+    @staticmethod
+    def handle_aggregate_count_thing(context, aggregate, command):
+        return _count_thing(aggregate)
+
+
+@memoize(maxsize=1)
+def _get_aggregates_db(size):
+    """
+    Return a cached db and the ids of `size` aggregate streams
+    """
+    db = InMemoryEventDB()
+    ids = [str(uuid4()) for _ in range(size)]
+    for id_ in ids:
+        db.write_to_stream(id_, generate_events(AGGREGATE_EVENTS))
+    return db, ids
+
+
+def _setup(size):
+    db, ids = _get_aggregates_db(max(size // AGGREGATE_COMMANDS, 1))
+    commands = [
+        Command.generate('CountThing', data=pmap({'id': id_}))
+        for _, id_ in zip(range(size), cycle(ids))
+    ]
+
+    def generate_handler():
+        repository = Repository(event_store=generate_store(copy_db(db)))
+        return CountingCommandHandler(
+            context=pmap({'repository': repository})
+        )
+    return commands, generate_handler
+
+
+@benchmark('command_handler.handle_commands')
+def bench_handle_commands(size):
+    """
+    Handle `size` commands spread over one aggregate per 10 as one batch
+    """
+    commands, generate_handler = _setup(size)
+
+    def fn():
+        generate_handler().handle_commands(commands)
+    return fn
+
+
+@benchmark('command_handler.handle_command')
+def bench_handle_command(size):
+    """
+    Handle `size` commands spread over one aggregate per 10 one at a time
+    """
+    commands, generate_handler = _setup(size)
+
+    def fn():
+        handler = generate_handler()
+        for command in commands:
+            handler.handle_command(command)
+    return fn
@@ -0,0 +1,60 @@
+"""
+Deduplicating event store benchmarks
+"""
+from dvent.dedup import DeduplicatingEventStore, EventIdIndex
+
+from benchmarks.fixtures import generate_events, generate_store
+from benchmarks.runner import benchmark
+
+# Ids held exactly by the benchmarked indexes; older ids go to a Bloom filter
+WINDOW = 10000
+
+
+@benchmark('dedup.save_events')
+def bench_save_events(size):
+    """
+    Save `size` single-event writes through a deduplicating store
+    """
+    events = generate_events(size, versioned=False)
+
+    def fn():
+        store = DeduplicatingEventStore.generate(
+            generate_store(), window=WINDOW, bloom_capacity=size
+        )
+        for event in events:
+            store.save_events('stream', (event,))
+    return fn
+
+
+@benchmark('dedup.save_duplicate_events')
+def bench_save_duplicate_events(size):
+    """
+    Retry `size` single-event writes to their own streams, half of them older
+    than the exact window
+    """
+    events = generate_events(size, versioned=False)
+    store = DeduplicatingEventStore.generate(
+        generate_store(), window=max(size // 2, 1), bloom_capacity=size
+    )
+    for event in events:
+        store.save_events(event.id, (event,))
+
+    def fn():
+        for event in events:
+            store.save_events(event.id, (event,))
+    return fn
+
+
+@benchmark('dedup.index_add')
+def bench_index_add(size):
+    """
+    Add `size` ids to an index, all but `WINDOW` of them moving to its Bloom
+    filter
+    """
+    ids = [event.id for event in generate_events(size)]
+
+    def fn():
+        index = EventIdIndex(window=WINDOW, bloom_capacity=size)
+        for id_ in ids:
+            index.add(id_)
+    return fn
@@ -0,0 +1,52 @@
+"""
+Event benchmarks
+"""
+from dvent.event import Event
+
+from benchmarks.fixtures import get_events
+from benchmarks.runner import benchmark
+
+
+@benchmark('event.generate')
+def bench_generate(size):
+    data = {'amount': 1, 'note': 'counted'}
+
+    def fn():
+        for _ in range(size):
+            Event.generate('ThingCounted', data=data)
+    return fn
+
+
+@benchmark('event.generate_many')
+def bench_generate_many(size):
+    specs = [('ThingCounted', {'amount': 1, 'note': 'counted'})] * size
+
+    def fn():
+        Event.generate_many(specs, stream_id='stream', start_version=1)
+    return fn
+
+
+@benchmark('event.create')
+def bench_create(size):
+    """
+    Build `size` events from stored values with full validation
+    """
+    values = [dict(event) for event in get_events(size)]
+
+    def fn():
+        for _values in values:
+            Event.create(_values)
+    return fn
+
+
+@benchmark('event.create_trusted')
+def bench_create_trusted(size):
+    """
+    Build `size` events from stored values as trusted
+    """
+    values = [dict(event) for event in get_events(size)]
+
+    def fn():
+        for _values in values:
+            Event.create_trusted(_values)
+    return fn
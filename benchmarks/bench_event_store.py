@@ -0,0 +1,80 @@
+"""
+In-memory event store benchmarks
+"""
+from uuid import uuid4
+
+from benchmarks.fixtures import (
+    copy_db, generate_events, generate_store, get_events, get_stream_db,
+    get_streams_db
+)
+from benchmarks.runner import benchmark
+
+PAGE_SIZE = 100
+
+
+@benchmark('event_store.save_events')
+def bench_save_events(size):
+    """
+    Save `size` events to a new stream in one call
+    """
+    events = get_events(size)
+
+    def fn():
+        generate_store().save_events(str(uuid4()), events, -1)
+    return fn
+
+
+@benchmark('event_store.save_events_expected_version', items=lambda size: 1)
+def bench_save_events_expected_version(size):
+    """
+    Save one event with a version check to a stream with `size` events
+    """
+    db, stream_id = get_stream_db(size)
+    event = generate_events(1, versioned=False)[0].set('version', size + 1)
+
+    def fn():
+        generate_store(copy_db(db)).save_events(stream_id, (event,), size)
+    return fn
+
+
+@benchmark('event_store.get_events')
+def bench_get_events(size):
+    """
+    Read every event of a stream with `size` events
+    """
+    db, stream_id = get_stream_db(size)
+    store = generate_store(db)
+
+    def fn():
+        for _ in store.get_events(stream_id):
+            pass
+    return fn
+
+
+@benchmark('event_store.get_last_event', items=lambda size: 1)
+def bench_get_last_event(size):
+    """
+    Get the last event of a stream with `size` events
+    """
+    db, stream_id = get_stream_db(size)
+    store = generate_store(db)
+
+    def fn():
+        store.get_last_event(stream_id)
+    return fn
+
+
+@benchmark(
+    'event_store.get_streams_page', items=lambda size: min(size, PAGE_SIZE)
+)
+def bench_get_streams_page(size):
+    """
+    Read the last page of streams from a store holding `size` streams
+    """
+    store = generate_store(get_streams_db(size))
+    start = max(size - PAGE_SIZE, 0)
+
+    def fn():
+        for _ in store.get_streams(start=start):
+            pass
+    return fn
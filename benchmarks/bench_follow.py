@@ -0,0 +1,75 @@
+"""
+Live tail benchmarks
+"""
+from threading import Event as ThreadingEvent, Thread
+from time import sleep
+from uuid import uuid4
+
+from benchmarks.fixtures import generate_events, generate_store
+from benchmarks.runner import benchmark
+
+# Sizes are events handed off one at a time, so keep them small
+SIZES = (10, 100, 1000)
+
+# Seconds between reads of a polling follower
+POLL_INTERVAL = 0.001
+
+
+def _handoff(size, follow):
+    """
+    Return a function saving `size` events one at a time, each only once
+    the follower running `follow(event_store, stream_id, received)` has
+    received the previous one
+    """
+    events = generate_events(size)
+
+    def fn():
+        event_store = generate_store()
+        stream_id = str(uuid4())
+        received = ThreadingEvent()
+        follower = Thread(
+            target=follow, args=(event_store, stream_id, size, received),
+            daemon=True
+        )
+        follower.start()
+        for event in events:
+            received.clear()
+            event_store.save_events(stream_id, (event,))
+            received.wait()
+        follower.join()
+    return fn
+
+
+def _subscribe(event_store, stream_id, size, received):
+    for count, _ in enumerate(event_store.subscribe(stream_id), 1):
+        received.set()
+        if count == size:
+            return
+
+
+def _poll(event_store, stream_id, size, received):
+    position = 0
+    while position < size:
+        events = list(event_store.get_events(stream_id, start=position))
+        if events:
+            position += len(events)
+            received.set()
+        else:
+            sleep(POLL_INTERVAL)
+
+
+@benchmark('follow.subscribe', sizes=SIZES)
+def bench_subscribe(size):
+    """
+    Hand off `size` events one at a time to a subscribed follower thread
+    """
+    return _handoff(size, _subscribe)
+
+
+@benchmark('follow.poll', sizes=SIZES)
+def bench_poll(size):
+    """
+    Hand off `size` events one at a time to a follower thread polling
+    `get_events` every millisecond
+    """
+    return _handoff(size, _poll)
@@ -0,0 +1,71 @@
+"""
+Event id generator benchmarks, including index inserts on SQLite
+
+SQLite stands in for a real backend: events are inserted into a table whose
+primary key is the event id, so random ids scatter inserts across the B-tree
+while time-ordered ids append to it
+"""
+import os
+import sqlite3
+from tempfile import TemporaryDirectory
+
+from dvent.ids import uuid4_id, uuid7_id
+
+from benchmarks.runner import benchmark
+
+# Rows inserted per transaction
+INSERT_BATCH_SIZE = 1000
+
+ID_FACTORIES = (
+    ('uuid4', uuid4_id),
+    ('uuid7', uuid7_id),
+)
+
+
+def _generate_ids_setup(id_factory):
+    def setup(size):
+        def fn():
+            for _ in range(size):
+                id_factory()
+        return fn
+    return setup
+
+
+def _sqlite_insert_setup(id_factory):
+    def setup(size):
+        ids = [id_factory() for _ in range(size)]
+
+        def fn():
+            # Removed with the database once the run ends, even if it fails
+            with TemporaryDirectory() as directory:
+                connection = sqlite3.connect(
+                    os.path.join(directory, 'events.db')
+                )
+                try:
+                    connection.execute(
+                        'CREATE TABLE events ('
+                        'id TEXT PRIMARY KEY, type TEXT, data TEXT'
+                        ') WITHOUT ROWID'
+                    )
+                    for start in range(0, size, INSERT_BATCH_SIZE):
+                        with connection:
+                            connection.executemany(
+                                'INSERT INTO events VALUES (?, ?, ?)', (
+                                    (id_, 'ThingCounted', '{"amount": 1}')
+                                    for id_ in ids[
+                                        start:start + INSERT_BATCH_SIZE
+                                    ]
+                                )
+                            )
+                finally:
+                    connection.close()
+        return fn
+    return setup
+
+
+for _name, _id_factory in ID_FACTORIES:
+    benchmark('ids.{}'.format(_name))(_generate_ids_setup(_id_factory))
+    benchmark(
+        'ids.sqlite_insert_{}'.format(_name),
+        sizes=(1000, 10000, 100000, 1000000),
+    )(_sqlite_insert_setup(_id_factory))
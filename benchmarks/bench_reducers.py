@@ -0,0 +1,47 @@
+"""
+Numeric reducer benchmarks
+"""
+from dvent.aggregate import Aggregate
+from dvent.reducers import NumericReducer
+
+from benchmarks.fixtures import generate_store, get_streams_db
+from benchmarks.runner import benchmark
+
+# Events per stream in the reduced store
+EVENTS_PER_STREAM = 10
+
+REDUCER = NumericReducer.generate('amounts', 'amount', types=('ThingCounted',))
+
+
+def _get_store(size):
+    return generate_store(get_streams_db(
+        max(size // EVENTS_PER_STREAM, 1), events_per_stream=EVENTS_PER_STREAM
+    ))
+
+
+@benchmark('reducers.reduce')
+def bench_reduce(size):
+    """
+    Reduce `size` events by stream with batched NumPy operations
+    """
+    store = _get_store(size)
+
+    def fn():
+        REDUCER.reduce(store)
+    return fn
+
+
+@benchmark('reducers.apply_event')
+def bench_apply_event(size):
+    """
+    Fold `size` events by stream with the per-event apply handler
+    """
+    store = _get_store(size)
+    apply_map = REDUCER.get_apply_map()
+
+    def fn():
+        for stream in store.get_streams():
+            Aggregate.generate_from_events(
+                stream.id, store.get_events(stream.id), apply_map=apply_map
+            )
+    return fn
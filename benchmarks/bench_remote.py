@@ -0,0 +1,60 @@
+"""
+Remote event store benchmarks against a server on a local TCP port
+"""
+from uuid import uuid4
+
+from dvent.event import Event
+from dvent.remote import EventStoreServer, RemoteEventStore
+
+from benchmarks.fixtures import generate_store, get_stream_db, noop_publisher
+from benchmarks.runner import benchmark
+
+
+def _generate_remote_store(db=None):
+    server = EventStoreServer(generate_store(db))
+    address = server.start_in_thread(('127.0.0.1', 0))
+    return RemoteEventStore.generate(address, publisher=noop_publisher)
+
+
+@benchmark('remote.get_events')
+def bench_get_events(size):
+    """
+    Read every event of a stream with `size` events through the server
+    """
+    db, stream_id = get_stream_db(size)
+    store = _generate_remote_store(db)
+
+    def fn():
+        for _ in store.get_events(stream_id):
+            pass
+    return fn
+
+
+@benchmark('remote.save_events', sizes=(1, 10, 100, 1000))
+def bench_save_events(size):
+    """
+    Save a batch of `size` events to a new stream through the server
+    """
+    store = _generate_remote_store()
+    events = tuple(
+        Event.generate('ThingCounted', data={'amount': 1})
+        for _ in range(size)
+    )
+
+    def fn():
+        store.save_events(str(uuid4()), events)
+    return fn
+
+
+@benchmark('remote.get_last_event', sizes=(10, 1000, 100000),
+           items=lambda size: 1)
+def bench_get_last_event(size):
+    """
+    Get the last event of a stream with `size` events through the server
+    """
+    db, stream_id = get_stream_db(size)
+    store = _generate_remote_store(db)
+
+    def fn():
+        store.get_last_event(stream_id)
+    return fn
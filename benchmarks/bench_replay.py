@@ -0,0 +1,96 @@
+"""
+Parallel replay benchmarks
+
+Replaying from a shared log, whose events reach forked workers without
+pickling, is compared with sending each stream's events to a pool of the
+same size as pickled lists.
+"""
+import multiprocessing
+import os
+import tempfile
+from functools import lru_cache as memoize
+from uuid import uuid4
+
+from dvent.event_store import InMemoryEventDB
+from dvent.replay import SharedEventLog, replay_aggregates, write_log
+
+from benchmarks.fixtures import (
+    CountingAggregate, generate_events, generate_store
+)
+from benchmarks.runner import benchmark
+
+# Events per replayed stream
+EVENTS_PER_STREAM = 100
+
+# Worker processes per replay
+PROCESSES = 4
+
+SIZES = (1000, 10000, 100000, 1000000)
+
+
+def _get_log_path():
+    return os.path.join(tempfile.gettempdir(), 'dvent-bench.log')
+
+
+@memoize(maxsize=1)
+def _get_store(size):
+    """
+    Return a cached store of `size` events in streams of distinct events,
+    so pickling them can't share repeated events
+    """
+    db = InMemoryEventDB()
+    for _ in range(max(size // EVENTS_PER_STREAM, 1)):
+        db.write_to_stream(str(uuid4()), generate_events(EVENTS_PER_STREAM))
+    return generate_store(db)
+
+
+def _replay_events(args):
+    stream_id, events = args
+    return stream_id, CountingAggregate.generate_from_events(
+        stream_id, events
+    ).state
+
+
+@benchmark('replay.write_log', sizes=SIZES)
+def bench_write_log(size):
+    """
+    Write a store of `size` events to a shared log file
+    """
+    event_store = _get_store(size)
+
+    def fn():
+        write_log(event_store, _get_log_path())
+    return fn
+
+
+@benchmark('replay.shared_log', sizes=SIZES)
+def bench_shared_log(size):
+    """
+    Replay the aggregates of `size` events from a shared log in forked
+    workers
+    """
+    write_log(_get_store(size), _get_log_path())
+    log = SharedEventLog(_get_log_path())
+
+    def fn():
+        replay_aggregates(log, CountingAggregate, processes=PROCESSES)
+    return fn
+
+
+@benchmark('replay.pickled_pool', sizes=SIZES)
+def bench_pickled_pool(size):
+    """
+    Replay the aggregates of `size` events by sending each stream's events
+    to a pool of workers
+    """
+    event_store = _get_store(size)
+    context = multiprocessing.get_context('fork')
+
+    def fn():
+        streams = (
+            (stream.id, list(event_store.get_events(stream.id)))
+            for stream in event_store.get_streams()
+        )
+        with context.Pool(PROCESSES) as pool:
+            dict(pool.imap_unordered(_replay_events, streams, chunksize=100))
+    return fn
@@ -0,0 +1,75 @@
+"""
+Repository benchmarks
+"""
+from pyrsistent import pvector
+
+from dvent.repository import Repository
+
+from benchmarks.fixtures import (
+    CountingAggregate, generate_events, generate_store, get_stream_db
+)
+from benchmarks.runner import benchmark
+
+
+@benchmark('repository.get_aggregate')
+def bench_get_aggregate(size):
+    """
+    Load an aggregate whose stream holds `size` events
+    """
+    db, stream_id = get_stream_db(size)
+    repository = Repository(event_store=generate_store(db))
+
+    def fn():
+        repository.get_aggregate(CountingAggregate, stream_id)
+    return fn
+
+
+@benchmark('repository.round_trip')
+def bench_round_trip(size):
+    """
+    Save a new aggregate with `size` uncommitted events and load it back
+    """
+    events = pvector(generate_events(size, versioned=False))
+
+    def fn():
+        repository = Repository(event_store=generate_store())
+        aggregate = CountingAggregate.generate().apply_events(events)
+        aggregate = repository.save_aggregate(aggregate)
+        repository.get_aggregate(CountingAggregate, aggregate.id)
+    return fn
+
+
+def _generate_aggregates(size):
+    return [
+        CountingAggregate.generate().apply_events(
+            generate_events(1, versioned=False)
+        )
+        for _ in range(size)
+    ]
+
+
+@benchmark('repository.save_aggregates')
+def bench_save_aggregates(size):
+    """
+    Save `size` new aggregates of one event each atomically in one call
+    """
+    aggregates = _generate_aggregates(size)
+
+    def fn():
+        repository = Repository(event_store=generate_store())
+        repository.save_aggregates(aggregates)
+    return fn
+
+
+@benchmark('repository.save_aggregate_each')
+def bench_save_aggregate_each(size):
+    """
+    Save `size` new aggregates of one event each, one call per aggregate
+    """
+    aggregates = _generate_aggregates(size)
+
+    def fn():
+        repository = Repository(event_store=generate_store())
+        for aggregate in aggregates:
+            repository.save_aggregate(aggregate)
+    return fn
@@ -0,0 +1,50 @@
+"""
+Event database snapshot benchmarks
+
+Warm-start load time for a production-sized db is measured with eg.
+
+    python -m benchmarks run -k snapshot.load_db --size 10000000
+"""
+import os
+import tempfile
+
+from benchmarks.fixtures import get_streams_db
+from benchmarks.runner import benchmark
+
+from dvent.snapshot import dump_db, load_db
+
+# Events per stream in the snapshotted db
+EVENTS_PER_STREAM = 10
+
+
+def _get_snapshot_path():
+    return os.path.join(tempfile.gettempdir(), 'dvent-bench.snapshot')
+
+
+@benchmark('snapshot.dump_db')
+def bench_dump_db(size):
+    """
+    Dump a db holding `size` events to a snapshot file
+    """
+    db = get_streams_db(
+        max(size // EVENTS_PER_STREAM, 1), events_per_stream=EVENTS_PER_STREAM
+    )
+
+    def fn():
+        dump_db(db, _get_snapshot_path())
+    return fn
+
+
+@benchmark('snapshot.load_db')
+def bench_load_db(size):
+    """
+    Load a db holding `size` events from a snapshot file
+    """
+    db = get_streams_db(
+        max(size // EVENTS_PER_STREAM, 1), events_per_stream=EVENTS_PER_STREAM
+    )
+    dump_db(db, _get_snapshot_path())
+
+    def fn():
+        load_db(_get_snapshot_path())
+    return fn
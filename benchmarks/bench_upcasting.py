@@ -0,0 +1,78 @@
+"""
+Upcasting benchmarks
+
+Replaying old events upcast lazily on every read is compared with replaying
+events rewritten to the latest schema once by `rewrite_events`.
+"""
+from dvent.event_store import InMemoryEventStore
+from dvent.repository import Repository
+from dvent.upcasting import UpcasterRegistry, rewrite_events
+
+from benchmarks.fixtures import (
+    CountingAggregate, noop_publisher, generate_store, get_stream_db
+)
+from benchmarks.runner import benchmark
+
+
+def _get_upcasters():
+    """
+    Return a registry upcasting benchmark events from version 1 to 3
+    """
+    upcasters = UpcasterRegistry()
+    upcasters.register(
+        'ThingCounted', 1, lambda data: data.set('unit', 'thing')
+    )
+    upcasters.register(
+        'ThingCounted', 2, lambda data: data.set('scale', 1)
+    )
+    return upcasters
+
+
+def _generate_store(upcasters, db=None):
+    return InMemoryEventStore.generate(
+        publisher=noop_publisher, db=db, upcasters=upcasters
+    )
+
+
+@benchmark('upcasting.replay')
+def bench_replay(size):
+    """
+    Load an aggregate whose `size` events are each upcast over two versions
+    """
+    db, stream_id = get_stream_db(size)
+    repository = Repository(event_store=_generate_store(_get_upcasters(), db))
+
+    def fn():
+        repository.get_aggregate(CountingAggregate, stream_id)
+    return fn
+
+
+@benchmark('upcasting.replay_rewritten')
+def bench_replay_rewritten(size):
+    """
+    Load an aggregate whose `size` events were rewritten to the latest
+    version, through a store with the same upcasters
+    """
+    db, stream_id = get_stream_db(size)
+    upcasters = _get_upcasters()
+    event_store = _generate_store(upcasters)
+    rewrite_events(generate_store(db), event_store, upcasters)
+    repository = Repository(event_store=event_store)
+
+    def fn():
+        repository.get_aggregate(CountingAggregate, stream_id)
+    return fn
+
+
+@benchmark('upcasting.rewrite_events')
+def bench_rewrite_events(size):
+    """
+    Rewrite a store of `size` events into a new store, upcasting each
+    """
+    db, _ = get_stream_db(size)
+    source = generate_store(db)
+    upcasters = _get_upcasters()
+
+    def fn():
+        rewrite_events(source, generate_store(), upcasters)
+    return fn
@@ -0,0 +1,113 @@
+"""
+Shared, cached data sets for benchmarks
+"""
+from collections import OrderedDict
+from functools import lru_cache as memoize
+from uuid import uuid4
+
+from pyrsistent import pmap, pvector
+
+from dvent.aggregate import Aggregate
+from dvent.event import Event
+from dvent.event_store import InMemoryEventDB, InMemoryEventStore
+
+
+class CountingAggregate(Aggregate):
+    """
+    Aggregate with a small, realistic state update per event
+    """
+
+    @classmethod
+    @memoize(maxsize=1)
+    def get_apply_map(cls):
+        return pmap({
+            'ThingCounted': cls.apply_thing_counted,
+        })
+
+    @staticmethod
+    def apply_thing_counted(aggregate, event):
+        return aggregate.set_state(
+            'count', aggregate.state.get('count', 0) + event.data['amount']
+        )
+
+
+def noop_publisher(event):
+    """
+    Publisher which discards events so publishing doesn't skew timings
+    """
+    pass
+
+
+def generate_events(size, versioned=True):
+    """
+    Return a new tuple of `size` events, versioned 1..size by default
+    """
+    return tuple(
+        Event.generate(
+            'ThingCounted',
+            data={'amount': 1},
+            version=(index + 1) if versioned else None,
+        )
+        for index in range(size)
+    )
+
+
+@memoize(maxsize=1)
+def get_events(size):
+    """
+    Return a cached tuple of `size` versioned events
+    """
+    return generate_events(size)
+
+
+@memoize(maxsize=1)
+def get_stream_db(size):
+    """
+    Return a cached db and stream id where the stream holds `size` events
+    """
+    db = InMemoryEventDB()
+    stream_id = str(uuid4())
+    db.write_to_stream(stream_id, get_events(size))
+    return db, stream_id
+
+
+@memoize(maxsize=1)
+def get_streams_db(size, events_per_stream=1):
+    """
+    Return a cached db holding `size` streams
+    """
+    db = InMemoryEventDB()
+    for index in range(size):
+        db.write_to_stream(str(uuid4()), (
+            Event.generate('ThingCounted', data={'amount': 1}, version=1),
+        ) * events_per_stream)
+    return db
+
+
+def copy_db(db):
+    """
+    Return a shallow copy of an `InMemoryEventDB` which can be written to
+    without altering `db`; the event vector is shared structurally
+    """
+    _db = InMemoryEventDB()
+    _db.events = db.events
+    _db.event_stream_ids = db.event_stream_ids
+    _db.streams = OrderedDict(db.streams)
+    return _db
+
+
+def generate_store(db=None):
+    """
+    Return an in-memory store with a no-op publisher
+    """
+    return InMemoryEventStore.generate(publisher=noop_publisher, db=db)
+
+
+@memoize(maxsize=1)
+def get_aggregate(size):
+    """
+    Return a cached aggregate with `size` committed events
+    """
+    return CountingAggregate.generate_from_events(
+        str(uuid4()), pvector(get_events(size))
+    )
@@ -0,0 +1,203 @@
+"""
+Benchmark registry, timing and result persistence
+"""
+import json
+import platform
+import subprocess
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from statistics import median
+from timeit import default_timer
+
+# Stream lengths/collection sizes covered by default
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+
+# Minimum seconds a single measurement should take for small sizes
+MIN_MEASUREMENT_TIME = 0.02
+
+BENCHMARKS = OrderedDict()
+
+
+class Benchmark(object):
+    """
+    A named, size-parameterized benchmark
+
+    `setup_fn` accepts a size and returns a function of no arguments which
+    performs the timed operation; anything done in `setup_fn` itself is not
+    timed.
+    """
+
+    def __init__(self, name, setup_fn, sizes=DEFAULT_SIZES, items=None):
+        """
+        Arguments:
+        name -- Unique benchmark name, by convention "<module>.<operation>"
+        setup_fn -- Function accepting a size and returning the timed function
+
+        Keyword Arguments:
+        sizes -- Sizes to run the benchmark at
+        items -- Function accepting a size and returning the number of items
+                 processed per call, used to report time per item; defaults
+                 to the size itself
+        """
+        self.name = name
+        self.setup_fn = setup_fn
+        self.sizes = tuple(sizes)
+        self.items = items or (lambda size: size)
+
+    def run(self, size, repeat=3):
+        """
+        Time the benchmark at `size`, returning a result dict
+
+        Arguments:
+        size -- Size to set the benchmark up with
+
+        Keyword Arguments:
+        repeat -- Number of measurements to take
+        """
+        fn = self.setup_fn(size)
+
+        # Calibrate so cheap operations are measured over several calls;
+        # expensive ones keep the calibration call as their first measurement
+        number = 1
+        start = default_timer()
+        fn()
+        elapsed = default_timer() - start
+        timings = []
+        if elapsed < MIN_MEASUREMENT_TIME:
+            number = int(MIN_MEASUREMENT_TIME / max(elapsed, 1e-7)) + 1
+        else:
+            timings.append(elapsed)
+
+        while len(timings) < repeat:
+            start = default_timer()
+            for _ in range(number):
+                fn()
+            timings.append((default_timer() - start) / number)
+
+        items = self.items(size)
+        return OrderedDict([
+            ('benchmark', self.name),
+            ('size', size),
+            ('items', items),
+            ('repeat', repeat),
+            ('number', number),
+            ('best', min(timings)),
+            ('median', median(timings)),
+            ('best_per_item', min(timings) / items if items else None),
+        ])
+
+
+def benchmark(name, sizes=DEFAULT_SIZES, items=None):
+    """
+    Decorator registering a benchmark setup function under `name`
+
+    See `Benchmark` for the arguments
+    """
+    def decorator(setup_fn):
+        BENCHMARKS[name] = Benchmark(name, setup_fn, sizes=sizes, items=items)
+        return setup_fn
+    return decorator
+
+
+def load_benchmarks():
+    """
+    Import every benchmark module so its benchmarks are registered
+    """
+    from benchmarks import (  # noqa: F401
+        bench_aggregate, bench_archive, bench_bulk, bench_bus, bench_caching,
+        bench_columnar, bench_command_handler, bench_dedup, bench_event,
+        bench_event_store, bench_follow, bench_ids, bench_reducers,
+        bench_remote, bench_replay, bench_repository, bench_snapshot,
+        bench_upcasting
+    )
+    return BENCHMARKS
+
+
+def get_metadata():
+    """
+    Return information describing the environment results were taken in
+    """
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return OrderedDict([
+        ('commit', commit),
+        ('timestamp', datetime.utcnow().isoformat()),
+        ('python', sys.version.split()[0]),
+        ('implementation', platform.python_implementation()),
+        ('platform', platform.platform()),
+    ])
+
+
+def run_benchmarks(
+    names=None, max_size=None, sizes=None, repeat=3, report=None
+):
+    """
+    Run the selected benchmarks, returning results ready to be saved as JSON
+
+    Keyword Arguments:
+    names -- Substrings; only benchmarks whose name contains one are run
+    max_size -- Skip sizes larger than this
+    sizes -- Only run these sizes (intersected with each benchmark's sizes)
+    repeat -- Number of measurements per benchmark & size
+    report -- Function called with each result as it completes
+    """
+    results = []
+    for name, bench in load_benchmarks().items():
+        if names and not any(n in name for n in names):
+            continue
+        for size in bench.sizes:
+            if max_size is not None and size > max_size:
+                continue
+            if sizes and size not in sizes:
+                continue
+            result = bench.run(size, repeat=repeat)
+            results.append(result)
+            if report:
+                report(result)
+
+    return OrderedDict([('meta', get_metadata()), ('results', results)])
+
+
+def save_results(results, path):
+    """
+    Save results as JSON to `path`
+    """
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    """
+    Load results previously saved with `save_results`
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(base, head):
+    """
+    Return a generator of comparisons between two sets of results
+
+    Each comparison is a tuple of (benchmark, size, base best, head best,
+    ratio) where a ratio below 1 means `head` is faster
+
+    Arguments:
+    base -- Results to compare against
+    head -- Results to compare
+    """
+    base_best = dict(
+        ((r['benchmark'], r['size']), r['best']) for r in base['results']
+    )
+    for result in head['results']:
+        key = (result['benchmark'], result['size'])
+        if key in base_best:
+            yield key + (
+                base_best[key], result['best'],
+                result['best'] / base_best[key] if base_best[key] else None
+            )
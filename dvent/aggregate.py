@@ -2,11 +2,68 @@
 Domain aggregate
 """
 from functools import lru_cache as memoize
+from time import perf_counter
 from uuid import UUID, uuid4
 
 from pyrsistent import PClass, field, pmap, PMap, pvector_field, pvector
 
-from dvent.event import Event
+from dvent.event import Event, is_fast_construction, is_trusted_replay
+from dvent.profiling import APPLY, get_profiler
+
+try:
+    # Private to pyrsistent, see `_check_fast_append`
+    from pyrsistent._pvector import PythonPVector
+except ImportError:
+    PythonPVector = None
+
+_MISSING = object()
+
+
+def _append_trusted(vector, item):
+    """
+    Append to a checked vector (eg. `pvector_field`) without type checks
+    """
+    return type(vector)(PythonPVector.append(vector, item))
+
+
+def _set_trusted(instance, key, value):
+    """
+    Return a copy of a PClass instance with `key` set, skipping field checks
+    """
+    result = object.__new__(type(instance))
+    for name in instance._pclass_fields:
+        _value = value if name == key else getattr(instance, name, _MISSING)
+        if _value is not _MISSING:
+            object.__setattr__(result, name, _value)
+    object.__setattr__(result, '_pclass_frozen', True)
+    return result
+
+
+def _check_fast_append():
+    """
+    Return whether `_append_trusted` and `_set_trusted`, which rely on
+    pyrsistent's internals, match `set` and `append` with the installed
+    pyrsistent
+    """
+    class _Checked(PClass):
+        items = pvector_field(int)
+
+    try:
+        checked = _Checked(items=[1])
+        result = _set_trusted(
+            checked, 'items', _append_trusted(checked.items, 2)
+        )
+        return (
+            type(result) is _Checked and
+            type(result.items) is type(checked.items) and
+            result == checked.set('items', checked.items.append(2)) and
+            result.set('items', [3]).items == pvector([3])
+        )
+    except Exception:
+        return False
+
+
+_FAST_APPEND_SUPPORTED = _check_fast_append()
 
 
 class Aggregate(PClass):
@@ -37,12 +94,11 @@ class Aggregate(PClass):
 
         If `committed` is False then include uncommitted events
         """
-        _events = self.events
-
-        if not committed:
-            _events += self.uncommitted_events
+        # Only the last event matters; avoid concatenating the vectors
+        if not committed and self.uncommitted_events:
+            return self.uncommitted_events[-1].version
 
-        return _events[-1].version if _events else 0
+        return self.events[-1].version if self.events else 0
 
     # Public
     @classmethod
@@ -79,11 +135,16 @@ class Aggregate(PClass):
                in order to have events associated
         events -- The events to apply
         committed -- If True then the events are added as if committed
+
+        Events are assumed to be valid, eg. loaded from an event store, and
+        are added without re-checking their type unless trusted replay has
+        been disabled with `dvent.event.set_trusted_replay(False)`
         """
         apply_map = apply_map or cls.get_apply_map()
         aggregate = cls.generate(id_)
         return aggregate.apply_events(
-            events, committed=committed, apply_map=apply_map
+            events, committed=committed, apply_map=apply_map,
+            trusted=is_trusted_replay()
         )
 
     @classmethod
@@ -100,7 +161,8 @@ class Aggregate(PClass):
             # 'NothingHappened': cls.apply_noop
         })
 
-    def apply_event(self, event, committed=False, apply_map=None):
+    def apply_event(self, event, committed=False, apply_map=None,
+                    trusted=False):
         """
         Apply an event to the aggregate, returning a new instance
 
@@ -112,39 +174,45 @@ class Aggregate(PClass):
         Keyword Arguments:
         committed -- If True then apply the events as committed
         apply_map -- If supplied override definition of `self.get_apply_map`
+        trusted -- If True `event` is known to be a valid Event and is added
+                   without re-validating the aggregate's fields
         """
         # Get the state-update
         _apply_map = apply_map or self.get_apply_map()
         apply_fn = _apply_map.get(event.type, self.apply_noop)
 
         # Apply state-changes
-        _aggregate = apply_fn(self, event) if apply_fn else self
+        profiler = get_profiler()
+        if profiler is None:
+            _aggregate = apply_fn(self, event) if apply_fn else self
+        else:
+            start = perf_counter()
+            _aggregate = apply_fn(self, event) if apply_fn else self
+            profiler.record(
+                APPLY, self.type, event.type, perf_counter() - start
+            )
 
         # Version the event
         if not event.version:
             event = event.set('version', (self.uncommitted_version + 1))
 
-        if not committed:
-            _aggregate = _aggregate.set(
-                'uncommitted_events',
-                _aggregate.uncommitted_events + (event,)
-            )
-        else:
-            _aggregate = _aggregate.set(
-                'events',
-                _aggregate.events + (event,)
+        key = 'events' if committed else 'uncommitted_events'
+        if trusted and _FAST_APPEND_SUPPORTED and is_fast_construction():
+            return _set_trusted(
+                _aggregate, key, _append_trusted(getattr(_aggregate, key), event)
             )
+        return _aggregate.set(key, getattr(_aggregate, key) + (event,))
 
-        return _aggregate
-
-    def apply_events(self, events, committed=False, apply_map=None):
+    def apply_events(self, events, committed=False, apply_map=None,
+                     trusted=False):
         """
         Apply multiple events to an aggregate, delegates to `apply_event`
         """
         _aggregate = self
         for event in events:
             _aggregate = _aggregate.apply_event(
-                event, committed=committed, apply_map=apply_map
+                event, committed=committed, apply_map=apply_map,
+                trusted=trusted
             )
         return _aggregate
 
@@ -160,6 +228,44 @@ class Aggregate(PClass):
     def uncommitted_version(self):
         return self._version(committed=False)
 
+    def __eq__(self, other):
+        """
+        Compare every field, as PClass does, after cheaper checks
+
+        Identical aggregates are equal without comparing fields, and ones
+        with different ids or numbers of events are unequal without comparing
+        events.  Events shared between the aggregates' vectors, eg. after
+        rebuilding from the same stream, are compared by identity.
+        """
+        if self is other:
+            return True
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        if self.id != other.id or len(self.events) != len(other.events) or (
+            len(self.uncommitted_events) != len(other.uncommitted_events)
+        ):
+            return False
+        for name in self._pclass_fields:
+            value = getattr(self, name, _MISSING)
+            other_value = getattr(other, name, _MISSING)
+            if value is not other_value and value != other_value:
+                return False
+        return True
+
+    def __hash__(self):
+        """
+        Hash the aggregate's id, numbers of events and state
+
+        Equal aggregates share all of these so their hashes are equal, but
+        unlike PClass's hash of every field the events aren't walked; the
+        state's hash is cached by its PMap, which is shared by every
+        aggregate until the state changes.
+        """
+        return hash((
+            self.id, len(self.events), len(self.uncommitted_events),
+            getattr(self, 'state', _MISSING)
+        ))
+
     def set_state(self, key, value):
         """
         Return a new aggregate with its state updated by key/value
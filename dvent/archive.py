@@ -0,0 +1,636 @@
+"""
+Archival of cold streams into compressed, read-only segments
+"""
+import json
+import lzma
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from heapq import merge
+from itertools import islice
+from threading import Lock
+
+from pyrsistent import field, pmap, pvector
+
+from dvent.event_store import IEventStore, InMemoryEventStore, Stream
+from dvent.serialization import (
+    events_from_columns, events_to_columns, micros_to_timestamp,
+    timestamp_to_micros
+)
+
+# Segment file header; the trailing byte is the format version
+SEGMENT_MAGIC = b'DVENTSEG\x02'
+
+SEGMENT_SUFFIX = '.dseg'
+
+# Compression name: (header code, compress function, decompress function)
+COMPRESSIONS = {
+    'zlib': (b'z', zlib.compress, zlib.decompress),
+    'lzma': (b'x', lzma.compress, lzma.decompress),
+}
+
+_DECOMPRESSORS = dict(
+    (code, decompress) for code, _, decompress in COMPRESSIONS.values()
+)
+
+_FOOTER = struct.Struct('>Q')
+
+_RELEASED_FILE = 'released'
+
+# Bytes per pointer to an event held by the db's vectors and stream index
+_POINTER_SIZE = struct.calcsize('P')
+
+
+class ArchiveError(RuntimeError):
+    """
+    Raised when a segment file is not readable
+    """
+    pass
+
+
+def _estimate_event_size(event):
+    """
+    Return an estimate of the bytes of memory held by a stored event
+
+    Counts the record, its id, timestamp and top-level data along with the
+    db's pointers to it; event types and nested data are not counted
+    """
+    return (
+        sys.getsizeof(event) + sys.getsizeof(event.id) +
+        sys.getsizeof(event.timestamp) + sys.getsizeof(event.data) +
+        3 * _POINTER_SIZE
+    )
+
+
+def _get_live_positions(indices, archived):
+    """
+    Return a list of the global positions of events in the db
+
+    Arguments:
+    indices -- Sorted positions of events in the db
+    archived -- Sorted global positions of every archived event
+    """
+    positions = []
+    skipped = 0
+    for index in indices:
+        while skipped < len(archived) and (
+            archived[skipped] <= index + skipped
+        ):
+            skipped += 1
+        positions.append(index + skipped)
+    return positions
+
+
+class _ArchivedStream(object):
+    """
+    Directory entry locating an archived stream in a segment file, with the
+    global positions its events held before they were archived
+    """
+
+    __slots__ = (
+        'stream_id', 'segment', 'offset', 'length', 'count',
+        'first_timestamp', 'last_timestamp', 'positions',
+    )
+
+    def __init__(self, stream_id, segment, offset, length, count,
+                 first_timestamp, last_timestamp, positions):
+        self.stream_id = stream_id
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+        self.count = count
+        self.first_timestamp = first_timestamp
+        self.last_timestamp = last_timestamp
+        self.positions = array('q', positions)
+
+    @classmethod
+    def from_index(cls, segment, values):
+        """
+        Return an entry from a segment's index values
+        """
+        return cls(
+            values[0], segment, values[1], values[2], values[3],
+            micros_to_timestamp(values[4]), micros_to_timestamp(values[5]),
+            values[6]
+        )
+
+
+class SegmentArchive(object):
+    """
+    Directory of compressed, read-only segment files of archived streams
+
+    Each segment file holds several streams, each compressed separately so
+    reading a stream only decompresses that stream's events, followed by an
+    index of the streams it holds and the global positions of their events.
+    The in-memory `directory` maps stream ids to their location and is
+    rebuilt from the segment indexes when an existing archive path is opened.
+    Streams which are released (eg. to be written to again) are recorded so
+    they aren't reloaded.
+
+    `positions` holds the global position of every archived event in order,
+    with the directory entry (`owners`) and index within its stream
+    (`offsets`) of each; they're replaced, not changed, when the directory
+    changes, see `get_positions`.
+    """
+
+    def __init__(self, path, compression='zlib'):
+        """
+        Open or create an archive
+
+        Arguments:
+        path -- Directory path holding the segment files
+
+        Keyword Arguments:
+        compression -- 'zlib' (faster) or 'lzma' (smaller) for new segments
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError('Unknown compression: {}'.format(compression))
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.compression = compression
+        self.directory = OrderedDict()
+        self.positions = array('q')
+        self.owners = []
+        self.offsets = array('q')
+        self._segments = 0
+        self._lock = Lock()
+        self._load_directory()
+        self._index_positions()
+
+    def __contains__(self, stream_id):
+        return stream_id in self.directory
+
+    def _get_segment_path(self, segment):
+        return os.path.join(self.path, segment)
+
+    def _load_directory(self):
+        segments = sorted(
+            name for name in os.listdir(self.path)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        for segment in segments:
+            with open(self._get_segment_path(segment), 'rb') as f:
+                if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+                    raise ArchiveError('Not a segment file: {}'.format(
+                        segment
+                    ))
+                f.seek(-_FOOTER.size, os.SEEK_END)
+                index_offset, = _FOOTER.unpack(f.read(_FOOTER.size))
+                f.seek(index_offset)
+                index = json.loads(f.read()[:-_FOOTER.size].decode('utf-8'))
+            for values in index:
+                self.directory[values[0]] = _ArchivedStream.from_index(
+                    segment, values
+                )
+        if segments:
+            self._segments = int(
+                segments[-1][len('segment-'):-len(SEGMENT_SUFFIX)]
+            ) + 1
+
+        released_path = self._get_segment_path(_RELEASED_FILE)
+        if os.path.exists(released_path):
+            with open(released_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    segment, _, stream_id = line.rstrip('\n').partition('\t')
+                    entry = self.directory.get(stream_id)
+                    if entry is not None and entry.segment == segment:
+                        del self.directory[stream_id]
+
+    def _index_positions(self):
+        """
+        Replace the index of archived events by global position; call while
+        holding `_lock` or before the archive is shared
+        """
+        located = sorted(
+            (position, offset, entry)
+            for entry in self.directory.values()
+            for offset, position in enumerate(entry.positions)
+        )
+        self.positions = array('q', (values[0] for values in located))
+        self.offsets = array('q', (values[1] for values in located))
+        self.owners = [values[2] for values in located]
+
+    def get_positions(self):
+        """
+        Return a tuple of `positions`, `owners` and `offsets` describing the
+        same archived events
+        """
+        with self._lock:
+            return self.positions, self.owners, self.offsets
+
+    def write_segment(self, streams):
+        """
+        Write streams to a new segment file, returning its size in bytes
+
+        The file is flushed to disk and renamed into place before the
+        streams are added to the directory
+
+        Arguments:
+        streams -- Sequence of (stream id, events, positions) tuples; each
+                   stream's events must be complete and non-empty, and
+                   `positions` their global positions
+        """
+        code, compress, _ = COMPRESSIONS[self.compression]
+        with self._lock:
+            segment = 'segment-{:08d}{}'.format(
+                self._segments, SEGMENT_SUFFIX
+            )
+            self._segments += 1
+
+        index = []
+        path = self._get_segment_path(segment)
+        temp_path = '{}.tmp'.format(path)
+        with open(temp_path, 'wb') as f:
+            f.write(SEGMENT_MAGIC + code)
+            offset = len(SEGMENT_MAGIC) + len(code)
+            for stream_id, events, positions in streams:
+                payload = compress(json.dumps(
+                    events_to_columns([(stream_id, e) for e in events]),
+                    separators=(',', ':')
+                ).encode('utf-8'))
+                f.write(payload)
+                index.append((
+                    stream_id, offset, len(payload), len(events),
+                    timestamp_to_micros(events[0].timestamp),
+                    timestamp_to_micros(events[-1].timestamp),
+                    list(positions),
+                ))
+                offset += len(payload)
+            f.write(json.dumps(index, separators=(',', ':')).encode('utf-8'))
+            f.write(_FOOTER.pack(offset))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(temp_path, path)
+
+        with self._lock:
+            for values in index:
+                self.directory[values[0]] = _ArchivedStream.from_index(
+                    segment, values
+                )
+            self._index_positions()
+        return size
+
+    def read_stream(self, stream_id):
+        """
+        Return a PVector of an archived stream's events, or None if the
+        stream isn't archived
+
+        Arguments:
+        stream_id -- Stream id
+        """
+        entry = self.directory.get(stream_id)
+        if entry is None:
+            return None
+        return self.read_entry(entry)
+
+    def read_entry(self, entry):
+        """
+        Return a PVector of the events of a directory entry, which are read
+        from its segment even once the stream is released
+
+        Arguments:
+        entry -- Directory entry
+        """
+        with open(self._get_segment_path(entry.segment), 'rb') as f:
+            f.seek(len(SEGMENT_MAGIC))
+            decompress = _DECOMPRESSORS[f.read(1)]
+            f.seek(entry.offset)
+            payload = f.read(entry.length)
+        columns = json.loads(decompress(payload).decode('utf-8'))
+        return pvector(event for _, event in events_from_columns(columns))
+
+    def release(self, stream_id):
+        """
+        Remove a stream from the directory; its segment is left unchanged
+
+        Arguments:
+        stream_id -- Stream id
+        """
+        with self._lock:
+            entry = self.directory.pop(stream_id, None)
+            if entry is None:
+                return
+            self._index_positions()
+            with open(
+                self._get_segment_path(_RELEASED_FILE), 'a', encoding='utf-8'
+            ) as f:
+                f.write('{}\t{}\n'.format(entry.segment, stream_id))
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class ArchivingEventStore(IEventStore):
+    """
+    Event store interface archiving idle streams of an in-memory event store
+
+    `archive_idle_streams` moves streams whose last event is older than
+    `idle_period` out of the in-memory db into a new compressed segment,
+    recording the global position of each of their events.  Reads of
+    archived streams decompress them on demand, and writing to an archived
+    stream first restores its events to the db at their positions.  Reads of
+    all events fill the archived positions between the db's events, so every
+    event keeps its position as streams are archived and restored.  Both
+    shift the db's own positions, so raise `StreamsFollowedError` while the
+    db is followed, see `InMemoryEventDB.remove_streams`.
+
+    *Note: Not thread-safe, like the in-memory db*
+
+    Fields:
+    event_store -- Wrapped InMemoryEventStore which publishes saved events
+    archive -- SegmentArchive instance
+    idle_period -- timedelta after a stream's last event when it is archived
+    clock -- Function returning the current naive UTC datetime
+    """
+
+    event_store = field(mandatory=True, type=InMemoryEventStore)
+
+    archive = field(mandatory=True, type=SegmentArchive)
+
+    idle_period = field(mandatory=True, type=timedelta)
+
+    clock = field(mandatory=True)
+
+    @classmethod
+    def generate(cls, event_store, path, idle_period=timedelta(days=7),
+                 compression='zlib', clock=datetime.utcnow):
+        """
+        Generate an archiving interface for an existing in-memory event store
+
+        Arguments:
+        event_store -- InMemoryEventStore instance to wrap
+        path -- Directory path of the archive's segment files
+
+        Keyword Arguments:
+        idle_period -- timedelta after a stream's last event when it is
+                       archived
+        compression -- 'zlib' (faster) or 'lzma' (smaller) for new segments
+        clock -- Function returning the current naive UTC datetime
+        """
+        return cls(**{
+            'publisher': event_store.publisher,
+            'id_factory': event_store.id_factory,
+            'event_store': event_store,
+            'archive': SegmentArchive(path, compression=compression),
+            'idle_period': idle_period,
+            'clock': clock,
+        })
+
+    def archive_idle_streams(self):
+        """
+        Archive every stream idle for at least `idle_period`
+
+        Removing streams shifts the db's positions, so raise
+        `StreamsFollowedError`, archiving nothing, while the db is followed
+        (see `InMemoryEventDB.remove_streams`).  The db is locked throughout
+        so no stream is written to while it's archived.
+
+        Returns a PMap reporting the number of `streams` and `events`
+        archived, the estimated bytes of memory reclaimed, less the archived
+        positions held in memory (`memory_reclaimed`), and the bytes of the
+        new segment (`disk_used`)
+        """
+        cutoff = self.clock() - self.idle_period
+        db = self.event_store.db
+        with db.lock:
+            idle = [
+                (stream_id, indices)
+                for stream_id, indices in db.streams.items()
+                if indices and db.events[indices[-1]].timestamp <= cutoff
+            ]
+            if not idle:
+                return pmap({
+                    'streams': 0, 'events': 0,
+                    'memory_reclaimed': 0, 'disk_used': 0,
+                })
+
+            db.check_not_followed()
+            archived, _, _ = self.archive.get_positions()
+            indices = sorted(
+                index for _, stream_indices in idle
+                for index in stream_indices
+            )
+            positions = dict(
+                zip(indices, _get_live_positions(indices, archived))
+            )
+            idle = [
+                (
+                    stream_id,
+                    pvector(db.events[index] for index in stream_indices),
+                    [positions[index] for index in stream_indices],
+                )
+                for stream_id, stream_indices in idle
+            ]
+            disk_used = self.archive.write_segment(idle)
+            db.remove_streams(stream_id for stream_id, _, _ in idle)
+        return pmap({
+            'streams': len(idle),
+            'events': len(indices),
+            'memory_reclaimed': sum(
+                _estimate_event_size(event) - archived.itemsize
+                for _, events, _ in idle for event in events
+            ),
+            'disk_used': disk_used,
+        })
+
+    def restore_stream(self, id_):
+        """
+        Move an archived stream back into the in-memory db, inserting its
+        events at their global positions
+
+        Raise `StreamsFollowedError`, restoring nothing, while the db is
+        followed, see `InMemoryEventDB.insert_stream`
+
+        Arguments:
+        id_ -- Stream id
+        """
+        entry = self.archive.directory.get(id_)
+        if entry is None:
+            return
+        events = self.archive.read_entry(entry)
+        archived, _, _ = self.archive.get_positions()
+        serialize_event = self.event_store.serialize_event
+        # Each event's db position once inserted skips the other streams'
+        # archived events before it, but not this stream's earlier events
+        self.event_store.db.insert_stream(id_, (
+            (position - bisect_left(archived, position) + offset,
+             serialize_event(event))
+            for offset, (position, event) in enumerate(
+                zip(entry.positions, events)
+            )
+        ))
+        self.archive.release(id_)
+
+    def save_events(self, id_, events, expected_version=-2):
+        """
+        Save `events` to stream `id_`, restoring it first if archived
+
+        Arguments:
+        id_ -- Stream id to which the events will be saved
+        events -- Events to save to the store
+
+        Keyword Arguments:
+        expected_version -- Version checking for optimistic concurrency; see
+                            `IEventStore.check_version` for details
+        """
+        self.restore_stream(id_)
+        self.event_store.save_events(
+            id_, events, expected_version=expected_version
+        )
+
+    def save_events_batch(self, batch):
+        """
+        Save version-checked writes, restoring archived streams first
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        batch = tuple(batch)
+        for id_, _ in batch:
+            self.restore_stream(id_)
+        self.event_store.save_events_batch(batch)
+
+    def save_events_multi(self, writes):
+        """
+        Save writes to several streams atomically, restoring archived streams
+        first
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples,
+                  written in order
+        """
+        writes = tuple(writes)
+        for id_, _, _ in writes:
+            self.restore_stream(id_)
+        self.event_store.save_events_multi(writes)
+
+    def import_events_batch(self, batch):
+        """
+        Persist exported events, restoring archived streams first
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        batch = tuple(batch)
+        for id_, _ in batch:
+            self.restore_stream(id_)
+        self.event_store.import_events_batch(batch)
+
+    def _get_entries(self, start, archived, owners, offsets):
+        """
+        Return generator of (stream id, Event) tuples for all events from
+        position `start`, filling the archived positions between the db's
+        events
+
+        Each archived stream is decompressed once its first event is read,
+        and dropped once its last event is read
+        """
+        skipped = bisect_left(archived, start)
+        live = self.event_store.get_stream_events(start=start - skipped)
+        streams = {}
+        position = start
+        while True:
+            if skipped < len(archived) and archived[skipped] == position:
+                entry, offset = owners[skipped], offsets[skipped]
+                events = streams.get(entry.stream_id)
+                if events is None:
+                    events = streams[entry.stream_id] = (
+                        self.archive.read_entry(entry)
+                    )
+                if offset == len(events) - 1:
+                    del streams[entry.stream_id]
+                skipped += 1
+                yield entry.stream_id, events[offset]
+            else:
+                try:
+                    yield next(live)
+                except StopIteration:
+                    return
+            position += 1
+
+    def get_stream_events(self, start=0):
+        """
+        Return generator of (stream id, Event) tuples for all events in
+        order, including archived events at their positions
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        archived, owners, offsets = self.archive.get_positions()
+        if not archived:
+            return self.event_store.get_stream_events(start=start)
+        return self._get_entries(start, archived, owners, offsets)
+
+    def get_events(self, id_=None, start=0):
+        """
+        Return generator of ordered Events for the optionally supplied id_
+
+        Without `id_` archived events are returned at their positions in the
+        global order, see `get_stream_events`
+
+        Keyword Arguments:
+        id_ -- Stream id, if None will return all events in order
+        start -- Integer, optionally specify a starting position in the stream
+        """
+        if not id_:
+            return (event for _, event in self.get_stream_events(start=start))
+
+        events = self.archive.read_stream(id_)
+        if events is None:
+            return self.event_store.get_events(id_, start=start)
+        return iter(events[start:])
+
+    def get_last_event(self, id_):
+        """
+        Get the last event for the specified stream
+
+        Arguments:
+        id_ -- Stream id
+        """
+        events = self.archive.read_stream(id_)
+        if events is None:
+            return self.event_store.get_last_event(id_)
+        return events[-1]
+
+    def get_streams(self, start=0):
+        """
+        Get a generator of Stream instances in creation order, including
+        archived streams
+
+        Streams are ordered by the global position of their first event, so
+        archiving and restoring streams doesn't renumber them
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        archived, owners, offsets = self.archive.get_positions()
+        archived_streams = (
+            (position, entry.stream_id, entry.first_timestamp)
+            for position, entry, offset in zip(archived, owners, offsets)
+            if offset == 0
+        )
+        db = self.event_store.db
+        live = sorted(
+            (indices[0], stream_id)
+            for stream_id, indices in list(db.streams.items()) if indices
+        )
+        live_streams = (
+            (position, stream_id, db.events[index].timestamp)
+            for (index, stream_id), position in zip(live, _get_live_positions(
+                [index for index, _ in live], archived
+            ))
+        )
+        merged = merge(archived_streams, live_streams)
+        for number, (_, stream_id, timestamp) in enumerate(
+            islice(merged, start, None), start
+        ):
+            yield Stream(**{
+                'id': stream_id,
+                'timestamp': timestamp,
+                'number': number,
+            })
@@ -0,0 +1,257 @@
+"""
+Streaming bulk export and import of event stores
+
+Exports write (stream id, event) entries in global order to either JSON Lines
+(one JSON object per event) or a chunked columnar file, and imports read them
+back into any event store in large batches.  Only one batch or chunk is held
+in memory at a time regardless of the size of the store.
+
+    count = export_jsonl(source_store, 'events.jsonl')
+    import_events(target_store, read_jsonl('events.jsonl'))
+"""
+import json
+import struct
+import zlib
+
+from pyrsistent import InvariantException
+
+from dvent.serialization import (
+    event_from_dict, event_to_dict, events_from_columns, events_to_columns
+)
+
+# Columnar file header; the trailing byte is the format version
+COLUMNAR_MAGIC = b'DVENTCOL\x01'
+
+# Events per import batch, columnar chunk and progress report by default
+BATCH_SIZE = 10000
+
+_CHUNK_HEADER = struct.Struct('>I')
+
+# Errors reading an invalid event from an export
+_FORMAT_ERRORS = (ValueError, KeyError, IndexError, TypeError,
+                  InvariantException)
+
+
+class BulkFormatError(RuntimeError):
+    """
+    Raised when a file is not a readable export
+    """
+    pass
+
+
+def _select_entries(store, stream_ids=None):
+    """
+    Return generator of a store's (stream id, Event) entries in global order,
+    optionally only those of `stream_ids`
+    """
+    entries = store.get_stream_events()
+    if stream_ids is None:
+        return entries
+    stream_ids = frozenset(stream_ids)
+    return (entry for entry in entries if entry[0] in stream_ids)
+
+
+def export_jsonl(store, path, stream_ids=None, progress=None,
+                 batch_size=BATCH_SIZE):
+    """
+    Export events to a JSON Lines file in global order, returning the count
+
+    Each line holds an object with the event's `stream` id and the `event`
+    fields; see `dvent.serialization.event_to_dict`
+
+    Arguments:
+    store -- IEventStore instance to export from
+    path -- File path to write
+
+    Keyword Arguments:
+    stream_ids -- Iterable of stream ids to export, defaults to every stream
+    progress -- Function called with the number of events exported so far
+                after every `batch_size` events and once at the end
+    batch_size -- Number of events between progress reports
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for stream_id, event in _select_entries(store, stream_ids):
+            f.write(json.dumps(
+                {'stream': stream_id, 'event': event_to_dict(event)},
+                separators=(',', ':')
+            ))
+            f.write('\n')
+            count += 1
+            if progress and count % batch_size == 0:
+                progress(count)
+    if progress:
+        progress(count)
+    return count
+
+
+def read_jsonl(path):
+    """
+    Return generator of (stream id, Event) entries from a JSON Lines export
+
+    Events are validated as they're read; raise BulkFormatError for the
+    first invalid line
+
+    Arguments:
+    path -- File path written by `export_jsonl`
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                values = json.loads(line)
+                entry = values['stream'], event_from_dict(
+                    values['event'], validate=True
+                )
+            except _FORMAT_ERRORS as e:
+                raise BulkFormatError('Invalid line {} of {}: {}'.format(
+                    line_number, path, e
+                ))
+            yield entry
+
+
+def _encode_chunk(entries):
+    """
+    Return the compressed columnar encoding of a list of entries
+    """
+    return zlib.compress(json.dumps(
+        events_to_columns(entries), separators=(',', ':')
+    ).encode('utf-8'))
+
+
+def _decode_chunk(payload):
+    """
+    Return a list of the validated entries of a chunk from `_encode_chunk`
+    """
+    return list(events_from_columns(
+        json.loads(zlib.decompress(payload).decode('utf-8')), validate=True
+    ))
+
+
+def export_columnar(store, path, stream_ids=None, progress=None,
+                    batch_size=BATCH_SIZE):
+    """
+    Export events to a columnar file in global order, returning the count
+
+    The file is a header followed by length-prefixed chunks of up to
+    `batch_size` events, each a zlib-compressed JSON object of columns
+
+    Arguments:
+    store -- IEventStore instance to export from
+    path -- File path to write
+
+    Keyword Arguments:
+    stream_ids -- Iterable of stream ids to export, defaults to every stream
+    progress -- Function called with the number of events exported so far
+                after every chunk and once at the end
+    batch_size -- Number of events per chunk
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(COLUMNAR_MAGIC)
+        chunk = []
+        for entry in _select_entries(store, stream_ids):
+            chunk.append(entry)
+            if len(chunk) >= batch_size:
+                payload = _encode_chunk(chunk)
+                f.write(_CHUNK_HEADER.pack(len(payload)))
+                f.write(payload)
+                count += len(chunk)
+                chunk = []
+                if progress:
+                    progress(count)
+        if chunk:
+            payload = _encode_chunk(chunk)
+            f.write(_CHUNK_HEADER.pack(len(payload)))
+            f.write(payload)
+            count += len(chunk)
+    if progress:
+        progress(count)
+    return count
+
+
+def read_columnar(path):
+    """
+    Return generator of (stream id, Event) entries from a columnar export
+
+    Events are validated as they're read; raise BulkFormatError for the
+    first invalid chunk
+
+    Arguments:
+    path -- File path written by `export_columnar`
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise BulkFormatError('Not a columnar export: {}'.format(path))
+        while True:
+            header = f.read(_CHUNK_HEADER.size)
+            if not header:
+                return
+            payload = b''
+            if len(header) == _CHUNK_HEADER.size:
+                size, = _CHUNK_HEADER.unpack(header)
+                payload = f.read(size)
+            if not payload or len(payload) < size:
+                raise BulkFormatError('Truncated columnar export: {}'.format(
+                    path
+                ))
+            try:
+                entries = _decode_chunk(payload)
+            except _FORMAT_ERRORS + (zlib.error,) as e:
+                raise BulkFormatError('Invalid chunk of {}: {}'.format(
+                    path, e
+                ))
+            for entry in entries:
+                yield entry
+
+
+def _group_runs(entries):
+    """
+    Return a list of (stream id, events) tuples grouping consecutive entries
+    of the same stream, preserving order
+    """
+    runs = []
+    for stream_id, event in entries:
+        if runs and runs[-1][0] == stream_id:
+            runs[-1][1].append(event)
+        else:
+            runs.append((stream_id, [event]))
+    return runs
+
+
+def import_events(store, entries, progress=None, batch_size=BATCH_SIZE):
+    """
+    Import (stream id, Event) entries into a store, returning the count
+
+    Entries are written in their given order in batches of `batch_size`
+    events with `IEventStore.import_events_batch`, keeping each event's id
+    and version; neither versions are checked nor events published by the
+    in-memory store.
+
+    Arguments:
+    store -- IEventStore instance to import into
+    entries -- Iterable of (stream id, Event) tuples, eg. from `read_jsonl`,
+               `read_columnar` or another store's `get_stream_events()`
+
+    Keyword Arguments:
+    progress -- Function called with the number of events imported so far
+                after every batch and once at the end
+    batch_size -- Number of events per batch
+    """
+    count = 0
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            store.import_events_batch(_group_runs(batch))
+            count += len(batch)
+            batch = []
+            if progress:
+                progress(count)
+    if batch:
+        store.import_events_batch(_group_runs(batch))
+        count += len(batch)
+    if progress:
+        progress(count)
+    return count
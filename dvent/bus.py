@@ -0,0 +1,316 @@
+"""
+In-process event bus routing published events to subscribers
+"""
+from collections import deque
+from logging import getLogger
+from threading import Condition, Lock
+from time import monotonic
+
+from pyrsistent import pmap
+
+from dvent.instrumentation import get_sink
+
+logger = getLogger(__name__)
+
+# Events delivered by an executor task before it yields to other subscribers
+DRAIN_BATCH_SIZE = 100
+
+
+class Subscription(object):
+    """
+    A subscriber registered with an `EventBus` and its delivery statistics
+
+    Without an executor events are delivered synchronously as they're
+    published.  With one, events are appended to the subscription's own
+    queue and delivered in order by tasks submitted to the executor, so a
+    slow subscriber only delays itself; when `max_queue` events are already
+    waiting further events are dropped and counted.  If the executor rejects
+    a task, eg. once shut down, the failure is logged and the queued events
+    wait for the next published event to submit another.
+    """
+
+    def __init__(self, handler, name, number, types=None, stream_prefix=None,
+                 executor=None, max_queue=None):
+        self.handler = handler
+        self.name = name
+        self.number = number
+        self.types = types
+        self.stream_prefix = stream_prefix
+        self.executor = executor
+        self.max_queue = max_queue
+        self.published = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = deque()
+        self._scheduled = False
+        self._condition = Condition(Lock())
+
+    def _deliver(self, event):
+        """
+        Call the handler with an event, logging rather than raising failures
+        """
+        try:
+            self.handler(event)
+        except Exception as e:
+            get_sink().count('event_bus.subscriber_failures')
+            logger.critical(
+                "Subscriber {} failed handling event {}: {}".format(
+                    self.name, event, str(e)
+                )
+            )
+            with self._condition:
+                self.failed += 1
+        else:
+            with self._condition:
+                self.delivered += 1
+
+    def _receive(self, event):
+        """
+        Deliver or enqueue a published event
+        """
+        if self.executor is None:
+            with self._condition:
+                self.published += 1
+            self._deliver(event)
+            return
+
+        with self._condition:
+            self.published += 1
+            if self.max_queue is not None and (
+                len(self._queue) >= self.max_queue
+            ):
+                self.dropped += 1
+                get_sink().count('event_bus.dropped_events')
+                return
+            self._queue.append((monotonic(), event))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._submit()
+
+    def _submit(self):
+        """
+        Submit a `_drain` task, unscheduling the subscription and logging
+        rather than raising if the executor rejects it
+        """
+        try:
+            self.executor.submit(self._drain)
+        except Exception as e:
+            get_sink().count('event_bus.submit_failures')
+            logger.critical(
+                "Subscriber {} failed scheduling delivery: {}".format(
+                    self.name, str(e)
+                )
+            )
+            with self._condition:
+                self._scheduled = False
+                self._condition.notify_all()
+
+    def _drain(self):
+        """
+        Deliver queued events in order, resubmitting itself after every
+        `DRAIN_BATCH_SIZE` events so subscribers sharing an executor take
+        turns
+        """
+        for _ in range(DRAIN_BATCH_SIZE):
+            with self._condition:
+                if not self._queue:
+                    self._scheduled = False
+                    self._condition.notify_all()
+                    return
+                _, event = self._queue.popleft()
+            self._deliver(event)
+        self._submit()
+
+    def join(self, timeout=None):
+        """
+        Wait until every queued event has been delivered, or delivery has
+        stopped as the executor rejected a task, returning False if `timeout`
+        seconds pass first
+
+        Keyword Arguments:
+        timeout -- Maximum seconds to wait, or None to wait indefinitely
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._scheduled, timeout=timeout
+            )
+
+    def get_lag(self):
+        """
+        Return a PMap of the subscription's delivery statistics
+
+        `queued` is the number of events waiting for delivery and `lag` the
+        seconds the oldest of them has been waiting
+        """
+        with self._condition:
+            queued = len(self._queue)
+            lag = monotonic() - self._queue[0][0] if queued else 0.0
+            return pmap({
+                'published': self.published,
+                'delivered': self.delivered,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'queued': queued,
+                'lag': lag,
+            })
+
+
+class EventBus(object):
+    """
+    Publisher routing each event only to the subscribers interested in it
+
+    Subscribers select events by type and/or a prefix of the event's
+    `stream_id`; both are held in an index, so publishing costs one lookup
+    per event type and distinct prefix length rather than a check per
+    subscriber.  A bus is callable with an event, so it can be used as an
+    event store's publisher:
+
+        bus = EventBus()
+        bus.subscribe(update_order_list, types=('OrderPlaced',))
+        event_store = InMemoryEventStore.generate(publisher=bus)
+
+    Event stores publish events with the `stream_id` of the stream they were
+    saved to, see `IEventStore.publish_events`.  Subscribers matching an
+    event receive it in the order they subscribed; see `Subscription` for
+    synchronous and executor delivery.
+    """
+
+    def __init__(self):
+        self.subscriptions = pmap()
+        self._routes = {}
+        self._lock = Lock()
+        self._number = 0
+
+    def subscribe(self, handler, types=None, stream_prefix=None,
+                  executor=None, max_queue=None, name=None):
+        """
+        Register a subscriber, returning its Subscription
+
+        Arguments:
+        handler -- Function accepting an Event
+
+        Keyword Arguments:
+        types -- Iterable of event types to receive, defaults to every type
+        stream_prefix -- Only receive events whose `stream_id` starts with
+                         this string
+        executor -- `concurrent.futures.Executor` delivering events from the
+                    subscription's queue; None delivers them synchronously
+        max_queue -- Maximum number of queued events before further events
+                     are dropped; None for no limit
+        name -- Unique subscription name, defaults to the handler's name
+        """
+        name = name or getattr(handler, '__name__', repr(handler))
+        with self._lock:
+            if name in self.subscriptions:
+                raise ValueError(
+                    'A subscription named {} already exists'.format(name)
+                )
+            self._number += 1
+            subscription = Subscription(
+                handler, name, self._number,
+                types=frozenset(types) if types is not None else None,
+                stream_prefix=stream_prefix or None,
+                executor=executor,
+                max_queue=max_queue,
+            )
+            self.subscriptions = self.subscriptions.set(name, subscription)
+            self._rebuild_routes()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Remove a subscription; events already queued are still delivered
+
+        Arguments:
+        subscription -- Subscription returned by `subscribe`
+        """
+        with self._lock:
+            self.subscriptions = self.subscriptions.discard(subscription.name)
+            self._rebuild_routes()
+
+    def _rebuild_routes(self):
+        """
+        Replace the routing index with one of the current subscriptions
+
+        The index maps each event type (None for subscriptions of every type)
+        to a tuple of (prefix length, dict of prefix to subscriptions); it is
+        rebuilt rather than changed in place so publishing needs no lock
+        """
+        routes = {}
+        for subscription in self.subscriptions.values():
+            prefix = subscription.stream_prefix or ''
+            for type_ in subscription.types or (None,):
+                prefixes = routes.setdefault(type_, {}).setdefault(
+                    len(prefix), {}
+                )
+                prefixes.setdefault(prefix, []).append(subscription)
+        self._routes = dict(
+            (type_, tuple(sorted(
+                (length, dict(
+                    (prefix, tuple(sorted(
+                        subscriptions, key=lambda s: s.number
+                    )))
+                    for prefix, subscriptions in prefixes.items()
+                ))
+                for length, prefixes in lengths.items()
+            )))
+            for type_, lengths in routes.items()
+        )
+
+    def get_subscribers(self, event):
+        """
+        Return a list of the Subscriptions an event is routed to
+
+        Arguments:
+        event -- Event instance
+        """
+        routes = self._routes
+        stream_id = event.stream_id or ''
+        matched = []
+        for type_ in (event.type, None):
+            for length, prefixes in routes.get(type_, ()):
+                subscriptions = prefixes.get(stream_id[:length]) if (
+                    len(stream_id) >= length
+                ) else None
+                if subscriptions:
+                    matched.extend(subscriptions)
+        if len(matched) > 1:
+            matched.sort(key=lambda s: s.number)
+        return matched
+
+    def publish(self, event):
+        """
+        Route an event to every matching subscriber
+
+        Arguments:
+        event -- Event instance
+        """
+        for subscription in self.get_subscribers(event):
+            subscription._receive(event)
+
+    __call__ = publish
+
+    def join(self, timeout=None):
+        """
+        Wait until every subscription's queued events have been delivered,
+        returning False if `timeout` seconds pass first
+
+        Keyword Arguments:
+        timeout -- Maximum seconds to wait for each subscription
+        """
+        return all([
+            subscription.join(timeout=timeout)
+            for subscription in self.subscriptions.values()
+        ])
+
+    def get_lag(self):
+        """
+        Return a PMap of subscription name to its delivery statistics, see
+        `Subscription.get_lag`
+        """
+        return pmap(
+            (name, subscription.get_lag())
+            for name, subscription in self.subscriptions.items()
+        )
@@ -0,0 +1,375 @@
+"""
+Read-through caching event store
+"""
+from collections import OrderedDict
+from threading import Lock
+
+from pyrsistent import field, pmap, pvector
+
+from dvent.event_store import IEventStore
+
+# Number of write counters streams are hashed to, see `StreamCache.stamp`
+WRITE_COUNTERS = 1024
+
+
+class StreamCache(object):
+    """
+    LRU cache of stream tails bounded by a total number of cached events
+
+    Each entry holds the events of a stream from an offset through to the
+    end of the stream, so any read starting at or after the offset can be
+    served from the entry.  Least recently used entries are evicted once more
+    than `max_events` events are cached.
+
+    Tails read from the backing store are stamped before the read (see
+    `stamp`) and only cached by `put` if no write to the stream was appended
+    or invalidated in between, so a concurrent write can't be lost.
+    """
+
+    def __init__(self, max_events=100000):
+        """
+        Keyword Arguments:
+        max_events -- Maximum number of events cached across all streams
+        """
+        self.max_events = max_events
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._writes = [0] * WRITE_COUNTERS
+
+    def _count_write(self, id_):
+        """
+        Count a write to a stream; call while holding the lock
+        """
+        self._writes[hash(id_) % WRITE_COUNTERS] += 1
+
+    def stamp(self, id_):
+        """
+        Return a stamp of a stream's writes to pass to `put` with a tail read
+        after it was taken
+
+        Streams share a fixed number of write counters, so a write to another
+        stream occasionally prevents caching a tail, never the reverse
+
+        Arguments:
+        id_ -- Stream id
+        """
+        with self._lock:
+            return self._writes[hash(id_) % WRITE_COUNTERS]
+
+    def get(self, id_, start=0):
+        """
+        Return the cached PVector of events from `start`, or None on a miss
+
+        Arguments:
+        id_ -- Stream id
+
+        Keyword Arguments:
+        start -- Integer position in the stream
+        """
+        with self._lock:
+            entry = self._entries.get(id_)
+            if entry is None or entry[0] > start:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(id_)
+            self.hits += 1
+            offset, events = entry
+            return events[start - offset:]
+
+    def get_last(self, id_):
+        """
+        Return (True, last event or None) if known from the cache, otherwise
+        (False, None)
+
+        Arguments:
+        id_ -- Stream id
+        """
+        with self._lock:
+            entry = self._entries.get(id_)
+            if entry is None or (entry[0] > 0 and not entry[1]):
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(id_)
+            self.hits += 1
+            events = entry[1]
+            return True, (events[-1] if events else None)
+
+    def put(self, id_, offset, events, stamp=None):
+        """
+        Cache the tail of a stream, unless a longer tail is already cached
+
+        An empty tail is only cached from the start of the stream, as an
+        empty read past the end doesn't show where the stream ends
+
+        Arguments:
+        id_ -- Stream id
+        offset -- Integer position in the stream of the first event
+        events -- All of the stream's events from `offset`
+
+        Keyword Arguments:
+        stamp -- Result of `stamp` taken before the tail was read; the tail
+                 isn't cached if the stream was written to since
+        """
+        events = pvector(events)
+        if len(events) > self.max_events or (offset > 0 and not events):
+            return
+        with self._lock:
+            if stamp is not None and (
+                stamp != self._writes[hash(id_) % WRITE_COUNTERS]
+            ):
+                return
+            entry = self._entries.get(id_)
+            if entry is not None:
+                if entry[0] <= offset:
+                    return
+                self.size -= len(entry[1])
+            self._entries[id_] = (offset, events)
+            self._entries.move_to_end(id_)
+            self.size += len(events)
+            self._evict()
+
+    def append(self, id_, events):
+        """
+        Append newly saved events to a stream's cached tail, if it is cached
+
+        Arguments:
+        id_ -- Stream id
+        events -- Events saved to the end of the stream
+        """
+        with self._lock:
+            self._count_write(id_)
+            entry = self._entries.get(id_)
+            if entry is None:
+                return
+            offset, cached = entry
+            cached = cached.extend(events)
+            self._entries[id_] = (offset, cached)
+            self.size += len(cached) - len(entry[1])
+            self._evict()
+
+    def invalidate(self, id_):
+        """
+        Remove a stream from the cache
+
+        Arguments:
+        id_ -- Stream id
+        """
+        with self._lock:
+            self._count_write(id_)
+            entry = self._entries.pop(id_, None)
+            if entry is not None:
+                self.size -= len(entry[1])
+
+    def _evict(self):
+        while self.size > self.max_events and self._entries:
+            _, (_, events) = self._entries.popitem(last=False)
+            self.size -= len(events)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        """
+        Fraction of lookups served from the cache
+        """
+        lookups = self.hits + self.misses
+        return (self.hits / lookups) if lookups else 0.0
+
+    def stats(self):
+        """
+        Return a PMap of cache statistics
+        """
+        with self._lock:
+            return pmap({
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'evictions': self.evictions,
+                'streams': len(self._entries),
+                'events': self.size,
+                'max_events': self.max_events,
+            })
+
+
+class CachingEventStore(IEventStore):
+    """
+    Event store interface caching recently read streams of any event store
+
+    Stream reads and `get_last_event` are served from the cache when the
+    cached tail covers them, and saved events are appended to cached tails
+    (write-through).  The cache is only consistent when every write to the
+    wrapped store goes through this interface and the wrapped store persists
+    events as they are given.  Reads of all events are passed through.
+
+    Fields:
+    event_store -- Wrapped IEventStore instance which publishes saved events
+    cache -- StreamCache instance
+    """
+
+    event_store = field(mandatory=True, type=IEventStore)
+
+    cache = field(mandatory=True, type=StreamCache)
+
+    @classmethod
+    def generate(cls, event_store, max_events=100000):
+        """
+        Generate a caching interface for an existing event store
+
+        Arguments:
+        event_store -- IEventStore instance to wrap
+
+        Keyword Arguments:
+        max_events -- Maximum number of events cached across all streams
+        """
+        return cls(**{
+            'publisher': event_store.publisher,
+            'id_factory': event_store.id_factory,
+            'event_store': event_store,
+            'cache': StreamCache(max_events=max_events),
+        })
+
+    def save_events(self, id_, events, expected_version=-2):
+        """
+        Save `events` to stream `id_` and append them to its cached tail
+
+        Arguments:
+        id_ -- Stream id to which the events will be saved
+        events -- Events to save to the store
+
+        Keyword Arguments:
+        expected_version -- Version checking for optimistic concurrency; see
+                            `IEventStore.check_version` for details
+        """
+        events = self.event_store.stamp_events(events)
+        try:
+            self.event_store.save_events(
+                id_, events, expected_version=expected_version
+            )
+        except Exception:
+            # The cached tail may be stale or the write partial
+            self.cache.invalidate(id_)
+            raise
+        self.cache.append(id_, events)
+
+    def save_events_batch(self, batch):
+        """
+        Save version-checked writes and append them to cached tails
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        batch = tuple(
+            (id_, self.event_store.stamp_events(events))
+            for id_, events in batch
+        )
+        try:
+            self.event_store.save_events_batch(batch)
+        except Exception:
+            for id_, _ in batch:
+                self.cache.invalidate(id_)
+            raise
+        for id_, events in batch:
+            self.cache.append(id_, events)
+
+    def save_events_multi(self, writes):
+        """
+        Save writes to several streams atomically and append them to cached
+        tails
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples,
+                  written in order
+        """
+        writes = tuple(
+            (id_, self.event_store.stamp_events(events), expected_version)
+            for id_, events, expected_version in writes
+        )
+        try:
+            self.event_store.save_events_multi(writes)
+        except Exception:
+            for id_, _, _ in writes:
+                self.cache.invalidate(id_)
+            raise
+        for id_, events, _ in writes:
+            self.cache.append(id_, events)
+
+    def import_events_batch(self, batch):
+        """
+        Persist exported events to the wrapped store, uncaching their streams
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        batch = tuple(batch)
+        try:
+            self.event_store.import_events_batch(batch)
+        finally:
+            for id_, _ in batch:
+                self.cache.invalidate(id_)
+
+    def get_events(self, id_=None, start=0):
+        """
+        Return generator of ordered Events for the optionally supplied id_
+
+        Keyword Arguments:
+        id_ -- Stream id, if None will return all events in order
+        start -- Integer, optionally specify a starting position in the stream
+        """
+        if not id_:
+            return self.event_store.get_events(id_, start=start)
+
+        events = self.cache.get(id_, start)
+        if events is None:
+            stamp = self.cache.stamp(id_)
+            events = pvector(self.event_store.get_events(id_, start=start))
+            self.cache.put(id_, start, events, stamp=stamp)
+        return iter(events)
+
+    def subscribe(self, stream_id=None, from_position=0, timeout=None):
+        """
+        Follow events saved to the wrapped store; see `IEventStore.subscribe`
+
+        Keyword Arguments:
+        stream_id -- Stream id, if None will follow all events in order
+        from_position -- Integer position of the first event
+        timeout -- Seconds to wait for each new event before iteration ends
+        """
+        return self.event_store.subscribe(
+            stream_id, from_position=from_position, timeout=timeout
+        )
+
+    def get_stream_events(self, start=0):
+        """
+        Return generator of (stream id, Event) tuples for all events in order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        return self.event_store.get_stream_events(start=start)
+
+    def get_last_event(self, id_):
+        """
+        Get the last event for the specified stream
+
+        A cache miss is passed to the wrapped store's `get_last_event`, which
+        may look it up more cheaply than reading the stream, and isn't cached
+
+        Arguments:
+        id_ -- Stream id
+        """
+        found, event = self.cache.get_last(id_)
+        if found:
+            return event
+        return self.event_store.get_last_event(id_)
+
+    def get_streams(self, start=0):
+        """
+        Get a generator of Stream instances in persisted order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        return self.event_store.get_streams(start=start)
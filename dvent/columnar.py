@@ -0,0 +1,247 @@
+"""
+NumPy columnar views of the event log for vectorized analytics
+
+Requires NumPy, eg. `pip install dvent[numpy]`
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Row layout of an event log view
+EVENT_DTYPE = np.dtype([
+    ('position', np.int64),
+    ('stream', np.int32),
+    ('type', np.int32),
+    ('timestamp', np.int64),
+    ('version', np.int64),
+])
+
+_EPOCH = datetime(1970, 1, 1)
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class EventLogView(object):
+    """
+    NumPy structured array of an event store's log, updated incrementally
+
+    Each row holds an event's global `position`, its interned `stream` and
+    `type` codes (indexes into `stream_ids` and `types`), its `timestamp` in
+    microseconds since the Unix epoch, and its `version`.  `refresh` appends
+    the rows of events saved since the last refresh, optionally only those of
+    selected streams or types, so the view relies on positions in the
+    store's global order not changing.  A view of an in-memory store is
+    registered as a follower of its db until closed, which prevents
+    `InMemoryEventDB.remove_streams`, eg. archival, from shifting them.
+    """
+
+    def __init__(self, event_store, stream_ids=None, types=None,
+                 chunk_size=65536):
+        """
+        Create an empty view; call `refresh` to load events
+
+        Arguments:
+        event_store -- IEventStore instance whose `get_stream_events` is read
+
+        Keyword Arguments:
+        stream_ids -- Iterable of stream ids to include, defaults to all
+        types -- Iterable of event types to include, defaults to all
+        chunk_size -- Number of events converted to rows at a time
+        """
+        self.event_store = event_store
+        self.stream_filter = frozenset(stream_ids) if stream_ids else None
+        self.type_filter = frozenset(types) if types else None
+        self.chunk_size = chunk_size
+        self.stream_ids = []
+        self.types = []
+        self.position = 0
+        self.size = 0
+        self._stream_codes = {}
+        self._type_codes = {}
+        self._rows = np.empty(0, dtype=EVENT_DTYPE)
+        db = getattr(event_store, 'db', None)
+        if db is not None and hasattr(db, 'add_follower'):
+            db.add_follower(self)
+
+    def close(self):
+        """
+        Unregister the view from an in-memory store's db; it can still be
+        read, but shouldn't be refreshed again
+        """
+        db = getattr(self.event_store, 'db', None)
+        if db is not None and hasattr(db, 'remove_follower'):
+            db.remove_follower(self)
+
+    @property
+    def rows(self):
+        """
+        Structured array of the loaded rows; a view, not a copy
+        """
+        return self._rows[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def get_stream_code(self, stream_id):
+        """
+        Return the interned code of a stream id, or -1 if not loaded
+
+        Arguments:
+        stream_id -- Stream id
+        """
+        return self._stream_codes.get(stream_id, -1)
+
+    def get_type_code(self, type_):
+        """
+        Return the interned code of an event type, or -1 if not loaded
+
+        Arguments:
+        type_ -- Event type
+        """
+        return self._type_codes.get(type_, -1)
+
+    def refresh(self):
+        """
+        Append rows for every event saved since the last refresh, returning
+        the number of rows added
+        """
+        added = 0
+        chunk = []
+        for entry in self.event_store.get_stream_events(start=self.position):
+            chunk.append(entry)
+            if len(chunk) >= self.chunk_size:
+                added += self._append_chunk(chunk)
+                chunk = []
+        if chunk:
+            added += self._append_chunk(chunk)
+        return added
+
+    def _append_chunk(self, chunk):
+        """
+        Convert a chunk of (stream id, Event) entries to rows and append them
+        """
+        first_position = self.position
+        self.position += len(chunk)
+
+        positions = range(first_position, first_position + len(chunk))
+        if self.stream_filter is not None or self.type_filter is not None:
+            selected = [
+                (position, entry)
+                for position, entry in zip(positions, chunk)
+                if (self.stream_filter is None or
+                    entry[0] in self.stream_filter) and
+                (self.type_filter is None or entry[1].type in self.type_filter)
+            ]
+            positions = [position for position, _ in selected]
+            chunk = [entry for _, entry in selected]
+        if not chunk:
+            return 0
+
+        stream_codes, type_codes = self._stream_codes, self._type_codes
+        rows = np.empty(len(chunk), dtype=EVENT_DTYPE)
+        rows['position'] = positions
+        rows['stream'] = [
+            stream_codes[stream_id] if stream_id in stream_codes
+            else self._intern_stream(stream_id)
+            for stream_id, _ in chunk
+        ]
+        rows['type'] = [
+            type_codes[event.type] if event.type in type_codes
+            else self._intern_type(event.type)
+            for _, event in chunk
+        ]
+        rows['timestamp'] = np.fromiter(
+            ((event.timestamp - _EPOCH) // _MICROSECOND for _, event in chunk),
+            dtype=np.int64, count=len(chunk)
+        )
+        rows['version'] = np.fromiter(
+            (event.version for _, event in chunk),
+            dtype=np.int64, count=len(chunk)
+        )
+
+        end = self.size + len(rows)
+        if end > len(self._rows):
+            grown = np.empty(max(end, 2 * len(self._rows)), dtype=EVENT_DTYPE)
+            grown[:self.size] = self._rows[:self.size]
+            self._rows = grown
+        self._rows[self.size:end] = rows
+        self.size = end
+        return len(rows)
+
+    def _intern_stream(self, stream_id):
+        code = self._stream_codes[stream_id] = len(self.stream_ids)
+        self.stream_ids.append(stream_id)
+        return code
+
+    def _intern_type(self, type_):
+        code = self._type_codes[type_] = len(self.types)
+        self.types.append(type_)
+        return code
+
+    def select(self, stream_id=None, type_=None, start=None, end=None):
+        """
+        Return the rows matching every supplied criterion as a new array
+
+        Keyword Arguments:
+        stream_id -- Only rows of this stream
+        type_ -- Only rows of this event type
+        start -- Only rows at or after this naive UTC datetime
+        end -- Only rows before this naive UTC datetime
+        """
+        rows = self.rows
+        mask = np.ones(len(rows), dtype=bool)
+        if stream_id is not None:
+            mask &= rows['stream'] == self.get_stream_code(stream_id)
+        if type_ is not None:
+            mask &= rows['type'] == self.get_type_code(type_)
+        if start is not None:
+            mask &= rows['timestamp'] >= (start - _EPOCH) // _MICROSECOND
+        if end is not None:
+            mask &= rows['timestamp'] < (end - _EPOCH) // _MICROSECOND
+        return rows[mask]
+
+    def count_by_type(self):
+        """
+        Return a dict of event type to number of events
+        """
+        counts = np.bincount(self.rows['type'], minlength=len(self.types))
+        return dict(zip(self.types, counts.tolist()))
+
+    def count_by_type_per_interval(self, interval=timedelta(hours=1)):
+        """
+        Return (interval starts, counts) of events per type per interval
+
+        `interval starts` is an array of the epoch-microsecond start of each
+        interval holding any events, and `counts` a 2D array of the number
+        of events per interval (rows) and type code (columns)
+
+        Keyword Arguments:
+        interval -- timedelta width of each interval
+        """
+        rows = self.rows
+        interval_us = interval // _MICROSECOND
+        buckets = rows['timestamp'] // interval_us
+        starts, bucket_codes = np.unique(buckets, return_inverse=True)
+        counts = np.zeros((len(starts), len(self.types)), dtype=np.int64)
+        np.add.at(counts, (bucket_codes.ravel(), rows['type']), 1)
+        return starts * interval_us, counts
+
+    def stream_lengths(self):
+        """
+        Return an array of the number of events per stream code
+        """
+        return np.bincount(self.rows['stream'], minlength=len(self.stream_ids))
+
+    def version_gaps(self):
+        """
+        Return the rows whose version isn't one more than the previous
+        event's version in the same stream (or 1 for a stream's first event)
+        """
+        rows = self.rows
+        order = np.lexsort((rows['position'], rows['stream']))
+        ordered = rows[order]
+        previous = np.zeros(len(ordered), dtype=np.int64)
+        if len(ordered):
+            same_stream = ordered['stream'][1:] == ordered['stream'][:-1]
+            previous[1:] = np.where(same_stream, ordered['version'][:-1], 0)
+        return ordered[ordered['version'] != previous + 1]
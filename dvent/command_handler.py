@@ -1,9 +1,32 @@
 """
 Command handler
 """
+from collections import OrderedDict
 from functools import lru_cache as memoize
+from time import perf_counter
 
-from pyrsistent import PClass, field, pmap, PMap
+from pyrsistent import PClass, field, pmap, PMap, pvector
+
+from dvent.profiling import COMMAND, get_profiler
+
+
+class CommandResult(PClass):
+    """
+    Outcome of a single command handled by `CommandHandler.handle_commands`
+
+    Fields:
+    command -- The handled Command
+    result -- Return value of handling the command, eg. the saved aggregate;
+              None if handling failed
+    error -- Exception raised handling the command or saving its aggregate,
+             or None if it succeeded
+    """
+
+    command = field(mandatory=True)
+
+    result = field(initial=None)
+
+    error = field(initial=None)
 
 
 class CommandHandler(PClass):
@@ -31,6 +54,148 @@ class CommandHandler(PClass):
             # 'DoNothing': cls.handle_command_noop
         })
 
+    @classmethod
+    @memoize(maxsize=1)
+    def get_aggregate_handle_map(cls):
+        """
+        Return a map of command types to (aggregate class, handler function)
+        for handling batches of commands with `handle_commands`
+
+        Aggregate handler functions accept the context, the target aggregate
+        (None if it has no events yet) and the command, and return the
+        aggregate with any new uncommitted events; loading and saving the
+        aggregate is left to `handle_commands`, eg.
+
+            @staticmethod
+            def change_status(context, todo, command):
+                return todo.change_status(command.data['status'])
+        """
+        return pmap({
+            # 'DoNothing': (Aggregate, cls.handle_aggregate_noop)
+        })
+
+    @staticmethod
+    def get_aggregate_id(command):
+        """
+        Return the id of the aggregate a command targets, or None for
+        commands creating a new aggregate; defaults to `command.data['id']`
+
+        Arguments:
+        command -- Command to handle
+        """
+        return command.data.get('id')
+
+    def _handle_aggregate_command(self, handler_fn, context, aggregate,
+                                  command):
+        """
+        Call an aggregate handler function, profiling it if enabled
+        """
+        profiler = get_profiler()
+        if profiler is None:
+            return handler_fn(context, aggregate, command)
+
+        start = perf_counter()
+        try:
+            return handler_fn(context, aggregate, command)
+        finally:
+            profiler.record(
+                COMMAND, self.__class__.__name__, command.type,
+                perf_counter() - start
+            )
+
+    def handle_commands(self, commands, repository=None, context=None):
+        """
+        Handle a batch of commands, loading and saving each aggregate once
+
+        Commands with an aggregate handler (see `get_aggregate_handle_map`)
+        are grouped by their target aggregate.  Each aggregate is loaded once,
+        its commands' handlers are applied in order accumulating uncommitted
+        events, and it is saved once.  A command whose handler raises has no
+        effect on the aggregate and the group carries on; if saving fails
+        every command of the group which succeeded fails with the error.
+        Other commands are handled individually with `handle_command` after
+        the groups.
+
+        Return a PVector of CommandResult in the order of `commands`; the
+        result of each successful aggregate command is its aggregate as saved
+
+        Arguments:
+        commands -- Iterable of Commands
+
+        Keyword Arguments:
+        repository -- Repository to load and save aggregates with, defaults
+                      to the context's `repository`
+        context -- Context in which to handle the commands, optional override
+        """
+        commands = tuple(commands)
+        context = context or self.context
+        repository = repository or context['repository']
+        handle_map = self.get_aggregate_handle_map()
+        results = [None] * len(commands)
+
+        groups = OrderedDict()
+        others = []
+        for index, command in enumerate(commands):
+            handler = handle_map.get(command.type)
+            if handler is None:
+                others.append(index)
+                continue
+            id_ = self.get_aggregate_id(command)
+            # Commands creating new aggregates can't share one
+            key = (handler[0], id_) if id_ is not None else index
+            groups.setdefault(key, []).append(index)
+
+        for indexes in groups.values():
+            first = commands[indexes[0]]
+            klass, _ = handle_map[first.type]
+            id_ = self.get_aggregate_id(first)
+            try:
+                aggregate = (
+                    repository.get_aggregate(klass, id_)
+                    if id_ is not None else None
+                )
+            except Exception as e:
+                for index in indexes:
+                    results[index] = CommandResult(
+                        command=commands[index], error=e
+                    )
+                continue
+
+            handled = []
+            for index in indexes:
+                command = commands[index]
+                try:
+                    aggregate = self._handle_aggregate_command(
+                        handle_map[command.type][1], context, aggregate,
+                        command
+                    )
+                    handled.append(index)
+                except Exception as e:
+                    results[index] = CommandResult(command=command, error=e)
+
+            result, error = aggregate, None
+            if aggregate is not None and aggregate.uncommitted_events:
+                try:
+                    result = repository.save_aggregate(aggregate)
+                except Exception as e:
+                    result, error = None, e
+            for index in handled:
+                results[index] = CommandResult(
+                    command=commands[index], result=result, error=error
+                )
+
+        for index in others:
+            command = commands[index]
+            try:
+                results[index] = CommandResult(
+                    command=command,
+                    result=self.handle_command(command, context=context)
+                )
+            except Exception as e:
+                results[index] = CommandResult(command=command, error=e)
+
+        return pvector(results)
+
     def handle_command(self, command, context=None):
         """
         Handle a command in the provided context
@@ -43,7 +208,19 @@ class CommandHandler(PClass):
         """
         command_fn = self.get_handle_map().get(command.type, self.handle_noop)
         context = context or self.context
-        return command_fn(self.context, command) if command_fn else None
+
+        profiler = get_profiler()
+        if profiler is None:
+            return command_fn(self.context, command) if command_fn else None
+
+        start = perf_counter()
+        try:
+            return command_fn(self.context, command) if command_fn else None
+        finally:
+            profiler.record(
+                COMMAND, self.__class__.__name__, command.type,
+                perf_counter() - start
+            )
 
     @staticmethod
     def handle_noop(context, command):
@@ -55,3 +232,16 @@ class CommandHandler(PClass):
         command -- Command to handle
         """
         pass
+
+    @staticmethod
+    def handle_aggregate_noop(context, aggregate, command):
+        """
+        Handle a command as a no-op on its aggregate; helper for modeling and
+        testing
+
+        Arguments:
+        context -- Context in which to handle the command
+        aggregate -- Aggregate targeted by the command
+        command -- Command to handle
+        """
+        return aggregate
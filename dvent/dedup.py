@@ -0,0 +1,443 @@
+"""
+Idempotent event store writes by event id deduplication
+"""
+import sys
+from collections import deque
+from hashlib import md5
+from math import ceil, exp, log
+from threading import RLock
+
+from pyrsistent import field, pmap
+
+from dvent.event_store import IEventStore
+
+
+class DuplicateEventError(RuntimeError):
+    """
+    Raised when a write repeats some, but not all, already-saved event ids,
+    or repeats an event id within itself
+    """
+    pass
+
+
+class BloomFilter(object):
+    """
+    Fixed-size probabilistic set of strings without false negatives
+
+    Sized for `capacity` strings at a false positive rate of `error_rate`;
+    adding more strings raises the rate, see `estimated_error_rate`
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Arguments:
+        capacity -- Number of strings the filter is sized for
+
+        Keyword Arguments:
+        error_rate -- Target false positive rate at `capacity`
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(
+            int(ceil(-capacity * log(error_rate) / (log(2) ** 2))), 8
+        )
+        self.num_hashes = max(
+            int(round(self.num_bits / capacity * log(2))), 1
+        )
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _indexes(self, value):
+        """
+        Return the bit indexes of a string by double hashing
+        """
+        digest = int.from_bytes(md5(value.encode('utf-8')).digest(), 'little')
+        first, second = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+        num_bits = self.num_bits
+        return [
+            (first + index * second) % num_bits
+            for index in range(self.num_hashes)
+        ]
+
+    def add(self, value):
+        """
+        Add a string
+
+        Arguments:
+        value -- String
+        """
+        bits = self._bits
+        for index in self._indexes(value):
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        bits = self._bits
+        return all(
+            bits[index >> 3] & (1 << (index & 7))
+            for index in self._indexes(value)
+        )
+
+    @property
+    def nbytes(self):
+        """
+        Size of the bit array in bytes
+        """
+        return len(self._bits)
+
+    @property
+    def estimated_error_rate(self):
+        """
+        Expected false positive rate given the number of strings added
+        """
+        return (
+            1 - exp(-self.num_hashes * self.count / self.num_bits)
+        ) ** self.num_hashes
+
+
+class EventIdIndex(object):
+    """
+    Bounded index of saved event ids
+
+    The `window` most recently added ids are held exactly.  Older ids are
+    moved into an optional Bloom filter, whose positive answers are only
+    "maybe" and are confirmed with an exact fallback check; without a Bloom
+    filter ids older than the window are forgotten.
+    """
+
+    def __init__(self, window=100000, bloom_capacity=None, error_rate=0.001):
+        """
+        Keyword Arguments:
+        window -- Number of most recent event ids held exactly
+        bloom_capacity -- Number of older event ids the Bloom filter is sized
+                          for; None disables the filter
+        error_rate -- Bloom filter false positive rate at `bloom_capacity`
+        """
+        self.window = window
+        self.bloom = (
+            BloomFilter(bloom_capacity, error_rate=error_rate)
+            if bloom_capacity else None
+        )
+        self.lock = RLock()
+        self.fallbacks = 0
+        self.false_positives = 0
+        self._recent = set()
+        self._order = deque()
+        self._recent_bytes = 0
+
+    def add(self, event_id):
+        """
+        Add a saved event id, moving the oldest exact id to the Bloom filter
+        once more than `window` are held
+
+        Arguments:
+        event_id -- Event id string
+        """
+        if event_id in self._recent:
+            return
+        self._recent.add(event_id)
+        self._order.append(event_id)
+        self._recent_bytes += sys.getsizeof(event_id)
+        if len(self._order) > self.window:
+            oldest = self._order.popleft()
+            self._recent.discard(oldest)
+            self._recent_bytes -= sys.getsizeof(oldest)
+            if self.bloom is not None:
+                self.bloom.add(oldest)
+
+    def contains(self, event_id, fallback):
+        """
+        Return whether an event id has been saved
+
+        Arguments:
+        event_id -- Event id string
+        fallback -- Function accepting the event id and returning whether it
+                    was saved, called to confirm Bloom filter matches
+        """
+        if event_id in self._recent:
+            return True
+        if self.bloom is None or event_id not in self.bloom:
+            return False
+        self.fallbacks += 1
+        if fallback(event_id):
+            return True
+        self.false_positives += 1
+        return False
+
+    def memory_usage(self):
+        """
+        Return a PMap of the index's size and approximate memory use in bytes
+        """
+        bloom = self.bloom
+        return pmap({
+            'recent_ids': len(self._order),
+            'recent_bytes': (
+                sys.getsizeof(self._recent) + sys.getsizeof(self._order) +
+                self._recent_bytes
+            ),
+            'bloom_ids': bloom.count if bloom is not None else 0,
+            'bloom_bytes': bloom.nbytes if bloom is not None else 0,
+            'bloom_error_rate': (
+                bloom.estimated_error_rate if bloom is not None else 0.0
+            ),
+            'fallbacks': self.fallbacks,
+            'false_positives': self.false_positives,
+        })
+
+
+class DeduplicatingEventStore(IEventStore):
+    """
+    Event store interface making saves idempotent by event id
+
+    Each write's event ids are looked up in an `EventIdIndex` before it is
+    passed to the wrapped store.  A write whose events were all saved before,
+    eg. a client's retry after a timeout, succeeds without saving, checking
+    versions or publishing anything; a write repeating only some saved ids
+    raises DuplicateEventError and saves nothing.  Bloom filter matches are
+    confirmed against the events of the stream being written, so ids older
+    than the exact window are only detected when retried to the same stream.
+
+    The index is only consistent when every write to the wrapped store goes
+    through this interface; writes are serialized by the index's lock.  Ids
+    of single and batched saves are only indexed once their stream's last
+    event confirms they were written, as stores such as InMemoryEventStore
+    log a failed write rather than raising.
+
+    Fields:
+    event_store -- Wrapped IEventStore instance which publishes saved events
+    index -- EventIdIndex of saved event ids
+    """
+
+    event_store = field(mandatory=True, type=IEventStore)
+
+    index = field(mandatory=True, type=EventIdIndex)
+
+    @classmethod
+    def generate(cls, event_store, window=100000, bloom_capacity=None,
+                 error_rate=0.001, warm=True):
+        """
+        Generate a deduplicating interface for an existing event store
+
+        Arguments:
+        event_store -- IEventStore instance to wrap
+
+        Keyword Arguments:
+        window -- Number of most recent event ids held exactly
+        bloom_capacity -- Number of older event ids the Bloom filter is sized
+                          for; None disables the filter
+        error_rate -- Bloom filter false positive rate at `bloom_capacity`
+        warm -- Index the ids of every event already in the store
+        """
+        index = EventIdIndex(
+            window=window, bloom_capacity=bloom_capacity,
+            error_rate=error_rate
+        )
+        if warm:
+            for event in event_store.get_events():
+                index.add(event.id)
+        return cls(**{
+            'publisher': event_store.publisher,
+            'id_factory': event_store.id_factory,
+            'event_store': event_store,
+            'index': index,
+        })
+
+    def _is_duplicate(self, id_, events, batch_ids):
+        """
+        Return whether every event of a write was already saved, or False if
+        none were; raise DuplicateEventError otherwise
+
+        Arguments:
+        id_ -- Stream id of the write
+        events -- Events of the write
+        batch_ids -- Set of ids of earlier writes of the same batch, updated
+                     with the ids of this write
+        """
+        stream_ids = []
+
+        def saved_in_stream(event_id):
+            if not stream_ids:
+                stream_ids.append(frozenset(
+                    event.id for event in self.event_store.get_events(id_)
+                ))
+            return event_id in stream_ids[0]
+
+        saved = []
+        for event in events:
+            if event.id in batch_ids:
+                raise DuplicateEventError(
+                    'Event id {} is repeated in the write'.format(event.id)
+                )
+            batch_ids.add(event.id)
+            saved.append(self.index.contains(event.id, saved_in_stream))
+
+        if saved and all(saved):
+            return True
+        if any(saved):
+            raise DuplicateEventError(
+                'Events {} were already saved'.format(','.join(
+                    event.id for event, found in zip(events, saved) if found
+                ))
+            )
+        return False
+
+    def _index_saved(self, writes):
+        """
+        Index the event ids of the writes confirmed by the wrapped store
+
+        Writes to a stream are saved in order, so a write was saved if its
+        last event, or that of a later write to the same stream, is the
+        stream's last event.
+
+        Arguments:
+        writes -- Sequence of (stream id, events) tuples, written in order
+        """
+        confirmed = {}
+        saved = []
+        for id_, events in reversed(writes):
+            if not events:
+                continue
+            if id_ not in confirmed:
+                last_event = self.event_store.get_last_event(id_)
+                confirmed[id_] = None if last_event is None else last_event.id
+            if confirmed[id_] == events[-1].id:
+                confirmed[id_] = True
+            if confirmed[id_] is True:
+                saved.append(events)
+        for events in reversed(saved):
+            for event in events:
+                self.index.add(event.id)
+
+    def save_events(self, id_, events, expected_version=-2):
+        """
+        Save `events` to stream `id_` unless they were all saved before
+
+        Raise DuplicateEventError if only some of the events were saved
+
+        Arguments:
+        id_ -- Stream id to which the events will be saved
+        events -- Events to save to the store
+
+        Keyword Arguments:
+        expected_version -- Version checking for optimistic concurrency; see
+                            `IEventStore.check_version` for details
+        """
+        events = tuple(events)
+        with self.index.lock:
+            if self._is_duplicate(id_, events, set()):
+                return
+            self.event_store.save_events(
+                id_, events, expected_version=expected_version
+            )
+            self._index_saved(((id_, events),))
+
+    def save_events_batch(self, batch):
+        """
+        Save version-checked writes, skipping those saved before
+
+        Raise DuplicateEventError, saving nothing, if any write repeats only
+        some saved events
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        batch_ids = set()
+        with self.index.lock:
+            writes = []
+            for id_, events in batch:
+                events = tuple(events)
+                if not self._is_duplicate(id_, events, batch_ids):
+                    writes.append((id_, events))
+            if not writes:
+                return
+            self.event_store.save_events_batch(writes)
+            self._index_saved(writes)
+
+    def save_events_multi(self, writes):
+        """
+        Save writes to several streams atomically, skipping those saved before
+
+        Raise DuplicateEventError, saving nothing, if any write repeats only
+        some saved events
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples,
+                  written in order
+        """
+        batch_ids = set()
+        with self.index.lock:
+            accepted = []
+            for id_, events, expected_version in writes:
+                events = tuple(events)
+                if not self._is_duplicate(id_, events, batch_ids):
+                    accepted.append((id_, events, expected_version))
+            if not accepted:
+                return
+            self.event_store.save_events_multi(accepted)
+            for _, events, _ in accepted:
+                for event in events:
+                    self.index.add(event.id)
+
+    def import_events_batch(self, batch):
+        """
+        Persist exported events to the wrapped store, indexing their ids
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        batch = tuple((id_, tuple(events)) for id_, events in batch)
+        with self.index.lock:
+            self.event_store.import_events_batch(batch)
+            for _, events in batch:
+                for event in events:
+                    self.index.add(event.id)
+
+    def get_events(self, id_=None, start=0):
+        """
+        Return generator of ordered Events for the optionally supplied id_
+
+        Keyword Arguments:
+        id_ -- Stream id, if None will return all events in order
+        start -- Integer, optionally specify a starting position in the stream
+        """
+        return self.event_store.get_events(id_, start=start)
+
+    def subscribe(self, stream_id=None, from_position=0, timeout=None):
+        """
+        Follow events saved to the wrapped store; see `IEventStore.subscribe`
+
+        Keyword Arguments:
+        stream_id -- Stream id, if None will follow all events in order
+        from_position -- Integer position of the first event
+        timeout -- Seconds to wait for each new event before iteration ends
+        """
+        return self.event_store.subscribe(
+            stream_id, from_position=from_position, timeout=timeout
+        )
+
+    def get_stream_events(self, start=0):
+        """
+        Return generator of (stream id, Event) tuples for all events in order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        return self.event_store.get_stream_events(start=start)
+
+    def get_last_event(self, id_):
+        """
+        Get the last event for the specified stream
+
+        Arguments:
+        id_ -- Stream id
+        """
+        return self.event_store.get_last_event(id_)
+
+    def get_streams(self, start=0):
+        """
+        Get a generator of Stream instances in persisted order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        return self.event_store.get_streams(start=start)
@@ -2,17 +2,98 @@
 Domain event
 """
 from datetime import datetime
-from uuid import uuid4
+from os import urandom
 
 from pyrsistent import PRecord, field, pmap, PMap, freeze
 
+from dvent.ids import get_id_factory, uuid4_id
+
 NoneType = type(None)
 
+# Number of event ids generated per batch of random bytes
+ID_BATCH_SIZE = 1024
+
+_EMPTY_DATA = pmap()
+
+_trusted_replay = True
+
+
+def is_trusted_replay():
+    """
+    Return True if events loaded from a store are trusted as valid
+    """
+    return _trusted_replay
+
+
+def set_trusted_replay(enabled):
+    """
+    Enable or disable trusting events loaded from a store, returning the
+    previous setting
+
+    When enabled (the default) `Event.create_trusted` and
+    `Aggregate.generate_from_events` skip re-validating data which was
+    validated when it was written; disable it (eg. in tests) to re-enable
+    every check.
+
+    Arguments:
+    enabled -- Boolean
+    """
+    global _trusted_replay
+    previous, _trusted_replay = _trusted_replay, bool(enabled)
+    return previous
+
+
+def is_fast_construction():
+    """
+    Return True if trusted events and aggregates are built from pyrsistent's
+    internals rather than its public constructors
+    """
+    return _fast_construction
+
+
+def set_fast_construction(enabled):
+    """
+    Enable or disable building trusted events and aggregates from
+    pyrsistent's internals, returning the previous setting
+
+    The internals are private to pyrsistent, so the fast path is only ever
+    enabled if a check on import found they work as expected; otherwise, or
+    when disabled, trusted values are built with the public constructors,
+    which re-validate them.
+
+    Arguments:
+    enabled -- Boolean
+    """
+    global _fast_construction
+    previous = _fast_construction
+    _fast_construction = bool(enabled) and _FAST_CONSTRUCTION_SUPPORTED
+    return previous
+
 
 def _validate_version(version):
     return (version >= 0, 'version negative')
 
 
+def _generate_uuid4_strings(count):
+    """
+    Return a list of `count` random (version 4) UUID strings
+
+    Equivalent to `str(uuid4())` per id but reads random bytes in one call
+    and formats them directly rather than through `UUID` instances
+    """
+    raw = bytearray(urandom(16 * count))
+    ids = []
+    for offset in range(0, 16 * count, 16):
+        # Set the version (4) and RFC 4122 variant bits
+        raw[offset + 6] = (raw[offset + 6] & 0x0f) | 0x40
+        raw[offset + 8] = (raw[offset + 8] & 0x3f) | 0x80
+        hex_ = raw[offset:offset + 16].hex()
+        ids.append('{}-{}-{}-{}-{}'.format(
+            hex_[:8], hex_[8:12], hex_[12:16], hex_[16:20], hex_[20:]
+        ))
+    return ids
+
+
 class Event(PRecord):
     """
     Domain event data object; immutable
@@ -48,19 +129,20 @@ class Event(PRecord):
         """
         Generate an Event
 
-        `id` *must* be a UUID, will default to a random uuid4() if not supplied
+        `id` *must* be a UUID, will default to the id factory set with
+        `dvent.ids.set_id_factory` (a random uuid4() unless changed)
 
         Arguments:
         event_type -- String representing the event type
         data -- PMap of command data
-        id -- Event id; ideally a UUID, will default to uuid4()
+        id -- Event id; ideally a UUID, defaults to the default id factory
         stream_id -- Stream id; ideally a UUID, optional
         timestamp -- Datetime representing when the event happened, default
                      to datetime.utcnow()
         version -- Event version within its stream
         """
         if not id:
-            id = uuid4()
+            id = get_id_factory()()
 
         return cls(**{
             'id': str(id),
@@ -70,3 +152,160 @@ class Event(PRecord):
             'timestamp': timestamp or datetime.utcnow(),
             'version': version or 0,
         })
+
+    @classmethod
+    def generate_many(
+        cls, specs, stream_id=None, start_version=None, timestamp=None
+    ):
+        """
+        Generate a list of Events in bulk
+
+        Much cheaper per event than calling `generate` in a loop: the shared
+        arguments are validated once, all events share one timestamp, ids are
+        generated in batches, and records are built without re-running the
+        per-field type checks.
+
+        Arguments:
+        specs -- Iterable of event type strings or (event_type, data) pairs
+
+        Keyword Arguments:
+        stream_id -- Stream id shared by every event, optional
+        start_version -- Version of the first event; following events are
+                         versioned contiguously.  If not supplied every event
+                         is unversioned (version 0) as with `generate`
+        timestamp -- Datetime shared by every event, default to
+                     datetime.utcnow()
+        """
+        stream_id = stream_id or ''
+        timestamp = timestamp or datetime.utcnow()
+        if not isinstance(stream_id, str):
+            raise TypeError('stream_id must be a str')
+        if not isinstance(timestamp, datetime):
+            raise TypeError('timestamp must be a datetime')
+        if start_version is not None and (
+            not isinstance(start_version, int) or start_version < 0
+        ):
+            raise ValueError('start_version must be a non-negative int')
+
+        specs = [
+            (spec, None) if isinstance(spec, str) else spec for spec in specs
+        ]
+
+        id_factory = get_id_factory()
+        if id_factory is uuid4_id:
+            generate_ids = _generate_uuid4_strings
+        else:
+            def generate_ids(count):
+                return [str(id_factory()) for _ in range(count)]
+
+        events = []
+        for batch_start in range(0, len(specs), ID_BATCH_SIZE):
+            batch = specs[batch_start:batch_start + ID_BATCH_SIZE]
+            ids = generate_ids(len(batch))
+            for index, (event_type, data) in enumerate(batch):
+                if not isinstance(event_type, str):
+                    raise TypeError('event_type must be a str')
+                if not isinstance(data, PMap):
+                    data = freeze(data) or _EMPTY_DATA
+                    if not isinstance(data, PMap):
+                        raise TypeError('data must be a mapping')
+
+                version = 0
+                if start_version is not None:
+                    version = start_version + batch_start + index
+
+                events.append(cls._create_trusted({
+                    'id': ids[index],
+                    'type': event_type,
+                    'data': data,
+                    'stream_id': stream_id,
+                    'timestamp': timestamp,
+                    'version': version,
+                }))
+        return events
+
+    @classmethod
+    def create_trusted(cls, values):
+        """
+        Build an Event from a mapping of values loaded from an event store
+
+        The values are trusted to be valid, having been validated when the
+        event was first generated, so the per-field type & invariant checks
+        are skipped unless disabled with `set_trusted_replay(False)`; use in
+        implementations of `deserialize_event`
+
+        Arguments:
+        values -- Mapping including every Event field
+        """
+        if not _trusted_replay:
+            return cls.create(values)
+        return cls._create_trusted(values)
+
+    @classmethod
+    def _create_trusted(cls, values):
+        """
+        Build an Event from a dict of field values without validating them
+
+        Only for values already known to satisfy every field's type and
+        invariant; `values` must include every field.  Falls back to `create`
+        when fast construction is disabled, see `set_fast_construction`.
+        """
+        if not _fast_construction:
+            return cls.create(values)
+        return _build_record(cls, values)
+
+    def __eq__(self, other):
+        """
+        Compare as a PMap, after checks for identity and equal ids
+
+        Events with different ids are unequal without building dicts of
+        their fields; PMap also short-circuits events whose cached hashes
+        differ.
+        """
+        if self is other:
+            return True
+        if isinstance(other, Event) and self['id'] != other['id']:
+            return False
+        return PRecord.__eq__(self, other)
+
+    # Defining __eq__ resets __hash__; keep PMap's cached hash of all fields
+    __hash__ = PRecord.__hash__
+
+
+def _build_record(cls, values):
+    """
+    Build a PRecord from the buckets of a PMap of its values, which are
+    private to pyrsistent
+    """
+    _map = pmap(values)
+    return cls(_precord_buckets=_map._buckets, _precord_size=_map._size)
+
+
+def _check_fast_construction():
+    """
+    Return whether `_build_record` builds Events equal to validated ones with
+    the installed pyrsistent
+    """
+    values = {
+        'id': 'check',
+        'type': 'Checked',
+        'data': pmap({'key': 'value'}),
+        'stream_id': 'check',
+        'timestamp': datetime(2000, 1, 1),
+        'version': 1,
+    }
+    try:
+        event = _build_record(Event, values)
+        validated = Event.create(values)
+        return (
+            type(event) is Event and event == validated and
+            hash(event) == hash(validated) and
+            event.set('version', 2) == validated.set('version', 2)
+        )
+    except Exception:
+        return False
+
+
+_FAST_CONSTRUCTION_SUPPORTED = _check_fast_construction()
+
+_fast_construction = _FAST_CONSTRUCTION_SUPPORTED
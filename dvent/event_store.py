@@ -4,9 +4,15 @@ Event store
 from collections import OrderedDict
 from logging import getLogger
 from pprint import pprint
+from threading import Condition, RLock
+from weakref import WeakSet
+from time import perf_counter
 
 from pyrsistent import PClass, PRecord, field, pvector
 
+from dvent.event import Event
+from dvent.instrumentation import get_sink, timed_iter
+
 logger = getLogger(__name__)
 
 
@@ -16,6 +22,15 @@ class IEventStoreVersionError(RuntimeError):
     pass
 
 
+class StreamsFollowedError(RuntimeError):
+    """
+    Raised when removing streams from an `InMemoryEventDB` which is followed,
+    as removal would shift the global positions followers read from
+    """
+
+    pass
+
+
 class Stream(PRecord):
     """
     Stream data container
@@ -46,23 +61,54 @@ class IEventStore(PClass):
 
     Fields:
     publisher -- Function accepting saved events and "publishing" them
+    id_factory -- Function returning new event ids for `generate_event`;
+                  optional, see `dvent.ids`
+    upcasters -- `dvent.upcasting.UpcasterRegistry` applied to events read
+                 from the store by `deserialize_event`; optional
     """
 
     publisher = field()
 
+    id_factory = field(initial=None)
+
+    upcasters = field(initial=None)
+
     @classmethod
-    def generate(cls, publisher=None):
+    def generate(cls, publisher=None, id_factory=None, upcasters=None):
         """
         Generate a new event store instance
 
         Keyword Arguments:
         publisher -- Function which accepts an Event as a single argument, will
                      be called with any events persisted to the store
+        id_factory -- Function returning new event ids, eg.
+                      `dvent.ids.uuid7_id` for time-ordered ids
+        upcasters -- `dvent.upcasting.UpcasterRegistry` upcasting events read
+                     from the store to their latest schema
         """
         return cls(**{
-            'publisher': publisher or pprint
+            'publisher': publisher or pprint,
+            'id_factory': id_factory,
+            'upcasters': upcasters,
         })
 
+    def generate_event(self, event_type, **kwargs):
+        """
+        Generate an Event with an id from the store's `id_factory`
+
+        Without an `id_factory` the default id factory is used; see
+        `dvent.ids.set_id_factory`
+
+        Arguments:
+        event_type -- String representing the event type
+
+        Keyword Arguments:
+        See `Event.generate`
+        """
+        if self.id_factory and not kwargs.get('id'):
+            kwargs['id'] = self.id_factory()
+        return Event.generate(event_type, **kwargs)
+
     @staticmethod
     def check_version(expected_version=-2, last_event=None):
         """
@@ -87,6 +133,7 @@ class IEventStore(PClass):
         if expected_version in (-1, 0):
             if last_event:
                 _id = last_event.id
+                get_sink().count('event_store.version_conflicts')
                 raise IEventStoreVersionError(
                     'Expected new but found existing event '
                     'with id {}'.format(_id)
@@ -96,12 +143,43 @@ class IEventStore(PClass):
         if expected_version >= 1:
             current_version = last_event.version if last_event else 0
             if expected_version != current_version:
+                get_sink().count('event_store.version_conflicts')
                 raise IEventStoreVersionError(
                     'Expected version {} but found {}'.format(
                         expected_version, current_version
                     )
                 )
 
+    def stamp_events(self, events):
+        """
+        Return a tuple of events to save, stamped with their latest schema
+        versions by `upcasters` if set; see `UpcasterRegistry.stamp`
+
+        Implementations of the save methods should save the stamped events
+
+        Arguments:
+        events -- Events to save to the store
+        """
+        events = tuple(events)
+        if self.upcasters is None:
+            return events
+        return tuple(map(self.upcasters.stamp, events))
+
+    def deserialize_event(self, store_event):
+        """
+        Convert client/db event model/data into an Event instance
+
+        This default accepts Events or mappings of every Event field.  Events
+        read back from a store were validated when they were written, so they
+        are built with `Event.create_trusted`; implementations overriding this
+        should do the same, and upcast the Event with `upcasters` if set.
+        """
+        if not isinstance(store_event, Event):
+            store_event = Event.create_trusted(store_event)
+        if self.upcasters is not None:
+            return self.upcasters.upcast(store_event)
+        return store_event
+
     def save_events(self, id_, events, expected_version=-2):
         """
         Save a `events` to stream `id_` with `expected_version` check
@@ -124,6 +202,97 @@ class IEventStore(PClass):
         )
         raise NotImplementedError('Must implement save_events')
 
+    def save_events_batch(self, batch):
+        """
+        Save several writes whose expected versions were already checked
+
+        Intended for writers that check versions themselves, such as
+        `dvent.group_commit.GroupCommitter`.  This default saves each write in
+        turn; override it when the database can write the batch in one call.
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        for id_, events in batch:
+            self.save_events(id_, events)
+
+    def check_versions(self, writes, get_last_event=None):
+        """
+        Verify the expected versions of several writes, as if saved in order
+
+        A stream written more than once is checked against its last event
+        after the earlier writes, so each write's expected version must
+        account for them.  Raise IEventStoreVersionError for the first write
+        whose version conflicts.
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples
+
+        Keyword Arguments:
+        get_last_event -- Function accepting a stream id and returning its
+                          last event, defaults to `self.get_last_event`
+        """
+        get_last_event = get_last_event or self.get_last_event
+        last_events = {}
+        for id_, events, expected_version in writes:
+            if expected_version >= -1:
+                if id_ not in last_events:
+                    last_events[id_] = get_last_event(id_)
+                self.check_version(expected_version, last_events[id_])
+            if events:
+                last_events[id_] = events[-1]
+
+    def save_events_multi(self, writes):
+        """
+        Save writes to several streams atomically, checking every expected
+        version before saving any events
+
+        Raise IEventStoreVersionError, saving nothing, if any check fails.
+        This default checks versions with `check_versions` and then saves
+        with `save_events_batch`, so it is only atomic when nothing else
+        writes to the streams meanwhile; override it when the database can
+        check and write in a single transaction.
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples,
+                  written in order
+        """
+        writes = tuple(
+            (id_, tuple(events), expected_version)
+            for id_, events, expected_version in writes
+        )
+        self.check_versions(writes)
+        self.save_events_batch((id_, events) for id_, events, _ in writes)
+
+    def publish_events(self, events, id_=None):
+        """
+        Publish each of the `events`, logging rather than raising failures
+
+        Events without a `stream_id` are published with it set to `id_`, so
+        publishers such as `dvent.bus.EventBus` can route them by stream; the
+        saved events are unchanged
+
+        Arguments:
+        events -- Events which have been saved to the store
+
+        Keyword Arguments:
+        id_ -- Stream id to which the events were saved
+        """
+        sink = get_sink()
+        start = perf_counter() if sink.enabled else None
+        for event in events:
+            if id_ and not event.stream_id:
+                event = event.set('stream_id', id_)
+            try:
+                self.publisher(event)
+            except Exception as e:
+                sink.count('event_store.publish_failures')
+                logger.critical("Failed publishing event {}: {}".format(
+                    event, str(e)
+                ))
+        if start is not None:
+            sink.timing('event_store.publish_events', perf_counter() - start)
+
     def get_events(self, id_=None, start=0):
         """
         Return generator of ordered Events for the optionally supplied id_
@@ -134,6 +303,49 @@ class IEventStore(PClass):
         """
         raise NotImplementedError('Must implement get_events')
 
+    def subscribe(self, stream_id=None, from_position=0, timeout=None):
+        """
+        Return an iterator of events from `from_position` which, once it has
+        caught up, waits for new events to be saved instead of ending
+
+        Implementations should wake waiting iterators when events are saved
+        rather than polling; see `InMemoryEventStore.subscribe`
+
+        Keyword Arguments:
+        stream_id -- Stream id, if None will follow all events in order
+        from_position -- Integer position in the stream (or all events) of
+                         the first event
+        timeout -- Seconds to wait for each new event before iteration ends;
+                   None waits indefinitely
+        """
+        raise NotImplementedError('Must implement subscribe')
+
+    def get_stream_events(self, start=0):
+        """
+        Return generator of (stream id, Event) tuples for all events in order
+
+        This default relies on every event carrying its `stream_id`; override
+        it when the database indexes streams separately from events
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        for event in self.get_events(start=start):
+            yield event.stream_id, event
+
+    def import_events_batch(self, batch):
+        """
+        Persist events exported from a store, eg. when migrating or seeding
+
+        Events keep their ids and versions and are not version-checked.  This
+        default saves the batch with `save_events_batch` (so it may publish
+        the events); override it to write directly to the database.
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        self.save_events_batch(batch)
+
     def get_last_event(self, id_):
         """
         Get the last event for the specified stream
@@ -170,7 +382,12 @@ class InMemoryEventDB(object):
 
     Immutable append-only in-memory event database
 
-    *Note: Not thread-safe*
+    Writes are serialized by `lock`, which callers may also hold to check
+    versions and write atomically; reads are not locked.  Every write
+    notifies the `appended` condition and calls each of the `listeners`, so
+    followers (see `dvent.follow`) wake for new events without polling.
+    Followers, and other readers relying on stable global positions, are
+    registered in `followers` until closed and prevent `remove_streams`.
 
     **DO NOT USE IN PRODUCTION; FOR TESTING & REFERENCE ONLY**
     """
@@ -181,35 +398,241 @@ class InMemoryEventDB(object):
         """
         self.streams = OrderedDict()
         self.events = pvector([])
+        self.event_stream_ids = pvector([])
+        self.lock = RLock()
+        self.appended = Condition(self.lock)
+        self.listeners = frozenset()
+        self.followers = WeakSet()
+
+    def _notify(self):
+        """
+        Wake everything waiting for new events; call while holding `lock`
+        """
+        self.appended.notify_all()
+        for listener in self.listeners:
+            try:
+                listener()
+            except Exception:
+                logger.exception('Failed calling db listener')
+
+    def add_listener(self, listener):
+        """
+        Register a function called, without arguments, after every write
+
+        Listeners are called on the writing thread while the db is locked, so
+        they must be quick and must not write; eg.
+        `loop.call_soon_threadsafe(event.set)` to wake an asyncio task
+
+        Arguments:
+        listener -- Function accepting no arguments
+        """
+        with self.lock:
+            self.listeners = self.listeners.union((listener,))
+
+    def remove_listener(self, listener):
+        """
+        Unregister a function added with `add_listener`
+
+        Arguments:
+        listener -- Function accepting no arguments
+        """
+        with self.lock:
+            self.listeners = self.listeners.difference((listener,))
+
+    def add_follower(self, follower):
+        """
+        Register a reader of global positions, preventing `remove_streams`
+        until it is removed or garbage collected
+
+        Arguments:
+        follower -- Object, eg. a `dvent.follow.Follower`
+        """
+        with self.lock:
+            self.followers.add(follower)
+
+    def remove_follower(self, follower):
+        """
+        Unregister a reader added with `add_follower`
+
+        Arguments:
+        follower -- Object
+        """
+        with self.lock:
+            self.followers.discard(follower)
+
+    def check_not_followed(self):
+        """
+        Raise StreamsFollowedError if any followers or listeners are
+        registered
+        """
+        with self.lock:
+            if self.listeners or len(self.followers):
+                raise StreamsFollowedError(
+                    'Cannot remove streams while {} followers and {} '
+                    'listeners are registered'.format(
+                        len(self.followers), len(self.listeners)
+                    )
+                )
 
     def write_to_stream(self, stream_id, events):
         """
         Append the `events` to the in-memory vector; update streams index
 
-        *Note: not thread-safe*
-
         Arguments:
         stream_id -- Stream id to which the events apply
         events -- Events to save
         """
-        # Determine the next index which corresponds to the new event
-        # NOTE: This isn't atomic/safe if we encounter a race-condition;
-        #       using `self.events.index` would be better but slower
-        for event in events:
-            # If no version is supplied then version the event here
-            # This is easier than versioning on the way out
-            if event.version < 0 or event.version is None:
-                version = len(self.streams.get(stream_id, []))
-                event = event.set('version', version)
+        with self.lock:
+            for event in events:
+                # If no version is supplied then version the event here
+                # This is easier than versioning on the way out
+                if event.version < 0 or event.version is None:
+                    version = len(self.streams.get(stream_id, []))
+                    event = event.set('version', version)
+
+                if not event.stream_id:
+                    event.set('stream_id', stream_id)
+
+                new_index = len(self.events)
+                self.events = self.events.append(event)
+                self.event_stream_ids = self.event_stream_ids.append(
+                    stream_id
+                )
+                self.streams[stream_id] = self.streams\
+                    .setdefault(stream_id, pvector())\
+                    .append(new_index)
+            self._notify()
 
-            if not event.stream_id:
-                event.set('stream_id', stream_id)
+    def import_events(self, batch):
+        """
+        Append already-versioned events of several streams in a single pass
+
+        Events are stored as given, keeping their versions, and each vector is
+        updated through one evolver rather than an append per event.  The
+        vectors and streams index are only replaced once every event has been
+        added, so if reading the batch fails part way through nothing is
+        written.
 
-            new_index = len(self.events)
-            self.events = self.events.append(event)
-            self.streams[stream_id] = self.streams\
-                .setdefault(stream_id, pvector())\
-                .append(new_index)
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        with self.lock:
+            events = self.events.evolver()
+            event_stream_ids = self.event_stream_ids.evolver()
+            streams = OrderedDict()
+            for stream_id, stream_events in batch:
+                indices = streams.get(stream_id)
+                if indices is None:
+                    indices = streams[stream_id] = self.streams.get(
+                        stream_id, pvector()
+                    ).evolver()
+                for event in stream_events:
+                    indices.append(len(events))
+                    events.append(event)
+                    event_stream_ids.append(stream_id)
+
+            self.events = events.persistent()
+            self.event_stream_ids = event_stream_ids.persistent()
+            for stream_id, indices in streams.items():
+                self.streams[stream_id] = indices.persistent()
+            self._notify()
+
+    def remove_streams(self, stream_ids):
+        """
+        Remove streams and their events, returning them in an OrderedDict of
+        stream id to PVector of events
+
+        The remaining events are re-indexed in a single pass, so positions in
+        the global order shift down past the removed events; raise
+        StreamsFollowedError, removing nothing, while followers or listeners
+        relying on those positions are registered
+
+        Arguments:
+        stream_ids -- Iterable of stream ids; unknown ids are ignored
+        """
+        with self.lock:
+            stream_ids = frozenset(stream_ids).intersection(self.streams)
+            removed = OrderedDict(
+                (stream_id, pvector(
+                    self.events[index] for index in self.streams[stream_id]
+                ))
+                for stream_id in self.streams if stream_id in stream_ids
+            )
+            if not removed:
+                return removed
+            self.check_not_followed()
+
+            events, event_stream_ids = [], []
+            streams = OrderedDict(
+                (stream_id, []) for stream_id in self.streams
+                if stream_id not in stream_ids
+            )
+            for event, stream_id in zip(self.events, self.event_stream_ids):
+                if stream_id not in stream_ids:
+                    streams[stream_id].append(len(events))
+                    events.append(event)
+                    event_stream_ids.append(stream_id)
+
+            self.events = pvector(events)
+            self.event_stream_ids = pvector(event_stream_ids)
+            self.streams = OrderedDict(
+                (stream_id, pvector(indices))
+                for stream_id, indices in streams.items()
+            )
+            return removed
+
+    def insert_stream(self, stream_id, entries):
+        """
+        Insert the events of a stream at given positions in the global order
+
+        The vectors and streams index are rebuilt in a single pass, like
+        `remove_streams`, so positions after each inserted event shift up;
+        raise StreamsFollowedError, inserting nothing, while followers or
+        listeners relying on those positions are registered.  Raise
+        ValueError if the stream already holds events.
+
+        Arguments:
+        stream_id -- Stream id
+        entries -- Iterable of (position, event) tuples in increasing order
+                   of position; each position is the event's once inserted
+        """
+        with self.lock:
+            entries = list(entries)
+            if not entries:
+                return
+            if stream_id in self.streams:
+                raise ValueError('Stream {} already holds events'.format(
+                    stream_id
+                ))
+            self.check_not_followed()
+
+            events, event_stream_ids = [], []
+            streams = OrderedDict()
+
+            def append(event, event_stream_id):
+                streams.setdefault(event_stream_id, []).append(len(events))
+                events.append(event)
+                event_stream_ids.append(event_stream_id)
+
+            inserts = iter(entries)
+            insert = next(inserts, None)
+            for event, event_stream_id in zip(
+                self.events, self.event_stream_ids
+            ):
+                while insert is not None and insert[0] <= len(events):
+                    append(insert[1], stream_id)
+                    insert = next(inserts, None)
+                append(event, event_stream_id)
+            while insert is not None:
+                append(insert[1], stream_id)
+                insert = next(inserts, None)
+
+            self.events = pvector(events)
+            self.event_stream_ids = pvector(event_stream_ids)
+            self.streams = OrderedDict(
+                (event_stream_id, pvector(indices))
+                for event_stream_id, indices in streams.items()
+            )
 
     def get_events(self, stream_id=None, start=0):
         """
@@ -228,6 +651,17 @@ class InMemoryEventDB(object):
         for index in indices[start:]:
             yield self.events[index]
 
+    def get_stream_events(self, start=0):
+        """
+        Return a generator of (stream id, event) tuples for all events
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        events, event_stream_ids = self.events, self.event_stream_ids
+        for index in range(start, len(events)):
+            yield event_stream_ids[index], events[index]
+
     def get_streams(self, start=0):
         """
         Get a generator of Stream instances in persisted order
@@ -259,12 +693,14 @@ class InMemoryEventStore(IEventStore):
     Fields:
     db -- An instance of `InMemoryEventDB`
     publisher -- Function accepting saved events and "publishing" them
+    id_factory -- Function returning new event ids for `generate_event`
     """
 
     db = field(type=InMemoryEventDB)
 
     @classmethod
-    def generate(cls, publisher=None, db=None):
+    def generate(cls, publisher=None, db=None, id_factory=None,
+                 upcasters=None):
         """
         Generate a new in-memory event store with an existing or new database
 
@@ -272,18 +708,25 @@ class InMemoryEventStore(IEventStore):
         publisher -- Function which accepts an Event as a single argument, will
                      be called with any events persisted to the store
         db -- An instance of `InMemoryEventDB`
+        id_factory -- Function returning new event ids, eg.
+                      `dvent.ids.uuid7_id` for time-ordered ids
+        upcasters -- `dvent.upcasting.UpcasterRegistry` upcasting events read
+                     from the store to their latest schema
         """
         return cls(**{
             'publisher': publisher or pprint,
             'db': db or InMemoryEventDB(),
+            'id_factory': id_factory,
+            'upcasters': upcasters,
         })
 
-    @staticmethod
-    def deserialize_event(store_event):
+    def deserialize_event(self, store_event):
         """
         Convert client/db event model/data into an Event instance
         """
         # In-memory db is native so already an Event instance
+        if self.upcasters is not None:
+            return self.upcasters.upcast(store_event)
         return store_event
 
     @staticmethod
@@ -309,25 +752,128 @@ class InMemoryEventStore(IEventStore):
         expected_version -- Version checking for optimistic concurrency; see
                             `IEventStore.check_version` for details
         """
-        if expected_version >= -1:
-            last_event = self.get_last_event(id_)
-            self.check_version(expected_version, last_event)
+        sink = get_sink()
+        start = perf_counter() if sink.enabled else None
+        events = self.stamp_events(events)
+
+        # Hold the db lock so the version can't change before the write
+        with self.db.lock:
+            if expected_version >= -1:
+                last_event = self.get_last_event(id_)
+                self.check_version(expected_version, last_event)
+
+            # Write the events and then publish them
+            try:
+                self.db.write_to_stream(
+                    id_, map(self.serialize_event, events)
+                )
+            except Exception as e:
+                logger.critical("Failed to write events ({}): {}".format(
+                    ','.join(event.id for event in events),
+                    str(e)
+                ))
+        if start is not None:
+            sink.timing('event_store.save_events', perf_counter() - start)
+            sink.count('event_store.events_saved', len(events))
+        self.publish_events(events, id_)
+
+    def save_events_batch(self, batch):
+        """
+        Save several already version-checked writes in a single db pass
+
+        Events for every write are persisted before any are published
 
-        # Write the events and then publish them
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        sink = get_sink()
+        start = perf_counter() if sink.enabled else None
+        batch = tuple(
+            (id_, self.stamp_events(events)) for id_, events in batch
+        )
         try:
-            self.db.write_to_stream(id_, map(self.serialize_event, events))
+            for id_, events in batch:
+                self.db.write_to_stream(
+                    id_, map(self.serialize_event, events)
+                )
         except Exception as e:
             logger.critical("Failed to write events ({}): {}".format(
-                ','.join(event.id for event in events),
+                ','.join(event.id for _, events in batch for event in events),
                 str(e)
             ))
-        for event in events:
+        if start is not None:
+            sink.timing(
+                'event_store.save_events_batch', perf_counter() - start
+            )
+            sink.count(
+                'event_store.events_saved',
+                sum(len(events) for _, events in batch)
+            )
+        for id_, events in batch:
+            self.publish_events(events, id_)
+
+    def save_events_multi(self, writes):
+        """
+        Save writes to several streams atomically, checking every expected
+        version before saving any events
+
+        Versions are checked and every event is written while holding the
+        db's lock, in a single `InMemoryEventDB.import_events` pass, so either
+        every write is saved or, if a check or the write fails, none are.
+        Raise IEventStoreVersionError on a version conflict; write failures
+        are also raised.  Events are published once all are saved.
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples,
+                  written in order
+        """
+        sink = get_sink()
+        start = perf_counter() if sink.enabled else None
+        writes = tuple(
+            (id_, self.stamp_events(events), expected_version)
+            for id_, events, expected_version in writes
+        )
+        serialize_event = self.serialize_event
+        with self.db.lock:
+            self.check_versions(writes)
             try:
-                self.publisher(event)
+                self.db.import_events(
+                    (id_, map(serialize_event, events))
+                    for id_, events, _ in writes
+                )
             except Exception as e:
-                logger.critical("Failed publishing event {}: {}".format(
-                    event, str(e)
+                logger.critical("Failed to write events ({}): {}".format(
+                    ','.join(
+                        event.id for _, events, _ in writes for event in events
+                    ),
+                    str(e)
                 ))
+                raise
+        if start is not None:
+            sink.timing(
+                'event_store.save_events_multi', perf_counter() - start
+            )
+            sink.count(
+                'event_store.events_saved',
+                sum(len(events) for _, events, _ in writes)
+            )
+        for id_, events, _ in writes:
+            self.publish_events(events, id_)
+
+    def import_events_batch(self, batch):
+        """
+        Write exported events straight to the db without publishing them
+
+        Unlike saving, write failures are raised so an import can't silently
+        drop events
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        serialize_event = self.serialize_event
+        self.db.import_events(
+            (id_, map(serialize_event, events)) for id_, events in batch
+        )
 
     def get_events(self, id_=None, start=0):
         """
@@ -337,8 +883,46 @@ class InMemoryEventStore(IEventStore):
         id_ -- Stream id, if None will return all events in order
         start -- Integer, optionally specify a starting position in the stream
         """
-        for serialized_event in (self.db.get_events(id_, start) or []):
-            yield self.deserialize_event(serialized_event)
+        events = map(
+            self.deserialize_event, self.db.get_events(id_, start) or []
+        )
+        sink = get_sink()
+        if sink.enabled:
+            return timed_iter(sink, 'event_store.get_events', events)
+        return events
+
+    def get_stream_events(self, start=0):
+        """
+        Return generator of (stream id, Event) tuples for all events in order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        deserialize_event = self.deserialize_event
+        for stream_id, event in self.db.get_stream_events(start):
+            yield stream_id, deserialize_event(event)
+
+    def subscribe(self, stream_id=None, from_position=0, timeout=None):
+        """
+        Return a `dvent.follow.Follower` of events from `from_position`
+
+        Historical events are yielded first; then iterating blocks, and async
+        iteration awaits, until the db wakes the follower with new events.
+        Call the follower's `close` to end it from another thread or task.
+
+        Keyword Arguments:
+        stream_id -- Stream id, if None will follow all events in order
+        from_position -- Integer position in the stream (or all events) of
+                         the first event
+        timeout -- Seconds to wait for each new event before iteration ends;
+                   None waits until the follower is closed
+        """
+        # Imported here as async iteration requires Python 3.5+
+        from dvent.follow import Follower
+        return Follower(
+            self.db, stream_id=stream_id, position=from_position,
+            timeout=timeout, deserialize_event=self.deserialize_event
+        )
 
     def get_streams(self, start=0):
         """
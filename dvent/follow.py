@@ -0,0 +1,170 @@
+"""
+Live tail of an in-memory event log without polling
+
+A `Follower` iterates a stream's (or the whole log's) events from a position
+and, once it has caught up, waits to be woken by the next write to the
+`InMemoryEventDB` rather than polling `get_events`.  Followers are usually
+created with `InMemoryEventStore.subscribe`:
+
+    for event in event_store.subscribe(from_position=0):
+        update_projection(event)
+
+or, on an asyncio event loop (Python 3.5+):
+
+    async for event in event_store.subscribe(stream_id):
+        await notify(event)
+"""
+import asyncio
+from collections import deque
+
+# Events read from the db per batch once a follower wakes
+READ_BATCH_SIZE = 1000
+
+
+class Follower(object):
+    """
+    Blocking and asynchronous iterator of an `InMemoryEventDB`'s events
+
+    Historical events from `position` are yielded first.  Once caught up,
+    iterating blocks on the db's `appended` condition and async iteration
+    awaits an asyncio event set by a db listener, so new events are seen as
+    soon as they're written.  Iteration ends if `timeout` seconds pass
+    without a new event or once `close` is called, eg. from another thread.
+
+    Positions are indexes into the stream, or into the global log when
+    following every stream, so followers are registered with the db until
+    closed, or their iteration ends, which prevents streams being removed
+    (see `InMemoryEventDB.remove_streams`).
+    """
+
+    def __init__(self, db, stream_id=None, position=0, timeout=None,
+                 deserialize_event=None):
+        """
+        Arguments:
+        db -- InMemoryEventDB instance
+
+        Keyword Arguments:
+        stream_id -- Stream id to follow, defaults to every stream
+        position -- Position of the first event to yield
+        timeout -- Seconds to wait for each new event, or None to wait until
+                   closed
+        deserialize_event -- Function converting db events to Events
+        """
+        self.db = db
+        self.stream_id = stream_id
+        self.position = position
+        self.timeout = timeout
+        self.deserialize_event = deserialize_event
+        self.closed = False
+        self._buffer = deque()
+        self._wake = None
+        db.add_follower(self)
+
+    def _available(self):
+        """
+        Return the number of saved events at or after `position`
+        """
+        if self.stream_id is None:
+            return len(self.db.events) - self.position
+        return len(self.db.streams.get(self.stream_id, ())) - self.position
+
+    def _fill(self):
+        """
+        Buffer the next batch of saved events, returning whether any were
+        """
+        db, position = self.db, self.position
+        if self.stream_id is None:
+            events = db.events
+            end = min(len(events), position + READ_BATCH_SIZE)
+            batch = [events[index] for index in range(position, end)]
+        else:
+            # Streams are indexed after events are appended, so read the
+            # indices first and every one of them is in the events vector
+            indices = db.streams.get(self.stream_id, ())
+            events = db.events
+            end = min(len(indices), position + READ_BATCH_SIZE)
+            batch = [events[indices[index]] for index in range(position, end)]
+        if not batch:
+            return False
+        self.position = end
+        if self.deserialize_event is not None:
+            batch = map(self.deserialize_event, batch)
+        self._buffer.extend(batch)
+        return True
+
+    def close(self):
+        """
+        End iteration, waking the follower if it's waiting
+        """
+        self.closed = True
+        with self.db.appended:
+            self.db.remove_follower(self)
+            self.db.appended.notify_all()
+        wake = self._wake
+        if wake is not None:
+            wake()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._buffer and not self._wait():
+            self.close()
+            raise StopIteration
+        return self._buffer.popleft()
+
+    def _wait(self):
+        """
+        Block until events are buffered, returning False on timeout or close
+        """
+        if self.closed:
+            return False
+        if self._fill():
+            return True
+        appended = self.db.appended
+        with appended:
+            appended.wait_for(
+                lambda: self.closed or self._available() > 0,
+                timeout=self.timeout
+            )
+        return not self.closed and self._fill()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._buffer and not await self._wait_async():
+            self.close()
+            raise StopAsyncIteration
+        return self._buffer.popleft()
+
+    async def _wait_async(self):
+        """
+        Await buffered events, returning False on timeout or close
+        """
+        if self.closed:
+            return False
+        if self._fill():
+            return True
+        loop = asyncio.get_event_loop()
+        woken = asyncio.Event()
+
+        def wake():
+            loop.call_soon_threadsafe(woken.set)
+
+        # Listen before checking again so a write in between isn't missed
+        self._wake = wake
+        self.db.add_listener(wake)
+        try:
+            while not self.closed:
+                woken.clear()
+                if self._fill():
+                    return True
+                try:
+                    await asyncio.wait_for(woken.wait(), self.timeout)
+                except asyncio.TimeoutError:
+                    return False
+            return False
+        finally:
+            self.db.remove_listener(wake)
+            self._wake = None
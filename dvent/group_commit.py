@@ -0,0 +1,276 @@
+"""
+Group commit of concurrent event store writes
+"""
+from threading import Condition, Event as ThreadingEvent, Lock
+
+from pyrsistent import field
+
+from dvent.event_store import IEventStore, IEventStoreVersionError
+
+
+class _PendingWrite(object):
+    """
+    A single caller's write waiting to be committed with its group
+    """
+
+    __slots__ = ('id_', 'events', 'expected_version', 'error', 'done')
+
+    def __init__(self, id_, events, expected_version):
+        self.id_ = id_
+        self.events = events
+        self.expected_version = expected_version
+        self.error = None
+        self.done = ThreadingEvent()
+
+
+class GroupCommitter(object):
+    """
+    Collects writes from concurrent callers and commits them as one batch
+
+    The first caller to submit a write while no group is forming becomes the
+    group's leader; it waits up to `window` seconds (or until
+    `max_batch_size` writes are pending), checks every caller's expected
+    version in submission order, and saves the accepted writes with a single
+    `IEventStore.save_events_batch` call.  Each caller is then completed
+    individually, either successfully or with its `IEventStoreVersionError`.
+
+    Version checks are only consistent when every write to the underlying
+    store goes through the same committer.
+    """
+
+    def __init__(self, event_store, window=0.002, max_batch_size=256):
+        """
+        Initialize the committer for an event store
+
+        Arguments:
+        event_store -- IEventStore instance to which batches are saved
+
+        Keyword Arguments:
+        window -- Maximum seconds a leader waits for more writes to group
+        max_batch_size -- Number of pending writes which triggers a commit
+                          without waiting for the full window
+        """
+        self.event_store = event_store
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.writes = 0
+        self._pending = []
+        self._leading = False
+        self._condition = Condition(Lock())
+        self._commit_lock = Lock()
+
+    def submit(self, id_, events, expected_version=-2):
+        """
+        Submit a write and block until its group has been committed
+
+        Raise IEventStoreVersionError if the expected version conflicts
+
+        Arguments:
+        id_ -- Stream id to which the events will be saved
+        events -- Events to save to the store
+
+        Keyword Arguments:
+        expected_version -- See `IEventStore.check_version`
+        """
+        pending = _PendingWrite(id_, tuple(events), expected_version)
+
+        with self._condition:
+            self._pending.append(pending)
+            is_leader = not self._leading
+            if is_leader:
+                self._leading = True
+            elif len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+
+        if is_leader:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: len(self._pending) >= self.max_batch_size,
+                    timeout=self.window
+                )
+                batch, self._pending = self._pending, []
+                # Let the next group form while this one is committed
+                self._leading = False
+            with self._commit_lock:
+                self._commit(batch)
+
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+
+    def submit_multi(self, writes):
+        """
+        Save writes to several streams atomically, between group commits
+
+        The writes aren't grouped with others but saved with the store's
+        `IEventStore.save_events_multi` while no group is being committed, so
+        their version checks are consistent with those of the groups
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples
+        """
+        writes = tuple(writes)
+        with self._commit_lock:
+            self.event_store.save_events_multi(writes)
+            self.batches += 1
+            self.writes += len(writes)
+
+    def _commit(self, batch):
+        """
+        Check expected versions and save the accepted writes of a batch
+
+        Arguments:
+        batch -- List of _PendingWrite instances in submission order
+        """
+        last_events = {}
+        accepted = []
+        try:
+            for pending in batch:
+                id_ = pending.id_
+                if id_ not in last_events:
+                    last_events[id_] = self.event_store.get_last_event(id_)
+                try:
+                    self.event_store.check_version(
+                        pending.expected_version, last_events[id_]
+                    )
+                except IEventStoreVersionError as e:
+                    pending.error = e
+                    continue
+
+                accepted.append(pending)
+                if pending.events:
+                    last_events[id_] = pending.events[-1]
+
+            self.event_store.save_events_batch(
+                (pending.id_, pending.events) for pending in accepted
+            )
+            self.batches += 1
+            self.writes += len(accepted)
+        except Exception as e:
+            for pending in accepted:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+
+class GroupCommitEventStore(IEventStore):
+    """
+    Event store interface grouping concurrent `save_events` calls
+
+    Trades up to `committer.window` seconds of write latency for far fewer
+    (and larger) writes to the wrapped store.  Reads are passed through.
+
+    Fields:
+    event_store -- Wrapped IEventStore instance which publishes saved events
+    committer -- GroupCommitter instance for the wrapped store
+    """
+
+    event_store = field(mandatory=True, type=IEventStore)
+
+    committer = field(mandatory=True, type=GroupCommitter)
+
+    @classmethod
+    def generate(cls, event_store, window=0.002, max_batch_size=256):
+        """
+        Generate a group-committing interface for an existing event store
+
+        Arguments:
+        event_store -- IEventStore instance to wrap
+
+        Keyword Arguments:
+        window -- Maximum seconds a write waits for others to join its group
+        max_batch_size -- Number of pending writes which triggers a commit
+        """
+        return cls(**{
+            'publisher': event_store.publisher,
+            'id_factory': event_store.id_factory,
+            'event_store': event_store,
+            'committer': GroupCommitter(
+                event_store, window=window, max_batch_size=max_batch_size
+            ),
+        })
+
+    def save_events(self, id_, events, expected_version=-2):
+        """
+        Save `events` to stream `id_` as part of the next committed group
+
+        Arguments:
+        id_ -- Stream id to which the events will be saved
+        events -- Events to save to the store
+
+        Keyword Arguments:
+        expected_version -- Version checking for optimistic concurrency; see
+                            `IEventStore.check_version` for details
+        """
+        self.committer.submit(id_, events, expected_version=expected_version)
+
+    def save_events_multi(self, writes):
+        """
+        Save writes to several streams atomically, outside of any group
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples,
+                  written in order
+        """
+        self.committer.submit_multi(writes)
+
+    def get_events(self, id_=None, start=0):
+        """
+        Return generator of ordered Events for the optionally supplied id_
+
+        Keyword Arguments:
+        id_ -- Stream id, if None will return all events in order
+        start -- Integer, optionally specify a starting position in the stream
+        """
+        return self.event_store.get_events(id_, start=start)
+
+    def subscribe(self, stream_id=None, from_position=0, timeout=None):
+        """
+        Follow events saved to the wrapped store; see `IEventStore.subscribe`
+
+        Keyword Arguments:
+        stream_id -- Stream id, if None will follow all events in order
+        from_position -- Integer position of the first event
+        timeout -- Seconds to wait for each new event before iteration ends
+        """
+        return self.event_store.subscribe(
+            stream_id, from_position=from_position, timeout=timeout
+        )
+
+    def get_stream_events(self, start=0):
+        """
+        Return generator of (stream id, Event) tuples for all events in order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        return self.event_store.get_stream_events(start=start)
+
+    def import_events_batch(self, batch):
+        """
+        Persist exported events directly to the wrapped store
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        self.event_store.import_events_batch(batch)
+
+    def get_last_event(self, id_):
+        """
+        Get the last event for the specified stream
+
+        Arguments:
+        id_ -- Stream id
+        """
+        return self.event_store.get_last_event(id_)
+
+    def get_streams(self, start=0):
+        """
+        Get a generator of Stream instances in persisted order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        return self.event_store.get_streams(start=start)
@@ -0,0 +1,249 @@
+"""
+Instrumentation hooks and metrics sinks
+"""
+from bisect import insort
+from math import ceil
+from random import randrange
+from threading import Lock
+from time import perf_counter
+
+from pyrsistent import pmap
+
+
+class IMetricsSink(object):
+    """
+    Metrics sink interface; receives timings, counts, and observations
+
+    The base implementation discards everything and has `enabled` set to
+    False so instrumented code can skip measuring altogether; sinks which
+    record metrics must set `enabled` to True.
+
+    Metric names are dotted strings, eg. "event_store.save_events"
+    """
+
+    enabled = False
+
+    def timing(self, name, seconds):
+        """
+        Record the duration of an operation
+
+        Arguments:
+        name -- Metric name
+        seconds -- Float duration in seconds
+        """
+        pass
+
+    def count(self, name, value=1):
+        """
+        Increment a counter
+
+        Arguments:
+        name -- Metric name
+
+        Keyword Arguments:
+        value -- Integer amount to increment by
+        """
+        pass
+
+    def observe(self, name, value):
+        """
+        Record a single value of a distribution, eg. a loaded stream length
+
+        Arguments:
+        name -- Metric name
+        value -- Numeric value
+        """
+        pass
+
+
+class NullSink(IMetricsSink):
+    """
+    Metrics sink which discards everything; the default sink
+    """
+
+    pass
+
+
+class Histogram(object):
+    """
+    Summary of a distribution of values with percentiles
+
+    Retains at most `max_samples` values via reservoir sampling so memory is
+    bounded; count, total, min and max are always exact.
+
+    *Note: Not thread-safe*
+    """
+
+    def __init__(self, max_samples=10000):
+        """
+        Keyword Arguments:
+        max_samples -- Maximum number of values retained for percentiles
+        """
+        self.max_samples = max_samples
+        self.samples = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """
+        Add a value to the distribution
+        """
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        if len(self.samples) < self.max_samples:
+            insort(self.samples, value)
+        else:
+            index = randrange(self.count)
+            if index < self.max_samples:
+                del self.samples[randrange(self.max_samples)]
+                insort(self.samples, value)
+
+    def percentile(self, percent):
+        """
+        Return the nearest-rank percentile of the retained values
+
+        Arguments:
+        percent -- Number between 0 and 100
+        """
+        if not self.samples:
+            return None
+        rank = int(ceil(percent / 100.0 * len(self.samples))) - 1
+        return self.samples[min(max(rank, 0), len(self.samples) - 1)]
+
+    def summary(self, percentiles=(50, 95, 99)):
+        """
+        Return a PMap summarizing the distribution
+
+        Keyword Arguments:
+        percentiles -- Percentiles to include, keyed as eg. "p95"
+        """
+        summary = {
+            'count': self.count,
+            'total': self.total,
+            'mean': (self.total / self.count) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+        }
+        for percent in percentiles:
+            summary['p{}'.format(percent)] = self.percentile(percent)
+        return pmap(summary)
+
+
+class AggregatingSink(IMetricsSink):
+    """
+    In-process metrics sink aggregating counters & distribution summaries
+
+    Timings and observations are summarized with a `Histogram` per metric
+    name; counts are summed
+    """
+
+    enabled = True
+
+    def __init__(self, max_samples=10000):
+        """
+        Keyword Arguments:
+        max_samples -- Maximum values retained per metric for percentiles
+        """
+        self.max_samples = max_samples
+        self.counters = {}
+        self.histograms = {}
+        self._lock = Lock()
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(self.max_samples)
+        return histogram
+
+    def timing(self, name, seconds):
+        with self._lock:
+            self._histogram(name).add(seconds)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            self._histogram(name).add(value)
+
+    def report(self, percentiles=(50, 95, 99)):
+        """
+        Return a PMap of metric names to counts or distribution summaries
+
+        Keyword Arguments:
+        percentiles -- Percentiles to include in each summary
+        """
+        with self._lock:
+            report = dict(self.counters)
+            for name, histogram in self.histograms.items():
+                report[name] = histogram.summary(percentiles)
+        return pmap(report)
+
+    def reset(self):
+        """
+        Discard everything recorded so far
+        """
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+
+_sink = NullSink()
+
+
+def get_sink():
+    """
+    Return the metrics sink in use
+    """
+    return _sink
+
+
+def set_sink(sink):
+    """
+    Set the metrics sink used by all instrumented code, returning the previous
+
+    Arguments:
+    sink -- IMetricsSink instance, or None to restore the default `NullSink`
+    """
+    global _sink
+    previous, _sink = _sink, (sink or NullSink())
+    return previous
+
+
+def timed_iter(sink, name, iterable):
+    """
+    Return a generator over `iterable` which reports time spent producing it
+
+    Only the time spent inside `iterable` counts, not the consumer's time
+    between items.  When exhausted or closed the elapsed time is reported as
+    a timing of `name` and the number of items as an observation of
+    "<name>.events".
+
+    Arguments:
+    sink -- IMetricsSink instance to report to
+    name -- Metric name
+    iterable -- Iterable to instrument
+    """
+    iterator = iter(iterable)
+    count = 0
+    elapsed = 0.0
+    try:
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += perf_counter() - start
+            count += 1
+            yield item
+    finally:
+        sink.timing(name, elapsed)
+        sink.observe(name + '.events', count)
@@ -0,0 +1,458 @@
+"""
+Synthetic load generation for measuring repositories under a traffic shape
+
+`run_load` drives a `Repository` over any `IEventStore` with a `Workload`:
+a number of streams whose popularity is Zipf-skewed, a read/write ratio,
+events per write command and a number of concurrent workers.  It returns a
+JSON-compatible report of throughput, latency percentiles and the version
+conflict rate.
+
+    report = run_load(
+        Repository(event_store=event_store),
+        Workload.generate(streams=1000, zipf=1.1, read_ratio=0.9)
+    )
+
+Workers are threads, so with stores which don't release the GIL the
+concurrency measured is contention rather than parallelism.  Run a workload
+from the command line with `python -m dvent.load`, see `main`.
+"""
+import argparse
+import json
+import sys
+from bisect import bisect
+from collections import OrderedDict
+from functools import lru_cache as memoize
+from importlib import import_module
+from itertools import accumulate
+from random import Random
+from threading import Barrier, Lock, Thread
+from time import perf_counter
+from uuid import UUID
+
+from pyrsistent import PClass, field, pmap
+
+from dvent.aggregate import Aggregate
+from dvent.event import Event
+from dvent.event_store import IEventStoreVersionError, InMemoryEventStore
+from dvent.instrumentation import Histogram
+from dvent.repository import Repository
+
+NoneType = type(None)
+
+# Aggregates saved per call when seeding a workload's streams
+SEED_BATCH_SIZE = 1000
+
+PERCENTILES = (50, 95, 99)
+
+
+def _validate_positive(value):
+    return (value >= 1, 'must be at least 1')
+
+
+def _validate_ratio(value):
+    return (0 <= value <= 1, 'must be between 0 and 1')
+
+
+def _validate_zipf(value):
+    return (value >= 0, 'must not be negative')
+
+
+class Workload(PClass):
+    """
+    Shape of the traffic generated by `run_load`
+
+    Fields:
+    streams -- Number of aggregate streams
+    zipf -- Zipf exponent of stream popularity; the nth most popular stream
+            is picked with weight 1 / n ** zipf, so 0 is uniform and larger
+            values concentrate traffic on fewer hot aggregates
+    events_per_command -- Events applied to the aggregate by each write
+    read_ratio -- Fraction (0-1) of operations which only load an aggregate
+    concurrency -- Number of concurrent workers
+    operations -- Total operations across every worker
+    duration -- Optional limit in seconds, stopping before `operations`
+    seed -- Optional random seed; stream ids and operation choices repeat
+            for the same seed, although thread scheduling varies
+    """
+
+    streams = field(type=int, mandatory=True, invariant=_validate_positive)
+
+    zipf = field(type=(int, float), mandatory=True, invariant=_validate_zipf)
+
+    events_per_command = field(
+        type=int, mandatory=True, invariant=_validate_positive
+    )
+
+    read_ratio = field(
+        type=(int, float), mandatory=True, invariant=_validate_ratio
+    )
+
+    concurrency = field(type=int, mandatory=True, invariant=_validate_positive)
+
+    operations = field(type=int, mandatory=True, invariant=_validate_positive)
+
+    duration = field(type=(int, float, NoneType), initial=None)
+
+    seed = field(type=(int, NoneType), initial=None)
+
+    @classmethod
+    def generate(cls, streams=1000, zipf=1.0, events_per_command=1,
+                 read_ratio=0.5, concurrency=1, operations=10000,
+                 duration=None, seed=None):
+        """
+        Generate a workload
+
+        Keyword Arguments:
+        streams -- Number of aggregate streams
+        zipf -- Zipf exponent of stream popularity, 0 for uniform
+        events_per_command -- Events applied by each write
+        read_ratio -- Fraction (0-1) of operations which are reads
+        concurrency -- Number of concurrent workers
+        operations -- Total operations across every worker
+        duration -- Optional limit in seconds
+        seed -- Optional random seed
+        """
+        return cls(**{
+            'streams': streams,
+            'zipf': zipf,
+            'events_per_command': events_per_command,
+            'read_ratio': read_ratio,
+            'concurrency': concurrency,
+            'operations': operations,
+            'duration': duration,
+            'seed': seed,
+        })
+
+
+class ZipfSampler(object):
+    """
+    Samples indexes 0..n-1 with index k weighted 1 / (k + 1) ** exponent
+    """
+
+    def __init__(self, n, exponent):
+        """
+        Arguments:
+        n -- Number of indexes
+        exponent -- Zipf exponent, 0 samples uniformly
+        """
+        self.n = n
+        self.exponent = exponent
+        self.cumulative_weights = list(accumulate(
+            1.0 / (rank ** exponent) for rank in range(1, n + 1)
+        ))
+        self.total = self.cumulative_weights[-1]
+
+    def sample(self, rng):
+        """
+        Return a random index
+
+        Arguments:
+        rng -- `random.Random` instance
+        """
+        index = bisect(self.cumulative_weights, rng.random() * self.total)
+        # Guard against rounding at the upper edge
+        return index if index < self.n else self.n - 1
+
+
+class LoadAggregate(Aggregate):
+    """
+    Aggregate written by generated load, counting its applied events
+    """
+
+    @classmethod
+    @memoize(maxsize=1)
+    def get_apply_map(cls):
+        return pmap({
+            'LoadApplied': cls.apply_load_applied,
+        })
+
+    @staticmethod
+    def apply_load_applied(aggregate, event):
+        return aggregate.set_state(
+            'count', aggregate.state.get('count', 0) + 1
+        )
+
+    def apply_load(self, count):
+        """
+        Return the aggregate with `count` new uncommitted events
+
+        Arguments:
+        count -- Number of events
+        """
+        version = self.uncommitted_version
+        return self.apply_events([
+            Event.generate('LoadApplied', version=version + offset)
+            for offset in range(1, count + 1)
+        ])
+
+
+def generate_stream_ids(count, seed=None):
+    """
+    Return a list of `count` UUID stream id strings, repeatable by `seed`
+
+    Arguments:
+    count -- Number of ids
+
+    Keyword Arguments:
+    seed -- Optional random seed
+    """
+    rng = Random(seed)
+    return [str(UUID(int=rng.getrandbits(128), version=4))
+            for _ in range(count)]
+
+
+def seed_streams(repository, stream_ids):
+    """
+    Save a `LoadAggregate` with one event for each stream id
+
+    Arguments:
+    repository -- Repository to save the aggregates with
+    stream_ids -- Iterable of stream ids
+    """
+    stream_ids = list(stream_ids)
+    for start in range(0, len(stream_ids), SEED_BATCH_SIZE):
+        repository.save_aggregates(
+            LoadAggregate.generate(id_).apply_load(1)
+            for id_ in stream_ids[start:start + SEED_BATCH_SIZE]
+        )
+
+
+def _percentiles(latencies):
+    """
+    Return an OrderedDict of latency statistics in milliseconds
+    """
+    if not latencies:
+        return OrderedDict()
+    # Retain every latency so the percentiles are exact; adding them sorted
+    # appends each to the histogram's samples rather than inserting it
+    histogram = Histogram(max_samples=len(latencies))
+    for latency in sorted(latencies):
+        histogram.add(latency)
+    summary = histogram.summary(percentiles=PERCENTILES)
+    stats = OrderedDict(
+        (key, summary[key] * 1e3)
+        for key in ['p{}'.format(percentile) for percentile in PERCENTILES]
+    )
+    stats['mean'] = summary['mean'] * 1e3
+    stats['max'] = summary['max'] * 1e3
+    return stats
+
+
+class _Worker(object):
+    """
+    Runs operations on one thread, recording their outcomes and latencies
+    """
+
+    def __init__(self, repository, workload, stream_ids, sampler, seed):
+        self.repository = repository
+        self.workload = workload
+        self.stream_ids = stream_ids
+        self.sampler = sampler
+        self.rng = Random(seed)
+        self.read_latencies = []
+        self.write_latencies = []
+        self.conflicts = 0
+        self.errors = 0
+
+    def run_operation(self):
+        """
+        Run a single read or write of a sampled stream
+        """
+        rng, repository = self.rng, self.repository
+        id_ = self.stream_ids[self.sampler.sample(rng)]
+        is_read = rng.random() < self.workload.read_ratio
+        start = perf_counter()
+        try:
+            aggregate = repository.get_aggregate(LoadAggregate, id_)
+            if not is_read:
+                repository.save_aggregate(
+                    aggregate.apply_load(self.workload.events_per_command)
+                )
+        except IEventStoreVersionError:
+            self.conflicts += 1
+        except Exception:
+            self.errors += 1
+        latency = perf_counter() - start
+        if is_read:
+            self.read_latencies.append(latency)
+        else:
+            self.write_latencies.append(latency)
+
+
+def run_load(repository, workload, stream_ids=None, seed_store=True):
+    """
+    Run a workload against a repository, returning an OrderedDict report
+
+    The report holds the workload, the number of operations, reads, writes,
+    version conflicts and other errors, the elapsed seconds, throughput in
+    operations per second, the conflict rate (conflicts per write) and
+    latency statistics in milliseconds for all operations, reads and writes.
+    A conflicting write is counted and not retried.
+
+    Arguments:
+    repository -- Repository whose event store is loaded
+    workload -- Workload instance
+
+    Keyword Arguments:
+    stream_ids -- List of existing `LoadAggregate` stream ids, generated
+                  from the workload's seed by default
+    seed_store -- Save an aggregate for each stream before running; disable
+                  when the streams were saved by an earlier run
+    """
+    if stream_ids is None:
+        stream_ids = generate_stream_ids(workload.streams, seed=workload.seed)
+    if seed_store:
+        seed_streams(repository, stream_ids)
+
+    sampler = ZipfSampler(len(stream_ids), workload.zipf)
+    base_seed = workload.seed
+    if base_seed is None:
+        base_seed = Random().getrandbits(32)
+    workers = [
+        _Worker(repository, workload, stream_ids, sampler, base_seed + index)
+        for index in range(workload.concurrency)
+    ]
+    remaining = [workload.operations]
+    lock = Lock()
+    barrier = Barrier(workload.concurrency + 1)
+    deadline = []
+
+    def claim():
+        with lock:
+            if remaining[0] <= 0 or (
+                deadline and perf_counter() >= deadline[0]
+            ):
+                return False
+            remaining[0] -= 1
+            return True
+
+    def work(worker):
+        barrier.wait()
+        while claim():
+            worker.run_operation()
+
+    threads = [
+        Thread(target=work, args=(worker,), daemon=True) for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    start = perf_counter()
+    if workload.duration is not None:
+        deadline.append(start + workload.duration)
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    reads = [l for worker in workers for l in worker.read_latencies]
+    writes = [l for worker in workers for l in worker.write_latencies]
+    conflicts = sum(worker.conflicts for worker in workers)
+    operations = len(reads) + len(writes)
+    return OrderedDict([
+        ('workload', dict(workload.serialize())),
+        ('operations', operations),
+        ('reads', len(reads)),
+        ('writes', len(writes)),
+        ('conflicts', conflicts),
+        ('errors', sum(worker.errors for worker in workers)),
+        ('elapsed', elapsed),
+        ('throughput', operations / elapsed if elapsed else 0.0),
+        ('conflict_rate', conflicts / len(writes) if writes else 0.0),
+        ('latency_ms', OrderedDict([
+            ('all', _percentiles(reads + writes)),
+            ('read', _percentiles(reads)),
+            ('write', _percentiles(writes)),
+        ])),
+    ])
+
+
+def _load_factory(path):
+    """
+    Return the callable named by a 'module:attribute' path
+    """
+    module, _, name = path.partition(':')
+    if not name:
+        raise ValueError('Factory must be given as module:callable')
+    return getattr(import_module(module), name)
+
+
+def main(argv=None):
+    """
+    Run a synthetic workload against an event store and print a JSON report
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m dvent.load', description=main.__doc__.strip()
+    )
+    parser.add_argument('--streams', type=int, default=1000,
+                        help='Number of aggregate streams (default 1000)')
+    parser.add_argument('--zipf', type=float, default=1.0,
+                        help='Zipf exponent of stream popularity, 0 for '
+                             'uniform (default 1.0)')
+    parser.add_argument('--events-per-command', type=int, default=1,
+                        help='Events saved by each write (default 1)')
+    parser.add_argument('--read-ratio', type=float, default=0.5,
+                        help='Fraction of operations which are reads '
+                             '(default 0.5)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Number of concurrent workers (default 1)')
+    parser.add_argument('--operations', type=int, default=10000,
+                        help='Total operations (default 10000)')
+    parser.add_argument('--duration', type=float,
+                        help='Stop after this many seconds')
+    parser.add_argument('--seed', type=int, help='Random seed')
+    store = parser.add_mutually_exclusive_group()
+    store.add_argument('--remote', metavar='HOST:PORT',
+                       help='Load a dvent.remote server over TCP')
+    store.add_argument('--unix', metavar='PATH',
+                       help='Load a dvent.remote server on a Unix socket')
+    store.add_argument('--factory', metavar='MODULE:CALLABLE',
+                       help='Load the IEventStore returned by this callable')
+    parser.add_argument('--no-seed-store', action='store_true',
+                        help="Don't save the streams first; they must exist "
+                             'from an earlier run with the same --seed')
+    parser.add_argument('-o', '--output',
+                        help='Write the report to this path, not stdout')
+    args = parser.parse_args(argv)
+
+    if args.remote or args.unix:
+        from dvent.remote import RemoteEventStore
+        address = args.unix
+        if args.remote:
+            host, _, port = args.remote.rpartition(':')
+            address = (host or '127.0.0.1', int(port))
+        event_store = RemoteEventStore.generate(
+            address, publisher=lambda event: None,
+            pool_size=max(args.concurrency, 1)
+        )
+    elif args.factory:
+        event_store = _load_factory(args.factory)()
+    else:
+        event_store = InMemoryEventStore.generate(
+            publisher=lambda event: None
+        )
+
+    workload = Workload.generate(
+        streams=args.streams,
+        zipf=args.zipf,
+        events_per_command=args.events_per_command,
+        read_ratio=args.read_ratio,
+        concurrency=args.concurrency,
+        operations=args.operations,
+        duration=args.duration,
+        seed=args.seed,
+    )
+    report = run_load(
+        Repository(event_store=event_store), workload,
+        seed_store=not args.no_seed_store
+    )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Opt-in profiling of aggregate apply handlers and command handlers
+"""
+from contextlib import contextmanager
+from threading import Lock
+
+from pyrsistent import pvector
+
+from dvent.instrumentation import Histogram
+
+# Kinds of profiled calls
+APPLY = 'apply'
+COMMAND = 'command'
+
+
+class Profiler(object):
+    """
+    Records call counts and durations per handler
+
+    Calls are keyed by (kind, owner, type) where kind is `APPLY` or `COMMAND`,
+    owner is the aggregate or command handler class name, and type is the
+    event or command type.
+    """
+
+    def __init__(self, max_samples=10000):
+        """
+        Keyword Arguments:
+        max_samples -- Maximum durations retained per key for percentiles
+        """
+        self.max_samples = max_samples
+        self.histograms = {}
+        self._lock = Lock()
+
+    def record(self, kind, owner, type_, seconds):
+        """
+        Record a single handler call
+
+        Arguments:
+        kind -- `APPLY` or `COMMAND`
+        owner -- Name of the aggregate or command handler class
+        type_ -- Event or command type
+        seconds -- Float duration of the call
+        """
+        key = (kind, owner, type_)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.max_samples)
+            histogram.add(seconds)
+
+    def report(self, kind=None, percentiles=(50, 95, 99)):
+        """
+        Return a PVector of PMaps summarizing each handler, costliest first
+
+        Each summary includes the `kind`, `owner` and `type` along with the
+        call `count`, cumulative `total` seconds, `mean`, `min`, `max`, and
+        the requested percentiles.
+
+        Keyword Arguments:
+        kind -- Only include `APPLY` or `COMMAND` handlers if supplied
+        percentiles -- Percentiles to include, keyed as eg. "p95"
+        """
+        with self._lock:
+            summaries = [
+                histogram.summary(percentiles).update({
+                    'kind': key[0], 'owner': key[1], 'type': key[2],
+                })
+                for key, histogram in self.histograms.items()
+                if kind is None or key[0] == kind
+            ]
+        return pvector(sorted(summaries, key=lambda s: -s['total']))
+
+    def reset(self):
+        """
+        Discard everything recorded so far
+        """
+        with self._lock:
+            self.histograms = {}
+
+
+_profiler = None
+
+
+def get_profiler():
+    """
+    Return the active Profiler, or None if profiling is disabled
+    """
+    return _profiler
+
+
+def enable_profiling(profiler=None):
+    """
+    Enable profiling, returning the active Profiler
+
+    Keyword Arguments:
+    profiler -- Profiler instance to record to, defaults to a new Profiler
+    """
+    global _profiler
+    _profiler = profiler or Profiler()
+    return _profiler
+
+
+def disable_profiling():
+    """
+    Disable profiling, returning the Profiler which was active (if any)
+    """
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+@contextmanager
+def profile(profiler=None):
+    """
+    Context manager enabling profiling for the duration of the block
+
+    Restores whichever profiler (or none) was active beforehand
+
+        with profile() as profiler:
+            Repository.get_aggregate(MyAggregate, id_)
+        pprint(profiler.report())
+
+    Keyword Arguments:
+    profiler -- Profiler instance to record to, defaults to a new Profiler
+    """
+    previous = get_profiler()
+    try:
+        yield enable_profiling(profiler)
+    finally:
+        if previous is None:
+            disable_profiling()
+        else:
+            enable_profiling(previous)
+
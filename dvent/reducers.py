@@ -0,0 +1,305 @@
+"""
+Declarative numeric reducers compiled to batched NumPy operations
+
+Requires NumPy, eg. `pip install dvent[numpy]`
+"""
+import numpy as np
+from pyrsistent import PClass, PSet, field, pmap, pset, pvector_field
+
+# Reducer operations
+SUM = 'sum'
+COUNT = 'count'
+MIN = 'min'
+MAX = 'max'
+
+OPERATIONS = (SUM, COUNT, MIN, MAX)
+
+# Reducer groupings
+STREAM = 'stream'
+TYPE = 'type'
+
+NoneType = type(None)
+
+# Largest magnitude an int64 sum may reach before switching to Python ints
+_INT_LIMIT = float(2 ** 62)
+
+
+def _validate_operations(operations):
+    return (
+        all(operation in OPERATIONS for operation in operations),
+        'unknown operation'
+    )
+
+
+def _validate_group_by(group_by):
+    return (group_by in (None, STREAM, TYPE), 'unknown group_by')
+
+
+class _Accumulator(object):
+    """
+    Per-group running results of a reducer, held in NumPy arrays
+
+    Chunks are folded in with the unbuffered `ufunc.at` methods, which apply
+    values in order, so float sums round exactly as a sequential fold would.
+    Integer sums are kept as int64 while they can't overflow and as Python
+    ints (object arrays) beyond that.
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros(0, dtype=np.int64)
+        self.mins = np.zeros(0, dtype=np.int64)
+        self.maxes = np.zeros(0, dtype=np.int64)
+
+    def _coerce(self, values):
+        """
+        Return `values` and the accumulators converted to a common dtype
+        """
+        if values.dtype.kind == 'b':
+            values = values.astype(np.int64)
+        if values.dtype.kind not in 'iufO':
+            raise TypeError('Reduced values must be ints or floats')
+
+        kind = self.sums.dtype.kind
+        if values.dtype.kind == 'O' or kind == 'O':
+            dtype = object
+        elif values.dtype.kind == 'f' or kind == 'f':
+            dtype = np.float64
+        else:
+            bound = (
+                float(np.abs(self.sums).max(initial=0)) +
+                float(np.abs(values.astype(np.float64)).sum())
+            )
+            dtype = object if bound >= _INT_LIMIT else np.int64
+
+        if values.dtype != dtype:
+            values = values.astype(dtype)
+        if self.sums.dtype != dtype:
+            # Convert through Python scalars so ints stay exact
+            convert = (
+                (lambda array: np.array(array.tolist(), dtype=object))
+                if dtype is object else
+                (lambda array: array.astype(dtype))
+            )
+            self.sums = convert(self.sums)
+            self.mins = convert(self.mins)
+            self.maxes = convert(self.maxes)
+        return values
+
+    def add(self, keys, values):
+        """
+        Fold a chunk of group keys and their values into the results
+
+        Arguments:
+        keys -- List of group keys, one per value
+        values -- List of numeric values
+        """
+        groups = self.groups
+        codes = np.fromiter(
+            (groups.setdefault(key, len(groups)) for key in keys),
+            dtype=np.int64, count=len(keys)
+        )
+        try:
+            array = np.array(values)
+        except OverflowError:
+            array = np.array(values, dtype=object)
+        # Ints beyond int64 (alone or mixed with floats) become uint64 or
+        # float64 arrays, so keep them as exact Python objects instead
+        if array.dtype.kind == 'u' or (array.dtype.kind == 'f' and any(
+            type(value) is int for value in values
+        )):
+            array = np.array(values, dtype=object)
+        values = array
+        if values.dtype.kind == 'O' and not all(
+            isinstance(value, (int, float)) for value in values.tolist()
+        ):
+            raise TypeError('Reduced values must be ints or floats')
+        values = self._coerce(values)
+
+        size = len(self.counts)
+        if len(groups) > size:
+            grow = len(groups) - size
+            _, first = np.unique(codes, return_index=True)
+            first = first[codes[first] >= size]
+            self.counts = np.concatenate(
+                (self.counts, np.zeros(grow, dtype=np.int64))
+            )
+            self.sums = np.concatenate(
+                (self.sums, np.zeros(grow, dtype=self.sums.dtype))
+            )
+            # New groups start from their first value in the chunk
+            self.mins = np.concatenate((self.mins, values[first]))
+            self.maxes = np.concatenate((self.maxes, values[first]))
+
+        np.add.at(self.counts, codes, 1)
+        np.add.at(self.sums, codes, values)
+        np.minimum.at(self.mins, codes, values)
+        np.maximum.at(self.maxes, codes, values)
+
+    def get_results(self, operations):
+        """
+        Return a dict of group key to a PMap of each operation's result
+        """
+        columns = {
+            SUM: self.sums.tolist(),
+            COUNT: self.counts.tolist(),
+            MIN: self.mins.tolist(),
+            MAX: self.maxes.tolist(),
+        }
+        return dict(
+            (key, pmap(
+                (operation, columns[operation][code])
+                for operation in operations
+            ))
+            for key, code in self.groups.items()
+        )
+
+
+class NumericReducer(PClass):
+    """
+    Declarative fold of a numeric `data` value of events
+
+    Computes the sum, count, minimum and/or maximum of `event.data[key]` over
+    the events of `types` (or every event), optionally grouped by stream or
+    event type.  `reduce` compiles the fold to batched NumPy operations over
+    chunks of events from an event store.  `apply_event` is the equivalent
+    per-event `Aggregate` apply handler, folding a stream's events into
+    `aggregate.state[name]`; for each stream `reduce` grouped by stream gives
+    identical results.
+
+        reducer = NumericReducer.generate(
+            'amounts', 'amount', types=('ThingCounted',), group_by=STREAM
+        )
+        results = reducer.reduce(event_store)
+
+    Fields:
+    name -- State key of the per-event handler's results
+    key -- Key of the value in each event's `data`
+    operations -- PVector of `SUM`, `COUNT`, `MIN` and/or `MAX`
+    types -- PSet of event types to reduce, or None for every event
+    group_by -- `STREAM`, `TYPE` or None to reduce every event together
+    """
+
+    name = field(type=str, mandatory=True)
+
+    key = field(mandatory=True)
+
+    operations = pvector_field(str, invariant=_validate_operations)
+
+    types = field(type=(PSet, NoneType), initial=None)
+
+    group_by = field(initial=STREAM, invariant=_validate_group_by)
+
+    @classmethod
+    def generate(cls, name, key, operations=OPERATIONS, types=None,
+                 group_by=STREAM):
+        """
+        Generate a reducer
+
+        Arguments:
+        name -- State key of the per-event handler's results
+        key -- Key of the value in each event's `data`
+
+        Keyword Arguments:
+        operations -- Iterable of `SUM`, `COUNT`, `MIN` and/or `MAX`
+        types -- Iterable of event types to reduce, defaults to every event
+        group_by -- `STREAM`, `TYPE` or None to reduce every event together
+        """
+        return cls(**{
+            'name': name,
+            'key': key,
+            'operations': operations,
+            'types': pset(types) if types is not None else None,
+            'group_by': group_by,
+        })
+
+    def get_apply_map(self):
+        """
+        Return a PMap of each reduced event type to `apply_event`, for use as
+        an `Aggregate` apply map; requires `types`
+        """
+        return pmap((type_, self.apply_event) for type_ in self.types)
+
+    def apply_event(self, aggregate, event):
+        """
+        Aggregate event handler folding the event into the reducer's state
+
+        Arguments:
+        aggregate -- Aggregate instance to which the event will be applied
+        event -- Event instance to "apply" to the `aggregate`
+        """
+        if self.types is not None and event.type not in self.types:
+            return aggregate
+
+        value = event.data[self.key]
+        result = aggregate.state.get(self.name) or pmap()
+        updates = {}
+        for operation in self.operations:
+            if operation == SUM:
+                updates[SUM] = result.get(SUM, 0) + value
+            elif operation == COUNT:
+                updates[COUNT] = result.get(COUNT, 0) + 1
+            elif operation == MIN:
+                current = result.get(MIN)
+                updates[MIN] = value if (
+                    current is None or value < current
+                ) else current
+            elif operation == MAX:
+                current = result.get(MAX)
+                updates[MAX] = value if (
+                    current is None or value > current
+                ) else current
+        return aggregate.set_state(self.name, result.update(updates))
+
+    def _get_entries(self, event_store, stream_ids):
+        """
+        Return an iterable of (stream id, Event) entries to reduce
+        """
+        if stream_ids is not None:
+            return (
+                (stream_id, event) for stream_id in stream_ids
+                for event in event_store.get_events(stream_id)
+            )
+        if self.group_by == STREAM:
+            return event_store.get_stream_events()
+        return ((None, event) for event in event_store.get_events())
+
+    def reduce(self, event_store, stream_ids=None, chunk_size=65536):
+        """
+        Return the results of reducing an event store's events
+
+        Results are a PMap of group (stream id or event type) to a PMap of
+        operation to result; ungrouped reducers return just the latter.  Only
+        groups with at least one reduced event are included.
+
+        Arguments:
+        event_store -- IEventStore instance to read events from
+
+        Keyword Arguments:
+        stream_ids -- Iterable of stream ids to reduce, defaults to all
+        chunk_size -- Number of events folded per batch
+        """
+        accumulator = _Accumulator()
+        types, key, group_by = self.types, self.key, self.group_by
+        keys, values = [], []
+        for stream_id, event in self._get_entries(event_store, stream_ids):
+            if types is not None and event.type not in types:
+                continue
+            if group_by == STREAM:
+                keys.append(stream_id)
+            elif group_by == TYPE:
+                keys.append(event.type)
+            else:
+                keys.append(None)
+            values.append(event.data[key])
+            if len(values) >= chunk_size:
+                accumulator.add(keys, values)
+                keys, values = [], []
+        if values:
+            accumulator.add(keys, values)
+
+        results = accumulator.get_results(self.operations)
+        if group_by is None:
+            return results.get(None, pmap())
+        return pmap(results)
@@ -0,0 +1,724 @@
+"""
+Event store server and client for sharing a store between local processes
+
+`EventStoreServer` exposes any event store over a TCP or Unix socket with
+asyncio, and `RemoteEventStore` is an `IEventStore` client for it with a
+pool of connections, pipelined paged reads and batched reads.  The server
+handles every request on its event loop's thread, so a store which isn't
+thread-safe (like `InMemoryEventStore`) is safely shared by every client.
+
+    server = EventStoreServer(InMemoryEventStore.generate())
+    address = server.start_in_thread(('127.0.0.1', 0))
+    event_store = RemoteEventStore.generate(address)
+
+Each request and response is a frame of a fixed binary header (body length,
+request id and operation or status) followed by a UTF-8 JSON body; events
+are sent in the columnar encoding of `dvent.serialization`, so their data
+must be JSON-compatible.  The server trusts its clients' events as valid.
+
+The server requires Python 3.5+ (`async def`); run a standalone server with
+`python -m dvent.remote --port 7070` or `--unix PATH`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import struct
+from collections import deque
+from contextlib import contextmanager
+from itertools import groupby, islice
+from logging import getLogger
+from operator import itemgetter
+from pprint import pprint
+from threading import BoundedSemaphore, Event as ThreadingEvent, Lock, Thread
+
+from pyrsistent import field
+
+from dvent.event_store import (
+    IEventStore, IEventStoreVersionError, InMemoryEventStore, Stream
+)
+from dvent.serialization import (
+    event_from_dict, event_to_dict, events_from_columns, events_to_columns,
+    micros_to_timestamp, timestamp_to_micros
+)
+
+logger = getLogger(__name__)
+
+# Request operations
+SAVE_EVENTS = 1
+SAVE_EVENTS_BATCH = 2
+IMPORT_EVENTS_BATCH = 3
+GET_EVENTS = 4
+GET_EVENTS_BATCH = 5
+GET_STREAM_EVENTS = 6
+GET_LAST_EVENT = 7
+GET_STREAMS = 8
+SAVE_EVENTS_MULTI = 9
+
+# Response statuses
+OK = 0
+VERSION_CONFLICT = 1
+ERROR = 2
+
+# Body length, request id and operation or status of every frame
+_FRAME_HEADER = struct.Struct('>IIB')
+
+# Largest request body the server accepts, in bytes
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# Events or streams per page of paged reads by default
+PAGE_SIZE = 1000
+
+DEFAULT_ADDRESS = ('127.0.0.1', 0)
+
+
+class RemoteEventStoreError(RuntimeError):
+    """
+    Raised when a request fails on the server or the connection breaks
+    """
+    pass
+
+
+def _encode_frame(request_id, code, value):
+    """
+    Return the frame of a request or response with a JSON-compatible value
+    """
+    body = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return _FRAME_HEADER.pack(len(body), request_id, code) + body
+
+
+def _encode_entries(entries):
+    """
+    Return the columnar encoding of a list of (stream id, Event) entries
+    """
+    return events_to_columns(entries)
+
+
+def _decode_batch(columns):
+    """
+    Return a list of (stream id, events) writes from encoded entries,
+    grouping consecutive entries of the same stream
+    """
+    return [
+        (stream_id, tuple(event for _, event in entries))
+        for stream_id, entries in groupby(
+            events_from_columns(columns), key=itemgetter(0)
+        )
+    ]
+
+
+def _decode_events(columns):
+    """
+    Return a list of the Events of encoded entries
+    """
+    return [event for _, event in events_from_columns(columns)]
+
+
+def _decode_streams(rows):
+    """
+    Return a list of Stream instances from (id, micros, number) rows
+    """
+    return [
+        Stream(**{
+            'id': id_,
+            'timestamp': micros_to_timestamp(micros),
+            'number': number,
+        })
+        for id_, micros, number in rows
+    ]
+
+
+class EventStoreServer(object):
+    """
+    asyncio server handling event store requests from local clients
+
+    Requests on a connection are handled in order, so clients can pipeline
+    them; requests from all connections are handled one at a time on the
+    event loop's thread.  Version checks of saves happen on the server, so
+    they're consistent across every client.
+    """
+
+    def __init__(self, event_store, max_frame_size=MAX_FRAME_SIZE):
+        """
+        Arguments:
+        event_store -- IEventStore instance to serve
+
+        Keyword Arguments:
+        max_frame_size -- Largest request body accepted, in bytes; larger
+                          requests close the connection
+        """
+        self.event_store = event_store
+        self.max_frame_size = max_frame_size
+        self.address = None
+        self.requests = 0
+        self._server = None
+        self._writers = set()
+        self._loop = None
+        self._thread = None
+        self._handlers = {
+            SAVE_EVENTS: self._save_events,
+            SAVE_EVENTS_BATCH: self._save_events_batch,
+            SAVE_EVENTS_MULTI: self._save_events_multi,
+            IMPORT_EVENTS_BATCH: self._import_events_batch,
+            GET_EVENTS: self._get_events,
+            GET_EVENTS_BATCH: self._get_events_batch,
+            GET_STREAM_EVENTS: self._get_stream_events,
+            GET_LAST_EVENT: self._get_last_event,
+            GET_STREAMS: self._get_streams,
+        }
+
+    async def start(self, address=DEFAULT_ADDRESS):
+        """
+        Start listening on the current event loop, returning the address
+
+        Keyword Arguments:
+        address -- (host, port) tuple for TCP, port 0 picking a free port, or
+                   a Unix socket path string
+        """
+        if isinstance(address, str):
+            self._server = await asyncio.start_unix_server(
+                self._serve_connection, path=address
+            )
+            self.address = address
+        else:
+            host, port = address
+            self._server = await asyncio.start_server(
+                self._serve_connection, host, port
+            )
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self.address
+
+    async def close(self):
+        """
+        Stop listening and close every client connection
+        """
+        self._server.close()
+        for writer in tuple(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def serve_forever(self, address=DEFAULT_ADDRESS, ready=None):
+        """
+        Run the server on a new event loop in this thread until `stop`
+
+        Keyword Arguments:
+        address -- See `start`
+        ready -- threading.Event set once listening (or failing to)
+        """
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            try:
+                loop.run_until_complete(self.start(address))
+            finally:
+                if ready is not None:
+                    ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+        finally:
+            loop.close()
+
+    def start_in_thread(self, address=DEFAULT_ADDRESS):
+        """
+        Run the server in a daemon thread, returning the listening address
+
+        Keyword Arguments:
+        address -- See `start`
+        """
+        ready = ThreadingEvent()
+        self._thread = Thread(
+            target=self.serve_forever, args=(address, ready), daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        if self.address is None:
+            self._thread.join()
+            raise RemoteEventStoreError(
+                'Failed to start server on {}'.format(address)
+            )
+        return self.address
+
+    def stop(self):
+        """
+        Stop a server running with `serve_forever` or `start_in_thread`
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def _serve_connection(self, reader, writer):
+        """
+        Handle a connection's requests in order until it closes
+        """
+        self._writers.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(_FRAME_HEADER.size)
+                size, request_id, operation = _FRAME_HEADER.unpack(header)
+                if size > self.max_frame_size:
+                    logger.error('Closing connection sending a {} byte '
+                                 'request'.format(size))
+                    return
+                body = await reader.readexactly(size)
+                status, value = self._handle(operation, body)
+                writer.write(_encode_frame(request_id, status, value))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _handle(self, operation, body):
+        """
+        Return the (status, value) response to a request
+        """
+        self.requests += 1
+        handler = self._handlers.get(operation)
+        if handler is None:
+            return ERROR, 'Unknown operation {}'.format(operation)
+        try:
+            return OK, handler(json.loads(body.decode('utf-8')))
+        except IEventStoreVersionError as e:
+            return VERSION_CONFLICT, str(e)
+        except Exception as e:
+            logger.exception('Failed handling operation {}'.format(operation))
+            return ERROR, '{}: {}'.format(type(e).__name__, e)
+
+    def _save_events(self, request):
+        events = _decode_events(request['events'])
+        self.event_store.save_events(
+            request['stream'], events, request['expected_version']
+        )
+
+    def _save_events_batch(self, request):
+        self.event_store.save_events_batch(_decode_batch(request))
+
+    def _save_events_multi(self, request):
+        events = iter(_decode_events(request['events']))
+        self.event_store.save_events_multi(
+            (id_, tuple(islice(events, count)), expected_version)
+            for id_, expected_version, count in request['writes']
+        )
+
+    def _import_events_batch(self, request):
+        self.event_store.import_events_batch(_decode_batch(request))
+
+    def _get_events(self, request):
+        events = self.event_store.get_events(
+            request['stream'], start=request['start']
+        )
+        return _encode_entries([
+            (event.stream_id, event)
+            for event in islice(events, request['limit'])
+        ])
+
+    def _get_events_batch(self, request):
+        get_events = self.event_store.get_events
+        return _encode_entries([
+            (stream_id, event) for stream_id in request['streams']
+            for event in get_events(stream_id)
+        ])
+
+    def _get_stream_events(self, request):
+        entries = self.event_store.get_stream_events(start=request['start'])
+        return _encode_entries(list(islice(entries, request['limit'])))
+
+    def _get_last_event(self, request):
+        event = self.event_store.get_last_event(request['stream'])
+        return event_to_dict(event) if event is not None else None
+
+    def _get_streams(self, request):
+        streams = self.event_store.get_streams(start=request['start'])
+        return [
+            (stream.id, timestamp_to_micros(stream.timestamp), stream.number)
+            for stream in islice(streams, request['limit'])
+        ]
+
+
+class _Connection(object):
+    """
+    Blocking client connection which can pipeline requests
+
+    Responses arrive in request order, so `receive` returns the response to
+    the oldest request still pending
+    """
+
+    def __init__(self, address, timeout=None):
+        if isinstance(address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(address)
+        else:
+            sock = socket.create_connection(tuple(address), timeout=timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket = sock
+        self.file = sock.makefile('rb')
+        self.pending = deque()
+        self.closed = False
+        self._next_id = 0
+
+    def close(self):
+        self.closed = True
+        self.file.close()
+        self.socket.close()
+
+    def send(self, operation, request):
+        """
+        Send a request without waiting for its response
+
+        Arguments:
+        operation -- Request operation
+        request -- JSON-compatible request value
+        """
+        request_id = self._next_id = (self._next_id + 1) % 2 ** 32
+        try:
+            self.socket.sendall(_encode_frame(request_id, operation, request))
+        except Exception:
+            self.close()
+            raise
+        self.pending.append(request_id)
+
+    def _read(self, size):
+        data = self.file.read(size)
+        if len(data) < size:
+            raise RemoteEventStoreError('Connection closed by the server')
+        return data
+
+    def receive(self):
+        """
+        Return the value of the oldest pending request's response
+
+        Raise IEventStoreVersionError or RemoteEventStoreError if the request
+        failed
+        """
+        try:
+            size, request_id, status = _FRAME_HEADER.unpack(
+                self._read(_FRAME_HEADER.size)
+            )
+            value = json.loads(self._read(size).decode('utf-8'))
+        except Exception:
+            self.close()
+            raise
+        if request_id != self.pending.popleft():
+            self.close()
+            raise RemoteEventStoreError('Received an out of order response')
+        if status == VERSION_CONFLICT:
+            raise IEventStoreVersionError(value)
+        if status != OK:
+            raise RemoteEventStoreError(value)
+        return value
+
+    def call(self, operation, request):
+        """
+        Send a request and return its response's value
+        """
+        self.send(operation, request)
+        return self.receive()
+
+
+class ConnectionPool(object):
+    """
+    Thread-safe pool of up to `size` connections to an event store server
+
+    Connections are opened on demand and reused; one returned with requests
+    still pending (eg. an abandoned paged read) or broken is closed instead.
+    Connections opened before a fork are dropped in the child.
+    """
+
+    def __init__(self, address, size=4, timeout=None):
+        """
+        Arguments:
+        address -- (host, port) tuple or Unix socket path of the server
+
+        Keyword Arguments:
+        size -- Maximum number of connections; further callers wait
+        timeout -- Socket timeout in seconds, or None to block
+        """
+        self.address = address
+        self.size = size
+        self.timeout = timeout
+        self.created = 0
+        self._idle = []
+        self._pid = os.getpid()
+        self._lock = Lock()
+        self._slots = BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager lending a connection from the pool
+        """
+        with self._slots:
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid, self._idle = os.getpid(), []
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = _Connection(self.address, timeout=self.timeout)
+                with self._lock:
+                    self.created += 1
+            try:
+                yield connection
+            finally:
+                if connection.closed or connection.pending:
+                    if not connection.closed:
+                        connection.close()
+                else:
+                    with self._lock:
+                        self._idle.append(connection)
+
+    def close(self):
+        """
+        Close every idle connection
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class RemoteEventStore(IEventStore):
+    """
+    Client interface for an event store served by `EventStoreServer`
+
+    Saves are version-checked on the server and published by this client's
+    `publisher` once acknowledged.  Paged reads keep the next page's request
+    in flight while the current page is consumed, and `get_events_batch`
+    reads several streams in a single round trip.
+
+    Fields:
+    pool -- ConnectionPool to the server
+    page_size -- Number of events or streams per page of paged reads
+    publisher -- Function accepting saved events and "publishing" them
+    id_factory -- Function returning new event ids for `generate_event`
+    """
+
+    pool = field(mandatory=True, type=ConnectionPool)
+
+    page_size = field(type=int, initial=PAGE_SIZE)
+
+    @classmethod
+    def generate(cls, address, publisher=None, id_factory=None, pool_size=4,
+                 timeout=None, page_size=PAGE_SIZE):
+        """
+        Generate a client for the server listening on `address`
+
+        Arguments:
+        address -- (host, port) tuple or Unix socket path of the server
+
+        Keyword Arguments:
+        publisher -- Function which accepts an Event as a single argument, will
+                     be called with any events saved through this client
+        id_factory -- Function returning new event ids
+        pool_size -- Maximum number of connections to the server
+        timeout -- Socket timeout in seconds, or None to block
+        page_size -- Number of events or streams per page of paged reads
+        """
+        return cls(**{
+            'publisher': publisher or pprint,
+            'id_factory': id_factory,
+            'pool': ConnectionPool(address, size=pool_size, timeout=timeout),
+            'page_size': page_size,
+        })
+
+    def _call(self, operation, request):
+        """
+        Return the response value of a single request
+        """
+        with self.pool.connection() as connection:
+            return connection.call(operation, request)
+
+    def _read_pages(self, operation, request, start, decode):
+        """
+        Return generator of the items of a paged read, requesting each page
+        before the previous one has been received
+        """
+        page_size = self.page_size
+        with self.pool.connection() as connection:
+            for page_start in (start, start + page_size):
+                request = dict(request, start=page_start, limit=page_size)
+                connection.send(operation, request)
+            next_start = start + 2 * page_size
+            while True:
+                items = decode(connection.receive())
+                if len(items) < page_size:
+                    # Receive the response to the page after the last
+                    while connection.pending:
+                        connection.receive()
+                    break
+                request = dict(request, start=next_start)
+                connection.send(operation, request)
+                next_start += page_size
+                for item in items:
+                    yield item
+        for item in items:
+            yield item
+
+    def save_events(self, id_, events, expected_version=-2):
+        """
+        Save `events` to stream `id_`, checking `expected_version` on the
+        server
+
+        Arguments:
+        id_ -- Stream id to which the events will be saved
+        events -- Events to save to the store
+
+        Keyword Arguments:
+        expected_version -- Version checking for optimistic concurrency; see
+                            `IEventStore.check_version` for details
+        """
+        events = tuple(events)
+        self._call(SAVE_EVENTS, {
+            'stream': id_,
+            'expected_version': expected_version,
+            'events': _encode_entries([(id_, event) for event in events]),
+        })
+        self.publish_events(events, id_)
+
+    def save_events_batch(self, batch):
+        """
+        Save several already version-checked writes in a single request
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        batch = tuple((id_, tuple(events)) for id_, events in batch)
+        self._call(SAVE_EVENTS_BATCH, _encode_entries([
+            (id_, event) for id_, events in batch for event in events
+        ]))
+        for id_, events in batch:
+            self.publish_events(events, id_)
+
+    def save_events_multi(self, writes):
+        """
+        Save writes to several streams atomically in a single request, with
+        the server store's `save_events_multi`
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples,
+                  written in order
+        """
+        writes = tuple(
+            (id_, tuple(events), expected_version)
+            for id_, events, expected_version in writes
+        )
+        self._call(SAVE_EVENTS_MULTI, {
+            'writes': [
+                (id_, expected_version, len(events))
+                for id_, events, expected_version in writes
+            ],
+            'events': _encode_entries([
+                (id_, event) for id_, events, _ in writes for event in events
+            ]),
+        })
+        for id_, events, _ in writes:
+            self.publish_events(events, id_)
+
+    def import_events_batch(self, batch):
+        """
+        Persist exported events with the server store's `import_events_batch`
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        self._call(IMPORT_EVENTS_BATCH, _encode_entries([
+            (id_, event) for id_, events in batch for event in events
+        ]))
+
+    def get_events(self, id_=None, start=0):
+        """
+        Return generator of ordered Events for the optionally supplied id_
+
+        Keyword Arguments:
+        id_ -- Stream id, if None will return all events in order
+        start -- Integer, optionally specify a starting position in the stream
+        """
+        return self._read_pages(
+            GET_EVENTS, {'stream': id_}, start, _decode_events
+        )
+
+    def get_events_batch(self, ids):
+        """
+        Return a dict of stream id to tuple of its Events in one round trip
+
+        Arguments:
+        ids -- Iterable of stream ids
+        """
+        ids = tuple(ids)
+        results = dict((id_, ()) for id_ in ids)
+        columns = self._call(GET_EVENTS_BATCH, {'streams': ids})
+        for id_, entries in groupby(
+            events_from_columns(columns), key=itemgetter(0)
+        ):
+            results[id_] = tuple(event for _, event in entries)
+        return results
+
+    def get_stream_events(self, start=0):
+        """
+        Return generator of (stream id, Event) tuples for all events in order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        return self._read_pages(
+            GET_STREAM_EVENTS, {}, start,
+            lambda columns: list(events_from_columns(columns))
+        )
+
+    def get_last_event(self, id_):
+        """
+        Get the last event for the specified stream
+
+        Arguments:
+        id_ -- Stream id
+        """
+        values = self._call(GET_LAST_EVENT, {'stream': id_})
+        return event_from_dict(values) if values is not None else None
+
+    def get_streams(self, start=0):
+        """
+        Get a generator of Stream instances in persisted order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        return self._read_pages(GET_STREAMS, {}, start, _decode_streams)
+
+
+def main(argv=None):
+    """
+    Serve an in-memory event store until interrupted
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m dvent.remote', description=main.__doc__.strip()
+    )
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='TCP host to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=7070,
+                        help='TCP port to listen on (default 7070)')
+    parser.add_argument('--unix', help='Listen on this Unix socket path '
+                                       'instead of TCP')
+    parser.add_argument('--snapshot', help='Start from a snapshot written '
+                                           'by dvent.snapshot.dump_db')
+    args = parser.parse_args(argv)
+
+    db = None
+    if args.snapshot:
+        from dvent.snapshot import load_db
+        db = load_db(args.snapshot)
+    server = EventStoreServer(InMemoryEventStore.generate(
+        publisher=lambda event: None, db=db
+    ))
+    try:
+        server.serve_forever(args.unix or (args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Parallel aggregate replay from a shared, memory-mapped event log
+
+Rebuilding many aggregates with a process pool would otherwise pickle each
+aggregate's events to a worker.  Instead the log is written once to a file
+of JSON-encoded streams with an offset index, mapped into memory, and
+worker processes are forked after it is mapped so they share its pages
+without copying or unpickling anything; each worker decodes only the
+streams it is assigned and returns just their final states:
+
+    write_log(event_store, path)
+    with SharedEventLog(path) as log:
+        states = replay_aggregates(log, Order, processes=8)
+
+Requires the 'fork' multiprocessing start method, eg. Linux or macOS.
+"""
+import json
+import mmap
+import multiprocessing
+import struct
+
+from pyrsistent import pmap
+
+from dvent.serialization import events_from_columns, events_to_columns
+
+# File header; the trailing byte is the format version
+MAGIC = b'DVENTLOG\x01'
+
+# Streams replayed per task sent to a worker
+CHUNK_SIZE = 100
+
+# Trailer holding the byte offset of the stream index
+_TRAILER = struct.Struct('<Q')
+
+# Log, aggregate class and apply map of a worker, set by `_init_worker`
+_replay_args = None
+
+
+class SharedLogError(RuntimeError):
+    """
+    Raised when a file is not a readable shared event log
+    """
+    pass
+
+
+def write_log(event_store, path, stream_ids=None):
+    """
+    Write the events of every stream, or of selected streams, to a shared
+    log file, returning the number of events
+
+    Each stream's events are encoded together as JSON columns (see
+    `dvent.serialization.events_to_columns`) so a stream is decoded with one
+    `json.loads`.  The streams are followed by an index of each stream's
+    byte range, and a trailer holding the index's offset.
+
+    Arguments:
+    event_store -- IEventStore instance to read from
+    path -- File path to write
+
+    Keyword Arguments:
+    stream_ids -- Iterable of stream ids to write, defaults to every stream
+    """
+    if stream_ids is None:
+        stream_ids = (stream.id for stream in event_store.get_streams())
+
+    count = 0
+    index = []
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        offset = len(MAGIC)
+        for stream_id in stream_ids:
+            events = list(event_store.get_events(stream_id))
+            payload = json.dumps(
+                events_to_columns([(stream_id, event) for event in events]),
+                separators=(',', ':')
+            ).encode('utf-8')
+            f.write(payload)
+            index.append([stream_id, offset, offset + len(payload)])
+            offset += len(payload)
+            count += len(events)
+        f.write(json.dumps(index, separators=(',', ':')).encode('utf-8'))
+        f.write(_TRAILER.pack(offset))
+    return count
+
+
+class SharedEventLog(object):
+    """
+    Read-only, memory-mapped event log written by `write_log`
+
+    The file's pages are shared by every process mapping it, including
+    processes forked after it was opened, so they're read from the page
+    cache rather than copied.  Streams are decoded on demand by `get_events`.
+    """
+
+    def __init__(self, path):
+        """
+        Map a shared log file and load its stream index
+
+        Arguments:
+        path -- File path written by `write_log`
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = self.buffer
+        if len(buffer) < len(MAGIC) + _TRAILER.size or (
+            buffer[:len(MAGIC)] != MAGIC
+        ):
+            buffer.close()
+            raise SharedLogError('Not a shared event log: {}'.format(path))
+        index_offset, = _TRAILER.unpack(buffer[-_TRAILER.size:])
+        self.index = dict(
+            (stream_id, (start, end)) for stream_id, start, end in json.loads(
+                buffer[index_offset:-_TRAILER.size].decode('utf-8')
+            )
+        )
+
+    @property
+    def stream_ids(self):
+        """
+        List of the log's stream ids in the order they were written
+        """
+        return list(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, stream_id):
+        return stream_id in self.index
+
+    def get_events(self, stream_id):
+        """
+        Return a list of a stream's Events, or an empty list if the stream
+        isn't in the log
+
+        Arguments:
+        stream_id -- Stream id
+        """
+        try:
+            start, end = self.index[stream_id]
+        except KeyError:
+            return []
+        columns = json.loads(self.buffer[start:end].decode('utf-8'))
+        return [event for _, event in events_from_columns(columns)]
+
+    def close(self):
+        """
+        Unmap the log file
+        """
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _init_worker(log, aggregate_class, apply_map):
+    """
+    Hold the replay arguments in a worker; forked workers inherit them
+    rather than unpickling them
+    """
+    global _replay_args
+    _replay_args = (log, aggregate_class, apply_map)
+
+
+def _replay_streams(stream_ids):
+    """
+    Rebuild the aggregates of some streams in a worker, returning a list of
+    (stream id, state) tuples
+    """
+    return _rebuild_states(*_replay_args, stream_ids=stream_ids)
+
+
+def _rebuild_states(log, aggregate_class, apply_map, stream_ids):
+    """
+    Rebuild the aggregates of some streams, returning a list of
+    (stream id, state) tuples
+    """
+    states = []
+    for stream_id in stream_ids:
+        aggregate = aggregate_class.generate_from_events(
+            stream_id, log.get_events(stream_id), apply_map=apply_map
+        )
+        states.append((stream_id, aggregate.state))
+    return states
+
+
+def replay_aggregates(log, aggregate_class, stream_ids=None, processes=None,
+                      chunk_size=CHUNK_SIZE, apply_map=None,
+                      max_tasks_per_worker=None):
+    """
+    Rebuild aggregates from a shared log in forked worker processes,
+    returning a PMap of stream id to each aggregate's final state
+
+    Workers inherit the mapped log, the aggregate class and the apply map
+    when they're forked, so only stream ids are sent to them and only
+    states are sent back; neither the log nor the events are pickled.
+    Streams are sent to workers in chunks of `chunk_size`.  With one process
+    the aggregates are rebuilt in the calling process instead.  Workers
+    replacing those that exit are initialized the same way.
+
+    Arguments:
+    log -- SharedEventLog instance
+    aggregate_class -- Aggregate class to rebuild, see
+                       `Aggregate.generate_from_events`
+
+    Keyword Arguments:
+    stream_ids -- Iterable of stream ids to rebuild, defaults to every stream
+                  in the log
+    processes -- Number of worker processes, defaults to the number of CPUs
+    chunk_size -- Number of streams per task sent to a worker
+    apply_map -- Apply map to rebuild with, defaults to the class's own
+    max_tasks_per_worker -- Number of chunks a worker replays before it is
+                            replaced, eg. to release its memory; None keeps
+                            workers for the whole replay
+    """
+    stream_ids = log.stream_ids if stream_ids is None else list(stream_ids)
+    chunks = [
+        stream_ids[start:start + chunk_size]
+        for start in range(0, len(stream_ids), chunk_size)
+    ]
+    if processes == 1 or len(chunks) <= 1:
+        return pmap(
+            state for chunk in chunks
+            for state in _rebuild_states(
+                log, aggregate_class, apply_map, chunk
+            )
+        )
+
+    context = multiprocessing.get_context('fork')
+    pool = context.Pool(
+        min(processes or multiprocessing.cpu_count(), len(chunks)),
+        initializer=_init_worker,
+        initargs=(log, aggregate_class, apply_map),
+        maxtasksperchild=max_tasks_per_worker
+    )
+    with pool:
+        states = {}
+        for chunk_states in pool.imap_unordered(_replay_streams, chunks):
+            states.update(chunk_states)
+    return pmap(states)
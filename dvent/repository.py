@@ -1,8 +1,13 @@
 """
 Domain repository
 """
+from time import perf_counter
+
 from pyrsistent import PClass, pvector, field
 
+from dvent.event_store import IEventStoreVersionError
+from dvent.instrumentation import get_sink
+
 
 class Repository(PClass):
     """
@@ -31,14 +36,44 @@ class Repository(PClass):
                      accept an aggregate and event; used to build a
                      projection of the aggregate from saved events
         """
+        sink = get_sink()
+        start = perf_counter() if sink.enabled else None
+
         events = pvector(self.event_store.get_events(id_))
 
-        if not events:
-            return
+        aggregate = None
+        if events:
+            aggregate = klass.generate_from_events(
+                id_, events, apply_map=apply_map
+            )
+
+        if start is not None:
+            sink.timing('repository.get_aggregate', perf_counter() - start)
+            sink.observe('repository.get_aggregate.events', len(events))
+        return aggregate
+
+    def refresh_aggregate(self, aggregate, apply_map=None):
+        """
+        Return the aggregate with any newly committed events applied
+
+        Only the events persisted after the aggregate's committed events are
+        read from the store, so refreshing is cheap compared to
+        `get_aggregate`.  Any uncommitted events are discarded since they were
+        generated against stale state.
 
-        return klass.generate_from_events(
-            id_, events, apply_map=apply_map
+        Arguments:
+        aggregate -- Aggregate instance
+
+        Keyword Arguments:
+        apply_map -- a dict of event names to handler functions; see
+                     `get_aggregate`
+        """
+        events = self.event_store.get_events(
+            aggregate.id, start=len(aggregate.events)
         )
+        return aggregate\
+            .set('uncommitted_events', pvector())\
+            .apply_events(events, committed=True, apply_map=apply_map)
 
     def save_aggregate(self, aggregate):
         """
@@ -53,9 +88,63 @@ class Repository(PClass):
         Arguments:
         aggregate -- Aggregate instance
         """
-        self.event_store.save_events(
-            aggregate.id,
-            aggregate.uncommitted_events,
-            aggregate.version
-        )
+        sink = get_sink()
+        start = perf_counter() if sink.enabled else None
+
+        try:
+            self.event_store.save_events(
+                aggregate.id,
+                aggregate.uncommitted_events,
+                aggregate.version
+            )
+        except IEventStoreVersionError:
+            sink.count('repository.version_conflicts')
+            raise
+
+        if start is not None:
+            sink.timing('repository.save_aggregate', perf_counter() - start)
+            sink.observe(
+                'repository.save_aggregate.events',
+                len(aggregate.uncommitted_events)
+            )
         return aggregate.mark_events_committed()
+
+    def save_aggregates(self, aggregates):
+        """
+        Save several aggregates atomically
+
+        Persist every aggregate's `uncommitted_events` with a single
+        `save_events_multi` call, which checks all of their versions before
+        any events are saved, and return a PVector of new aggregates with
+        those events marked as committed.  Aggregates without uncommitted
+        events are still version-checked, so unchanged aggregates a decision
+        was based on can't have changed either.
+
+        Failure will generate an appropriate exception, generally a
+        `RuntimeError` or its descendants (eg. `IEventStoreVersionError`); with
+        an atomic store such as `InMemoryEventStore` no aggregate is saved
+
+        Arguments:
+        aggregates -- Iterable of Aggregate instances
+        """
+        sink = get_sink()
+        start = perf_counter() if sink.enabled else None
+        aggregates = tuple(aggregates)
+
+        try:
+            self.event_store.save_events_multi(
+                (aggregate.id, aggregate.uncommitted_events, aggregate.version)
+                for aggregate in aggregates
+            )
+        except IEventStoreVersionError:
+            sink.count('repository.version_conflicts')
+            raise
+
+        if start is not None:
+            sink.timing('repository.save_aggregates', perf_counter() - start)
+            sink.observe('repository.save_aggregates.events', sum(
+                len(aggregate.uncommitted_events) for aggregate in aggregates
+            ))
+        return pvector(
+            aggregate.mark_events_committed() for aggregate in aggregates
+        )
@@ -0,0 +1,198 @@
+"""
+Command execution with optimistic concurrency retries
+"""
+from logging import getLogger
+from random import random
+from threading import Lock
+from time import sleep
+
+from pyrsistent import PClass, field, pmap
+
+from dvent.event_store import IEventStoreVersionError
+from dvent.instrumentation import get_sink
+
+logger = getLogger(__name__)
+
+
+def _validate_max_attempts(max_attempts):
+    return (max_attempts >= 1, 'max_attempts must be at least 1')
+
+
+def _validate_jitter(jitter):
+    return (0 <= jitter <= 1, 'jitter must be between 0 and 1')
+
+
+class RetryPolicy(PClass):
+    """
+    Backoff and budget settings for retrying version conflicts
+
+    Fields:
+    max_attempts -- Maximum number of times a command is handled & saved,
+                    including the first attempt
+    base_delay -- Seconds to wait before the first retry; doubled each retry
+    max_delay -- Upper bound in seconds for any single backoff
+    jitter -- Fraction (0-1) of each backoff which is randomized; 1 is "full
+              jitter" which spreads competing writers out the most
+    """
+
+    max_attempts = field(
+        type=int, mandatory=True, invariant=_validate_max_attempts
+    )
+
+    base_delay = field(type=(int, float), mandatory=True)
+
+    max_delay = field(type=(int, float), mandatory=True)
+
+    jitter = field(type=(int, float), mandatory=True, invariant=_validate_jitter)
+
+    @classmethod
+    def generate(
+        cls, max_attempts=5, base_delay=0.005, max_delay=0.5, jitter=1.0
+    ):
+        """
+        Generate a retry policy
+
+        Keyword Arguments:
+        max_attempts -- Maximum attempts, including the first
+        base_delay -- Seconds to wait before the first retry
+        max_delay -- Upper bound in seconds for any single backoff
+        jitter -- Fraction (0-1) of each backoff which is randomized
+        """
+        return cls(**{
+            'max_attempts': max_attempts,
+            'base_delay': base_delay,
+            'max_delay': max_delay,
+            'jitter': jitter,
+        })
+
+    def get_delay(self, retry):
+        """
+        Return the seconds to wait before the supplied retry
+
+        Arguments:
+        retry -- Integer, the retry number starting from 1
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (retry - 1)))
+        return delay * (1 - self.jitter) + delay * self.jitter * random()
+
+
+class RetryStats(object):
+    """
+    Thread-safe counters describing version conflicts across executions
+
+    Share a single instance between executions to track the conflict rate of
+    a hot aggregate or of a whole service
+    """
+
+    def __init__(self):
+        """
+        Initialize all counters to zero
+        """
+        self._lock = Lock()
+        self.executions = 0
+        self.attempts = 0
+        self.conflicts = 0
+        self.exhausted = 0
+
+    def record(self, attempts, conflicts, exhausted=False):
+        """
+        Record the outcome of a single execution
+
+        Arguments:
+        attempts -- Number of attempts made
+        conflicts -- Number of attempts which hit a version conflict
+
+        Keyword Arguments:
+        exhausted -- True if the execution gave up after its last attempt
+        """
+        with self._lock:
+            self.executions += 1
+            self.attempts += attempts
+            self.conflicts += conflicts
+            self.exhausted += int(exhausted)
+
+    @property
+    def conflict_rate(self):
+        """
+        Fraction of all attempts which hit a version conflict
+        """
+        return (self.conflicts / self.attempts) if self.attempts else 0.0
+
+    def as_pmap(self):
+        """
+        Return a snapshot of the counters as a PMap
+        """
+        with self._lock:
+            return pmap({
+                'executions': self.executions,
+                'attempts': self.attempts,
+                'conflicts': self.conflicts,
+                'exhausted': self.exhausted,
+                'conflict_rate': self.conflict_rate,
+            })
+
+
+def execute_command(
+    repository, klass, id_, command, handle_fn,
+    policy=None, stats=None, apply_map=None, sleep_fn=sleep
+):
+    """
+    Handle a command against an aggregate and save it, retrying on conflict
+
+    The aggregate is loaded from `repository` (or generated if it has no
+    events), passed to `handle_fn` along with `command`, and the result is
+    saved.  When the save raises `IEventStoreVersionError` only the events
+    committed since the aggregate's version are read and applied, then
+    `handle_fn` is run again against the refreshed aggregate after a jittered
+    backoff.  Once `policy.max_attempts` is reached the error is re-raised.
+
+    `handle_fn` must be free of side-effects other than returning the
+    aggregate with new uncommitted events since it may be called many times.
+
+    Arguments:
+    repository -- dvent.repository.Repository instance
+    klass -- Aggregate class
+    id_ -- Aggregate id
+    command -- Command to handle
+    handle_fn -- Function accepting an aggregate and command which returns
+                 the aggregate with any new events applied as uncommitted
+
+    Keyword Arguments:
+    policy -- RetryPolicy instance, defaults to `RetryPolicy.generate()`
+    stats -- RetryStats instance in which to record the execution (optional)
+    apply_map -- Apply map override used to load & refresh the aggregate
+    sleep_fn -- Function accepting seconds to wait between attempts
+    """
+    policy = policy or RetryPolicy.generate()
+    aggregate = (
+        repository.get_aggregate(klass, id_, apply_map=apply_map) or
+        klass.generate(id_)
+    )
+
+    attempts = conflicts = 0
+    exhausted = False
+    try:
+        while True:
+            attempts += 1
+            try:
+                return repository.save_aggregate(handle_fn(aggregate, command))
+            except IEventStoreVersionError as e:
+                conflicts += 1
+                if attempts >= policy.max_attempts:
+                    exhausted = True
+                    get_sink().count('retry.exhausted')
+                    raise
+
+                get_sink().count('retry.retries')
+
+                logger.debug(
+                    'Version conflict handling {} for {} (attempt {}): '
+                    '{}'.format(command.type, id_, attempts, str(e))
+                )
+                sleep_fn(policy.get_delay(attempts))
+                aggregate = repository.refresh_aggregate(
+                    aggregate, apply_map=apply_map
+                )
+    finally:
+        if stats is not None:
+            stats.record(attempts, conflicts, exhausted=exhausted)
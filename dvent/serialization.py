@@ -0,0 +1,163 @@
+"""
+Conversion of events to and from JSON-compatible data
+"""
+from datetime import datetime, timedelta
+
+from pyrsistent import freeze, pmap, thaw
+
+from dvent.event import Event
+
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+_EPOCH = datetime(1970, 1, 1)
+
+_EMPTY_DATA = pmap()
+
+
+def format_timestamp(timestamp):
+    """
+    Return a naive datetime as an ISO 8601 string with microseconds
+
+    Arguments:
+    timestamp -- naive datetime in UTC
+    """
+    return timestamp.strftime(TIMESTAMP_FORMAT)
+
+
+def parse_timestamp(value):
+    """
+    Return the naive datetime of a string from `format_timestamp`
+
+    Arguments:
+    value -- ISO 8601 string with microseconds
+    """
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+def timestamp_to_micros(timestamp):
+    """
+    Return a naive UTC datetime as integer microseconds since the Unix epoch
+
+    Arguments:
+    timestamp -- naive datetime in UTC
+    """
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def micros_to_timestamp(micros):
+    """
+    Return the naive UTC datetime of integer microseconds since the epoch
+
+    Arguments:
+    micros -- Integer microseconds since the Unix epoch
+    """
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def event_to_dict(event):
+    """
+    Return a dict of an Event's fields using only JSON-compatible types
+
+    The event data must itself be JSON-compatible once thawed
+
+    Arguments:
+    event -- Event instance
+    """
+    return {
+        'id': event.id,
+        'type': event.type,
+        'stream_id': event.stream_id,
+        'timestamp': format_timestamp(event.timestamp),
+        'version': event.version,
+        'data': thaw(event.data) if event.data else {},
+    }
+
+
+def event_from_dict(values, validate=False):
+    """
+    Return an Event from a dict produced by `event_to_dict`
+
+    The values are trusted as valid, see `Event.create_trusted`, unless
+    `validate` is set
+
+    Arguments:
+    values -- Dict of JSON-compatible event fields
+
+    Keyword Arguments:
+    validate -- Validate the values with `Event.create`, eg. when read from
+                a file rather than a store
+    """
+    data = values.get('data')
+    create = Event.create if validate else Event.create_trusted
+    return create({
+        'id': values['id'],
+        'type': values['type'],
+        'stream_id': values.get('stream_id') or '',
+        'timestamp': parse_timestamp(values['timestamp']),
+        'version': values['version'],
+        'data': freeze(data) if data else _EMPTY_DATA,
+    })
+
+
+def events_to_columns(entries):
+    """
+    Return a dict of JSON-compatible columns for (stream id, Event) entries
+
+    Stream ids and event types are dictionary-encoded and timestamps stored
+    as integer microseconds so that each column compresses well
+
+    Arguments:
+    entries -- Sequence of (stream id, Event) tuples
+    """
+    stream_ids, types = {}, {}
+    return {
+        'streams': [
+            stream_ids.setdefault(stream_id, len(stream_ids))
+            for stream_id, _ in entries
+        ],
+        'types': [
+            types.setdefault(event.type, len(types)) for _, event in entries
+        ],
+        'ids': [event.id for _, event in entries],
+        'event_stream_ids': [event.stream_id for _, event in entries],
+        'timestamps': [
+            timestamp_to_micros(event.timestamp) for _, event in entries
+        ],
+        'versions': [event.version for _, event in entries],
+        'data': [
+            thaw(event.data) if event.data else None for _, event in entries
+        ],
+        'stream_ids': list(stream_ids),
+        'type_names': list(types),
+    }
+
+
+def events_from_columns(columns, validate=False):
+    """
+    Return generator of (stream id, Event) entries from `events_to_columns`
+
+    The values are trusted as valid, see `Event.create_trusted`, unless
+    `validate` is set
+
+    Arguments:
+    columns -- Dict of columns
+
+    Keyword Arguments:
+    validate -- Validate the values with `Event.create`, eg. when read from
+                a file rather than a store
+    """
+    create = Event.create if validate else Event.create_trusted
+    stream_ids, types = columns['stream_ids'], columns['type_names']
+    for stream, type_, id_, event_stream_id, micros, version, data in zip(
+        columns['streams'], columns['types'], columns['ids'],
+        columns['event_stream_ids'], columns['timestamps'],
+        columns['versions'], columns['data'],
+    ):
+        yield stream_ids[stream], create({
+            'id': id_,
+            'type': types[type_],
+            'stream_id': event_stream_id,
+            'timestamp': micros_to_timestamp(micros),
+            'version': version,
+            'data': freeze(data) if data else _EMPTY_DATA,
+        })
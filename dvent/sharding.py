@@ -0,0 +1,339 @@
+"""
+Hash-sharded event store
+"""
+from bisect import bisect
+from collections import OrderedDict
+from hashlib import md5
+from itertools import islice
+from pprint import pprint
+from threading import Lock
+
+from pyrsistent import field, pvector_field
+
+from dvent.event_store import IEventStore, Stream
+
+
+def _hash(key):
+    return int.from_bytes(md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing(object):
+    """
+    Consistent hash ring mapping keys to shard numbers
+
+    Each shard is placed on the ring at `replicas` pseudo-random points so
+    keys spread evenly, and adding a shard only moves the keys which land on
+    its points (roughly 1/N of them) rather than reshuffling everything.
+    """
+
+    def __init__(self, num_shards, replicas=64):
+        """
+        Arguments:
+        num_shards -- Number of shards, numbered from 0
+
+        Keyword Arguments:
+        replicas -- Points on the ring per shard
+        """
+        self.num_shards = num_shards
+        self.replicas = replicas
+        points = sorted(
+            (_hash('{}-{}'.format(shard, replica)), shard)
+            for shard in range(num_shards)
+            for replica in range(replicas)
+        )
+        self._hashes = [point[0] for point in points]
+        self._shards = [point[1] for point in points]
+
+    def get_shard(self, key):
+        """
+        Return the shard number for a key
+
+        Arguments:
+        key -- String key, eg. a stream id
+        """
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._shards[index]
+
+
+class ShardSequence(object):
+    """
+    Global order of the events and streams saved through a sharded store
+
+    Each write is recorded, once saved, as a run of events in a shard, and
+    each stream when its first write is recorded.  Positions in the global
+    order are therefore assigned by the router and never change as events
+    are appended, whatever the events' timestamps.  Only the counts are
+    recorded, so a shard's events are read in its own append order; writes
+    to the same shard recorded in a different order than they were appended
+    still count every shard event exactly once.
+    """
+
+    def __init__(self):
+        self.runs = []
+        self.streams = []
+        self.size = 0
+        self._stream_ids = set()
+        self._lock = Lock()
+
+    def record(self, shard, writes):
+        """
+        Record saved writes to a shard
+
+        Arguments:
+        shard -- Shard number
+        writes -- Iterable of (stream id, events) tuples, saved in order
+        """
+        with self._lock:
+            runs = self.runs
+            for id_, events in writes:
+                if not events:
+                    continue
+                if id_ not in self._stream_ids:
+                    self._stream_ids.add(id_)
+                    self.streams.append((id_, events[0].timestamp))
+                if runs and runs[-1][0] == shard:
+                    runs[-1] = (shard, runs[-1][1] + len(events))
+                else:
+                    runs.append((shard, len(events)))
+                self.size += len(events)
+
+    def get_runs(self, start=0):
+        """
+        Return a tuple of the (shard, count) runs from position `start` and a
+        dict of each shard's number of events before it
+
+        Keyword Arguments:
+        start -- Integer position in the global order
+        """
+        with self._lock:
+            runs = tuple(self.runs)
+        offsets = {}
+        for index, (shard, count) in enumerate(runs):
+            if start < count:
+                remaining = ((shard, count - start),) + runs[index + 1:]
+                offsets[shard] = offsets.get(shard, 0) + start
+                return remaining, offsets
+            start -= count
+            offsets[shard] = offsets.get(shard, 0) + count
+        return (), offsets
+
+    def get_streams(self, start=0):
+        """
+        Return a list of (stream id, timestamp) tuples of streams in the
+        order they were first written, from position `start`
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        with self._lock:
+            return self.streams[start:]
+
+
+class ShardedEventStore(IEventStore):
+    """
+    Event store interface routing streams to one of several event stores
+
+    Each stream lives entirely in the store chosen by consistent hashing of
+    its id, so per-stream reads, writes and version checks are served by a
+    single shard; each shard publishes the events saved to it.  Reads across
+    all streams follow a ShardSequence of the order writes were saved
+    through the router, so global positions are stable and can be resumed
+    from, eg. by `EventLogView` or `dvent.bulk`.  The sequence is only
+    consistent when every write to the shards goes through this interface.
+
+    Fields:
+    stores -- PVector of the IEventStore shards
+    ring -- HashRing for the shards
+    sequence -- ShardSequence of the saved events
+    """
+
+    stores = pvector_field(IEventStore)
+
+    ring = field(mandatory=True, type=HashRing)
+
+    sequence = field(mandatory=True, type=ShardSequence)
+
+    @classmethod
+    def generate(cls, stores, publisher=None, replicas=64):
+        """
+        Generate a sharded event store over existing event stores
+
+        The order of `stores` determines routing so must be kept stable;
+        appending a store moves roughly 1/N of the streams to it.  Events
+        already in the stores are sequenced once, here, by timestamp.
+
+        Arguments:
+        stores -- Sequence of IEventStore instances
+
+        Keyword Arguments:
+        publisher -- Function accepting an Event; informational only since
+                     each shard publishes its own saved events
+        replicas -- Points on the hash ring per shard
+        """
+        sequence = ShardSequence()
+        existing = sorted(
+            (
+                (event.timestamp, shard, stream_id, event)
+                for shard, store in enumerate(stores)
+                for stream_id, event in store.get_stream_events()
+            ),
+            key=lambda entry: (entry[0], entry[1])
+        )
+        for _, shard, stream_id, event in existing:
+            sequence.record(shard, ((stream_id, (event,)),))
+        return cls(**{
+            'publisher': publisher or pprint,
+            'stores': stores,
+            'ring': HashRing(len(stores), replicas=replicas),
+            'sequence': sequence,
+        })
+
+    def get_store(self, id_):
+        """
+        Return the shard event store for a stream id
+
+        Arguments:
+        id_ -- Stream id
+        """
+        return self.stores[self.ring.get_shard(id_)]
+
+    def save_events(self, id_, events, expected_version=-2):
+        """
+        Save `events` to stream `id_` in its shard
+
+        Arguments:
+        id_ -- Stream id to which the events will be saved
+        events -- Events to save to the store
+
+        Keyword Arguments:
+        expected_version -- Version checking for optimistic concurrency; see
+                            `IEventStore.check_version` for details
+        """
+        events = tuple(events)
+        shard = self.ring.get_shard(id_)
+        self.stores[shard].save_events(
+            id_, events, expected_version=expected_version
+        )
+        self.sequence.record(shard, ((id_, events),))
+
+    def save_events_batch(self, batch):
+        """
+        Save version-checked writes with one batch per shard
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        for shard, shard_batch in self._get_shard_batches(batch):
+            self.stores[shard].save_events_batch(shard_batch)
+            self.sequence.record(shard, shard_batch)
+
+    def save_events_multi(self, writes):
+        """
+        Save writes to several streams, atomically when they share a shard
+
+        Writes to a single shard are passed to its store's
+        `save_events_multi`.  Shards can't be written in one transaction, so
+        writes spanning several are version-checked before any are saved,
+        as by `IEventStore.save_events_multi`, but are only atomic when
+        nothing else writes to the streams meanwhile.
+
+        Arguments:
+        writes -- Iterable of (stream id, events, expected version) tuples,
+                  written in order
+        """
+        writes = tuple(
+            (id_, tuple(events), expected_version)
+            for id_, events, expected_version in writes
+        )
+        shards = set(self.ring.get_shard(id_) for id_, _, _ in writes)
+        if len(shards) == 1:
+            shard = shards.pop()
+            self.stores[shard].save_events_multi(writes)
+            self.sequence.record(
+                shard, ((id_, events) for id_, events, _ in writes)
+            )
+            return
+        super().save_events_multi(writes)
+
+    def import_events_batch(self, batch):
+        """
+        Persist exported events with one import batch per shard
+
+        Arguments:
+        batch -- Iterable of (stream id, events) tuples, written in order
+        """
+        for shard, shard_batch in self._get_shard_batches(batch):
+            self.stores[shard].import_events_batch(shard_batch)
+            self.sequence.record(shard, shard_batch)
+
+    def _get_shard_batches(self, batch):
+        """
+        Return a list of (shard, writes) tuples splitting a batch of
+        (stream id, events) writes by shard, keeping their order
+        """
+        shard_batches = OrderedDict()
+        for id_, events in batch:
+            shard_batches.setdefault(self.ring.get_shard(id_), []).append(
+                (id_, tuple(events))
+            )
+        return list(shard_batches.items())
+
+    def get_events(self, id_=None, start=0):
+        """
+        Return generator of ordered Events for the optionally supplied id_
+
+        Without `id_` every shard's events are returned in the order they
+        were saved through the router, see ShardSequence
+
+        Keyword Arguments:
+        id_ -- Stream id, if None will return all events in order
+        start -- Integer, optionally specify a starting position
+        """
+        if id_:
+            return self.get_store(id_).get_events(id_, start=start)
+
+        return (event for _, event in self.get_stream_events(start=start))
+
+    def get_stream_events(self, start=0):
+        """
+        Return generator of (stream id, Event) tuples for all events in the
+        order they were saved through the router, see ShardSequence
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        runs, offsets = self.sequence.get_runs(start)
+        entries = {}
+        for shard, count in runs:
+            shard_entries = entries.get(shard)
+            if shard_entries is None:
+                shard_entries = entries[shard] = self.stores[
+                    shard
+                ].get_stream_events(start=offsets.get(shard, 0))
+            for entry in islice(shard_entries, count):
+                yield entry
+
+    def get_last_event(self, id_):
+        """
+        Get the last event for the specified stream from its shard
+
+        Arguments:
+        id_ -- Stream id
+        """
+        return self.get_store(id_).get_last_event(id_)
+
+    def get_streams(self, start=0):
+        """
+        Get a generator of Stream instances in the order they were first
+        saved through the router, numbered in that order
+
+        Keyword Arguments:
+        start -- Integer, optionally specify a starting position
+        """
+        streams = self.sequence.get_streams(start)
+        for number, (id_, timestamp) in enumerate(streams, start):
+            yield Stream(**{
+                'id': id_,
+                'timestamp': timestamp,
+                'number': number,
+            })
@@ -0,0 +1,166 @@
+"""
+Snapshots of an in-memory event database for warm starts
+"""
+import gc
+import os
+import pickle
+import zlib
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from pyrsistent import pmap, pvector
+
+from dvent.event import Event
+from dvent.event_store import InMemoryEventDB
+
+# File header; the trailing byte is the format version
+MAGIC = b'DVENTDB\x01'
+
+_COMPRESSED = b'z'
+_UNCOMPRESSED = b'-'
+
+_EMPTY_DATA = pmap()
+
+
+class SnapshotError(RuntimeError):
+    """
+    Raised when a file is not a readable event database snapshot
+    """
+    pass
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pause the cyclic garbage collector, which otherwise repeatedly scans the
+    millions of (acyclic) containers allocated by a bulk load
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def dump_db(db, path, compress=False):
+    """
+    Write a snapshot of every event and the stream index of `db` to `path`
+
+    Events are stored column by column (ids, types, versions, etc.) with the
+    number of each event's stream, from which `load_db` rebuilds the stream
+    index.  The file is written alongside `path`, flushed to disk and then
+    renamed over it so a crash never leaves a partial snapshot.  Returns the
+    number of bytes written.
+
+    Arguments:
+    db -- InMemoryEventDB instance
+    path -- File path of the snapshot
+
+    Keyword Arguments:
+    compress -- Compress the snapshot with zlib; smaller but slower
+    """
+    # Capture both under the write lock so they describe the same writes;
+    # the vectors are persistent so serializing them needn't hold it
+    with db.lock:
+        events = db.events
+        streams = list(db.streams.items())
+
+    stream_numbers = array('q', bytes(8 * len(events)))
+    for number, (_, indices) in enumerate(streams):
+        for index in indices:
+            stream_numbers[index] = number
+
+    types = {}
+    columns = {
+        'stream_ids': [stream_id for stream_id, _ in streams],
+        'stream_numbers': stream_numbers,
+        'ids': [event.id for event in events],
+        'event_stream_ids': [event.stream_id for event in events],
+        'type_codes': array('q', (
+            types.setdefault(event.type, len(types)) for event in events
+        )),
+        'types': list(types),
+        'timestamps': [event.timestamp for event in events],
+        # Plain dicts pickle far faster than PMaps
+        'data': [dict(event.data) if event.data else None for event in events],
+        'versions': array('q', (event.version for event in events)),
+    }
+
+    payload = pickle.dumps(columns, protocol=pickle.HIGHEST_PROTOCOL)
+    flag = _UNCOMPRESSED
+    if compress:
+        payload, flag = zlib.compress(payload), _COMPRESSED
+
+    temp_path = '{}.tmp'.format(path)
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC + flag)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return len(MAGIC) + len(flag) + len(payload)
+
+
+def load_db(path):
+    """
+    Return a new InMemoryEventDB loaded from a snapshot written by `dump_db`
+
+    The file is read in one call and the events and stream index are rebuilt
+    in a single pass.  Events are trusted as valid, having been validated
+    before they were saved.  Snapshots are pickled so only load files written
+    by a trusted process.
+
+    Arguments:
+    path -- File path of the snapshot
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    header = content[:len(MAGIC)]
+    flag = content[len(MAGIC):len(MAGIC) + 1]
+    if header != MAGIC or flag not in (_COMPRESSED, _UNCOMPRESSED):
+        raise SnapshotError('Not an event database snapshot: {}'.format(path))
+
+    payload = memoryview(content)[len(MAGIC) + 1:]
+    if flag == _COMPRESSED:
+        payload = zlib.decompress(payload)
+
+    with _gc_paused():
+        columns = pickle.loads(payload)
+        del content, payload
+        stream_ids = columns['stream_ids']
+        stream_numbers = columns['stream_numbers']
+        types = columns['types']
+        create = Event._create_trusted
+
+        events = []
+        indices = [[] for _ in stream_ids]
+        for index, (id_, stream_id, type_code, timestamp, data, version) in \
+                enumerate(zip(
+                    columns['ids'], columns['event_stream_ids'],
+                    columns['type_codes'], columns['timestamps'],
+                    columns['data'], columns['versions'],
+                )):
+            events.append(create({
+                'id': id_,
+                'type': types[type_code],
+                'data': pmap(data) if data else _EMPTY_DATA,
+                'stream_id': stream_id,
+                'timestamp': timestamp,
+                'version': version,
+            }))
+            indices[stream_numbers[index]].append(index)
+
+        db = InMemoryEventDB()
+        db.events = pvector(events)
+        db.event_stream_ids = pvector(
+            stream_ids[number] for number in stream_numbers
+        )
+        db.streams = OrderedDict(
+            (stream_id, pvector(stream_indices))
+            for stream_id, stream_indices in zip(stream_ids, indices)
+        )
+    return db
@@ -0,0 +1,219 @@
+"""
+Upcasting of events saved with older `data` schemas
+
+Upcasters are registered by event type and the schema version they upgrade
+from, and each converts an event's `data` to the next version:
+
+    upcasters = UpcasterRegistry()
+
+    @upcasters.upcaster('OrderPlaced', 1)
+    def add_currency(data):
+        return data.set('currency', 'USD')
+
+    event_store = InMemoryEventStore.generate(upcasters=upcasters)
+
+An event's schema version is held in its `data` under `version_key`; events
+without it are at version 1.  Event stores with `upcasters` stamp the events
+they save with their type's latest version, see `stamp`, and apply
+upcasters lazily in `deserialize_event`, composing the upcasters from an event's
+version to the latest into one chain which is cached per type and version,
+so apply handlers only ever see the latest schema.  `rewrite_events` upcasts
+a whole store into another in bulk, after which replays skip upcasting.
+"""
+from functools import reduce
+
+from pyrsistent import freeze, pmap
+
+from dvent.bulk import BATCH_SIZE, import_events
+
+# Key of an event's schema version in its `data`
+VERSION_KEY = 'schema_version'
+
+# Schema version of events without a `VERSION_KEY`
+INITIAL_VERSION = 1
+
+_EMPTY_DATA = pmap()
+
+
+class UpcasterRegistry(object):
+    """
+    Upcasters keyed by (event type, schema version) and their cached chains
+
+    Each event type's upcasters must cover every version from the oldest
+    registered up to the latest, which is one more than the newest
+    registered; events at the latest version are returned unchanged.
+    """
+
+    def __init__(self, version_key=VERSION_KEY):
+        """
+        Keyword Arguments:
+        version_key -- Key of an event's schema version in its `data`
+        """
+        self.version_key = version_key
+        self.upcasters = {}
+        self.latest_versions = {}
+        self._chains = {}
+
+    def register(self, type_, version, fn):
+        """
+        Register a function upcasting `data` of an event type from `version`
+        to `version + 1`
+
+        Raise ValueError if the type already has an upcaster for `version`
+
+        Arguments:
+        type_ -- Event type
+        version -- Schema version the function upcasts from
+        fn -- Function accepting a PMap of event data and returning the
+              data at the next version; need not set the version
+        """
+        if (type_, version) in self.upcasters:
+            raise ValueError('An upcaster for {} version {} already '
+                             'exists'.format(type_, version))
+        self.upcasters[(type_, version)] = fn
+        self.latest_versions[type_] = max(
+            self.latest_versions.get(type_, INITIAL_VERSION), version + 1
+        )
+        self._chains = {}
+
+    def upcaster(self, type_, version):
+        """
+        Return a decorator registering the decorated function, see `register`
+
+        Arguments:
+        type_ -- Event type
+        version -- Schema version the function upcasts from
+        """
+        def decorator(fn):
+            self.register(type_, version, fn)
+            return fn
+        return decorator
+
+    def get_version(self, event):
+        """
+        Return the schema version of an event
+
+        Arguments:
+        event -- Event instance
+        """
+        data = event.data
+        if not data:
+            return INITIAL_VERSION
+        return data.get(self.version_key, INITIAL_VERSION)
+
+    def get_chain(self, type_, version):
+        """
+        Return a function upcasting data of an event type from `version` to
+        the latest version, or None if `version` is the latest
+
+        Chains are composed once per type and version and cached until
+        another upcaster is registered.  Raise ValueError if an upcaster
+        between `version` and the latest is missing.
+
+        Arguments:
+        type_ -- Event type
+        version -- Schema version
+        """
+        key = (type_, version)
+        try:
+            return self._chains[key]
+        except KeyError:
+            pass
+
+        latest = self.latest_versions.get(type_, INITIAL_VERSION)
+        steps = []
+        for step in range(version, latest):
+            fn = self.upcasters.get((type_, step))
+            if fn is None:
+                raise ValueError(
+                    'No upcaster for {} version {}'.format(type_, step)
+                )
+            steps.append(fn)
+
+        chain = None
+        if steps:
+            version_key = self.version_key
+
+            def chain(data):
+                data = reduce(lambda data, fn: freeze(fn(data)), steps, data)
+                return data.set(version_key, latest)
+        self._chains[key] = chain
+        return chain
+
+    def upcast(self, event):
+        """
+        Return an event with its data upcast to the latest schema version
+
+        Events of types without upcasters, or already at the latest version,
+        are returned as they are
+
+        Arguments:
+        event -- Event instance
+        """
+        if event.type not in self.latest_versions:
+            return event
+        chain = self.get_chain(event.type, self.get_version(event))
+        if chain is None:
+            return event
+        # Upcast data is frozen, so the event needn't be validated again
+        values = dict(event)
+        values['data'] = chain(event.data or _EMPTY_DATA)
+        return type(event).create_trusted(values)
+
+    def stamp(self, event):
+        """
+        Return an event with its type's latest schema version set in its
+        data, if the type has upcasters and the data has no version
+
+        Event stores stamp the events they save, so events written at the
+        latest schema aren't taken for version 1 and upcast when read back
+
+        Arguments:
+        event -- Event instance
+        """
+        latest = self.latest_versions.get(event.type)
+        if latest is None:
+            return event
+        data = event.data or _EMPTY_DATA
+        if self.version_key in data:
+            return event
+        values = dict(event)
+        values['data'] = data.set(self.version_key, latest)
+        return type(event).create_trusted(values)
+
+    def upcast_entries(self, entries):
+        """
+        Return a generator upcasting the events of (stream id, Event) entries
+
+        Arguments:
+        entries -- Iterable of (stream id, Event) tuples
+        """
+        upcast = self.upcast
+        for stream_id, event in entries:
+            yield stream_id, upcast(event)
+
+
+def rewrite_events(source, target, upcasters, progress=None,
+                   batch_size=BATCH_SIZE):
+    """
+    Import every event of a store into another with its data upcast to the
+    latest schema, returning the number of events
+
+    Events keep their ids, versions and global order (see
+    `dvent.bulk.import_events`); the target store needs no upcasters, so
+    replays from it skip upcasting entirely
+
+    Arguments:
+    source -- IEventStore instance to read from
+    target -- IEventStore instance to import into
+    upcasters -- UpcasterRegistry instance
+
+    Keyword Arguments:
+    progress -- Function called with the number of events imported so far
+                after every batch and once at the end
+    batch_size -- Number of events per batch
+    """
+    return import_events(
+        target, upcasters.upcast_entries(source.get_stream_events()),
+        progress=progress, batch_size=batch_size
+    )
@@ -40,3 +40,21 @@ and its events through the interface.
         Given an aggregate and its state
         When I apply a new state-changing domain event to the aggregate
         Then the aggregate's state is changed
+
+    Scenario: Aggregates rebuilt from copies of the same events are equal
+        Given an aggregate with some committed and uncommitted events
+        When I rebuild the aggregate from copies of its events
+        Then the aggregates are equal and have the same hash
+        And the aggregates are the same set member and dict key
+
+    Scenario: Aggregates differing only in an event are not equal
+        Given an aggregate with some committed and uncommitted events
+        When I copy the aggregate with a different last event
+        Then the aggregates are not equal
+        And the aggregates are different set members
+
+    Scenario: Aggregate equality is unchanged from comparing every field
+        Given an aggregate with some committed and uncommitted events
+        When I make variations of the aggregate
+        Then aggregates are equal exactly when every field is equal
+        And equal aggregates have the same hash
@@ -0,0 +1,88 @@
+Feature: Cold Stream Archival
+Streams with no new events for a configurable period can be moved out of an
+in-memory event store into compressed, read-only segment files, which are
+decompressed on demand when the streams are read.  Every event keeps its
+position in the global order as streams are archived and restored.
+
+    Background: An archiving event store with saved streams
+        Given a new archiving event store archiving streams idle for 1 day
+        When I save 3 new streams with 2 events to the store
+        And I note every event in the store
+
+    Scenario Outline: Archive idle streams and read them back
+        Given the archive compresses segments with <compression>
+        When 2 days pass
+        And I archive the idle streams
+        Then 3 streams and 6 events are reported archived
+        And memory and disk usage are reported
+        And the in-memory store holds no events
+        And every stream's events can still be read in the same order
+        And every event can still be read
+        And every event is read with its own stream id
+
+        Examples: Compressions
+            | compression |
+            | zlib        |
+            | lzma        |
+
+    Scenario: Only idle streams are archived
+        When I add a new event dated 2 days from now to the first stream
+        And 2 days pass
+        And I archive the idle streams
+        Then 2 streams and 4 events are reported archived
+        And the first stream is not archived
+
+    Scenario: Writing to an archived stream restores it
+        When 2 days pass
+        And I archive the idle streams
+        And I add a new event to the first stream
+        Then the first stream is not archived
+        And the first stream has 3 events
+
+    Scenario: Reopening an archive restores its directory
+        When 2 days pass
+        And I archive the idle streams
+        And I add a new event to the first stream
+        And I reopen the archive
+        Then the reopened archive holds the second and third streams
+
+    Scenario: Streams aren't archived while the store is followed
+        When I follow every stream of the in-memory store
+        And 2 days pass
+        And I try to archive the idle streams
+        Then an error is raised
+        And no streams are archived
+        And every event can still be read
+
+    Scenario: Streams are archived once followers are closed
+        When I follow every stream of the in-memory store
+        And I close the follower
+        And 2 days pass
+        And I archive the idle streams
+        Then 3 streams and 6 events are reported archived
+        And every event is read with its own stream id
+
+    Scenario: Events keep their positions as streams are archived and restored
+        When 2 days pass
+        And I archive the idle streams
+        Then reading from every position returns the noted events
+        When I add a new event to the second stream
+        Then the second stream is not archived
+        And reading from every position returns the noted events and the new event of the second stream
+
+    Scenario: Events keep their positions when only some streams are archived
+        When I add a new event dated 2 days from now to the first stream
+        And I note every event in the store
+        And 2 days pass
+        And I archive the idle streams
+        Then 2 streams and 4 events are reported archived
+        And reading from every position returns the noted events
+        When I add a new event to the second stream
+        Then reading from every position returns the noted events and the new event of the second stream
+
+    Scenario: Archived streams are decompressed as their events are read
+        When 2 days pass
+        And I archive the idle streams
+        And I count the archived streams decompressed
+        And I read the first event of the store
+        Then 1 archived stream was decompressed
@@ -0,0 +1,46 @@
+Feature: Bulk Export & Import
+Event stores can be exported to JSON Lines or columnar files and imported into
+another store in large batches, keeping every event's id, version and position
+in the global order.
+
+    Background: An event store with saved streams
+        Given a new event store
+        When I save 3 new streams with 2 events to the store
+        And I add a new event to the first stream
+
+    Scenario Outline: Export a store and import it into a new store
+        When I export the store to a <format> file in batches of 2
+        And I import the <format> file into a new event store in batches of 2
+        Then the imported store has the same events in the same order
+        And the imported store has the same streams in the same order
+        And progress was reported as 2, 4, 6 and 7 events
+
+        Examples: Export formats
+            | format   |
+            | jsonl    |
+            | columnar |
+
+    Scenario: Export selected streams
+        When I export the first and third streams to a jsonl file
+        And I import the jsonl file into a new event store in batches of 2
+        Then the imported store only has the first and third streams
+
+    Scenario: Copy a store without an intermediate file
+        When I import the store's events into a new event store in batches of 3
+        Then the imported store has the same events in the same order
+
+    Scenario Outline: Importing an export with an invalid event
+        When I export the store to a <format> file with the first event's <field> set to <value>
+        And I try to import the <format> file into a new event store
+        Then an error is raised
+
+        Examples:
+            | format   | field   | value  |
+            | jsonl    | version | "7"    |
+            | jsonl    | data    | [1, 2] |
+            | columnar | version | "7"    |
+            | columnar | data    | [1, 2] |
+
+    Scenario: Importing a file which isn't a columnar export
+        When I try to import a file which isn't a columnar export
+        Then an error is raised
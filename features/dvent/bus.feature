@@ -0,0 +1,89 @@
+Feature: Event Bus
+An event bus is a publisher which routes each event only to the subscribers
+interested in it, selected by event type and stream id prefix.  Subscribers
+are delivered events synchronously or from their own queue on an executor,
+so a slow subscriber only delays itself, and each reports how far it lags.
+
+    Background: An event bus
+        Given a new event bus
+
+    Scenario: Events are routed by type
+        Given a subscriber of OrderPlaced events
+        And a subscriber of OrderShipped events
+        And a subscriber of every event
+        When I publish an OrderPlaced event and an OrderShipped event
+        Then the OrderPlaced subscriber received 1 event
+        And the OrderShipped subscriber received 1 event
+        And the subscriber of every event received 2 events in order
+
+    Scenario: Events are routed by stream id prefix
+        Given a subscriber of events of streams starting with "order-"
+        When I publish an OrderPlaced event to stream "order-1"
+        And I publish an OrderPlaced event to stream "customer-1"
+        Then the stream prefix subscriber received 1 event
+
+    Scenario: An event store publishes saved events to the bus
+        Given a subscriber of events of streams starting with "order-"
+        And an event store publishing to the bus
+        When I save 2 events to stream "order-1" of the store
+        And I save 2 events to stream "customer-1" of the store
+        Then the stream prefix subscriber received 2 events
+        And every event received belongs to stream "order-1"
+
+    Scenario: A failing subscriber doesn't stop delivery to others
+        Given a failing subscriber of every event
+        And a subscriber of every event
+        When I publish an OrderPlaced event and an OrderShipped event
+        Then the subscriber of every event received 2 events in order
+        And the lag of the failing subscriber shows 2 failed events
+
+    Scenario: A slow subscriber only delays itself
+        Given a subscriber of every event on a paused executor
+        And a subscriber of every event
+        When I publish an OrderPlaced event and an OrderShipped event
+        Then the subscriber of every event received 2 events in order
+        And the lag of the queued subscriber shows 2 queued events
+        When the paused executor runs
+        Then the queued subscriber received 2 events in order
+        And the lag of the queued subscriber shows 0 queued events
+
+    Scenario: A full subscriber queue drops events
+        Given a subscriber of every event on a paused executor queueing at most 2 events
+        When I publish 5 OrderPlaced events
+        And the paused executor runs
+        Then the queued subscriber received 2 events in order
+        And the lag of the queued subscriber shows 3 dropped events
+
+    Scenario: Delivery rejected by the executor resumes on the next event
+        Given a subscriber of every event on a paused executor
+        When the paused executor rejects its next task
+        And I publish 1 OrderPlaced events
+        And I wait for the bus to deliver every event
+        Then the lag of the queued subscriber shows 1 queued events
+        When I publish 1 OrderPlaced events
+        And the paused executor runs
+        Then the queued subscriber received 2 events in order
+
+    Scenario: Delivery rejected part way through resumes on the next event
+        Given a subscriber of every event on a paused executor
+        When I publish 101 OrderPlaced events
+        And the paused executor rejects its next task
+        And the paused executor runs
+        And I wait for the bus to deliver every event
+        Then the lag of the queued subscriber shows 1 queued events
+        When I publish 1 OrderPlaced events
+        And the paused executor runs
+        Then the queued subscriber received 102 events in order
+
+    Scenario: Executor subscribers receive events in order
+        Given a subscriber of every event on a thread pool
+        When I publish 500 OrderPlaced events
+        And I wait for the bus to deliver every event
+        Then the queued subscriber received 500 events in order
+
+    Scenario: Unsubscribed subscribers receive no more events
+        Given a subscriber of every event
+        When I publish 1 OrderPlaced events
+        And I unsubscribe the subscriber of every event
+        And I publish 1 OrderPlaced events
+        Then the subscriber of every event received 1 event
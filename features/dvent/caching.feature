@@ -0,0 +1,66 @@
+Feature: Caching Event Store
+A caching event store wraps any event store with an LRU cache of recently read
+stream tails, serving repeated stream reads without going to the wrapped store
+while saved events are written through to both.
+
+    Background: A caching event store
+        Given a new caching event store holding at most 10 events
+
+    Scenario: Repeated stream reads are served from the cache
+        When I save a new stream with some events to the store
+        And I get events from the store with the same id
+        And I get events from the store with the same id
+        Then the events returned are the same and in the same order
+        And the cache has 1 hit and 1 miss
+
+    Scenario: Saved events are appended to the cached stream
+        When I save a new stream with some events to the store
+        And I get events from the store with the same id
+        And I save a new event to the same stream
+        Then the new event is last in the stream
+        And the last event of the stream is the new event
+        And the cache has 2 hits and 1 miss
+
+    Scenario: Reads from later positions are served by a cached tail
+        When I save a new stream with some events to the store
+        And I get events from the store with the same id
+        And I get events from the store with the same id starting from position 1
+        Then only the last event is returned
+        And the cache has 1 hit and 1 miss
+
+    Scenario: Version conflicts leave the cached stream unchanged
+        When I save a new stream with some events to the store
+        And I get events from the store with the same id
+        And I save a new event to the same stream with the wrong expected version
+        Then an error is raised
+        And the new event is not saved
+
+    Scenario: Last events of uncached streams are looked up in the wrapped store
+        Given a new caching event store over a store looking up last events
+        When I save a new stream with some events to the store
+        And I get the last event of the stream twice
+        Then the saved stream's last event is returned
+        And the wrapped store looked up the last event twice without reading the stream
+        And the cache has 0 hits and 2 misses
+
+    Scenario: Least recently used streams are evicted over the budget
+        When I save 6 new streams with 2 events to the store
+        And I read every stream from the store
+        Then the cache holds at most 10 events
+        And the first stream is no longer cached
+
+    Scenario: Reads past the end of a stream aren't cached
+        When I save a new stream with some events to the store
+        And I get events from the store with the same id starting from position 5
+        And I save a new event to the same stream
+        And I get events from the store with the same id starting from position 5
+        Then no events are returned
+
+    Scenario: A save during a cache miss isn't lost
+        Given a new caching event store whose stream reads can race a save
+        When I save a new stream with some events to the store
+        And a save to the stream races the next read
+        And I get events from the store with the same id
+        And I get events from the store with the same id
+        Then the new event is last in the stream
+        And the last event of the stream is the new event
@@ -0,0 +1,33 @@
+Feature: Columnar Event Log View
+The event log can be materialized into a NumPy structured array of positions,
+interned stream ids and types, timestamps and versions, updated incrementally
+as events are saved, for vectorized analytics.
+
+    Background: An event store with versioned streams
+        Given a new event store
+        And 3 streams with 2 versioned events each saved an hour apart
+
+    Scenario: Materialize the event log
+        When I create a columnar view of the store
+        Then the view has 6 rows in the order of the event log
+        And the view counts 3 events of each type
+
+    Scenario: Update the view incrementally
+        When I create a columnar view of the store
+        And I save 2 more versioned events to the first stream
+        And I refresh the view
+        Then 2 rows are added to the view
+        And the view's stream lengths are 4, 2 and 2
+
+    Scenario: Materialize a filtered slice of the event log
+        When I create a columnar view of the first stream
+        Then the view has 2 rows of the first stream
+
+    Scenario: Count events per type per hour
+        When I create a columnar view of the store
+        Then there are 2 events per hour in 3 hours
+
+    Scenario: Find version gaps
+        When I save an event with version 5 to the first stream
+        And I create a columnar view of the store
+        Then the version gap is found in the first stream
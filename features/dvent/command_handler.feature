@@ -0,0 +1,47 @@
+Feature: Command Handler
+Handles commands, orchestrating and persisting the aggregates they target.
+Batches of commands are grouped by aggregate so each aggregate is loaded and
+saved once however many commands target it.
+
+    Scenario: Commands targeting one aggregate load and save it once
+        Given a counter command handler with a new event store
+        And a saved counter
+        When I handle a batch of 3 increment commands for the counter
+        Then the event store was read 1 times and written 1 times
+        And every command succeeded
+        And the counter's count is 3
+
+    Scenario: Commands targeting several aggregates save each once
+        Given a counter command handler with a new event store
+        And 2 saved counters
+        When I handle a batch of increment commands alternating between the counters
+        Then the event store was read 2 times and written 2 times
+        And every command succeeded
+        And the results are in the order of the commands
+
+    Scenario: A failing command doesn't affect the rest of its group
+        Given a counter command handler with a new event store
+        And a saved counter
+        When I handle a batch of increment, failing and increment commands for the counter
+        Then the second command failed
+        And the other commands succeeded
+        And the counter's count is 2
+
+    Scenario: A failed save fails every command of the group
+        Given a counter command handler with a new event store
+        And a saved counter
+        And the counter is changed concurrently
+        When I handle a batch of 2 increment commands for the counter
+        Then every command failed with a version error
+
+    Scenario: Commands creating aggregates aren't grouped
+        Given a counter command handler with a new event store
+        When I handle a batch of 2 create commands
+        Then every command succeeded
+        And 2 counters were saved
+
+    Scenario: Commands without an aggregate handler are handled individually
+        Given a counter command handler with a new event store
+        When I handle a batch of 2 ping commands
+        Then every command succeeded
+        And every result is pong
@@ -0,0 +1,82 @@
+Feature: Deduplicating Event Store
+A deduplicating event store makes saves idempotent by event id, so a client
+retrying a save after a timeout can't append the same events twice.  Recently
+saved ids are indexed exactly and older ids optionally in a Bloom filter whose
+matches are confirmed against the stream being written.
+
+    Scenario: Retrying a save is a successful no-op
+        Given a new deduplicating event store
+        When I save a new stream with some events to the store
+        And I retry saving the same events as a new stream
+        Then the stream is created and the events are saved
+        And the events were published once
+
+    Scenario: A save the wrapped store failed to write can be retried
+        Given a new deduplicating event store
+        When the wrapped store fails to write the next save
+        And I save a new stream with some events to the store
+        And I retry saving the same events as a new stream
+        Then the stream is created and the events are saved
+
+    Scenario: A batch the wrapped store failed to write can be retried
+        Given a new deduplicating event store
+        When I save a new stream with some events to the store
+        And the wrapped store fails to write the next save
+        And I save a batch of the same write and a new stream
+        And I save a batch of the same write and the same new stream
+        Then the stream is created and the events are saved
+        And the new stream of the batch is saved
+
+    Scenario: A partially duplicate save is rejected
+        Given a new deduplicating event store
+        When I save a new stream with some events to the store
+        And I save the last event again with a new event
+        Then a duplicate event error is raised
+        And the stream is created and the events are saved
+
+    Scenario: A save repeating an event id is rejected
+        Given a new deduplicating event store
+        When I save a new stream with an event repeated
+        Then a duplicate event error is raised
+        And the stream is not saved
+
+    Scenario: Retried writes of a batch are skipped
+        Given a new deduplicating event store
+        When I save a new stream with some events to the store
+        And I save a batch of the same write and a new stream
+        Then the stream is created and the events are saved
+        And the new stream of the batch is saved
+
+    Scenario: Ids older than the exact window are found with the Bloom filter
+        Given a new deduplicating event store holding 2 recent ids and a Bloom filter of 100 ids
+        When I save a new stream with some events to the store
+        And I save 5 new streams with 1 events to the store
+        And I retry saving the same events as a new stream
+        Then the stream is created and the events are saved
+        And the index checked 2 Bloom filter matches against the stream
+
+    Scenario: Without a Bloom filter ids older than the window are forgotten
+        Given a new deduplicating event store holding 2 recent ids
+        When I save a new stream with some events to the store
+        And I save 5 new streams with 1 events to the store
+        And I retry saving the same events
+        Then the stream has 4 events
+
+    Scenario: The index is warmed from the wrapped store
+        Given a new event store
+        When I save a new stream with some events to the store
+        And I wrap the store to deduplicate saves
+        And I retry saving the same events as a new stream
+        Then the stream is created and the events are saved
+
+    Scenario: The memory used by the index is measured
+        Given a new deduplicating event store holding 10 recent ids and a Bloom filter of 1000 ids
+        When I save 50 new streams with 1 events to the store
+        Then the index holds 10 recent ids and 40 ids in the Bloom filter
+        And the index uses memory for both
+
+    Scenario: The Bloom filter's false positive rate is bounded
+        Given a Bloom filter of 2000 strings with a 1% false positive rate
+        When I add 2000 random strings to the filter
+        Then every added string is in the filter
+        And fewer than 2% of 10000 other strings are in the filter
@@ -13,3 +13,26 @@ An example of a domain event might be "Track Added" or "Track Title Changed".
         And the event has a timestamp value
         And the event has a data value
         And the event has a version value
+
+    Scenario: Events can be generated in bulk with contiguous versions
+        When I generate 3 events in bulk for a stream starting at version 4
+        Then there are 3 bulk events with the same set of values
+        And the bulk events are versioned 4 to 6
+        And the bulk events have unique ids
+
+    Scenario Outline: Events generated in bulk must have mapping data
+        When I try to generate an event in bulk with <data> as its data
+        Then an error is raised
+        And generating the event alone also raises an error
+
+        Examples:
+            | data   |
+            | [1, 2] |
+            | "text" |
+            | 7      |
+
+    Scenario: Event equality is unchanged from comparing every field
+        Given a new domain event
+        When I make variations of the event
+        Then events are equal exactly when every field is equal
+        And equal events have the same hash
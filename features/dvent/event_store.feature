@@ -66,4 +66,17 @@ is no way to delete or update any existing data.
         And I get all events from the store starting from position 2
         Then the first event is associated to the second stream
         And the last event is associated to the first stream
-        And there are 4 events total
\ No newline at end of file
+        And there are 4 events total
+
+    Scenario: Save events to several streams at once
+        Given a new event store
+        When I save events to 3 new streams together
+        Then every new stream's events are saved
+
+    Scenario: Saving to several streams with the wrong expected version saves nothing
+        Given a new event store
+        When I save a new stream with some events to the store
+        And I try to save events to 2 new streams and the same stream as if it's new together
+        Then an error is raised
+        And none of the new streams are saved
+        And the stream is created and the events are saved
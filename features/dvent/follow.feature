@@ -0,0 +1,60 @@
+Feature: Live Tail
+Subscribing to an event store follows a stream, or every stream, from a
+position: the events already saved are returned first and then the follower
+waits, or awaits, until the store wakes it with new events instead of polling.
+
+    Scenario: A follower returns history and then waits for new events
+        Given a new event store
+        When I save a new stream with some events to the store
+        And I follow the stream from position 0 in another thread
+        And I save 2 more events to the stream
+        Then the follower receives 4 events in order
+
+    Scenario: A follower starts from a position
+        Given a new event store
+        When I save a new stream with some events to the store
+        And I follow the stream from position 1 in another thread
+        And I save 2 more events to the stream
+        Then the follower receives 3 events in order
+
+    Scenario: A stream follower ignores other streams
+        Given a new event store
+        When I save a new stream with some events to the store
+        And I follow the stream from position 0 in another thread
+        And I save 3 new streams with 2 events to the store
+        And I save 2 more events to the stream
+        Then the follower receives 4 events in order
+
+    Scenario: Following every stream returns events in the order they were saved
+        Given a new event store
+        When I save 2 new streams with 2 events to the store
+        And I follow every stream from position 0 in another thread
+        And I save events to 2 new streams together
+        Then the follower receives 8 events in the order they were saved
+
+    Scenario: A follower stops once no event arrives within its timeout
+        Given a new event store
+        When I save a new stream with some events to the store
+        And I follow the stream from position 0 with a timeout of 0.05 seconds
+        Then the follower receives 2 events and stops
+
+    Scenario: Closing a waiting follower stops it
+        Given a new event store
+        When I save a new stream with some events to the store
+        And I follow the stream from position 0 in another thread
+        And I close the follower once it has received 2 events
+        Then the follower thread stops
+
+    Scenario: An asyncio follower is woken by writes from another thread
+        Given a new event store
+        When I save a new stream with some events to the store
+        And I follow the stream from position 0 on an event loop while another thread saves 2 more events
+        Then the follower receives 4 events in order
+        And the db has no listeners left
+
+    Scenario: Wrapping event stores follow the wrapped store
+        Given a new caching event store holding at most 100 events
+        When I save a new stream with some events to the store
+        And I follow the stream from position 0 in another thread
+        And I save 2 more events to the stream
+        Then the follower receives 4 events in order
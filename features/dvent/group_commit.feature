@@ -0,0 +1,18 @@
+Feature: Group Commit
+Concurrent writers to an event store can have their writes grouped into a
+single batch, trading a bounded amount of latency for far fewer writes.  Each
+writer's expected version is still checked individually so a conflict only
+fails the writer which caused it.
+
+    Background: A group-committing event store
+        Given a new group-committing event store
+
+    Scenario: Concurrent writes are committed together
+        When 8 writers concurrently save new streams
+        Then every writer's stream is saved
+        And the writes were committed in fewer than 8 batches
+
+    Scenario: A conflicting write in a group fails alone
+        When 2 writers concurrently save the same new stream
+        Then 1 write succeeds and 1 write fails with a version error
+        And the contested stream only has the successful writer's events
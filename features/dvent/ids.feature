@@ -0,0 +1,28 @@
+Feature: Event Ids
+Event ids default to random UUIDs, but a time-ordered, monotonic id generator
+can be selected globally or per event store so that backends get append-mostly
+index inserts and ids can be range-scanned by time.
+
+    Scenario: Time-ordered ids sort in the order they were generated
+        When I generate 1000 time-ordered ids
+        Then the ids are unique and already sorted
+        And the ids are version 7 UUIDs
+
+    Scenario: Time-ordered ids stay ordered when the clock goes backwards
+        Given a time-ordered id generator with a clock going backwards
+        When I generate 5 ids with that generator
+        Then the ids are unique and already sorted
+
+    Scenario: Time-ordered ids can bound range scans by time
+        When I generate 10 time-ordered ids
+        Then every id sorts at or above the floor id of its own timestamp
+
+    Scenario: Time-ordered ids can be selected globally
+        Given time-ordered ids are selected globally
+        When I generate a new event
+        Then the event id is a version 7 UUID
+
+    Scenario: Time-ordered ids can be selected per event store
+        Given a new event store with time-ordered ids
+        When I generate a new event from the event store
+        Then the event id is a version 7 UUID
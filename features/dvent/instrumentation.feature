@@ -0,0 +1,41 @@
+Feature: Instrumentation
+Event stores and repositories report timings, event counts, loaded stream
+lengths, version conflicts, and publisher failures to a pluggable metrics
+sink.  By default the sink discards everything; an aggregating sink summarizes
+metrics in-process with percentiles.
+
+    Background: An aggregating metrics sink
+        Given an aggregating metrics sink
+
+    Scenario: Saving and retrieving an aggregate is measured
+        Given a new repository
+        And a new aggregate with uncommitted events
+        When I save the aggregate to the repository
+        And I retrieve the aggregate from the repository
+        Then the sink has timings for repository.save_aggregate
+        And the sink has timings for repository.get_aggregate
+        And the sink has timings for event_store.save_events
+        And the sink has timings for event_store.get_events
+        And the sink counted 2 event_store.events_saved
+        And the sink observed a repository.get_aggregate.events of 2
+
+    Scenario: Version conflicts are counted
+        Given a new repository
+        And an existing aggregate
+        And another copy of that aggregate
+        When I apply a new event to the aggregate
+        And I save the aggregate to the repository
+        And I apply a new event to the aggregate copy
+        And I try to save the aggregate copy
+        Then the sink counted 1 event_store.version_conflicts
+        And the sink counted 1 repository.version_conflicts
+
+    Scenario: Publisher failures are counted
+        Given a new event store with a failing publisher
+        When I save a new stream with some events to the store
+        Then the sink counted 2 event_store.publish_failures
+
+    Scenario: The aggregating sink reports percentiles
+        When I record timings of 1 to 100 for a metric
+        Then the metric's p50 is 50
+        And the metric's p99 is 99
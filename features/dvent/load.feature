@@ -0,0 +1,43 @@
+Feature: Synthetic Load
+A load generator drives a repository with a configurable traffic shape and
+reports throughput, latency percentiles and the version conflict rate, so a
+store and aggregate combination can be measured before it's rolled out.
+
+    Scenario: A workload runs every operation and reports on them
+        Given a new repository
+        When I run a workload of 200 operations over 20 streams with 2 workers
+        Then the report counts 200 operations split into reads and writes
+        And the report has latency percentiles for reads and writes
+        And the report has a throughput and a conflict rate
+
+    Scenario: Writes save events to the streams
+        Given a new repository
+        When I run a write-only workload of 50 operations over 5 streams saving 2 events each
+        Then the streams hold 100 events more than they were seeded with
+        And the report counts 0 reads
+
+    Scenario: Reads don't save anything
+        Given a new repository
+        When I run a read-only workload of 50 operations over 5 streams
+        Then the streams hold 0 events more than they were seeded with
+        And the report counts 0 writes and 0 conflicts
+
+    Scenario: Version conflicts are counted
+        Given a new repository whose saves conflict every other time
+        When I run a write-only workload of 50 operations over 5 streams saving 1 events each
+        Then the report has a conflict rate of 50%
+
+    Scenario: Zipf-skewed stream popularity favours the hottest streams
+        Given a Zipf sampler of 100 streams with an exponent of 1.2
+        When I sample 10000 streams
+        Then the first stream is sampled most often
+        And the first 10 streams are sampled more than half of the time
+
+    Scenario: A uniform sampler spreads streams evenly
+        Given a Zipf sampler of 10 streams with an exponent of 0
+        When I sample 10000 streams
+        Then every stream is sampled between 800 and 1200 times
+
+    Scenario: Run a workload from the command line
+        When I run the load generator command line for 100 operations
+        Then it writes a JSON report of 100 operations
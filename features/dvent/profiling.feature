@@ -0,0 +1,24 @@
+Feature: Handler Profiling
+Profiling is an opt-in mode which records call counts and durations for each
+aggregate apply handler by aggregate class and event type, and for each
+command handler by command type, so the handlers dominating replay or command
+handling cost can be found.
+
+    Scenario: Apply handlers are profiled by aggregate class and event type
+        Given an aggregate
+        And profiling is enabled
+        When I apply 3 EventHappened events to the aggregate
+        And I apply 1 OtherEventHappened events to the aggregate
+        Then the profile has 3 apply calls for Aggregate EventHappened
+        And the profile has 1 apply calls for Aggregate OtherEventHappened
+
+    Scenario: Command handlers are profiled by command type
+        Given profiling is enabled
+        And a new command handler
+        When I handle 2 DoSomething commands
+        Then the profile has 2 command calls for CommandHandler DoSomething
+
+    Scenario: Nothing is profiled unless profiling is enabled
+        Given an aggregate
+        When I apply 3 EventHappened events to the aggregate
+        Then no profiler is active
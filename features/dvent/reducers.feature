@@ -0,0 +1,37 @@
+Feature: Numeric Reducers
+Numeric folds of an event data value (sums, counts, minimums and maximums)
+can be declared once and either applied per event by an aggregate or reduced
+over an event store in batched NumPy operations, with identical results.
+
+    Background: An event store
+        Given a new event store
+
+    Scenario Outline: Reduce by stream like per-event aggregate handlers
+        Given 4 streams of 25 events with random <kind> amounts
+        When I reduce the amounts by stream in chunks of 7 events
+        Then the results match aggregates applying each event
+
+        Examples: Amounts
+            | kind  |
+            | int   |
+            | float |
+
+    Scenario: Reduce by event type
+        Given 4 streams of 25 events with random int amounts
+        When I reduce the amounts by type in chunks of 7 events
+        Then the results match a per-event fold of each type
+
+    Scenario: Reduce every event together
+        Given 4 streams of 25 events with random float amounts
+        When I reduce the amounts of every event in chunks of 7 events
+        Then the result matches a per-event fold of every event
+
+    Scenario: Sums too large for 64-bit integers stay exact
+        Given 4 streams of 25 events with random huge amounts
+        When I reduce the amounts by stream in chunks of 7 events
+        Then the results match aggregates applying each event
+
+    Scenario: Non-numeric values can't be reduced
+        Given 1 streams of 2 events with random text amounts
+        When I try to reduce the amounts by stream in chunks of 7 events
+        Then an error is raised
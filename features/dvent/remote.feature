@@ -0,0 +1,67 @@
+Feature: Remote Event Store
+An event store server shares one event store between local processes over a
+TCP or Unix socket.  Clients implement the event store interface with a pool of
+connections, keeping the next page of a read in flight while the current page
+is consumed, and can read several streams in a single request.
+
+    Background: A remote event store on a local TCP port
+        Given an event store server on a local TCP port
+        And a remote event store client reading pages of 2 events
+
+    Scenario: Save and get a stream through the server
+        When I save a new stream with some events to the store
+        And I get events from the store with the same id
+        Then the events returned are the same and in the same order
+        And the last event of the stream is the last event saved
+
+    Scenario: Version conflicts are checked by the server
+        When I save a new stream with some events to the store
+        And I save a new event to the same stream with the wrong expected version
+        Then an error is raised
+        And the new event is not saved
+
+    Scenario: Writes to several streams are saved atomically in one request
+        When I save events to 3 new streams together through the server
+        Then every new stream's events are saved
+        And the server handled 1 request for the batch
+
+    Scenario: Atomic writes to several streams are version checked by the server
+        When I save a new stream with some events to the store
+        And I try to save events to 2 new streams and the same stream as if it's new together
+        Then an error is raised
+        And none of the new streams are saved
+
+    Scenario: Paged reads return everything in order
+        When I save 3 new streams with 5 events to the store
+        Then every event read from the client matches the served store
+        And every stream event read from the client from position 4 matches the served store
+        And every stream read from the client matches the served store
+
+    Scenario: Abandoning a paged read discards its connection
+        When I save 3 new streams with 5 events to the store
+        And I read the first event from the client and stop
+        Then every event read from the client matches the served store
+        And the client has opened 2 connections
+
+    Scenario: Batched reads get several streams in one request
+        When I save 3 new streams with 5 events to the store
+        And I get the events of every stream and an unknown stream in a batch
+        Then the batch holds each stream's events and none for the unknown stream
+        And the server handled 1 request for the batch
+
+    Scenario: Concurrent writers share a pool of connections
+        Given a remote event store client with a pool of 2 connections
+        When 8 threads each save a new stream through the client
+        Then every thread's stream is saved
+        And the client has opened at most 2 connections
+
+    Scenario: Separate processes share the store
+        When 2 processes each save a new stream through their own client
+        Then every process's stream is in the served store
+
+    Scenario: Serve the store on a Unix socket
+        Given an event store server on a Unix socket
+        And a remote event store client reading pages of 2 events
+        When I save a new stream with some events to the store
+        And I get events from the store with the same id
+        Then the events returned are the same and in the same order
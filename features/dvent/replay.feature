@@ -0,0 +1,39 @@
+Feature: Parallel Replay
+An event store's log can be written once to a memory-mapped file of encoded
+streams with an offset index.  Worker processes forked after it's mapped
+share it without pickling any events, rebuild the aggregates of the streams
+they're assigned and return only their final states.
+
+    Scenario: A shared log returns each stream's events
+        Given a new event store
+        When I save 3 new streams with 4 events to the store
+        And I write the store's log to a shared log file
+        Then the shared log returns the events of every stream
+
+    Scenario: Aggregates are replayed from a shared log in worker processes
+        Given a new event store holding counted streams
+        When I write the store's log to a shared log file
+        And I replay the aggregates from the shared log with 2 processes
+        Then every replayed state matches the aggregate from the repository
+
+    Scenario: Workers replacing those that exit replay aggregates too
+        Given a new event store holding counted streams
+        When I write the store's log to a shared log file
+        And I replay the aggregates from the shared log with 2 processes replaced after every task
+        Then every replayed state matches the aggregate from the repository
+
+    Scenario: Aggregates can be replayed from a shared log in one process
+        Given a new event store holding counted streams
+        When I write the store's log to a shared log file
+        And I replay the aggregates from the shared log with 1 process
+        Then every replayed state matches the aggregate from the repository
+
+    Scenario: Only selected streams are replayed
+        Given a new event store holding counted streams
+        When I write the store's log to a shared log file
+        And I replay 2 of the aggregates from the shared log with 2 processes
+        Then only the selected aggregates are replayed
+
+    Scenario: A file which isn't a shared log can't be opened
+        When I try to open a shared log from a file which isn't one
+        Then an error is raised
@@ -46,3 +46,22 @@ testing and on-disk for production).
         Given a new repository
         When I try to retrieve an aggregate from the repository
         Then no aggregate is returned
+
+    Scenario: Save several aggregates at once
+        Given a new repository
+        And 3 new aggregates with uncommitted events
+        When I save the aggregates to the repository together
+        Then the aggregates have no uncommitted events
+        And the aggregates can be retrieved by id from the repository
+
+    Scenario: Saving several aggregates when one has the incorrect expected version saves none
+        Given a new repository
+        And 3 new aggregates with uncommitted events
+        And an existing aggregate
+        And another copy of that aggregate
+        When I apply a new event to the aggregate
+        And I save the aggregate to the repository
+        And I apply a new event to the aggregate copy
+        And I try to save the aggregates and the aggregate copy together
+        Then an error is raised
+        And none of the aggregates were saved
@@ -0,0 +1,23 @@
+Feature: Command Retry
+Executing a command against an aggregate under contention will occasionally
+fail to save because another writer committed events first.  Rather than
+failing the whole request, the command can be handled again against the
+aggregate refreshed with only the newly committed events, within a bounded
+budget of attempts.
+
+    Scenario: A conflicting save is retried against the refreshed aggregate
+        Given a new repository
+        And an existing aggregate
+        And a competing writer that commits 2 events first
+        When I execute a command against the aggregate with retries
+        Then the command's event is last in the aggregate stream
+        And the aggregate stream has 5 events
+        And the retry stats record 3 attempts and 2 conflicts
+
+    Scenario: A command which keeps conflicting exhausts its retry budget
+        Given a new repository
+        And an existing aggregate
+        And a competing writer that commits 5 events first
+        When I try to execute a command against the aggregate with 3 attempts
+        Then an error is raised
+        And the retry stats record 1 exhausted execution
@@ -0,0 +1,54 @@
+Feature: Sharded Event Store
+A sharded event store routes each stream to one of several event stores by
+consistent hashing of the stream id, spreading writes and memory across them,
+while reads across all streams follow the order the events were saved in.
+
+    Background: A sharded event store
+        Given a new sharded event store with 4 shards
+
+    Scenario: Streams are spread across shards and each lives in one shard
+        When I save 20 new streams with 2 events to the store
+        Then the streams are spread across more than 1 shard
+        And every stream's events are in exactly one shard
+
+    Scenario: Get a saved event stream from its shard
+        When I save a new stream with some events to the store
+        And I get events from the store with the same id
+        Then the events returned are the same and in the same order
+
+    Scenario: Version conflicts are detected by the stream's shard
+        When I save a new stream with some events to the store
+        And I save a new event to the same stream with the wrong expected version
+        Then an error is raised
+        And the new event is not saved
+
+    Scenario: Get all events across shards in the order they were created
+        When I save 5 new streams with 2 events to the store
+        And I add a new event to the first stream
+        And I get all events from the store
+        Then all of the events are present and in the correct order
+        And there are 11 events total
+
+    Scenario: Get all streams across shards with a starting position
+        When I save 5 new streams with 2 events to the store
+        And I get new streams from the store starting from position 2
+        Then the first returned stream is the third created
+        And there are 3 streams total
+        And the returned streams are numbered from 2
+
+    Scenario: Reading from a position across shards doesn't skip late events
+        When I save 5 new streams with 2 events to the store
+        And I save an event with an earlier timestamp to another shard
+        And I get all events from the store starting from position 10
+        Then only the event with the earlier timestamp is returned
+
+    Scenario: Events already in the shards are read in order of timestamp
+        Given 4 shards already holding 3 streams of 2 events each
+        When I create a sharded event store over them
+        And I get all events from the store
+        Then all of the events are present and in the correct order
+        And there are 24 events total
+
+    Scenario: Adding a shard only moves some of the streams
+        When I route 1000 stream ids over 4 and then 5 shards
+        Then fewer than 40 percent of the stream ids move
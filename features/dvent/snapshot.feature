@@ -0,0 +1,25 @@
+Feature: Event Database Snapshots
+An in-memory event database can be dumped to a compact snapshot file and loaded
+back at startup, restoring every event and the stream index without replaying
+them from elsewhere.
+
+    Background: An event store with saved streams
+        Given a new event store
+        When I save 3 new streams with 2 events to the store
+        And I add a new event to the first stream
+
+    Scenario Outline: Load a dumped event database
+        When I dump the event database to a <format> snapshot
+        And I load the snapshot into a new event store
+        Then the loaded store has the same events in the same order
+        And the loaded store has the same streams in the same order
+        And new events can be saved to the loaded store
+
+        Examples: Snapshot formats
+            | format       |
+            | plain        |
+            | compressed   |
+
+    Scenario: Loading a file which isn't a snapshot
+        When I try to load a file which isn't a snapshot
+        Then an error is raised
@@ -0,0 +1,29 @@
+Feature: Trusted Replay
+Events loaded from an event store were validated when they were written, so
+rebuilding events and aggregates from them can skip re-validation.  Trusted
+replay is enabled by default and can be disabled to re-enable every check,
+eg. in tests.  Trusted values are built quickly from pyrsistent's internals
+when a check finds they work, and with its public constructors otherwise.
+
+    Scenario: Events built from trusted values equal validated events
+        Given a set of stored event values
+        When I build events from the stored values as trusted
+        Then the events equal events built with full validation
+
+    Scenario: An aggregate rebuilt with trusted replay matches a validated rebuild
+        Given a set of stored event values
+        When I rebuild an aggregate from the stored events
+        And I rebuild an aggregate from the stored events with trusted replay disabled
+        Then both rebuilt aggregates are equal
+
+    Scenario: An aggregate rebuilt without the fast path matches a fast rebuild
+        Given a set of stored event values
+        When I rebuild an aggregate from the stored events
+        And I rebuild an aggregate from the stored events with the fast path disabled
+        Then both rebuilt aggregates are equal
+        And the fast path is enabled again
+
+    Scenario: Invalid stored values are rejected with trusted replay disabled
+        Given trusted replay is disabled
+        When I try to build an event from stored values with a negative version
+        Then an error is raised
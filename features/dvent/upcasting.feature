@@ -0,0 +1,62 @@
+Feature: Upcasting
+Events saved with an older data schema are upcast to the latest schema as
+they're read from an event store with upcasters, by a chain of upcasters
+composed once per event type and version; events saved to such a store are
+stamped with the latest version so they aren't upcast.  A whole store can be
+upcast into another in bulk so replays from it skip upcasting.
+
+    Scenario: Old events are upcast when read
+        Given a new event store with upcasters to version 2
+        When I save a stream with events at schema version 1 before the upcasters existed
+        Then every event read from the store is at schema version 2
+
+    Scenario: Upcasters are chained across several versions
+        Given a new event store with upcasters to version 4
+        When I save a stream with events at schema version 1 before the upcasters existed
+        Then every event read from the store is at schema version 4
+        And every upcaster was applied in order
+
+    Scenario: Events at the latest version are not upcast
+        Given a new event store with upcasters to version 3
+        When I save a stream with events at schema version 3 before the upcasters existed
+        Then the events read from the store are the saved events
+
+    Scenario: New events are saved at the latest version and not upcast
+        Given a new event store with upcasters to version 3
+        When I save a stream with events at the latest schema
+        Then the data of every event read from the store is unchanged but for its schema version 3
+
+    Scenario: Events of other types are not upcast
+        Given a new event store with upcasters to version 3
+        When I save a new stream with some events to the store
+        Then the events read from the store are the saved events
+
+    Scenario: An upcaster can only be registered once per type and version
+        Given a new event store with upcasters to version 2
+        When I register another upcaster from version 1
+        Then an error is raised
+
+    Scenario: A missing upcaster raises an error
+        Given a new event store with upcasters to version 2
+        When I register an upcaster from version 3
+        And I save a stream with events at schema version 1 before the upcasters existed
+        And I read the stream's events
+        Then an error is raised
+
+    Scenario: Upcaster chains are cached per type and version
+        Given a new event store with upcasters to version 3
+        When I save a stream with events at schema version 1 before the upcasters existed
+        And I read the stream's events twice
+        Then the same upcaster chain was used for every read
+
+    Scenario: Aggregates replay upcast events
+        Given a new event store with upcasters to version 3
+        When I save a stream with events at schema version 1 before the upcasters existed
+        Then the stream's aggregate is built from data at schema version 3
+
+    Scenario: A store can be rewritten with every event upcast
+        Given a new event store with upcasters to version 3
+        When I save a stream with events at schema version 1 before the upcasters existed
+        And I save a new stream with some events to the store
+        And I rewrite the store into a new store
+        Then every event in the new store is upcast with its id and version kept
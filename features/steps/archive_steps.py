@@ -0,0 +1,231 @@
+"""
+Feature execution steps for cold stream archival
+"""
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from behave import given, when, then
+from pyrsistent import pvector
+from dvent.archive import ArchivingEventStore, SegmentArchive
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore, StreamsFollowedError
+
+
+@given(u'a new archiving event store archiving streams idle for {days:d} day')
+def _given_a_new_archiving_event_store(context, days):
+    context.archive_path = tempfile.mkdtemp()
+    context.add_cleanup(shutil.rmtree, context.archive_path)
+    context.now = datetime.utcnow()
+    context.event_store = ArchivingEventStore.generate(
+        InMemoryEventStore.generate(publisher=lambda event: None),
+        os.path.join(context.archive_path, 'archive'),
+        idle_period=timedelta(days=days),
+        clock=lambda: context.now
+    )
+
+
+@given(u'the archive compresses segments with {compression}')
+def _given_the_archive_compresses_segments_with(context, compression):
+    context.event_store.archive.compression = compression
+
+
+@when(u'I note every event in the store')
+def _when_i_note_every_event_in_the_store(context):
+    context.all_events = pvector(context.event_store.get_events())
+    context.all_stream_ids = pvector(
+        stream_id for stream_id, _ in context.event_store.get_stream_events()
+    )
+    context.stream_events = dict(
+        (stream_id, pvector(context.event_store.get_events(stream_id)))
+        for stream_id in context.stream_ids
+    )
+
+
+@when(u'{days:d} days pass')
+def _when_days_pass(context, days):
+    context.now += timedelta(days=days)
+
+
+@when(u'I archive the idle streams')
+def _when_i_archive_the_idle_streams(context):
+    context.report = context.event_store.archive_idle_streams()
+
+
+@when(u'I add a new event dated {days:d} days from now to the first stream')
+def _when_i_add_a_new_event_dated_to_the_first_stream(context, days):
+    context.event_store.save_events(context.stream_ids[0], (
+        Event.generate(
+            'AnotherEventHappened',
+            timestamp=context.now + timedelta(days=days)
+        ),
+    ))
+
+
+@when(u'I reopen the archive')
+def _when_i_reopen_the_archive(context):
+    context.reopened_archive = SegmentArchive(
+        context.event_store.archive.path
+    )
+
+
+@then(u'{num_streams:d} streams and {num_events:d} events are reported archived')
+def _then_streams_and_events_are_reported_archived(context, num_streams,
+                                                    num_events):
+    assert context.report['streams'] == num_streams
+    assert context.report['events'] == num_events
+
+
+@then(u'memory and disk usage are reported')
+def _then_memory_and_disk_usage_are_reported(context):
+    assert context.report['memory_reclaimed'] > 0
+    assert context.report['disk_used'] > 0
+
+
+@then(u'the in-memory store holds no events')
+def _then_the_in_memory_store_holds_no_events(context):
+    assert not pvector(context.event_store.event_store.get_events())
+
+
+@then(u'every stream\'s events can still be read in the same order')
+def _then_every_streams_events_can_still_be_read(context):
+    for stream_id, events in context.stream_events.items():
+        assert pvector(context.event_store.get_events(stream_id)) == events
+        assert context.event_store.get_last_event(stream_id) == events[-1]
+
+
+@then(u'every event can still be read')
+def _then_every_event_can_still_be_read(context):
+    assert (
+        pvector(context.event_store.get_events()) == context.all_events
+    )
+    assert (
+        tuple(stream.id for stream in context.event_store.get_streams()) ==
+        context.stream_ids
+    )
+
+
+@then(u'the first stream is not archived')
+def _then_the_first_stream_is_not_archived(context):
+    assert context.stream_ids[0] not in context.event_store.archive
+    assert pvector(context.event_store.event_store.get_events(
+        context.stream_ids[0]
+    ))
+
+
+@then(u'the first stream has {num_events:d} events')
+def _then_the_first_stream_has_events(context, num_events):
+    events = pvector(context.event_store.get_events(context.stream_ids[0]))
+    assert len(events) == num_events
+    assert events[:-1] == context.stream_events[context.stream_ids[0]]
+
+
+@then(u'the reopened archive holds the second and third streams')
+def _then_the_reopened_archive_holds_the_second_and_third_streams(context):
+    assert (
+        tuple(context.reopened_archive.directory) == context.stream_ids[1:]
+    )
+    for stream_id in context.stream_ids[1:]:
+        assert (
+            context.reopened_archive.read_stream(stream_id) ==
+            context.stream_events[stream_id]
+        )
+
+
+@when(u'I follow every stream of the in-memory store')
+def _when_i_follow_every_stream_of_the_in_memory_store(context):
+    context.follower = context.event_store.event_store.subscribe(timeout=0)
+    context.add_cleanup(context.follower.close)
+
+
+@when(u'I close the follower')
+def _when_i_close_the_follower(context):
+    context.follower.close()
+
+
+@when(u'I try to archive the idle streams')
+def _when_i_try_to_archive_the_idle_streams(context):
+    try:
+        context.event_store.archive_idle_streams()
+    except StreamsFollowedError as e:
+        context.error = e
+
+
+@then(u'every event is read with its own stream id')
+def _then_every_event_is_read_with_its_own_stream_id(context):
+    entries = list(context.event_store.get_stream_events())
+    assert pvector(stream_id for stream_id, _ in entries) == (
+        context.all_stream_ids
+    )
+    assert pvector(event for _, event in entries) == context.all_events
+    assert len(set(context.all_stream_ids)) == len(context.stream_ids)
+
+
+@then(u'no streams are archived')
+def _then_no_streams_are_archived(context):
+    assert not context.event_store.archive.directory
+    assert pvector(context.event_store.event_store.get_events()) == (
+        context.all_events
+    )
+
+
+def _check_every_position(context, entries):
+    store = context.event_store
+    for start in range(len(entries) + 1):
+        assert pvector(store.get_stream_events(start=start)) == (
+            entries[start:]
+        )
+        assert pvector(store.get_events(start=start)) == pvector(
+            event for _, event in entries[start:]
+        )
+    streams = list(store.get_streams())
+    assert tuple(stream.id for stream in streams) == context.stream_ids
+    assert [stream.number for stream in streams] == list(range(len(streams)))
+    assert tuple(
+        stream.id for stream in store.get_streams(start=1)
+    ) == context.stream_ids[1:]
+
+
+@then(u'reading from every position returns the noted events')
+def _then_reading_from_every_position_returns_the_noted_events(context):
+    _check_every_position(context, pvector(
+        zip(context.all_stream_ids, context.all_events)
+    ))
+
+
+@then(u'reading from every position returns the noted events and the new '
+      u'event of the second stream')
+def _then_reading_from_every_position_returns_the_new_event(context):
+    entries = pvector(context.event_store.get_stream_events())
+    assert entries[:-1] == pvector(
+        zip(context.all_stream_ids, context.all_events)
+    )
+    assert entries[-1][0] == context.stream_ids[1]
+    _check_every_position(context, entries)
+
+
+@then(u'the second stream is not archived')
+def _then_the_second_stream_is_not_archived(context):
+    assert context.stream_ids[1] not in context.event_store.archive
+
+
+@when(u'I count the archived streams decompressed')
+def _when_i_count_the_archived_streams_decompressed(context):
+    archive = context.event_store.archive
+    read_entry = archive.read_entry
+    context.decompressed = []
+
+    def counting_read_entry(entry):
+        context.decompressed.append(entry.stream_id)
+        return read_entry(entry)
+    archive.read_entry = counting_read_entry
+
+
+@when(u'I read the first event of the store')
+def _when_i_read_the_first_event_of_the_store(context):
+    next(context.event_store.get_events())
+
+
+@then(u'{num_streams:d} archived stream was decompressed')
+def _then_archived_streams_were_decompressed(context, num_streams):
+    assert len(context.decompressed) == num_streams
@@ -0,0 +1,167 @@
+"""
+Feature execution steps for bulk export & import
+"""
+import json
+import os
+import struct
+import tempfile
+import zlib
+from ast import literal_eval
+from behave import when, then
+from pyrsistent import pvector
+from dvent.bulk import (
+    COLUMNAR_MAGIC, BulkFormatError, export_columnar, export_jsonl,
+    import_events, read_columnar, read_jsonl
+)
+from dvent.event_store import InMemoryEventStore
+from dvent.serialization import events_to_columns
+
+EXPORTERS = {'jsonl': export_jsonl, 'columnar': export_columnar}
+
+READERS = {'jsonl': read_jsonl, 'columnar': read_columnar}
+
+
+def _get_export_path(context, format_):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'events.{}'.format(format_))
+
+    def cleanup():
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(directory)
+    context.add_cleanup(cleanup)
+    return path
+
+
+def _generate_imported_store(context):
+    context.imported_store = InMemoryEventStore.generate(
+        publisher=lambda event: None
+    )
+    context.progress = []
+    return context.imported_store
+
+
+@when(u'I export the store to a {format_} file in batches of {batch_size:d}')
+def _when_i_export_the_store_to_a_file(context, format_, batch_size):
+    context.export_path = _get_export_path(context, format_)
+    context.export_progress = []
+    EXPORTERS[format_](
+        context.event_store, context.export_path,
+        progress=context.export_progress.append, batch_size=batch_size
+    )
+
+
+@when(u'I export the first and third streams to a {format_} file')
+def _when_i_export_the_first_and_third_streams(context, format_):
+    context.export_path = _get_export_path(context, format_)
+    EXPORTERS[format_](
+        context.event_store, context.export_path,
+        stream_ids=(context.stream_ids[0], context.stream_ids[2])
+    )
+
+
+@when(u'I import the {format_} file into a new event store in batches of {batch_size:d}')
+def _when_i_import_the_file_into_a_new_event_store(context, format_,
+                                                   batch_size):
+    store = _generate_imported_store(context)
+    import_events(
+        store, READERS[format_](context.export_path),
+        progress=context.progress.append, batch_size=batch_size
+    )
+
+
+@when(u'I import the store\'s events into a new event store in batches of {batch_size:d}')
+def _when_i_import_the_stores_events_into_a_new_event_store(context,
+                                                            batch_size):
+    store = _generate_imported_store(context)
+    import_events(
+        store, context.event_store.get_stream_events(),
+        progress=context.progress.append, batch_size=batch_size
+    )
+
+
+@when(u'I export the store to a {format_} file with the first event\'s '
+      u'{field} set to {value}')
+def _when_i_export_the_store_with_an_invalid_event(context, format_, field,
+                                                   value):
+    context.export_path = _get_export_path(context, format_)
+    value = literal_eval(value)
+    entries = list(context.event_store.get_stream_events())
+    if format_ == 'jsonl':
+        export_jsonl(context.event_store, context.export_path)
+        with open(context.export_path, 'r', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        lines[0]['event'][field] = value
+        with open(context.export_path, 'w', encoding='utf-8') as f:
+            for line in lines:
+                f.write(json.dumps(line) + '\n')
+        return
+    columns = events_to_columns(entries)
+    columns[{'version': 'versions', 'data': 'data'}[field]][0] = value
+    payload = zlib.compress(json.dumps(columns).encode('utf-8'))
+    with open(context.export_path, 'wb') as f:
+        f.write(COLUMNAR_MAGIC)
+        f.write(struct.pack('>I', len(payload)))
+        f.write(payload)
+
+
+@when(u'I try to import the {format_} file into a new event store')
+def _when_i_try_to_import_the_file_into_a_new_event_store(context, format_):
+    try:
+        import_events(
+            _generate_imported_store(context),
+            READERS[format_](context.export_path)
+        )
+    except BulkFormatError as e:
+        context.error = e
+
+
+@when(u'I try to import a file which isn\'t a columnar export')
+def _when_i_try_to_import_a_file_which_isnt_a_columnar_export(context):
+    path = _get_export_path(context, 'columnar')
+    with open(path, 'wb') as f:
+        f.write(b'not an export')
+    try:
+        import_events(_generate_imported_store(context), read_columnar(path))
+    except BulkFormatError as e:
+        context.error = e
+
+
+@then(u'the imported store has the same events in the same order')
+def _then_the_imported_store_has_the_same_events_in_the_same_order(context):
+    assert (
+        pvector(context.imported_store.get_stream_events()) ==
+        pvector(context.event_store.get_stream_events())
+    )
+    for stream_id in context.stream_ids:
+        assert (
+            pvector(context.imported_store.get_events(stream_id)) ==
+            pvector(context.event_store.get_events(stream_id))
+        )
+
+
+@then(u'the imported store has the same streams in the same order')
+def _then_the_imported_store_has_the_same_streams_in_the_same_order(context):
+    assert (
+        pvector(context.imported_store.get_streams()) ==
+        pvector(context.event_store.get_streams())
+    )
+
+
+@then(u'the imported store only has the first and third streams')
+def _then_the_imported_store_only_has_the_first_and_third_streams(context):
+    selected = (context.stream_ids[0], context.stream_ids[2])
+    assert tuple(
+        stream.id for stream in context.imported_store.get_streams()
+    ) == selected
+    for stream_id in selected:
+        assert (
+            pvector(context.imported_store.get_events(stream_id)) ==
+            pvector(context.event_store.get_events(stream_id))
+        )
+
+
+@then(u'progress was reported as 2, 4, 6 and 7 events')
+def _then_progress_was_reported(context):
+    assert context.progress == [2, 4, 6, 7]
+    assert context.export_progress == [2, 4, 6, 7]
@@ -0,0 +1,185 @@
+"""
+Feature execution steps for the event bus
+"""
+from concurrent.futures import ThreadPoolExecutor
+from behave import given, when, then
+from dvent.bus import EventBus
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore
+
+
+class PausedExecutor(object):
+    """
+    Executor holding submitted tasks until `run` is called
+    """
+
+    def __init__(self):
+        self.tasks = []
+        self.rejecting = 0
+
+    def submit(self, fn, *args):
+        if self.rejecting:
+            self.rejecting -= 1
+            raise RuntimeError('Executor rejected the task')
+        self.tasks.append((fn, args))
+
+    def run(self):
+        while self.tasks:
+            fn, args = self.tasks.pop(0)
+            fn(*args)
+
+
+def _subscribe(context, name, **kwargs):
+    received = context.received[name] = []
+
+    def handler(event):
+        received.append(event)
+    context.subscriptions[name] = context.bus.subscribe(
+        handler, name=name, **kwargs
+    )
+
+
+@given(u'a new event bus')
+def _given_a_new_event_bus(context):
+    context.bus = EventBus()
+    context.received = {}
+    context.subscriptions = {}
+    context.published = []
+
+
+@given(u'a subscriber of {type_:w} events')
+def _given_a_subscriber_of_type_events(context, type_):
+    _subscribe(context, type_, types=(type_,))
+
+
+@given(u'a subscriber of every event')
+def _given_a_subscriber_of_every_event(context):
+    _subscribe(context, 'every')
+
+
+@given(u'a subscriber of events of streams starting with "{prefix}"')
+def _given_a_subscriber_of_stream_prefix_events(context, prefix):
+    _subscribe(context, 'stream prefix', stream_prefix=prefix)
+
+
+@given(u'a failing subscriber of every event')
+def _given_a_failing_subscriber_of_every_event(context):
+    def handler(event):
+        raise ValueError('Subscriber failed')
+    context.subscriptions['failing'] = context.bus.subscribe(
+        handler, name='failing'
+    )
+
+
+@given(u'a subscriber of every event on a paused executor')
+def _given_a_subscriber_on_a_paused_executor(context):
+    context.executor = PausedExecutor()
+    _subscribe(context, 'queued', executor=context.executor)
+
+
+@given(u'a subscriber of every event on a paused executor queueing at most {max_queue:d} events')
+def _given_a_subscriber_on_a_paused_executor_queueing(context, max_queue):
+    context.executor = PausedExecutor()
+    _subscribe(
+        context, 'queued', executor=context.executor, max_queue=max_queue
+    )
+
+
+@given(u'a subscriber of every event on a thread pool')
+def _given_a_subscriber_of_every_event_on_a_thread_pool(context):
+    executor = ThreadPoolExecutor(2)
+    context.add_cleanup(executor.shutdown)
+    _subscribe(context, 'queued', executor=executor)
+
+
+@given(u'an event store publishing to the bus')
+def _given_an_event_store_publishing_to_the_bus(context):
+    context.event_store = InMemoryEventStore.generate(publisher=context.bus)
+
+
+def _publish(context, type_, stream_id=None):
+    event = Event.generate(type_, stream_id=stream_id)
+    context.published.append(event)
+    context.bus.publish(event)
+
+
+@when(u'I publish an {first_type} event and an {second_type} event')
+def _when_i_publish_two_events(context, first_type, second_type):
+    _publish(context, first_type)
+    _publish(context, second_type)
+
+
+@when(u'I publish an {type_} event to stream "{stream_id}"')
+def _when_i_publish_an_event_to_stream(context, type_, stream_id):
+    _publish(context, type_, stream_id)
+
+
+@when(u'I publish {num_events:d} {type_} events')
+def _when_i_publish_events(context, num_events, type_):
+    for _ in range(num_events):
+        _publish(context, type_)
+
+
+@when(u'I save {num_events:d} events to stream "{stream_id}" of the store')
+def _when_i_save_events_to_stream_of_the_store(context, num_events, stream_id):
+    context.event_store.save_events(stream_id, tuple(
+        Event.generate('OrderPlaced') for _ in range(num_events)
+    ))
+
+
+@when(u'the paused executor runs')
+def _when_the_paused_executor_runs(context):
+    context.executor.run()
+
+
+@when(u'the paused executor rejects its next task')
+def _when_the_paused_executor_rejects_its_next_task(context):
+    context.executor.rejecting = 1
+
+
+@when(u'I wait for the bus to deliver every event')
+def _when_i_wait_for_the_bus_to_deliver_every_event(context):
+    assert context.bus.join(timeout=30)
+
+
+@when(u'I unsubscribe the subscriber of every event')
+def _when_i_unsubscribe_the_subscriber_of_every_event(context):
+    context.bus.unsubscribe(context.subscriptions['every'])
+
+
+@then(u'the {name} subscriber received {num_events:d} event')
+@then(u'the {name} subscriber received {num_events:d} events')
+def _then_the_subscriber_received_events(context, name, num_events):
+    assert len(context.received[name]) == num_events
+
+
+@then(u'the subscriber of every event received {num_events:d} event')
+def _then_the_subscriber_of_every_event_received_event(context, num_events):
+    assert len(context.received['every']) == num_events
+
+
+@then(u'the subscriber of every event received {num_events:d} events in order')
+def _then_the_subscriber_of_every_event_received_events(context, num_events):
+    assert context.received['every'] == context.published[:num_events]
+
+
+@then(u'the queued subscriber received {num_events:d} events in order')
+def _then_the_queued_subscriber_received_events_in_order(context, num_events):
+    assert context.received['queued'] == context.published[:num_events]
+
+
+@then(u'every event received belongs to stream "{stream_id}"')
+def _then_every_event_received_belongs_to_stream(context, stream_id):
+    assert all(
+        event.stream_id == stream_id
+        for event in context.received['stream prefix']
+    )
+
+
+@then(u'the lag of the {name} subscriber shows {num_events:d} {statistic} events')
+def _then_the_lag_of_the_subscriber_shows(context, name, num_events,
+                                          statistic):
+    lag = context.bus.get_lag()[name]
+    assert lag[statistic] == num_events
+    if statistic == 'queued':
+        assert (lag['lag'] > 0) == (num_events > 0)
@@ -0,0 +1,145 @@
+"""
+Feature execution steps for the caching event store
+"""
+from behave import given, when, then
+from pyrsistent import pvector
+from dvent.caching import CachingEventStore
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore
+
+
+class RacingEventStore(InMemoryEventStore):
+    """
+    In-memory store calling `db.during_read`, once, after reading a stream
+    """
+
+    def get_events(self, id_=None, start=0):
+        events = list(super().get_events(id_, start=start))
+        during_read = getattr(self.db, 'during_read', None)
+        if id_ and during_read is not None:
+            self.db.during_read = None
+            during_read(id_)
+        return iter(events)
+
+
+class LastEventStore(InMemoryEventStore):
+    """
+    In-memory store recording stream reads and last event lookups in
+    `db.reads`
+    """
+
+    def get_events(self, id_=None, start=0):
+        if id_:
+            self.db.reads.append('get_events')
+        return super().get_events(id_, start=start)
+
+    def get_last_event(self, id_):
+        self.db.reads.append('get_last_event')
+        events = list(self.db.get_events(id_))
+        return events[-1] if events else None
+
+
+@given(u'a new caching event store holding at most {max_events:d} events')
+def _given_a_new_caching_event_store(context, max_events):
+    context.event_store = CachingEventStore.generate(
+        InMemoryEventStore.generate(publisher=lambda event: None),
+        max_events=max_events
+    )
+
+
+@given(u'a new caching event store whose stream reads can race a save')
+def _given_a_new_caching_event_store_whose_reads_race_a_save(context):
+    context.racing_store = RacingEventStore.generate(
+        publisher=lambda event: None
+    )
+    context.event_store = CachingEventStore.generate(context.racing_store)
+
+
+@when(u'a save to the stream races the next read')
+def _when_a_save_to_the_stream_races_the_next_read(context):
+    def save_new_event(id_):
+        context.new_event = Event.generate(
+            'NewEventHappened', version=(len(context.events) + 1)
+        )
+        context.event_store.save_events(id_, (context.new_event,))
+
+    context.racing_store.db.during_read = save_new_event
+
+
+@given(u'a new caching event store over a store looking up last events')
+def _given_a_new_caching_event_store_over_a_last_event_store(context):
+    context.last_event_store = LastEventStore.generate(
+        publisher=lambda event: None
+    )
+    context.last_event_store.db.reads = []
+    context.event_store = CachingEventStore.generate(
+        context.last_event_store, max_events=10
+    )
+
+
+@when(u'I get the last event of the stream twice')
+def _when_i_get_the_last_event_of_the_stream_twice(context):
+    # Forget the lookup checking the saved stream was new
+    context.last_event_store.db.reads = []
+    context.last_events = [
+        context.event_store.get_last_event(context.stream_id)
+        for _ in range(2)
+    ]
+
+
+@then(u'the saved stream\'s last event is returned')
+def _then_the_saved_streams_last_event_is_returned(context):
+    assert context.last_events == [context.events[-1]] * 2
+
+
+@then(u'the wrapped store looked up the last event twice without reading '
+      u'the stream')
+def _then_the_wrapped_store_looked_up_the_last_event_twice(context):
+    assert context.last_event_store.db.reads == ['get_last_event'] * 2
+
+
+@when(u'I get events from the store with the same id starting from position {pos:d}')
+def _when_i_get_events_from_the_store_with_the_same_id_from(context, pos):
+    context.retrieved_events = pvector(context.event_store.get_events(
+        context.stream_id, start=pos
+    ))
+
+
+@when(u'I read every stream from the store')
+def _when_i_read_every_stream_from_the_store(context):
+    for stream_id in context.stream_ids:
+        pvector(context.event_store.get_events(stream_id))
+
+
+@then(u'only the last event is returned')
+def _then_only_the_last_event_is_returned(context):
+    assert context.retrieved_events == context.events[-1:]
+
+
+@then(u'the last event of the stream is the new event')
+def _then_the_last_event_of_the_stream_is_the_new_event(context):
+    assert (
+        context.event_store.get_last_event(context.stream_id) ==
+        context.new_event
+    )
+
+
+@then(u'the cache has {hits:d} {hit_word} and {misses:d} {miss_word}')
+def _then_the_cache_has_hits_and_misses(context, hits, hit_word, misses,
+                                        miss_word):
+    stats = context.event_store.cache.stats()
+    assert (stats['hits'], stats['misses']) == (hits, misses)
+    assert stats['hit_rate'] == hits / float(hits + misses)
+
+
+@then(u'the cache holds at most {max_events:d} events')
+def _then_the_cache_holds_at_most_events(context, max_events):
+    stats = context.event_store.cache.stats()
+    assert 0 < stats['events'] <= max_events
+    assert stats['evictions'] > 0
+
+
+@then(u'the first stream is no longer cached')
+def _then_the_first_stream_is_no_longer_cached(context):
+    assert context.event_store.cache.get(context.stream_ids[0]) is None
+    assert context.event_store.cache.get(context.stream_ids[-1]) is not None
@@ -0,0 +1,128 @@
+"""
+Feature execution steps for the columnar event log view
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+from behave import given, when, then
+from dvent.columnar import EventLogView
+from dvent.event import Event
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _save_versioned_events(context, stream_id, count, timestamp=None):
+    version = len(list(context.event_store.get_events(stream_id)))
+    context.event_store.save_events(stream_id, tuple(
+        Event.generate(
+            'ThingHappened' if (version + index) % 2 == 0 else 'ThingChanged',
+            version=version + index + 1,
+            timestamp=timestamp,
+        )
+        for index in range(count)
+    ))
+
+
+@given(u'{num_streams:d} streams with {num_events:d} versioned events each saved an hour apart')
+def _given_streams_with_versioned_events(context, num_streams, num_events):
+    start = datetime(2018, 5, 1, 12, 30)
+    context.stream_ids = tuple(str(uuid4()) for _ in range(num_streams))
+    for index, stream_id in enumerate(context.stream_ids):
+        _save_versioned_events(
+            context, stream_id, num_events,
+            timestamp=start + timedelta(hours=index)
+        )
+
+
+@when(u'I create a columnar view of the store')
+def _when_i_create_a_columnar_view_of_the_store(context):
+    context.view = EventLogView(context.event_store)
+    context.view.refresh()
+
+
+@when(u'I create a columnar view of the first stream')
+def _when_i_create_a_columnar_view_of_the_first_stream(context):
+    context.view = EventLogView(
+        context.event_store, stream_ids=(context.stream_ids[0],)
+    )
+    context.view.refresh()
+
+
+@when(u'I save {num_events:d} more versioned events to the first stream')
+def _when_i_save_more_versioned_events_to_the_first_stream(context,
+                                                           num_events):
+    _save_versioned_events(context, context.stream_ids[0], num_events)
+
+
+@when(u'I save an event with version {version:d} to the first stream')
+def _when_i_save_an_event_with_version_to_the_first_stream(context, version):
+    context.event_store.save_events(context.stream_ids[0], (
+        Event.generate('ThingHappened', version=version),
+    ))
+
+
+@when(u'I refresh the view')
+def _when_i_refresh_the_view(context):
+    context.added = context.view.refresh()
+
+
+@then(u'the view has {num_rows:d} rows in the order of the event log')
+def _then_the_view_has_rows_in_the_order_of_the_event_log(context, num_rows):
+    view = context.view
+    entries = list(context.event_store.get_stream_events())
+    assert len(view) == len(entries) == num_rows
+    for position, (row, (stream_id, event)) in enumerate(
+        zip(view.rows, entries)
+    ):
+        assert row['position'] == position
+        assert view.stream_ids[row['stream']] == stream_id
+        assert view.types[row['type']] == event.type
+        assert row['timestamp'] == (
+            (event.timestamp - EPOCH) // timedelta(microseconds=1)
+        )
+        assert row['version'] == event.version
+
+
+@then(u'the view counts {count:d} events of each type')
+def _then_the_view_counts_events_of_each_type(context, count):
+    assert context.view.count_by_type() == {
+        'ThingHappened': count, 'ThingChanged': count,
+    }
+
+
+@then(u'{num_rows:d} rows are added to the view')
+def _then_rows_are_added_to_the_view(context, num_rows):
+    assert context.added == num_rows
+    assert len(context.view) == len(list(context.event_store.get_events()))
+
+
+@then(u'the view\'s stream lengths are {first:d}, {second:d} and {third:d}')
+def _then_the_views_stream_lengths_are(context, first, second, third):
+    assert context.view.stream_lengths().tolist() == [first, second, third]
+
+
+@then(u'the view has {num_rows:d} rows of the first stream')
+def _then_the_view_has_rows_of_the_first_stream(context, num_rows):
+    assert len(context.view) == num_rows
+    assert context.view.stream_ids == [context.stream_ids[0]]
+    assert context.view.rows['position'].tolist() == [0, 1]
+
+
+@then(u'there are {count:d} events per hour in {hours:d} hours')
+def _then_there_are_events_per_hour(context, count, hours):
+    starts, counts = context.view.count_by_type_per_interval(
+        interval=timedelta(hours=1)
+    )
+    assert len(starts) == hours
+    assert counts.sum(axis=1).tolist() == [count] * hours
+    first_hour = datetime(2018, 5, 1, 12) - EPOCH
+    assert starts[0] == first_hour // timedelta(microseconds=1)
+
+
+@then(u'the version gap is found in the first stream')
+def _then_the_version_gap_is_found_in_the_first_stream(context):
+    gaps = context.view.version_gaps()
+    assert len(gaps) == 1
+    assert gaps[0]['version'] == 5
+    assert gaps[0]['stream'] == context.view.get_stream_code(
+        context.stream_ids[0]
+    )
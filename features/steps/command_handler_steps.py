@@ -0,0 +1,214 @@
+"""
+Feature execution steps for the command handler
+"""
+from behave import given, when, then
+from pyrsistent import pmap
+from dvent.aggregate import Aggregate
+from dvent.command import Command
+from dvent.command_handler import CommandHandler
+from dvent.event import Event
+from dvent.event_store import IEventStoreVersionError, InMemoryEventStore
+from dvent.repository import Repository
+
+
+class Counter(Aggregate):
+
+    @classmethod
+    def get_apply_map(cls):
+        return pmap({'Incremented': cls.apply_incremented})
+
+    @staticmethod
+    def apply_incremented(aggregate, event):
+        return aggregate.set_state(
+            'count', aggregate.state.get('count', 0) + 1
+        )
+
+    def increment(self):
+        return self.apply_event(
+            Event.generate('Incremented', version=self.uncommitted_version + 1)
+        )
+
+
+class CounterCommandHandler(CommandHandler):
+
+    @classmethod
+    def get_handle_map(cls):
+        return pmap({'Ping': cls.handle_ping})
+
+    @classmethod
+    def get_aggregate_handle_map(cls):
+        return pmap({
+            'Create': (Counter, cls.handle_create),
+            'Increment': (Counter, cls.handle_increment),
+            'Fail': (Counter, cls.handle_fail),
+        })
+
+    @staticmethod
+    def handle_ping(context, command):
+        return 'pong'
+
+    @staticmethod
+    def handle_create(context, counter, command):
+        return Counter.generate().increment()
+
+    @staticmethod
+    def handle_increment(context, counter, command):
+        return counter.increment()
+
+    @staticmethod
+    def handle_fail(context, counter, command):
+        raise ValueError('Failed')
+
+
+class CountingEventStore(object):
+    """
+    Event store proxy counting reads and writes
+    """
+
+    def __init__(self, event_store):
+        self.event_store = event_store
+        self.reads = 0
+        self.writes = 0
+        self.before_save = None
+
+    def get_events(self, *args, **kwargs):
+        self.reads += 1
+        return self.event_store.get_events(*args, **kwargs)
+
+    def save_events(self, *args, **kwargs):
+        self.writes += 1
+        if self.before_save is not None:
+            before_save, self.before_save = self.before_save, None
+            before_save()
+        return self.event_store.save_events(*args, **kwargs)
+
+
+def _save_counter(context):
+    counter = context.repository.save_aggregate(Counter.generate().increment())
+    context.event_store.reads = context.event_store.writes = 0
+    return counter
+
+
+def _handle(context, commands):
+    context.commands = commands
+    context.results = context.command_handler.handle_commands(commands)
+
+
+@given(u'a counter command handler with a new event store')
+def _given_a_counter_command_handler(context):
+    context.event_store = CountingEventStore(InMemoryEventStore.generate())
+    context.repository = Repository(event_store=context.event_store)
+    context.command_handler = CounterCommandHandler(
+        context=pmap({'repository': context.repository})
+    )
+
+
+@given(u'a saved counter')
+def _given_a_saved_counter(context):
+    context.counters = [_save_counter(context)]
+
+
+@given(u'{num_counters:d} saved counters')
+def _given_saved_counters(context, num_counters):
+    context.counters = [_save_counter(context) for _ in range(num_counters)]
+
+
+@given(u'the counter is changed concurrently')
+def _given_the_counter_is_changed_concurrently(context):
+    # Change it between the handler loading and saving it
+    context.event_store.before_save = lambda: context.repository\
+        .save_aggregate(context.counters[0].increment())
+
+
+@when(u'I handle a batch of {num_commands:d} increment commands for the counter')
+def _when_i_handle_increment_commands(context, num_commands):
+    _handle(context, [
+        Command.generate('Increment', data=pmap({'id': context.counters[0].id}))
+        for _ in range(num_commands)
+    ])
+
+
+@when(u'I handle a batch of increment commands alternating between the counters')
+def _when_i_handle_alternating_increment_commands(context):
+    _handle(context, [
+        Command.generate('Increment', data=pmap({'id': counter.id}))
+        for _ in range(2) for counter in context.counters
+    ])
+
+
+@when(u'I handle a batch of increment, failing and increment commands for the counter')
+def _when_i_handle_increment_failing_and_increment_commands(context):
+    data = pmap({'id': context.counters[0].id})
+    _handle(context, [
+        Command.generate(type_, data=data)
+        for type_ in ('Increment', 'Fail', 'Increment')
+    ])
+
+
+@when(u'I handle a batch of {num_commands:d} {type_:w} commands')
+def _when_i_handle_a_batch_of_commands(context, num_commands, type_):
+    _handle(context, [
+        Command.generate(type_.capitalize()) for _ in range(num_commands)
+    ])
+
+
+@then(u'the event store was read {reads:d} times and written {writes:d} times')
+def _then_the_event_store_was_read_and_written(context, reads, writes):
+    assert context.event_store.reads == reads
+    assert context.event_store.writes == writes
+
+
+@then(u'every command succeeded')
+def _then_every_command_succeeded(context):
+    assert [r.command for r in context.results] == context.commands
+    assert all(r.error is None for r in context.results)
+
+
+@then(u'the results are in the order of the commands')
+def _then_the_results_are_in_the_order_of_the_commands(context):
+    assert [
+        result.result.id for result in context.results
+    ] == [command.data['id'] for command in context.commands]
+
+
+@then(u'the second command failed')
+def _then_the_second_command_failed(context):
+    assert isinstance(context.results[1].error, ValueError)
+    assert context.results[1].result is None
+
+
+@then(u'the other commands succeeded')
+def _then_the_other_commands_succeeded(context):
+    assert context.results[0].error is None
+    assert context.results[2].error is None
+
+
+@then(u'every command failed with a version error')
+def _then_every_command_failed_with_a_version_error(context):
+    assert all(
+        isinstance(r.error, IEventStoreVersionError) and r.result is None
+        for r in context.results
+    )
+
+
+@then(u'the counter\'s count is {count:d}')
+def _then_the_counters_count_is(context, count):
+    # One increment was saved with the counter
+    for result in context.results:
+        if result.error is None:
+            assert result.result.state['count'] == count + 1
+            assert not result.result.uncommitted_events
+    saved = context.repository.get_aggregate(Counter, context.counters[0].id)
+    assert saved.state['count'] == count + 1
+
+
+@then(u'{num_counters:d} counters were saved')
+def _then_counters_were_saved(context, num_counters):
+    ids = set(result.result.id for result in context.results)
+    assert len(ids) == num_counters
+    assert context.event_store.writes == num_counters
+
+
+@then(u'every result is pong')
+def _then_every_result_is_pong(context):
+    assert all(result.result == 'pong' for result in context.results)
@@ -0,0 +1,176 @@
+"""
+Feature execution steps for the deduplicating event store
+"""
+from uuid import uuid4
+from behave import given, when, then
+from pyrsistent import pvector
+from dvent.dedup import BloomFilter, DeduplicatingEventStore, DuplicateEventError
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore
+
+
+def _generate_store(context, **kwargs):
+    context.published = []
+    context.event_store = DeduplicatingEventStore.generate(
+        InMemoryEventStore.generate(publisher=context.published.append),
+        **kwargs
+    )
+
+
+@given(u'a new deduplicating event store')
+def _given_a_new_deduplicating_event_store(context):
+    _generate_store(context)
+
+
+@given(u'a new deduplicating event store holding {window:d} recent ids')
+def _given_a_new_deduplicating_event_store_holding(context, window):
+    _generate_store(context, window=window)
+
+
+@given(u'a new deduplicating event store holding {window:d} recent ids and a Bloom filter of {capacity:d} ids')
+def _given_a_new_deduplicating_event_store_with_bloom(context, window,
+                                                     capacity):
+    _generate_store(context, window=window, bloom_capacity=capacity)
+
+
+@given(u'a Bloom filter of {capacity:d} strings with a {percent:d}% false positive rate')
+def _given_a_bloom_filter(context, capacity, percent):
+    context.bloom = BloomFilter(capacity, error_rate=percent / 100)
+
+
+@when(u'I wrap the store to deduplicate saves')
+def _when_i_wrap_the_store_to_deduplicate_saves(context):
+    context.event_store = DeduplicatingEventStore.generate(context.event_store)
+
+
+@when(u'I retry saving the same events as a new stream')
+def _when_i_retry_saving_the_same_events_as_a_new_stream(context):
+    context.event_store.save_events(
+        context.stream_id, context.events, expected_version=-1
+    )
+
+
+@when(u'I retry saving the same events')
+def _when_i_retry_saving_the_same_events(context):
+    context.event_store.save_events(context.stream_id, context.events)
+
+
+@when(u'I save the last event again with a new event')
+def _when_i_save_the_last_event_again_with_a_new_event(context):
+    try:
+        context.event_store.save_events(context.stream_id, (
+            context.events[-1], Event.generate('EventHappened', version=3)
+        ))
+    except DuplicateEventError as e:
+        context.error = e
+
+
+@when(u'I save a new stream with an event repeated')
+def _when_i_save_a_new_stream_with_an_event_repeated(context):
+    context.stream_id = str(uuid4())
+    event = Event.generate('EventHappened', version=1)
+    try:
+        context.event_store.save_events(context.stream_id, (event, event))
+    except DuplicateEventError as e:
+        context.error = e
+
+
+@when(u'I save a batch of the same write and a new stream')
+def _when_i_save_a_batch_of_the_same_write_and_a_new_stream(context):
+    context.new_stream_id = str(uuid4())
+    context.new_events = pvector([Event.generate('EventHappened', version=1)])
+    context.event_store.save_events_batch((
+        (context.stream_id, context.events),
+        (context.new_stream_id, context.new_events),
+    ))
+
+
+@when(u'I save a batch of the same write and the same new stream')
+def _when_i_save_a_batch_of_the_same_write_and_the_same_new_stream(context):
+    context.event_store.save_events_batch((
+        (context.stream_id, context.events),
+        (context.new_stream_id, context.new_events),
+    ))
+
+
+@when(u'the wrapped store fails to write the next save')
+def _when_the_wrapped_store_fails_to_write_the_next_save(context):
+    db = context.event_store.event_store.db
+
+    def fail_write(stream_id, events):
+        del db.write_to_stream
+        raise IOError('Write failed')
+
+    db.write_to_stream = fail_write
+
+
+@when(u'I add {num_strings:d} random strings to the filter')
+def _when_i_add_random_strings_to_the_filter(context, num_strings):
+    context.strings = tuple(str(uuid4()) for _ in range(num_strings))
+    for string in context.strings:
+        context.bloom.add(string)
+
+
+@then(u'a duplicate event error is raised')
+def _then_a_duplicate_event_error_is_raised(context):
+    assert isinstance(context.error, DuplicateEventError)
+
+
+@then(u'the events were published once')
+def _then_the_events_were_published_once(context):
+    assert [event.id for event in context.published] == [
+        event.id for event in context.events
+    ]
+
+
+@then(u'the stream is not saved')
+def _then_the_stream_is_not_saved(context):
+    assert not tuple(context.event_store.get_events(context.stream_id))
+
+
+@then(u'the new stream of the batch is saved')
+def _then_the_new_stream_of_the_batch_is_saved(context):
+    assert (
+        pvector(context.event_store.get_events(context.new_stream_id)) ==
+        context.new_events
+    )
+
+
+@then(u'the index checked {num_matches:d} Bloom filter matches against the stream')
+def _then_the_index_checked_bloom_filter_matches(context, num_matches):
+    usage = context.event_store.index.memory_usage()
+    assert usage['fallbacks'] == num_matches
+    assert usage['false_positives'] == 0
+
+
+@then(u'the stream has {num_events:d} events')
+def _then_the_stream_has_events(context, num_events):
+    assert len(tuple(
+        context.event_store.get_events(context.stream_id)
+    )) == num_events
+
+
+@then(u'the index holds {num_recent:d} recent ids and {num_bloom:d} ids in the Bloom filter')
+def _then_the_index_holds_ids(context, num_recent, num_bloom):
+    usage = context.event_store.index.memory_usage()
+    assert usage['recent_ids'] == num_recent
+    assert usage['bloom_ids'] == num_bloom
+
+
+@then(u'the index uses memory for both')
+def _then_the_index_uses_memory_for_both(context):
+    usage = context.event_store.index.memory_usage()
+    assert usage['recent_bytes'] > 0
+    assert usage['bloom_bytes'] == context.event_store.index.bloom.nbytes > 0
+    assert 0 < usage['bloom_error_rate'] < 0.001
+
+
+@then(u'every added string is in the filter')
+def _then_every_added_string_is_in_the_filter(context):
+    assert all(string in context.bloom for string in context.strings)
+
+
+@then(u'fewer than {percent:d}% of {num_strings:d} other strings are in the filter')
+def _then_few_other_strings_are_in_the_filter(context, percent, num_strings):
+    found = sum(str(uuid4()) in context.bloom for _ in range(num_strings))
+    assert found < num_strings * percent / 100
@@ -1,10 +1,11 @@
 """
 Feature execution steps for the base domain modeling objects
 """
+from ast import literal_eval
 from itertools import chain
 from uuid import uuid4
 from behave import given, when, then
-from pyrsistent import v as make_vector, pmap, pvector
+from pyrsistent import PClass, PMap, v as make_vector, pmap, pvector
 from dvent.aggregate import Aggregate
 from dvent.command import Command
 from dvent.event import Event
@@ -14,6 +15,17 @@ from dvent.repository import Repository
 # Dummy apply map that returns the aggregate unchanged
 _apply_map = pmap({'EventHappened': Aggregate.apply_noop})
 
+# Apply map counting events in the aggregate's state
+_counting_apply_map = pmap({
+    'EventHappened': lambda agg, event: agg.set_state(
+        'count', agg.state.get('count', 0) + 1
+    )
+})
+
+
+class OtherAggregate(Aggregate):
+    pass
+
 
 def _generate_dummy_aggregate():
     _aggregate = Aggregate.generate()
@@ -153,6 +165,46 @@ def _then_the_stream_is_created_and_the_events_are_saved(context):
     )
 
 
+def _generate_new_stream_writes(num_streams):
+    return [
+        (str(uuid4()), make_vector(
+            Event.generate('EventHappened', version=1),
+            Event.generate('EventHappened', version=2),
+        ), -1)
+        for _ in range(num_streams)
+    ]
+
+
+@when(u'I save events to {num_streams:d} new streams together')
+def _when_i_save_events_to_new_streams_together(context, num_streams):
+    context.writes = _generate_new_stream_writes(num_streams)
+    context.event_store.save_events_multi(context.writes)
+
+
+@when(u'I try to save events to {num_streams:d} new streams and the same stream as if it\'s new together')
+def _when_i_try_to_save_events_to_new_streams_and_the_same_stream(
+        context, num_streams):
+    context.writes = _generate_new_stream_writes(num_streams)
+    try:
+        context.event_store.save_events_multi(context.writes + [(
+            context.stream_id, [Event.generate('EventHappened', version=3)], -1
+        )])
+    except RuntimeError as e:
+        context.error = e
+
+
+@then(u'every new stream\'s events are saved')
+def _then_every_new_streams_events_are_saved(context):
+    for id_, events, _ in context.writes:
+        assert pvector(context.event_store.get_events(id_)) == events
+
+
+@then(u'none of the new streams are saved')
+def _then_none_of_the_new_streams_are_saved(context):
+    for id_, _, _ in context.writes:
+        assert not list(context.event_store.get_events(id_))
+
+
 @when(u'I try to save another stream with the same id as if it\'s new')
 def _when_i_try_to_save_another_stream_with_the_same_id_as_if_its_new(context):
     dupe_stream_events = reversed(context.events)
@@ -471,3 +523,265 @@ def _then_no_aggregate_is_returned(context):
 @then(u'an error is raised')
 def _then_an_error_is_raised(context):
     assert isinstance(context.error, Exception)
+
+
+@when(
+    u'I generate {num_events} events in bulk for a stream starting at '
+    u'version {version}'
+)
+def _when_i_generate_events_in_bulk(context, num_events, version):
+    context.stream_id = str(uuid4())
+    context.events = Event.generate_many(
+        [('EventHappened', {'index': i}) for i in range(int(num_events))],
+        stream_id=context.stream_id,
+        start_version=int(version),
+    )
+
+
+@then(u'there are {num_events} bulk events with the same set of values')
+def _then_there_are_bulk_events_with_the_same_values(context, num_events):
+    assert len(context.events) == int(num_events)
+    for index, event in enumerate(context.events):
+        assert isinstance(event, Event)
+        assert event == Event.create(dict(event))
+        assert event.stream_id == context.stream_id
+        assert event.data == pmap({'index': index})
+
+
+@then(u'the bulk events are versioned {first:d} to {last:d}')
+def _then_the_bulk_events_are_versioned(context, first, last):
+    assert [e.version for e in context.events] == list(range(first, last + 1))
+
+
+@then(u'the bulk events have unique ids')
+def _then_the_bulk_events_have_unique_ids(context):
+    assert len(set(e.id for e in context.events)) == len(context.events)
+
+
+@when(u'I try to generate an event in bulk with {data} as its data')
+def _when_i_try_to_generate_an_event_in_bulk_with_data(context, data):
+    context.data = literal_eval(data)
+    try:
+        Event.generate_many([('EventHappened', context.data)])
+    except TypeError as e:
+        context.error = e
+
+
+@then(u'generating the event alone also raises an error')
+def _then_generating_the_event_alone_also_raises_an_error(context):
+    try:
+        Event.generate('EventHappened', data=context.data)
+    except TypeError:
+        return
+    assert False
+
+
+@given(u'{num_aggregates:d} new aggregates with uncommitted events')
+def _given_new_aggregates_with_uncommitted_events(context, num_aggregates):
+    context.aggregates = [
+        Aggregate.generate().apply_events(
+            (Event.generate('EventHappened'), Event.generate('EventHappened')),
+            apply_map=_apply_map
+        )
+        for _ in range(num_aggregates)
+    ]
+
+
+@when(u'I save the aggregates to the repository together')
+def _when_i_save_the_aggregates_to_the_repository_together(context):
+    context.aggregates = context.repository.save_aggregates(
+        context.aggregates
+    )
+
+
+@when(u'I try to save the aggregates and the aggregate copy together')
+def _when_i_try_to_save_the_aggregates_and_the_copy_together(context):
+    try:
+        context.repository.save_aggregates(
+            context.aggregates + [context.aggregate_copy]
+        )
+    except RuntimeError as e:
+        context.error = e
+
+
+@then(u'the aggregates have no uncommitted events')
+def _then_the_aggregates_have_no_uncommitted_events(context):
+    assert all(not a.uncommitted_events for a in context.aggregates)
+
+
+@then(u'the aggregates can be retrieved by id from the repository')
+def _then_the_aggregates_can_be_retrieved_by_id(context):
+    for aggregate in context.aggregates:
+        retrieved = context.repository.get_aggregate(Aggregate, aggregate.id)
+        assert retrieved.events == aggregate.events
+
+
+@then(u'none of the aggregates were saved')
+def _then_none_of_the_aggregates_were_saved(context):
+    for aggregate in context.aggregates:
+        assert context.repository.get_aggregate(
+            Aggregate, aggregate.id
+        ) is None
+    assert context.repository.get_aggregate(
+        Aggregate, context.aggregate.id
+    ).events == context.aggregate.events
+
+
+def _copy_aggregate(aggregate, cls=None, uncommitted_events=None):
+    """
+    Return an aggregate with the same fields as `aggregate` which shares
+    none of its events or state
+    """
+    if uncommitted_events is None:
+        uncommitted_events = aggregate.uncommitted_events
+    return (cls or type(aggregate))(
+        id=aggregate.id,
+        events=pvector(Event.create(dict(e)) for e in aggregate.events),
+        uncommitted_events=pvector(
+            Event.create(dict(e)) for e in uncommitted_events
+        ),
+        state=pmap(dict(aggregate.state)),
+    )
+
+
+def _fields_equal(first, second):
+    """
+    Return whether two objects are equal by pyrsistent's own comparison of
+    every PClass field or PMap item
+    """
+    base = PClass if isinstance(first, PClass) else PMap
+    result = base.__eq__(first, second)
+    if result is NotImplemented and isinstance(second, base):
+        result = base.__eq__(second, first)
+    return result is True
+
+
+@given(u'an aggregate with some committed and uncommitted events')
+def _given_an_aggregate_with_committed_and_uncommitted_events(context):
+    context.aggregate = Aggregate.generate().apply_events(
+        Event.generate_many(['EventHappened'] * 2, start_version=1),
+        committed=True, apply_map=_counting_apply_map
+    ).apply_event(
+        Event.generate('EventHappened', version=3),
+        apply_map=_counting_apply_map
+    )
+
+
+@when(u'I rebuild the aggregate from copies of its events')
+def _when_i_rebuild_the_aggregate_from_copies_of_its_events(context):
+    context.aggregate_copy = _copy_aggregate(context.aggregate)
+
+
+@when(u'I copy the aggregate with a different last event')
+def _when_i_copy_the_aggregate_with_a_different_last_event(context):
+    last = context.aggregate.uncommitted_events[-1]
+    context.aggregate_copy = _copy_aggregate(
+        context.aggregate,
+        uncommitted_events=context.aggregate.uncommitted_events.set(
+            -1, Event.generate(last.type, version=last.version)
+        )
+    )
+
+
+@then(u'the aggregates are equal and have the same hash')
+def _then_the_aggregates_are_equal_and_have_the_same_hash(context):
+    aggregate, copy = context.aggregate, context.aggregate_copy
+    assert aggregate is not copy
+    assert aggregate == copy and copy == aggregate
+    assert not aggregate != copy
+    assert hash(aggregate) == hash(copy)
+
+
+@then(u'the aggregates are the same set member and dict key')
+def _then_the_aggregates_are_the_same_set_member_and_dict_key(context):
+    aggregate, copy = context.aggregate, context.aggregate_copy
+    assert len({aggregate, copy}) == 1
+    assert copy in {aggregate}
+    assert {aggregate: 'value'}[copy] == 'value'
+
+
+@then(u'the aggregates are not equal')
+def _then_the_aggregates_are_not_equal(context):
+    aggregate, copy = context.aggregate, context.aggregate_copy
+    assert aggregate != copy and copy != aggregate
+    assert not aggregate == copy
+
+
+@then(u'the aggregates are different set members')
+def _then_the_aggregates_are_different_set_members(context):
+    aggregate, copy = context.aggregate, context.aggregate_copy
+    assert len({aggregate, copy}) == 2
+    assert copy not in {aggregate}
+
+
+@when(u'I make variations of the aggregate')
+def _when_i_make_variations_of_the_aggregate(context):
+    aggregate = context.aggregate
+    last = aggregate.uncommitted_events[-1]
+    context.variations = [
+        aggregate,
+        _copy_aggregate(aggregate),
+        _copy_aggregate(aggregate, cls=OtherAggregate),
+        _copy_aggregate(aggregate, uncommitted_events=pvector([
+            Event.generate(last.type, version=last.version)
+        ])),
+        _copy_aggregate(aggregate).set('id', str(uuid4())),
+        aggregate.mark_events_committed(),
+        aggregate.apply_event(Event.generate('EventHappened', version=4)),
+        aggregate.set_state('count', 0),
+        aggregate.set('state', pmap()),
+        Aggregate.generate(aggregate.id),
+    ]
+
+
+@then(u'aggregates are equal exactly when every field is equal')
+def _then_aggregates_are_equal_when_every_field_is_equal(context):
+    for first in context.variations:
+        for second in context.variations:
+            assert (first == second) == _fields_equal(first, second)
+            assert (first != second) != _fields_equal(first, second)
+
+
+@then(u'equal aggregates have the same hash')
+def _then_equal_aggregates_have_the_same_hash(context):
+    for first in context.variations:
+        for second in context.variations:
+            if first == second:
+                assert hash(first) == hash(second)
+
+
+@when(u'I make variations of the event')
+def _when_i_make_variations_of_the_event(context):
+    event = context.new_event.set('data', pmap({'key': 'value'}))
+    context.event = event
+    context.variations = [
+        event,
+        Event.create(dict(event)),
+        pmap(dict(event)),
+        event.set('id', str(uuid4())),
+        event.set('data', pmap({'key': 'other'})),
+        event.set('version', event.version + 1),
+        event.set('stream_id', str(uuid4())),
+        Event.create(dict(event, data=pmap({'key': 'value'}))),
+    ]
+
+
+@then(u'events are equal exactly when every field is equal')
+def _then_events_are_equal_when_every_field_is_equal(context):
+    variations = context.variations + [dict(context.event)]
+    for first in variations:
+        for second in variations:
+            if not isinstance(first, PMap) and not isinstance(second, PMap):
+                continue
+            if not isinstance(first, PMap):
+                first, second = second, first
+            assert (first == second) == _fields_equal(first, second)
+            assert (first != second) != _fields_equal(first, second)
+
+
+@then(u'equal events have the same hash')
+def _then_equal_events_have_the_same_hash(context):
+    for first in context.variations:
+        for second in context.variations:
+            if first == second:
+                assert hash(first) == hash(second)
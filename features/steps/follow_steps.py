@@ -0,0 +1,142 @@
+"""
+Feature execution steps for following event stores
+"""
+import asyncio
+import time
+from threading import Thread
+from behave import when, then
+from pyrsistent import pvector
+from dvent.event import Event
+
+
+def _follow_in_thread(context, follower):
+    context.follower = follower
+    context.received = []
+
+    def follow():
+        for event in follower:
+            context.received.append(event)
+
+    context.follower_thread = Thread(target=follow, daemon=True)
+    context.follower_thread.start()
+    context.add_cleanup(follower.close)
+
+
+def _wait_for_events(context, num_events, timeout=5):
+    deadline = time.monotonic() + timeout
+    while len(context.received) < num_events and (
+        time.monotonic() < deadline
+    ):
+        time.sleep(0.001)
+
+
+def _save_more_events(event_store, stream_id, num_events):
+    start = len(list(event_store.get_events(stream_id)))
+    return event_store.save_events(stream_id, [
+        Event.generate('EventHappened', version=start + index + 1)
+        for index in range(num_events)
+    ])
+
+
+@when(u'I follow the stream from position {pos:d} in another thread')
+def _when_i_follow_the_stream_in_another_thread(context, pos):
+    context.from_position = pos
+    _follow_in_thread(context, context.event_store.subscribe(
+        context.stream_id, from_position=pos
+    ))
+
+
+@when(u'I follow every stream from position {pos:d} in another thread')
+def _when_i_follow_every_stream_in_another_thread(context, pos):
+    context.from_position = pos
+    _follow_in_thread(context, context.event_store.subscribe(
+        from_position=pos
+    ))
+
+
+@when(u'I follow the stream from position {pos:d} with a timeout of {timeout:g} seconds')
+def _when_i_follow_the_stream_with_a_timeout(context, pos, timeout):
+    start = time.monotonic()
+    context.received = list(context.event_store.subscribe(
+        context.stream_id, from_position=pos, timeout=timeout
+    ))
+    context.elapsed = time.monotonic() - start
+
+
+@when(u'I save {num_events:d} more events to the stream')
+def _when_i_save_more_events_to_the_stream(context, num_events):
+    _save_more_events(context.event_store, context.stream_id, num_events)
+
+
+@when(u'I close the follower once it has received {num_events:d} events')
+def _when_i_close_the_follower_once_it_has_received(context, num_events):
+    _wait_for_events(context, num_events)
+    # Give the follower time to start waiting for more
+    time.sleep(0.01)
+    context.follower.close()
+
+
+@when(u'I follow the stream from position {pos:d} on an event loop while another thread saves {num_events:d} more events')
+def _when_i_follow_the_stream_on_an_event_loop(context, pos, num_events):
+    context.from_position = pos
+    context.received = []
+    follower = context.follower = context.event_store.subscribe(
+        context.stream_id, from_position=pos, timeout=5
+    )
+    expected = len(list(context.event_store.get_events(context.stream_id))) \
+        - pos + num_events
+
+    async def follow():
+        writer = Thread(target=_save_more_events, args=(
+            context.event_store, context.stream_id, num_events
+        ))
+        async for event in follower:
+            context.received.append(event)
+            if len(context.received) == len(context.events) - pos:
+                writer.start()
+            if len(context.received) == expected:
+                break
+        writer.join()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(follow())
+    finally:
+        loop.close()
+
+
+@then(u'the follower receives {num_events:d} events in order')
+def _then_the_follower_receives_events_in_order(context, num_events):
+    _wait_for_events(context, num_events)
+    assert context.received == list(context.event_store.get_events(
+        context.stream_id, start=context.from_position
+    ))
+    assert len(context.received) == num_events
+
+
+@then(u'the follower receives {num_events:d} events in the order they were saved')
+def _then_the_follower_receives_events_in_saved_order(context, num_events):
+    _wait_for_events(context, num_events)
+    assert context.received == list(context.event_store.get_events(
+        start=context.from_position
+    ))
+    assert len(context.received) == num_events
+
+
+@then(u'the follower receives {num_events:d} events and stops')
+def _then_the_follower_receives_events_and_stops(context, num_events):
+    assert pvector(context.received) == context.events
+    assert len(context.received) == num_events
+    assert context.elapsed < 1
+
+
+@then(u'the follower thread stops')
+def _then_the_follower_thread_stops(context):
+    context.follower_thread.join(timeout=5)
+    assert not context.follower_thread.is_alive()
+    assert len(context.received) == 2
+
+
+@then(u'the db has no listeners left')
+def _then_the_db_has_no_listeners_left(context):
+    assert not context.event_store.db.listeners
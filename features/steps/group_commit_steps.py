@@ -0,0 +1,90 @@
+"""
+Feature execution steps for group committed event store writes
+"""
+from threading import Barrier, Thread
+from uuid import uuid4
+from behave import given, when, then
+from pyrsistent import pvector
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore, IEventStoreVersionError
+from dvent.group_commit import GroupCommitEventStore
+
+
+def _save_concurrently(context, stream_ids):
+    """
+    Save 2 events to each stream id from its own thread, all at once
+    """
+    barrier = Barrier(len(stream_ids))
+    context.written_events = [None] * len(stream_ids)
+    context.write_errors = [None] * len(stream_ids)
+
+    def write(index, stream_id):
+        events = (
+            Event.generate('EventHappened', version=1),
+            Event.generate('EventHappened', version=2),
+        )
+        barrier.wait()
+        try:
+            context.event_store.save_events(stream_id, events, -1)
+            context.written_events[index] = pvector(events)
+        except IEventStoreVersionError as e:
+            context.write_errors[index] = e
+
+    threads = [
+        Thread(target=write, args=(index, stream_id))
+        for index, stream_id in enumerate(stream_ids)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@given(u'a new group-committing event store')
+def _given_a_new_group_committing_event_store(context):
+    context.event_store = GroupCommitEventStore.generate(
+        InMemoryEventStore.generate(publisher=lambda event: None),
+        window=0.05,
+    )
+
+
+@when(u'{num_writers} writers concurrently save new streams')
+def _when_writers_concurrently_save_new_streams(context, num_writers):
+    context.stream_ids = tuple(str(uuid4()) for _ in range(int(num_writers)))
+    _save_concurrently(context, context.stream_ids)
+
+
+@when(u'{num_writers} writers concurrently save the same new stream')
+def _when_writers_concurrently_save_the_same_new_stream(context, num_writers):
+    context.stream_id = str(uuid4())
+    _save_concurrently(context, (context.stream_id,) * int(num_writers))
+
+
+@then(u'every writer\'s stream is saved')
+def _then_every_writers_stream_is_saved(context):
+    for stream_id, events in zip(context.stream_ids, context.written_events):
+        assert pvector(context.event_store.get_events(stream_id)) == events
+
+
+@then(u'the writes were committed in fewer than {num_batches} batches')
+def _then_the_writes_were_committed_in_fewer_batches(context, num_batches):
+    committer = context.event_store.committer
+    assert committer.writes == len(context.stream_ids)
+    assert committer.batches < int(num_batches)
+
+
+@then(
+    u'{num_succeeded} write succeeds and {num_failed} write fails with a '
+    u'version error'
+)
+def _then_writes_succeed_and_fail(context, num_succeeded, num_failed):
+    succeeded = [e for e in context.written_events if e is not None]
+    failed = [e for e in context.write_errors if e is not None]
+    assert len(succeeded) == int(num_succeeded)
+    assert len(failed) == int(num_failed)
+
+
+@then(u'the contested stream only has the successful writer\'s events')
+def _then_the_contested_stream_only_has_the_successful_events(context):
+    events = [e for e in context.written_events if e is not None][0]
+    assert pvector(context.event_store.get_events(context.stream_id)) == events
@@ -0,0 +1,66 @@
+"""
+Feature execution steps for event id generators
+"""
+from uuid import UUID
+from behave import given, when, then
+from dvent.event_store import InMemoryEventStore
+from dvent.ids import (
+    TimeOrderedIdGenerator, get_id_timestamp, set_id_factory,
+    time_ordered_id_floor, uuid7_id
+)
+
+
+@given(u'a time-ordered id generator with a clock going backwards')
+def _given_a_time_ordered_id_generator_with_a_backwards_clock(context):
+    times = iter([1000.005, 1000.004, 1000.003, 1000.004, 999.0])
+    context.id_generator = TimeOrderedIdGenerator(clock=lambda: next(times))
+
+
+@given(u'time-ordered ids are selected globally')
+def _given_time_ordered_ids_are_selected_globally(context):
+    previous_factory = set_id_factory(uuid7_id)
+    context.add_cleanup(set_id_factory, previous_factory)
+
+
+@given(u'a new event store with time-ordered ids')
+def _given_a_new_event_store_with_time_ordered_ids(context):
+    context.event_store = InMemoryEventStore.generate(id_factory=uuid7_id)
+
+
+@when(u'I generate {num_ids:d} time-ordered ids')
+def _when_i_generate_time_ordered_ids(context, num_ids):
+    context.ids = [uuid7_id() for _ in range(num_ids)]
+
+
+@when(u'I generate {num_ids:d} ids with that generator')
+def _when_i_generate_ids_with_that_generator(context, num_ids):
+    context.ids = [context.id_generator() for _ in range(num_ids)]
+
+
+@when(u'I generate a new event from the event store')
+def _when_i_generate_a_new_event_from_the_event_store(context):
+    context.event = context.event_store.generate_event('EventHappened')
+
+
+@then(u'the ids are unique and already sorted')
+def _then_the_ids_are_unique_and_already_sorted(context):
+    assert len(set(context.ids)) == len(context.ids)
+    assert sorted(context.ids) == context.ids
+    assert sorted(context.ids, key=UUID) == context.ids
+
+
+@then(u'the ids are version 7 UUIDs')
+def _then_the_ids_are_version_7_uuids(context):
+    for id_ in context.ids:
+        assert UUID(id_).version == 7
+
+
+@then(u'every id sorts at or above the floor id of its own timestamp')
+def _then_every_id_sorts_at_or_above_its_floor(context):
+    for id_ in context.ids:
+        assert time_ordered_id_floor(get_id_timestamp(id_)) <= id_
+
+
+@then(u'the event id is a version 7 UUID')
+def _then_the_event_id_is_a_version_7_uuid(context):
+    assert UUID(context.event.id).version == 7
@@ -0,0 +1,52 @@
+"""
+Feature execution steps for instrumentation and metrics sinks
+"""
+from behave import given, when, then
+from dvent.event_store import InMemoryEventStore
+from dvent.instrumentation import AggregatingSink, set_sink
+
+
+def _failing_publisher(event):
+    raise RuntimeError('Publisher unavailable')
+
+
+@given(u'an aggregating metrics sink')
+def _given_an_aggregating_metrics_sink(context):
+    context.sink = AggregatingSink()
+    previous_sink = set_sink(context.sink)
+    context.add_cleanup(set_sink, previous_sink)
+
+
+@given(u'a new event store with a failing publisher')
+def _given_a_new_event_store_with_a_failing_publisher(context):
+    context.event_store = InMemoryEventStore.generate(
+        publisher=_failing_publisher
+    )
+
+
+@when(u'I record timings of {low} to {high} for a metric')
+def _when_i_record_timings_for_a_metric(context, low, high):
+    for value in range(int(low), int(high) + 1):
+        context.sink.timing('metric', value)
+
+
+@then(u'the sink has timings for {name}')
+def _then_the_sink_has_timings_for(context, name):
+    summary = context.sink.report()[name]
+    assert summary['count'] >= 1
+    assert summary['total'] > 0
+
+
+@then(u'the sink counted {value} {name}')
+def _then_the_sink_counted(context, value, name):
+    assert context.sink.report()[name] == int(value)
+
+
+@then(u'the sink observed a {name} of {value}')
+def _then_the_sink_observed_a_value(context, name, value):
+    assert context.sink.report()[name]['max'] == int(value)
+
+
+@then(u'the metric\'s p{percent} is {value}')
+def _then_the_metrics_percentile_is(context, percent, value):
+    assert context.sink.report()['metric']['p' + percent] == int(value)
@@ -0,0 +1,154 @@
+"""
+Feature execution steps for synthetic load generation
+"""
+import json
+import os
+import tempfile
+from collections import Counter
+from random import Random
+from behave import given, when, then
+from dvent.event_store import IEventStoreVersionError, InMemoryEventStore
+from dvent.load import Workload, ZipfSampler, main, run_load
+from dvent.repository import Repository
+
+
+class ConflictingEventStore(InMemoryEventStore):
+    """
+    In-memory store whose every other save raises a version conflict
+    """
+
+    def save_events(self, id_, events, expected_version=-2):
+        self.db.saves = getattr(self.db, 'saves', 0) + 1
+        if self.db.saves % 2 == 0:
+            raise IEventStoreVersionError('Conflict')
+        super().save_events(id_, events, expected_version=expected_version)
+
+
+def _run(context, **kwargs):
+    context.workload = Workload.generate(seed=1, **kwargs)
+    context.report = run_load(context.repository, context.workload)
+
+
+@given(u'a new repository whose saves conflict every other time')
+def _given_a_new_repository_whose_saves_conflict(context):
+    context.event_store = ConflictingEventStore.generate(
+        publisher=lambda event: None
+    )
+    context.repository = Repository(event_store=context.event_store)
+
+
+@when(u'I run a workload of {operations:d} operations over {streams:d} streams with {concurrency:d} workers')
+def _when_i_run_a_workload(context, operations, streams, concurrency):
+    _run(context, operations=operations, streams=streams,
+         concurrency=concurrency)
+
+
+@when(u'I run a write-only workload of {operations:d} operations over {streams:d} streams saving {events:d} events each')
+def _when_i_run_a_write_only_workload(context, operations, streams, events):
+    _run(context, operations=operations, streams=streams,
+         events_per_command=events, read_ratio=0)
+
+
+@when(u'I run a read-only workload of {operations:d} operations over {streams:d} streams')
+def _when_i_run_a_read_only_workload(context, operations, streams):
+    _run(context, operations=operations, streams=streams, read_ratio=1)
+
+
+@then(u'the report counts {operations:d} operations split into reads and writes')
+def _then_the_report_counts_operations(context, operations):
+    report = context.report
+    assert report['operations'] == operations
+    assert report['reads'] + report['writes'] == operations
+    assert report['reads'] and report['writes']
+    assert report['errors'] == 0
+
+
+@then(u'the report has latency percentiles for reads and writes')
+def _then_the_report_has_latency_percentiles(context):
+    for kind in ('all', 'read', 'write'):
+        stats = context.report['latency_ms'][kind]
+        assert 0 <= stats['p50'] <= stats['p95'] <= stats['p99'] <= \
+            stats['max']
+
+
+@then(u'the report has a throughput and a conflict rate')
+def _then_the_report_has_a_throughput_and_a_conflict_rate(context):
+    assert context.report['throughput'] > 0
+    assert 0 <= context.report['conflict_rate'] <= 1
+    # The report is JSON-compatible
+    json.dumps(context.report)
+
+
+@then(u'the streams hold {num_events:d} events more than they were seeded with')
+def _then_the_streams_hold_events(context, num_events):
+    seeded = context.workload.streams
+    assert len(list(context.event_store.get_events())) == seeded + num_events
+
+
+@then(u'the report counts {num_reads:d} reads')
+def _then_the_report_counts_reads(context, num_reads):
+    assert context.report['reads'] == num_reads
+
+
+@then(u'the report counts {num_writes:d} writes and {num_conflicts:d} conflicts')
+def _then_the_report_counts_writes_and_conflicts(context, num_writes,
+                                                  num_conflicts):
+    assert context.report['writes'] == num_writes
+    assert context.report['conflicts'] == num_conflicts
+    assert context.report['latency_ms']['write'] == {}
+
+
+@then(u'the report has a conflict rate of {percent:d}%')
+def _then_the_report_has_a_conflict_rate(context, percent):
+    assert context.report['conflict_rate'] == percent / 100
+
+
+@given(u'a Zipf sampler of {n:d} streams with an exponent of {exponent:g}')
+def _given_a_zipf_sampler(context, n, exponent):
+    context.sampler = ZipfSampler(n, exponent)
+
+
+@when(u'I sample {count:d} streams')
+def _when_i_sample_streams(context, count):
+    rng = Random(1)
+    context.samples = Counter(
+        context.sampler.sample(rng) for _ in range(count)
+    )
+    context.sample_count = count
+
+
+@then(u'the first stream is sampled most often')
+def _then_the_first_stream_is_sampled_most_often(context):
+    assert context.samples.most_common(1)[0][0] == 0
+
+
+@then(u'the first {n:d} streams are sampled more than half of the time')
+def _then_the_first_streams_are_sampled_more_than_half(context, n):
+    assert sum(context.samples[index] for index in range(n)) > \
+        context.sample_count / 2
+
+
+@then(u'every stream is sampled between {low:d} and {high:d} times')
+def _then_every_stream_is_sampled_between(context, low, high):
+    assert len(context.samples) == context.sampler.n
+    assert all(low <= count <= high for count in context.samples.values())
+
+
+@when(u'I run the load generator command line for {operations:d} operations')
+def _when_i_run_the_load_generator_command_line(context, operations):
+    fd, context.report_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    context.add_cleanup(os.remove, context.report_path)
+    main([
+        '--streams', '10', '--operations', str(operations), '--zipf', '1.1',
+        '--read-ratio', '0.8', '--concurrency', '2', '--seed', '1',
+        '-o', context.report_path,
+    ])
+
+
+@then(u'it writes a JSON report of {operations:d} operations')
+def _then_it_writes_a_json_report(context, operations):
+    with open(context.report_path) as f:
+        report = json.load(f)
+    assert report['operations'] == operations
+    assert report['workload']['zipf'] == 1.1
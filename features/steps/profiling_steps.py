@@ -0,0 +1,49 @@
+"""
+Feature execution steps for handler profiling
+"""
+from behave import given, when, then
+from pyrsistent import pmap
+from dvent.command import Command
+from dvent.command_handler import CommandHandler
+from dvent.event import Event
+from dvent.profiling import disable_profiling, enable_profiling, get_profiler
+
+
+@given(u'profiling is enabled')
+def _given_profiling_is_enabled(context):
+    context.profiler = enable_profiling()
+    context.add_cleanup(disable_profiling)
+
+
+@given(u'a new command handler')
+def _given_a_new_command_handler(context):
+    context.command_handler = CommandHandler(context=pmap())
+
+
+@when(u'I apply {num_events} {event_type} events to the aggregate')
+def _when_i_apply_events_to_the_aggregate(context, num_events, event_type):
+    context.aggregate = context.aggregate.apply_events(
+        Event.generate(event_type) for _ in range(int(num_events))
+    )
+
+
+@when(u'I handle {num_commands} {command_type} commands')
+def _when_i_handle_commands(context, num_commands, command_type):
+    for _ in range(int(num_commands)):
+        context.command_handler.handle_command(Command.generate(command_type))
+
+
+@then(u'the profile has {count} {kind} calls for {owner} {type_}')
+def _then_the_profile_has_calls_for(context, count, kind, owner, type_):
+    summaries = [
+        s for s in context.profiler.report(kind=kind)
+        if (s['owner'], s['type']) == (owner, type_)
+    ]
+    assert len(summaries) == 1
+    assert summaries[0]['count'] == int(count)
+    assert summaries[0]['total'] >= 0
+
+
+@then(u'no profiler is active')
+def _then_no_profiler_is_active(context):
+    assert get_profiler() is None
@@ -0,0 +1,113 @@
+"""
+Feature execution steps for numeric reducers
+"""
+import random
+from uuid import uuid4
+from behave import given, when, then
+from pyrsistent import pmap
+from dvent.aggregate import Aggregate
+from dvent.event import Event
+from dvent.reducers import STREAM, TYPE, NumericReducer
+
+TYPES = ('AmountAdded', 'AmountRemoved')
+
+AMOUNTS = {
+    'int': lambda: random.randint(-1000, 1000),
+    'float': lambda: random.uniform(-1000, 1000),
+    'huge': lambda: random.randint(2 ** 62, 2 ** 64),
+    'text': lambda: str(random.random()),
+}
+
+
+def _generate_reducer(group_by):
+    return NumericReducer.generate(
+        'amounts', 'amount', types=TYPES, group_by=group_by
+    )
+
+
+def _fold(reducer, events):
+    aggregate = Aggregate.generate()
+    for event in events:
+        aggregate = reducer.apply_event(aggregate, event)
+    return aggregate.state.get(reducer.name, pmap())
+
+
+@given(u'{num_streams:d} streams of {num_events:d} events with random {kind} amounts')
+def _given_streams_of_events_with_random_amounts(context, num_streams,
+                                                 num_events, kind):
+    context.stream_ids = tuple(str(uuid4()) for _ in range(num_streams))
+    for stream_id in context.stream_ids:
+        context.event_store.save_events(stream_id, tuple(
+            Event.generate(
+                # Every stream has at least one reduced event
+                TYPES[0] if index == 0 else
+                random.choice(TYPES + ('AmountIgnored',)),
+                data={'amount': AMOUNTS[kind]()},
+                version=index + 1,
+            )
+            for index in range(num_events)
+        ))
+
+
+@when(u'I reduce the amounts by {group_by} in chunks of {chunk_size:d} events')
+def _when_i_reduce_the_amounts_by(context, group_by, chunk_size):
+    context.reducer = _generate_reducer(group_by)
+    context.results = context.reducer.reduce(
+        context.event_store, chunk_size=chunk_size
+    )
+
+
+@when(u'I reduce the amounts of every event in chunks of {chunk_size:d} events')
+def _when_i_reduce_the_amounts_of_every_event(context, chunk_size):
+    context.reducer = _generate_reducer(None)
+    context.results = context.reducer.reduce(
+        context.event_store, chunk_size=chunk_size
+    )
+
+
+@when(u'I try to reduce the amounts by stream in chunks of {chunk_size:d} events')
+def _when_i_try_to_reduce_the_amounts_by_stream(context, chunk_size):
+    try:
+        _generate_reducer(STREAM).reduce(
+            context.event_store, chunk_size=chunk_size
+        )
+    except TypeError as e:
+        context.error = e
+
+
+@then(u'the results match aggregates applying each event')
+def _then_the_results_match_aggregates_applying_each_event(context):
+    reducer = context.reducer
+    expected = {}
+    for stream_id in context.stream_ids:
+        aggregate = Aggregate.generate_from_events(
+            stream_id, context.event_store.get_events(stream_id),
+            apply_map=reducer.get_apply_map()
+        )
+        if reducer.name in aggregate.state:
+            expected[stream_id] = aggregate.state[reducer.name]
+    assert context.results == pmap(expected)
+    for result in context.results.values():
+        assert set(result) == {'sum', 'count', 'min', 'max'}
+
+
+@then(u'the results match a per-event fold of each type')
+def _then_the_results_match_a_per_event_fold_of_each_type(context):
+    events = list(context.event_store.get_events())
+    expected = dict(
+        (type_, _fold(
+            context.reducer, [event for event in events if event.type == type_]
+        ))
+        for type_ in TYPES
+    )
+    assert context.results == pmap(
+        (type_, result) for type_, result in expected.items() if result
+    )
+    assert context.reducer.group_by == TYPE
+
+
+@then(u'the result matches a per-event fold of every event')
+def _then_the_result_matches_a_per_event_fold_of_every_event(context):
+    assert context.results == _fold(
+        context.reducer, context.event_store.get_events()
+    )
@@ -0,0 +1,204 @@
+"""
+Feature execution steps for the remote event store server and client
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from threading import Barrier, Thread
+from uuid import uuid4
+from behave import given, when, then
+from pyrsistent import pvector
+import dvent
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore
+from dvent.remote import EventStoreServer, RemoteEventStore
+
+SAVE_SCRIPT = '''
+import sys
+from dvent.event import Event
+from dvent.remote import RemoteEventStore
+store = RemoteEventStore.generate(
+    (sys.argv[1], int(sys.argv[2])), publisher=lambda event: None
+)
+store.save_events(sys.argv[3], (Event.generate('EventHappened'),), -1)
+'''
+
+
+def _start_server(context, address):
+    context.served_store = InMemoryEventStore.generate(
+        publisher=lambda event: None
+    )
+    context.server = EventStoreServer(context.served_store)
+    context.address = context.server.start_in_thread(address)
+    context.add_cleanup(context.server.stop)
+
+
+def _generate_client(context, **kwargs):
+    context.event_store = RemoteEventStore.generate(
+        context.address, publisher=lambda event: None, **kwargs
+    )
+    context.add_cleanup(context.event_store.pool.close)
+
+
+@given(u'an event store server on a local TCP port')
+def _given_an_event_store_server_on_a_local_tcp_port(context):
+    _start_server(context, ('127.0.0.1', 0))
+
+
+@given(u'an event store server on a Unix socket')
+def _given_an_event_store_server_on_a_unix_socket(context):
+    directory = tempfile.mkdtemp()
+    context.add_cleanup(os.rmdir, directory)
+    _start_server(context, os.path.join(directory, 'dvent.sock'))
+
+
+@given(u'a remote event store client reading pages of {page_size:d} events')
+def _given_a_remote_event_store_client_reading_pages(context, page_size):
+    _generate_client(context, page_size=page_size)
+
+
+@given(u'a remote event store client with a pool of {pool_size:d} connections')
+def _given_a_remote_event_store_client_with_a_pool(context, pool_size):
+    _generate_client(context, pool_size=pool_size)
+
+
+@when(u'I read the first event from the client and stop')
+def _when_i_read_the_first_event_from_the_client_and_stop(context):
+    events = context.event_store.get_events()
+    next(events)
+    events.close()
+
+
+@when(u'I save events to {num_streams:d} new streams together through the server')
+def _when_i_save_events_to_new_streams_through_the_server(context,
+                                                          num_streams):
+    context.writes = [
+        (str(uuid4()), pvector([
+            Event.generate('EventHappened', version=1),
+            Event.generate('EventHappened', version=2),
+        ]), -1)
+        for _ in range(num_streams)
+    ]
+    requests = context.server.requests
+    context.event_store.save_events_multi(context.writes)
+    context.batch_requests = context.server.requests - requests
+
+
+@when(u'I get the events of every stream and an unknown stream in a batch')
+def _when_i_get_the_events_of_every_stream_in_a_batch(context):
+    context.unknown_stream_id = str(uuid4())
+    requests = context.server.requests
+    context.batch = context.event_store.get_events_batch(
+        context.stream_ids + (context.unknown_stream_id,)
+    )
+    context.batch_requests = context.server.requests - requests
+
+
+@when(u'{num_threads:d} threads each save a new stream through the client')
+def _when_threads_each_save_a_new_stream(context, num_threads):
+    context.stream_ids = tuple(str(uuid4()) for _ in range(num_threads))
+    context.written_events = [None] * num_threads
+    barrier = Barrier(num_threads)
+
+    def write(index, stream_id):
+        events = pvector([
+            Event.generate('EventHappened', version=1),
+            Event.generate('EventHappened', version=2),
+        ])
+        barrier.wait()
+        context.event_store.save_events(stream_id, events, -1)
+        context.written_events[index] = events
+
+    threads = [
+        Thread(target=write, args=(index, stream_id))
+        for index, stream_id in enumerate(context.stream_ids)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@when(u'{num_processes:d} processes each save a new stream through their own client')
+def _when_processes_each_save_a_new_stream(context, num_processes):
+    context.stream_ids = tuple(str(uuid4()) for _ in range(num_processes))
+    host, port = context.address
+    root = os.path.dirname(os.path.dirname(os.path.abspath(dvent.__file__)))
+    processes = [
+        subprocess.Popen(
+            [sys.executable, '-c', SAVE_SCRIPT, host, str(port), stream_id],
+            cwd=root,
+        )
+        for stream_id in context.stream_ids
+    ]
+    assert all(process.wait(timeout=60) == 0 for process in processes)
+
+
+@then(u'the last event of the stream is the last event saved')
+def _then_the_last_event_of_the_stream_is_the_last_event_saved(context):
+    assert (
+        context.event_store.get_last_event(context.stream_id) ==
+        context.events[-1]
+    )
+
+
+@then(u'every event read from the client matches the served store')
+def _then_every_event_read_from_the_client_matches(context):
+    assert (
+        pvector(context.event_store.get_events()) ==
+        pvector(context.served_store.get_events())
+    )
+
+
+@then(u'every stream event read from the client from position {pos:d} matches the served store')
+def _then_every_stream_event_read_from_the_client_matches(context, pos):
+    assert (
+        pvector(context.event_store.get_stream_events(start=pos)) ==
+        pvector(context.served_store.get_stream_events(start=pos))
+    )
+
+
+@then(u'every stream read from the client matches the served store')
+def _then_every_stream_read_from_the_client_matches(context):
+    assert (
+        pvector(context.event_store.get_streams()) ==
+        pvector(context.served_store.get_streams())
+    )
+
+
+@then(u'the client has opened {num_connections:d} connections')
+def _then_the_client_has_opened_connections(context, num_connections):
+    assert context.event_store.pool.created == num_connections
+
+
+@then(u'the client has opened at most {num_connections:d} connections')
+def _then_the_client_has_opened_at_most_connections(context, num_connections):
+    assert context.event_store.pool.created <= num_connections
+
+
+@then(u'the batch holds each stream\'s events and none for the unknown stream')
+def _then_the_batch_holds_each_streams_events(context):
+    for stream_id in context.stream_ids:
+        assert (
+            pvector(context.batch[stream_id]) ==
+            pvector(context.served_store.get_events(stream_id))
+        )
+    assert context.batch[context.unknown_stream_id] == ()
+
+
+@then(u'the server handled {num_requests:d} request for the batch')
+def _then_the_server_handled_requests_for_the_batch(context, num_requests):
+    assert context.batch_requests == num_requests
+
+
+@then(u'every thread\'s stream is saved')
+def _then_every_threads_stream_is_saved(context):
+    for stream_id, events in zip(context.stream_ids, context.written_events):
+        assert pvector(context.served_store.get_events(stream_id)) == events
+
+
+@then(u'every process\'s stream is in the served store')
+def _then_every_processs_stream_is_in_the_served_store(context):
+    for stream_id in context.stream_ids:
+        assert len(tuple(context.served_store.get_events(stream_id))) == 1
@@ -0,0 +1,143 @@
+"""
+Feature execution steps for parallel replay from a shared event log
+"""
+import os
+import tempfile
+from behave import given, when, then
+from pyrsistent import pmap
+from dvent.aggregate import Aggregate
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore
+from dvent.replay import (
+    SharedEventLog, SharedLogError, replay_aggregates, write_log
+)
+from dvent.repository import Repository
+
+
+class Tally(Aggregate):
+    """
+    Aggregate summing the amounts of its events
+    """
+
+    @classmethod
+    def get_apply_map(cls):
+        return pmap({
+            'AmountCounted': cls.apply_amount_counted,
+        })
+
+    @staticmethod
+    def apply_amount_counted(aggregate, event):
+        return aggregate.set_state(
+            'total', aggregate.state.get('total', 0) + event.data['amount']
+        )
+
+
+def _get_log_path(context):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'events.log')
+
+    def remove():
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(directory)
+
+    context.add_cleanup(remove)
+    return path
+
+
+def _open_log(context):
+    context.log = SharedEventLog(context.log_path)
+    context.add_cleanup(context.log.close)
+    return context.log
+
+
+@given(u'a new event store holding counted streams')
+def _given_a_new_event_store_holding_counted_streams(context):
+    context.event_store = InMemoryEventStore.generate(
+        publisher=lambda event: None
+    )
+    repository = Repository(event_store=context.event_store)
+    context.stream_ids = []
+    for index in range(1, 8):
+        tally = Tally.generate().apply_events([
+            Event.generate(
+                'AmountCounted', data={'amount': index * number},
+                version=number
+            )
+            for number in range(1, index + 1)
+        ])
+        repository.save_aggregate(tally)
+        context.stream_ids.append(tally.id)
+
+
+@when(u'I write the store\'s log to a shared log file')
+def _when_i_write_the_stores_log_to_a_shared_log_file(context):
+    context.log_path = _get_log_path(context)
+    context.num_written = write_log(context.event_store, context.log_path)
+
+
+@when(u'I replay the aggregates from the shared log with {processes:d} process')
+@when(u'I replay the aggregates from the shared log with {processes:d} processes')
+def _when_i_replay_the_aggregates(context, processes):
+    context.states = replay_aggregates(
+        _open_log(context), Tally, processes=processes, chunk_size=2
+    )
+
+
+@when(u'I replay the aggregates from the shared log with {processes:d} processes replaced after every task')
+def _when_i_replay_the_aggregates_replacing_workers(context, processes):
+    context.states = replay_aggregates(
+        _open_log(context), Tally, processes=processes, chunk_size=2,
+        max_tasks_per_worker=1
+    )
+
+
+@when(u'I replay {num_streams:d} of the aggregates from the shared log with {processes:d} processes')
+def _when_i_replay_some_of_the_aggregates(context, num_streams, processes):
+    context.selected_ids = context.stream_ids[-num_streams:]
+    context.states = replay_aggregates(
+        _open_log(context), Tally, stream_ids=context.selected_ids,
+        processes=processes, chunk_size=1
+    )
+
+
+@when(u'I try to open a shared log from a file which isn\'t one')
+def _when_i_try_to_open_a_shared_log_from_another_file(context):
+    path = _get_log_path(context)
+    with open(path, 'wb') as f:
+        f.write(b'not a shared event log')
+    try:
+        SharedEventLog(path)
+    except SharedLogError as e:
+        context.error = e
+
+
+@then(u'the shared log returns the events of every stream')
+def _then_the_shared_log_returns_the_events_of_every_stream(context):
+    log = _open_log(context)
+    streams = list(context.event_store.get_streams())
+    assert log.stream_ids == [stream.id for stream in streams]
+    assert context.num_written == len(list(context.event_store.get_events()))
+    for stream in streams:
+        assert log.get_events(stream.id) == list(
+            context.event_store.get_events(stream.id)
+        )
+    assert log.get_events('missing') == []
+
+
+@then(u'every replayed state matches the aggregate from the repository')
+def _then_every_replayed_state_matches(context):
+    repository = Repository(event_store=context.event_store)
+    assert set(context.states) == set(context.stream_ids)
+    for stream_id in context.stream_ids:
+        tally = repository.get_aggregate(Tally, stream_id)
+        assert context.states[stream_id] == tally.state
+
+
+@then(u'only the selected aggregates are replayed')
+def _then_only_the_selected_aggregates_are_replayed(context):
+    repository = Repository(event_store=context.event_store)
+    assert set(context.states) == set(context.selected_ids)
+    for stream_id in context.selected_ids:
+        tally = repository.get_aggregate(Tally, stream_id)
+        assert context.states[stream_id] == tally.state
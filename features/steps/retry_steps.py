@@ -0,0 +1,92 @@
+"""
+Feature execution steps for command execution with retries
+"""
+from behave import given, when, then
+from pyrsistent import pvector
+from dvent.aggregate import Aggregate
+from dvent.command import Command
+from dvent.event import Event
+from dvent.retry import RetryPolicy, RetryStats, execute_command
+
+
+def _competing_handle_fn(context):
+    """
+    Return a handler which lets a competing writer commit first
+    """
+    def handle_fn(aggregate, command):
+        if context.competing_events:
+            context.competing_events -= 1
+            stream = pvector(context.event_store.get_events(aggregate.id))
+            context.event_store.save_events(
+                aggregate.id,
+                (Event.generate(
+                    'CompetitorActed', version=(len(stream) + 1)
+                ),),
+            )
+        context.command_event = Event.generate('CommandHandled')
+        return aggregate.apply_event(context.command_event)
+    return handle_fn
+
+
+def _execute_command(context, max_attempts):
+    context.retry_stats = RetryStats()
+    context.aggregate = execute_command(
+        context.repository,
+        Aggregate,
+        context.aggregate.id,
+        Command.generate('DoSomething'),
+        _competing_handle_fn(context),
+        policy=RetryPolicy.generate(max_attempts=max_attempts),
+        stats=context.retry_stats,
+        sleep_fn=lambda seconds: None,
+    )
+
+
+@given(u'a competing writer that commits {num_events} events first')
+def _given_a_competing_writer_that_commits_events_first(context, num_events):
+    context.competing_events = int(num_events)
+
+
+@when(u'I execute a command against the aggregate with retries')
+def _when_i_execute_a_command_against_the_aggregate_with_retries(context):
+    _execute_command(context, 5)
+
+
+@when(
+    u'I try to execute a command against the aggregate with '
+    u'{max_attempts} attempts'
+)
+def _when_i_try_to_execute_a_command_with_attempts(context, max_attempts):
+    try:
+        _execute_command(context, int(max_attempts))
+    except RuntimeError as e:
+        context.error = e
+
+
+@then(u'the command\'s event is last in the aggregate stream')
+def _then_the_commands_event_is_last_in_the_aggregate_stream(context):
+    stream = pvector(context.event_store.get_events(context.aggregate.id))
+    assert stream[-1].id == context.command_event.id
+    assert context.aggregate.events[-1].id == context.command_event.id
+
+
+@then(u'the aggregate stream has {num_events} events')
+def _then_the_aggregate_stream_has_events(context, num_events):
+    stream = pvector(context.event_store.get_events(context.aggregate.id))
+    assert len(stream) == int(num_events)
+    assert [e.version for e in stream] == list(range(1, len(stream) + 1))
+
+
+@then(
+    u'the retry stats record {attempts} attempts and {conflicts} conflicts'
+)
+def _then_the_retry_stats_record_attempts_and_conflicts(
+    context, attempts, conflicts
+):
+    assert context.retry_stats.attempts == int(attempts)
+    assert context.retry_stats.conflicts == int(conflicts)
+
+
+@then(u'the retry stats record {exhausted} exhausted execution')
+def _then_the_retry_stats_record_exhausted_execution(context, exhausted):
+    assert context.retry_stats.exhausted == int(exhausted)
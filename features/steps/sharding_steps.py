@@ -0,0 +1,99 @@
+"""
+Feature execution steps for the sharded event store
+"""
+from datetime import timedelta
+from uuid import uuid4
+from behave import given, when, then
+from pyrsistent import pvector
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore
+from dvent.sharding import HashRing, ShardedEventStore
+
+
+@given(u'a new sharded event store with {num_shards:d} shards')
+def _given_a_new_sharded_event_store(context, num_shards):
+    context.shards = [
+        InMemoryEventStore.generate(publisher=lambda event: None)
+        for _ in range(num_shards)
+    ]
+    context.event_store = ShardedEventStore.generate(context.shards)
+
+
+@given(u'{num_shards:d} shards already holding {num_streams:d} streams of '
+       u'{num_events:d} events each')
+def _given_shards_already_holding_streams(
+    context, num_shards, num_streams, num_events
+):
+    context.shards = [
+        InMemoryEventStore.generate(publisher=lambda event: None)
+        for _ in range(num_shards)
+    ]
+    context.stream_ids = []
+    for _ in range(num_streams):
+        for shard in context.shards:
+            stream_id = str(uuid4())
+            shard.save_events(stream_id, tuple(
+                Event.generate('SomethingHappened') for _ in range(num_events)
+            ))
+            context.stream_ids.append(stream_id)
+
+
+@when(u'I create a sharded event store over them')
+def _when_i_create_a_sharded_event_store_over_them(context):
+    context.event_store = ShardedEventStore.generate(context.shards)
+
+
+@when(u'I save an event with an earlier timestamp to another shard')
+def _when_i_save_an_event_with_an_earlier_timestamp_to_another_shard(context):
+    first_shard = context.event_store.get_store(context.stream_ids[0])
+    stream_id = str(uuid4())
+    while context.event_store.get_store(stream_id) is first_shard:
+        stream_id = str(uuid4())
+    earliest = min(
+        event.timestamp for event in context.event_store.get_events()
+    )
+    context.late_event = Event.generate(
+        'SomethingHappened', timestamp=earliest - timedelta(seconds=1)
+    )
+    context.event_store.save_events(stream_id, (context.late_event,))
+
+
+@then(u'only the event with the earlier timestamp is returned')
+def _then_only_the_event_with_the_earlier_timestamp_is_returned(context):
+    assert context.all_events == [context.late_event]
+
+
+@when(u'I route {num_ids:d} stream ids over {before:d} and then {after:d} shards')
+def _when_i_route_stream_ids_over_shards(context, num_ids, before, after):
+    ids = [str(uuid4()) for _ in range(num_ids)]
+    before_ring, after_ring = HashRing(before), HashRing(after)
+    context.moved_ratio = sum(
+        before_ring.get_shard(id_) != after_ring.get_shard(id_) for id_ in ids
+    ) / float(num_ids)
+
+
+@then(u'the streams are spread across more than {num_shards:d} shard')
+def _then_the_streams_are_spread_across_shards(context, num_shards):
+    used = [shard for shard in context.shards if list(shard.get_streams())]
+    assert len(used) > num_shards
+
+
+@then(u'every stream\'s events are in exactly one shard')
+def _then_every_streams_events_are_in_exactly_one_shard(context):
+    for stream_id in context.stream_ids:
+        holding = [
+            shard for shard in context.shards
+            if pvector(shard.get_events(stream_id))
+        ]
+        assert holding == [context.event_store.get_store(stream_id)]
+
+
+@then(u'the returned streams are numbered from {number:d}')
+def _then_the_returned_streams_are_numbered_from(context, number):
+    numbers = [stream.number for stream in context.new_streams]
+    assert numbers == list(range(number, number + len(numbers)))
+
+
+@then(u'fewer than {percent:d} percent of the stream ids move')
+def _then_fewer_than_percent_of_the_stream_ids_move(context, percent):
+    assert 0 < context.moved_ratio < percent / 100.0
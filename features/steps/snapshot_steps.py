@@ -0,0 +1,80 @@
+"""
+Feature execution steps for event database snapshots
+"""
+import os
+import tempfile
+from behave import when, then
+from pyrsistent import pvector
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore
+from dvent.snapshot import SnapshotError, dump_db, load_db
+
+
+def _get_snapshot_path(context):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'events.snapshot')
+
+    def cleanup():
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(directory)
+    context.add_cleanup(cleanup)
+    return path
+
+
+@when(u'I dump the event database to a {format_} snapshot')
+def _when_i_dump_the_event_database_to_a_snapshot(context, format_):
+    context.snapshot_path = _get_snapshot_path(context)
+    dump_db(
+        context.event_store.db, context.snapshot_path,
+        compress=(format_ == 'compressed')
+    )
+
+
+@when(u'I load the snapshot into a new event store')
+def _when_i_load_the_snapshot_into_a_new_event_store(context):
+    context.loaded_store = InMemoryEventStore.generate(
+        publisher=lambda event: None, db=load_db(context.snapshot_path)
+    )
+
+
+@when(u'I try to load a file which isn\'t a snapshot')
+def _when_i_try_to_load_a_file_which_isnt_a_snapshot(context):
+    path = _get_snapshot_path(context)
+    with open(path, 'wb') as f:
+        f.write(b'not a snapshot')
+    try:
+        load_db(path)
+    except SnapshotError as e:
+        context.error = e
+
+
+@then(u'the loaded store has the same events in the same order')
+def _then_the_loaded_store_has_the_same_events_in_the_same_order(context):
+    assert (
+        pvector(context.loaded_store.get_events()) ==
+        pvector(context.event_store.get_events())
+    )
+    for stream_id in context.stream_ids:
+        assert (
+            pvector(context.loaded_store.get_events(stream_id)) ==
+            pvector(context.event_store.get_events(stream_id))
+        )
+
+
+@then(u'the loaded store has the same streams in the same order')
+def _then_the_loaded_store_has_the_same_streams_in_the_same_order(context):
+    assert (
+        pvector(context.loaded_store.get_streams()) ==
+        pvector(context.event_store.get_streams())
+    )
+
+
+@then(u'new events can be saved to the loaded store')
+def _then_new_events_can_be_saved_to_the_loaded_store(context):
+    stream_id = context.stream_ids[0]
+    last_event = context.loaded_store.get_last_event(stream_id)
+    new_event = Event.generate('EventHappened')
+    context.loaded_store.save_events(stream_id, (new_event,))
+    assert context.loaded_store.get_last_event(stream_id) == new_event
+    assert context.event_store.get_last_event(stream_id) == last_event
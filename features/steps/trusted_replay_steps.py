@@ -0,0 +1,103 @@
+"""
+Feature execution steps for trusted replay of stored events
+"""
+from uuid import uuid4
+from behave import given, when, then
+from pyrsistent import InvariantException, pvector
+from dvent.aggregate import Aggregate
+from dvent.event import (
+    Event, is_fast_construction, set_fast_construction, set_trusted_replay
+)
+
+
+@given(u'a set of stored event values')
+def _given_a_set_of_stored_event_values(context):
+    context.stream_id = str(uuid4())
+    context.stored_values = [
+        dict(event) for event in Event.generate_many(
+            [('EventHappened', {'index': i}) for i in range(3)],
+            stream_id=context.stream_id,
+            start_version=1,
+        )
+    ]
+
+
+@given(u'trusted replay is disabled')
+def _given_trusted_replay_is_disabled(context):
+    previous = set_trusted_replay(False)
+    context.add_cleanup(set_trusted_replay, previous)
+
+
+@when(u'I build events from the stored values as trusted')
+def _when_i_build_events_from_the_stored_values_as_trusted(context):
+    context.events = pvector(
+        Event.create_trusted(values) for values in context.stored_values
+    )
+
+
+@when(u'I rebuild an aggregate from the stored events')
+def _when_i_rebuild_an_aggregate_from_the_stored_events(context):
+    context.trusted_aggregate = Aggregate.generate_from_events(
+        context.stream_id,
+        pvector(Event.create_trusted(v) for v in context.stored_values),
+    )
+
+
+@when(
+    u'I rebuild an aggregate from the stored events with trusted replay '
+    u'disabled'
+)
+def _when_i_rebuild_an_aggregate_with_trusted_replay_disabled(context):
+    previous = set_trusted_replay(False)
+    try:
+        context.validated_aggregate = Aggregate.generate_from_events(
+            context.stream_id,
+            pvector(Event.create_trusted(v) for v in context.stored_values),
+        )
+    finally:
+        set_trusted_replay(previous)
+
+
+@when(
+    u'I rebuild an aggregate from the stored events with the fast path '
+    u'disabled'
+)
+def _when_i_rebuild_an_aggregate_with_the_fast_path_disabled(context):
+    previous = set_fast_construction(False)
+    try:
+        assert not is_fast_construction()
+        context.validated_aggregate = Aggregate.generate_from_events(
+            context.stream_id,
+            pvector(Event.create_trusted(v) for v in context.stored_values),
+        )
+    finally:
+        set_fast_construction(previous)
+
+
+@when(u'I try to build an event from stored values with a negative version')
+def _when_i_try_to_build_an_event_with_a_negative_version(context):
+    values = dict(Event.generate('EventHappened'), version=-1)
+    try:
+        Event.create_trusted(values)
+    except InvariantException as e:
+        context.error = e
+
+
+@then(u'the events equal events built with full validation')
+def _then_the_events_equal_events_built_with_full_validation(context):
+    validated = pvector(Event.create(v) for v in context.stored_values)
+    assert context.events == validated
+    assert [hash(e) for e in context.events] == [hash(e) for e in validated]
+
+
+@then(u'both rebuilt aggregates are equal')
+def _then_both_rebuilt_aggregates_are_equal(context):
+    assert context.trusted_aggregate == context.validated_aggregate
+    assert context.trusted_aggregate.version == 3
+    assert hash(context.trusted_aggregate) == \
+        hash(context.validated_aggregate)
+
+
+@then(u'the fast path is enabled again')
+def _then_the_fast_path_is_enabled_again(context):
+    assert is_fast_construction()
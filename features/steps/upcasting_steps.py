@@ -0,0 +1,183 @@
+"""
+Feature execution steps for event upcasting
+"""
+from behave import given, when, then
+from pyrsistent import pmap
+from dvent.aggregate import Aggregate
+from dvent.event import Event
+from dvent.event_store import InMemoryEventStore
+from dvent.repository import Repository
+from dvent.upcasting import VERSION_KEY, UpcasterRegistry, rewrite_events
+
+EVENT_TYPE = 'ItemRenamed'
+
+
+class Item(Aggregate):
+    """
+    Aggregate whose state is the data of its last event
+    """
+
+    @classmethod
+    def get_apply_map(cls):
+        return pmap({
+            EVENT_TYPE: cls.apply_item_renamed,
+        })
+
+    @staticmethod
+    def apply_item_renamed(aggregate, event):
+        return aggregate.set_state('data', event.data)
+
+
+def _upcaster(version):
+    def upcast(data):
+        return data.set('steps', data.get('steps', ()) + (version,))
+    return upcast
+
+
+def _read_events(context):
+    return list(context.event_store.get_events(context.stream_id))
+
+
+@given(u'a new event store with upcasters to version {version:d}')
+def _given_a_new_event_store_with_upcasters(context, version):
+    context.upcasters = UpcasterRegistry()
+    for step in range(1, version):
+        context.upcasters.register(EVENT_TYPE, step, _upcaster(step))
+    context.latest_version = version
+    context.event_store = InMemoryEventStore.generate(
+        publisher=lambda event: None, upcasters=context.upcasters
+    )
+
+
+@when(u'I save a stream with events at schema version {version:d} before '
+      u'the upcasters existed')
+def _when_i_save_a_stream_with_events_at_schema_version(context, version):
+    context.stream_id = Event.generate('Placeholder').id
+    data = {'name': 'item'}
+    if version > 1:
+        data[VERSION_KEY] = version
+    context.events = [
+        Event.generate(EVENT_TYPE, data=data, version=index)
+        for index in range(1, 4)
+    ]
+    # Saved by a store without upcasters, so the events aren't stamped
+    InMemoryEventStore.generate(
+        publisher=lambda event: None, db=context.event_store.db
+    ).save_events(context.stream_id, context.events)
+
+
+@when(u'I save a stream with events at the latest schema')
+def _when_i_save_a_stream_with_events_at_the_latest_schema(context):
+    context.stream_id = Event.generate('Placeholder').id
+    context.events = [
+        Event.generate(EVENT_TYPE, data={'name': 'item'}, version=index)
+        for index in range(1, 4)
+    ]
+    context.event_store.save_events(context.stream_id, context.events)
+
+
+@when(u'I register another upcaster from version {version:d}')
+def _when_i_register_another_upcaster(context, version):
+    try:
+        context.upcasters.register(EVENT_TYPE, version, _upcaster(version))
+    except ValueError as e:
+        context.error = e
+
+
+@when(u'I register an upcaster from version {version:d}')
+def _when_i_register_an_upcaster(context, version):
+    context.upcasters.register(EVENT_TYPE, version, _upcaster(version))
+
+
+@when(u'I read the stream\'s events')
+def _when_i_read_the_streams_events(context):
+    try:
+        _read_events(context)
+    except ValueError as e:
+        context.error = e
+
+
+@when(u'I read the stream\'s events twice')
+def _when_i_read_the_streams_events_twice(context):
+    context.chains = []
+    get_chain = context.upcasters.get_chain
+
+    def recording_get_chain(type_, version):
+        chain = get_chain(type_, version)
+        context.chains.append(chain)
+        return chain
+
+    context.upcasters.get_chain = recording_get_chain
+    _read_events(context)
+    _read_events(context)
+
+
+@when(u'I rewrite the store into a new store')
+def _when_i_rewrite_the_store_into_a_new_store(context):
+    context.target_store = InMemoryEventStore.generate(
+        publisher=lambda event: None
+    )
+    context.num_rewritten = rewrite_events(
+        context.event_store, context.target_store, context.upcasters
+    )
+
+
+@then(u'every event read from the store is at schema version {version:d}')
+def _then_every_event_is_at_schema_version(context, version):
+    events = _read_events(context)
+    assert len(events) == len(context.events)
+    for saved, read in zip(context.events, events):
+        assert read.data[VERSION_KEY] == version
+        assert read.data['name'] == 'item'
+        assert read.id == saved.id
+        assert read.version == saved.version
+
+
+@then(u'every upcaster was applied in order')
+def _then_every_upcaster_was_applied_in_order(context):
+    steps = tuple(range(1, context.latest_version))
+    for event in _read_events(context):
+        assert event.data['steps'] == steps
+
+
+@then(u'the events read from the store are the saved events')
+def _then_the_events_read_are_the_saved_events(context):
+    assert _read_events(context) == list(context.events)
+
+
+@then(u'the data of every event read from the store is unchanged but '
+      u'for its schema version {version:d}')
+def _then_the_data_of_every_event_read_is_unchanged(context, version):
+    events = _read_events(context)
+    assert len(events) == len(context.events)
+    for saved, read in zip(context.events, events):
+        assert read.data == saved.data.set(VERSION_KEY, version)
+        assert read.id == saved.id
+
+
+@then(u'the same upcaster chain was used for every read')
+def _then_the_same_upcaster_chain_was_used(context):
+    assert len(context.chains) == 2 * len(context.events)
+    assert context.chains[0] is not None
+    assert all(chain is context.chains[0] for chain in context.chains)
+
+
+@then(u'the stream\'s aggregate is built from data at schema version {version:d}')
+def _then_the_streams_aggregate_is_built_from_upcast_data(context, version):
+    repository = Repository(event_store=context.event_store)
+    item = repository.get_aggregate(Item, context.stream_id)
+    assert item.state['data'][VERSION_KEY] == version
+    assert item.state['data']['steps'] == tuple(range(1, version))
+
+
+@then(u'every event in the new store is upcast with its id and version kept')
+def _then_every_event_in_the_new_store_is_upcast(context):
+    source = list(context.event_store.get_stream_events())
+    target = list(context.target_store.get_stream_events())
+    assert context.num_rewritten == len(source)
+    assert target == source
+    for _, event in target:
+        if event.type == EVENT_TYPE:
+            assert event.data[VERSION_KEY] == context.latest_version
+    # The target store has no upcasters, so reads return the rewritten data
+    assert context.target_store.upcasters is None
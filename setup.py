@@ -44,5 +44,8 @@ setup(
     install_requires=[
         'pyrsistent>=0.14.2,<1',
     ],
+    extras_require={
+        'numpy': ['numpy>=1.15'],
+    },
     python_requires='>=3.4',
 )